@@ -0,0 +1,394 @@
+#
+# File:    ActiveNeighbourCounts.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Incrementally maintained index of the number of neighbours of each
+node with outcome variable 1 ("active" neighbours), and versions of the
+contagion-type change statistics that use it.
+
+The contagion-type change statistics (Contagion, GWContagion,
+LogContagion etc.) count the number of neighbours of a node that have
+the outcome variable, and some of them (the geometrically weighted,
+log and power versions, and the alter two-star 2 statistics) also do
+this for every neighbour of the node, so are O(d^2) for a node of
+degree d. By keeping, for every node, the count of neighbours (in- and
+out-neighbours for directed graphs) with outcome 1, updated in O(d)
+only when the outcome of a node is changed, these become O(1) (Contagion)
+or O(d).
+
+The index also records which nodes it considers to have outcome 1, so
+that it is not affected by the samplers temporarily setting A[i] = 0
+for the node i whose change statistics are being computed. The change
+statistics here therefore give exactly the same values as the
+corresponding functions in changeStatisticsALAAM.py etc.
+
+The indexed change statistic functions have the same parameters as the
+corresponding change statistic function, with the additional final
+parameter nbrcounts for the ActiveNeighbourCounts object, so that
+e.g. partial(changeGWContagion, log(2)) corresponds to
+partial(changeGWContagionIndexed, log(2)) which is then called
+with (G, A, i, nbrcounts). Use get_indexed_changestat() to get the
+indexed version of a change statistic function.
+"""
+
+import math
+import functools
+import numpy as np         # used for matrix & vector data types and functions
+
+from Digraph import Digraph
+from BipartiteGraph import BipartiteGraph
+import changeStatisticsALAAM
+import changeStatisticsALAAMdirected
+import changeStatisticsALAAMbipartite
+
+
+class ActiveNeighbourCounts:
+    """Count, for each node, the number of neighbours with outcome 1.
+    For undirected graphs, count[i] is the number of neighbours of i
+    with outcome 1 and degsum[i] the sum of their degrees. For
+    directed graphs, outcount[i] is the number of out-neighbours and
+    incount[i] the number of in-neighbours of i with outcome 1.
+
+    The counts (and the active list) are Python lists, not numpy
+    arrays, as they are accessed one element at a time from Python
+    code, which is much faster for lists. The active nodes are also
+    kept in the numpy boolean array active_mask, updated in place along
+    with the active list, so that sync() can find the nodes whose
+    outcome has changed with a single vectorized comparison.
+    """
+
+    def __init__(self, G, A):
+        """
+        Construct the counts for outcome vector A on graph G.
+
+        Parameters:
+           G   - Graph or Digraph (or BipartiteGraph) object
+           A   - vector of 0/1 (or NA) outcome variables for ALAAM
+        """
+        self.directed = isinstance(G, Digraph)
+        N = G.numNodes()
+        self.active = [0] * N # 1 if node has outcome 1 else 0
+        self.active_mask = np.zeros(N, dtype=bool) # True if active[i] == 1
+        if self.directed:
+            self.outcount = [0] * N
+            self.incount = [0] * N
+        else:
+            self.count = [0] * N
+            self.degsum = [0] * N
+        self.sync(G, A)
+
+
+    def update(self, G, A, i):
+        """
+        Update the counts for the (possibly) changed outcome of node i.
+        Call this after the value of A[i] is changed.
+
+        Parameters:
+           G   - Graph or Digraph object the counts are for
+           A   - vector of 0/1 (or NA) outcome variables for ALAAM
+           i   - node whose outcome A[i] has changed
+        """
+        a = 1 if A[i] == 1 else 0
+        d = a - self.active[i]
+        if d == 0:
+            return
+        self.active[i] = a
+        self.active_mask[i] = a
+        if self.directed:
+            # i is an in-neighbour of its out-neighbours, and vice versa
+            for u in G.outIterator(i):
+                self.incount[u] += d
+            for u in G.inIterator(i):
+                self.outcount[u] += d
+        else:
+            ddeg = d * G.degree(i)
+            for u in G.neighbourIterator(i):
+                self.count[u] += d
+                self.degsum[u] += ddeg
+
+
+    def sync(self, G, A):
+        """
+        Update the counts so they are correct for the outcome vector A,
+        updating only for nodes whose outcome has changed.
+
+        Parameters:
+           G   - Graph or Digraph object the counts are for
+           A   - vector of 0/1 (or NA) outcome variables for ALAAM
+        """
+        changed = np.nonzero((np.asarray(A) == 1) != self.active_mask)[0]
+        for i in changed.tolist():
+            self.update(G, A, i)
+
+
+
+def changeContagionIndexed(G, A, i, nbrcounts):
+    r"""
+    change statistic for Contagion (partner attribute), using
+    active neighbour counts
+
+    *--*
+    """
+    return nbrcounts.count[i]
+
+
+def changeIndirectPartnerAttributeIndexed(G, A, i, nbrcounts):
+    r"""
+    Change statistic for indirect partner attribute (Alter-2Star2),
+    using active neighbour counts
+
+    *--o--*
+    """
+    # i is a neighbour of each neighbour u, so not counted if it is active
+    ai = nbrcounts.active[i]
+    count = nbrcounts.count
+    delta = 0
+    for u in G.neighbourIterator(i):
+        delta += count[u] - ai
+    return delta
+
+
+def changePartnerAttributeActivityIndexed(G, A, i, nbrcounts):
+    r"""Change statistic for partner attribute activity, using
+    active neighbour counts
+
+    *--*--o
+
+    """
+    return (nbrcounts.count[i] * (G.degree(i) - 2) + nbrcounts.degsum[i])
+
+
+def changeGWContagionIndexed(alpha, G, A, i, nbrcounts):
+    r"""Change statistic for Geometrically Weighted Contagion,
+    using active neighbour counts
+
+       *
+      /
+     *--*
+      \ :
+       *
+
+    """
+    ai = nbrcounts.active[i]
+    count = nbrcounts.count
+    delta = 0
+    for j in G.neighbourIterator(i):
+        if A[j] == 1:
+            djplus = count[j] - ai
+            delta += (math.exp(-alpha * (djplus + 1)) -
+                      math.exp(-alpha * djplus))
+    delta += math.exp(-alpha * count[i])
+    return delta
+
+
+def changeLogContagionIndexed(G, A, i, nbrcounts):
+    r"""Change statistic for Logarithmic Contagion, using active
+    neighbour counts
+
+       *
+      /
+     *--*
+      \ :
+       *
+
+    """
+    ai = nbrcounts.active[i]
+    count = nbrcounts.count
+    delta = 0
+    for j in G.neighbourIterator(i):
+        if A[j] == 1:
+            djplus = count[j] - ai
+            delta += math.log((djplus + 2) / (djplus + 1))
+    delta += math.log(count[i] + 1)
+    return delta
+
+
+def changePowerContagionIndexed(beta, G, A, i, nbrcounts):
+    r"""Change statistic for Power Contagion, using active neighbour counts
+
+       *
+      /
+     *--*
+      \ :
+       *
+
+    """
+    ai = nbrcounts.active[i]
+    count = nbrcounts.count
+    delta = 0
+    for j in G.neighbourIterator(i):
+        if A[j] == 1:
+            djplus = count[j] - ai
+            delta += (math.pow(djplus + 1, 1/beta) -
+                      math.pow(djplus, 1/beta))
+    delta += math.pow(count[i], 1/beta)
+    return delta
+
+
+def changeBipartiteAlterTwoStar2Indexed(mode, G, A, i, nbrcounts):
+    r"""
+    Change statistic for bipartite alter two-star 2, using active
+    neighbour counts
+
+    *--o--*
+    """
+    return (changeIndirectPartnerAttributeIndexed(G, A, i, nbrcounts)
+            if G.bipartite_node_mode(i) == mode else 0)
+
+
+def changeContagionDirectedIndexed(G, A, i, nbrcounts):
+    r"""
+    change statistic for directed Contagion (partner attribute), using
+    active neighbour counts
+
+    *->*
+    """
+    return nbrcounts.outcount[i] + nbrcounts.incount[i]
+
+
+def changeAlterInTwoStar2Indexed(G, A, i, nbrcounts):
+    r"""
+    Change statistic for AlterInTwoStar2, using active neighbour counts
+
+    *<--o-->*
+    """
+    ai = nbrcounts.active[i]
+    outcount = nbrcounts.outcount
+    delta = 0
+    for u in G.inIterator(i):
+        delta += outcount[u] - ai
+    return delta
+
+
+def changeAlterOutTwoStar2Indexed(G, A, i, nbrcounts):
+    r"""
+    Change statistic for AlterOutTwoStar2, using active neighbour counts
+
+    *-->o<--*
+    """
+    ai = nbrcounts.active[i]
+    incount = nbrcounts.incount
+    delta = 0
+    for u in G.outIterator(i):
+        delta += incount[u] - ai
+    return delta
+
+
+def changeGWContagionDirectedIndexed(alpha, G, A, i, nbrcounts):
+    r"""Change statistic for directed Geometrically Weighted Contagion,
+    using active neighbour counts
+    """
+    ai = nbrcounts.active[i]
+    incount = nbrcounts.incount
+    outcount = nbrcounts.outcount
+    delta = 0
+    for j in G.outIterator(i):
+        if A[j] == 1:
+            djplus = incount[j] - ai
+            delta += (math.exp(-alpha * (djplus + 1)) -
+                      math.exp(-alpha * djplus))
+    delta += math.exp(-alpha * outcount[i])
+    for j in G.inIterator(i):
+        if A[j] == 1:
+            djplus = outcount[j] - ai
+            delta += (math.exp(-alpha * (djplus + 1)) -
+                      math.exp(-alpha * djplus))
+    delta += math.exp(-alpha * incount[i])
+    return delta
+
+
+def changeLogContagionDirectedIndexed(G, A, i, nbrcounts):
+    r"""Change statistic for directed Log Contagion, using active
+    neighbour counts
+    """
+    ai = nbrcounts.active[i]
+    incount = nbrcounts.incount
+    outcount = nbrcounts.outcount
+    delta = 0
+    for j in G.outIterator(i):
+        if A[j] == 1:
+            djplus = incount[j] - ai
+            delta += math.log((djplus + 2) / (djplus + 1))
+    delta += math.log(outcount[i] + 1)
+    for j in G.inIterator(i):
+        if A[j] == 1:
+            djplus = outcount[j] - ai
+            delta += math.log((djplus + 2) / (djplus + 1))
+    delta += math.log(incount[i] + 1)
+    return delta
+
+
+def changePowerContagionDirectedIndexed(beta, G, A, i, nbrcounts):
+    r"""Change statistic for directed Power Contagion, using active
+    neighbour counts
+    """
+    ai = nbrcounts.active[i]
+    incount = nbrcounts.incount
+    outcount = nbrcounts.outcount
+    delta = 0
+    for j in G.outIterator(i):
+        if A[j] == 1:
+            djplus = incount[j] - ai
+            delta += (math.pow(djplus + 1, 1/beta) -
+                      math.pow(djplus, 1/beta))
+    delta += math.pow(outcount[i], 1/beta)
+    for j in G.inIterator(i):
+        if A[j] == 1:
+            djplus = outcount[j] - ai
+            delta += (math.pow(djplus + 1, 1/beta) -
+                      math.pow(djplus, 1/beta))
+    delta += math.pow(incount[i], 1/beta)
+    return delta
+
+
+# Map from change statistic functions to their versions using the
+# active neighbour counts
+INDEXED_CHANGESTATS = {
+    changeStatisticsALAAM.changeContagion : changeContagionIndexed,
+    changeStatisticsALAAM.changeIndirectPartnerAttribute :
+      changeIndirectPartnerAttributeIndexed,
+    changeStatisticsALAAM.changePartnerAttributeActivity :
+      changePartnerAttributeActivityIndexed,
+    changeStatisticsALAAM.changeGWContagion : changeGWContagionIndexed,
+    changeStatisticsALAAM.changeLogContagion : changeLogContagionIndexed,
+    changeStatisticsALAAM.changePowerContagion : changePowerContagionIndexed,
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar2 :
+      changeBipartiteAlterTwoStar2Indexed,
+    changeStatisticsALAAMdirected.changeContagion :
+      changeContagionDirectedIndexed,
+    changeStatisticsALAAMdirected.changeAlterInTwoStar2 :
+      changeAlterInTwoStar2Indexed,
+    changeStatisticsALAAMdirected.changeAlterOutTwoStar2 :
+      changeAlterOutTwoStar2Indexed,
+    changeStatisticsALAAMdirected.changeGWContagion :
+      changeGWContagionDirectedIndexed,
+    changeStatisticsALAAMdirected.changeLogContagion :
+      changeLogContagionDirectedIndexed,
+    changeStatisticsALAAMdirected.changePowerContagion :
+      changePowerContagionDirectedIndexed,
+}
+
+
+def get_indexed_changestat(changestat_func):
+    """Return the version of a change statistic function that uses the
+    active neighbour counts, or None if there is no such version.
+
+    Parameters:
+        changestat_func - change statistic function, possibly created
+                          with functools.partial(), e.g.
+                          partial(changeGWContagion, log(2))
+
+    Return value:
+        Function with the signature (G, A, i, nbrcounts) computing the
+        same change statistic using the ActiveNeighbourCounts object
+        nbrcounts, e.g. partial(changeGWContagionIndexed, log(2)),
+        or None if the change statistic has no indexed version.
+    """
+    if isinstance(changestat_func, functools.partial):
+        indexed_func = get_indexed_changestat(changestat_func.func)
+        if indexed_func is None:
+            return None
+        return functools.partial(indexed_func, *changestat_func.args,
+                                 **changestat_func.keywords)
+    return INDEXED_CHANGESTATS.get(changestat_func)
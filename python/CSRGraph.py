@@ -0,0 +1,1087 @@
+#
+# File:    CSRGraph.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+# Defines immutable (frozen) compressed sparse row (CSR) versions of
+# the Graph, Digraph and BipartiteGraph structures, and a binary
+# file format for them that can be loaded with memory mapping.
+#
+
+import bisect
+import collections
+import json
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np         # used for matrix & vector data types and functions
+
+from Graph import Graph
+from Digraph import Digraph
+from BipartiteGraph import BipartiteGraph,MODE_A,MODE_B
+from SparseMatrix import CSRSparseMatrix
+from readGraphFiles import readPajekEdges,readAttributeFile,readZoneFile
+from utils import NA_VALUE,attribute_columns,BINATTR_DTYPE,CATATTR_DTYPE,CONTATTR_DTYPE
+
+
+def adjacency_to_csr(n, adjdict):
+    """
+    Build the CSR arrays from a dictionary of dictionaries adjacency
+    structure such as Graph.G, Digraph.G or Digraph.Grev.
+
+    Parameters:
+        n       - number of nodes (rows)
+        adjdict - dict of dicts where adjdict[i] has the neighbours
+                  of node i as keys
+
+    Return value:
+        tuple (indptr, indices) of int32 numpy arrays, where the neighbours
+        of node i are indices[indptr[i]:indptr[i+1]], in sorted order.
+    """
+    degrees = np.fromiter((len(adjdict[i]) for i in range(n)),
+                          dtype=np.int64, count=n)
+    nnz = int(np.sum(degrees))
+    assert nnz < 2**31  # must fit in int32 indices
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(degrees)
+    indices = np.fromiter((j for i in range(n) for j in sorted(adjdict[i])),
+                          dtype=np.int32, count=nnz)
+    return (indptr, indices)
+
+
+def edges_to_csr(n, src, dst):
+    """
+    Build the CSR arrays from arrays of (source, destination) node pairs,
+    e.g. as read by readGraphFiles.readPajekEdges(). Duplicate pairs
+    are only included once.
+
+    Parameters:
+        n       - number of nodes (rows)
+        src     - numpy array of source nodes
+        dst     - numpy array of destination nodes, corresponding to src
+
+    Return value:
+        tuple (indptr, indices) of int32 numpy arrays, where the neighbours
+        of node i are indices[indptr[i]:indptr[i+1]], in sorted order.
+    """
+    # sorting on src * n + dst sorts by source and then destination
+    keys = np.sort(np.asarray(src, dtype=np.int64) * n + dst)
+    keys = keys[np.concatenate(([True], np.diff(keys) != 0))] # remove duplicates
+    assert len(keys) < 2**31  # must fit in int32 indices
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.bincount(keys // n, minlength=n))
+    return (indptr, (keys % n).astype(np.int32))
+
+
+def reverse_csr(n, indptr, indices):
+    """
+    Build the CSR arrays for the transpose (all arcs reversed) of the
+    supplied CSR structure.
+
+    Parameters:
+        n       - number of nodes (rows)
+        indptr  - row pointer array
+        indices - column indices array
+
+    Return value:
+        tuple (rev_indptr, rev_indices) of int32 numpy arrays, where
+        the in-neighbours of node j are rev_indices[rev_indptr[j]:rev_indptr[j+1]]
+        in sorted order.
+    """
+    rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+    # stable sort by column keeps the source rows in sorted order
+    order = np.argsort(indices, kind='stable')
+    rev_indices = rows[order].astype(np.int32)
+    rev_indptr = np.zeros(n + 1, dtype=np.int32)
+    rev_indptr[1:] = np.cumsum(np.bincount(indices, minlength=n))
+    return (rev_indptr, rev_indices)
+
+
+def twopaths_csr(indptr, indices):
+    """
+    Build the CSR arrays of the sparse matrix of two-path counts, i.e.
+    the number of paths i -- v -- j for each pair of distinct nodes i, j
+    with at least one such path, from the CSR arrays of an undirected graph.
+    This is the same matrix as BipartiteGraph.twoPathsMatrix.
+
+    Parameters:
+        indptr  - row pointer array of symmetric graph adjacency
+        indices - column indices array of symmetric graph adjacency
+
+    Return value:
+        tuple (indptr, indices, data) of numpy arrays (int32, int32, int64)
+        for the two-paths count matrix, columns in sorted order in each row.
+    """
+    n = len(indptr) - 1
+    tp_indptr = np.zeros(n + 1, dtype=np.int32)
+    tp_indices = []
+    tp_data = []
+    for i in range(n):
+        counts = {}
+        for u in indices[indptr[i]:indptr[i+1]].tolist():
+            for v in indices[indptr[u]:indptr[u+1]].tolist():
+                if v != i:
+                    counts[v] = counts.get(v, 0) + 1
+        for v in sorted(counts):
+            tp_indices.append(v)
+            tp_data.append(counts[v])
+        tp_indptr[i+1] = len(tp_indices)
+    return (tp_indptr, np.array(tp_indices, dtype=np.int32),
+            np.array(tp_data, dtype=np.int64))
+
+
+class CategoryMatch:
+    """Per-edge arrays for a categorical attribute, aligned with
+    the CSR neighbour list (indices) of a graph: same[k] is True when
+    the node i (where indptr[i] <= k < indptr[i+1]) and its neighbour
+    indices[k] both have the attribute (not NA) and the values are
+    equal, and diff[k] is True when they both have the attribute and
+    the values are not equal. The categorical homophily change
+    statistics (oO_Osame etc.) then just scan (or count) these
+    rather than comparing the attribute values of each pair of nodes.
+
+    same_count[i] and diff_count[i] are the number of neighbours of i
+    with the same and different value of the attribute respectively.
+    These are lists, not numpy arrays, as they are accessed one element
+    at a time from Python code.
+    """
+
+    def __init__(self, indptr, indices, values):
+        """
+        Construct the arrays for the attribute values on the graph
+        with CSR arrays indptr and indices.
+
+        Parameters:
+            indptr  - CSR row pointer array (length N+1)
+            indices - CSR column indices array
+            values  - numpy array of categorical attribute values by node
+        """
+        self.values = values
+        self.indptr = indptr
+        self.indices = indices
+        values = np.asarray(values)
+        node_values = np.repeat(values, np.diff(indptr))
+        nbr_values = values[indices]
+        not_na = (node_values != NA_VALUE) & (nbr_values != NA_VALUE)
+        self.same = not_na & (node_values == nbr_values)
+        self.diff = not_na & (node_values != nbr_values)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        self.same_count = np.bincount(rows[self.same],
+                                      minlength=len(indptr) - 1).tolist()
+        self.diff_count = np.bincount(rows[self.diff],
+                                      minlength=len(indptr) - 1).tolist()
+
+    def sameNeighbours(self, i):
+        """
+        Return list of the neighbours of i with the same value of the
+        attribute (neither being NA)
+        """
+        start = self.indptr[i]
+        end = self.indptr[i+1]
+        return self.indices[start:end][self.same[start:end]].tolist()
+
+    def diffNeighbours(self, i):
+        """
+        Return list of the neighbours of i with a different value of the
+        attribute (neither being NA)
+        """
+        start = self.indptr[i]
+        end = self.indptr[i+1]
+        return self.indices[start:end][self.diff[start:end]].tolist()
+
+
+def get_category_match(G, cache, attrname, indptr, indices):
+    """
+    Return the CategoryMatch object for categorical attribute attrname
+    on the CSR arrays indptr and indices, using the one in the dict cache
+    if it was computed for the current array of values of the attribute
+    (so the values of an attribute must not be modified in place after
+    it is first used, as for the ChangeStatisticsTable),
+    otherwise computing it (and replacing the one in the cache).
+
+    Parameters:
+        G        - CSRGraph, CSRDigraph or CSRBipartiteGraph object
+        cache    - dict of attribute name to CategoryMatch object
+        attrname - name of the categorical attribute
+        indptr   - CSR row pointer array
+        indices  - CSR column indices array
+
+    Return value:
+        CategoryMatch object for the attribute
+    """
+    values = G.catattr[attrname]
+    catmatch = cache.get(attrname)
+    if catmatch is None or catmatch.values is not values:
+        catmatch = CategoryMatch(indptr, indices, values)
+        cache[attrname] = catmatch
+    return catmatch
+
+
+# Maximum number of two-path counts memoized by CSRGraph.twoPaths()
+TWOPATHS_CACHE_SIZE = 1000000
+
+
+class CSRGraph(Graph):
+    """CSRGraph is an immutable undirected graph, stored in compressed
+    sparse row (CSR) format.  It is a subclass of Graph and provides
+    the same query methods (degree(), isEdge(), neighbourIterator(),
+    twoPaths(), etc.) so all the change statistics functions and samplers
+    work unchanged on it.
+
+    Since in the ALAAM the network is fixed (only the outcome vector
+    is changed in MCMC), the network never needs to be modified after
+    it is loaded, and so this frozen representation can be used instead
+    of the dictionary of dictionaries in Graph, which uses several
+    hundred bytes per edge.
+
+    The neighbours of node i are the entries
+    indices[indptr[i]:indptr[i+1]], in sorted order, where indptr and
+    indices are int32 numpy arrays. As in Graph, both the edge i -- j
+    and the edge j -- i are stored.
+
+    Node attributes and snowball sampling zones are stored exactly
+    as in Graph (see documentation there). For categorical attributes,
+    catattrMatch() also gives arrays aligned with indices of which
+    neighbours have the same (or different) value (see CategoryMatch),
+    used by the categorical homophily change statistics.
+    """
+
+    def __init__(self, G=None, indptr=None, indices=None):
+        """
+        Construct CSR graph either from an existing Graph object or
+        from CSR arrays.
+
+        Parameters:
+            G       - Graph object to convert (node attributes and
+                      snowball zones are also shared with it).
+                      If None then indptr and indices must be used instead.
+                      Default None
+            indptr  - CSR row pointer array (length N+1)
+                      (only if G is None). Default None
+            indices - CSR column indices array, symmetric (both i -- j
+                      and j -- i present) with sorted neighbours for each
+                      node (only if G is None). Default None
+        """
+        assert (G is None) != (indptr is None)
+        assert (indptr is None) == (indices is None)
+
+        self.binattr = None # binary attributes: dict name, array by node (int not boolean)
+        self.contattr = None # continuous attributes: dict name, array by node
+        self.catattr = None  # categorical attributes: dict name, array by node
+
+        # for conditional estimation on snowball sampling structure
+        self.zone    = None  # node snowball zone, list by node
+        self.max_zone= None  # maximum snowball zone number
+        self.inner_nodes = None # list of nodes with zone < max_zone
+
+        if G is not None:
+            (indptr, indices) = adjacency_to_csr(G.numNodes(), G.G)
+            self.binattr = G.binattr
+            self.contattr = G.contattr
+            self.catattr = G.catattr
+            self.zone = G.zone
+            self.max_zone = G.max_zone
+            self.inner_nodes = G.inner_nodes
+
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.degrees = np.diff(self.indptr)
+        self.catattr_match = {} # CategoryMatch by attribute name
+        # memoized twoPaths() by (i, j) with i < j, least recently used first
+        self.twopaths_cache = collections.OrderedDict()
+        self.make_views()
+
+
+    def make_views(self):
+        """
+        Make the memoryview objects on the CSR arrays used in the
+        query methods. Indexing a memoryview gives a Python int directly,
+        which is much faster than indexing the numpy array (giving a numpy
+        scalar) when called from Python code one element at a time.
+        """
+        self._indptr = memoryview(self.indptr)
+        self._indices = memoryview(self.indices)
+        self._degrees = memoryview(self.degrees)
+
+    def __getstate__(self):
+        """
+        Return state for pickling, without the (unpicklable) memoryviews
+        or the memoized twoPaths() counts
+        """
+        return {k: v for (k, v) in self.__dict__.items()
+                if not isinstance(v, memoryview) and k != 'twopaths_cache'}
+
+    def __setstate__(self, state):
+        """
+        Restore state from pickling, remaking the memoryviews
+        """
+        self.__dict__.update(state)
+        self.twopaths_cache = collections.OrderedDict()
+        self.make_views()
+
+    def numNodes(self):
+        """
+        Return number of nodes in graph
+        """
+        return len(self.indptr) - 1
+
+    def numEdges(self):
+        """
+        Return number of edges in graph
+        """
+        # both i -- j and j -- i are stored so divide by 2
+        return len(self.indices) // 2
+
+    def degree(self, i):
+        """
+        Return degree of node i
+        """
+        return self._degrees[i]
+
+    def isEdge(self, i, j):
+        """
+        Return True iff edge i -- j in graph
+        """
+        # binary search in the (sorted) neighbours of i
+        end = self._indptr[i+1]
+        k = bisect.bisect_left(self._indices, j, self._indptr[i], end)
+        return k < end and self._indices[k] == j
+
+    def neighbourIterator(self, i):
+        """
+        Return iterator over neighbours of i
+        """
+        return iter(self._indices[self._indptr[i]:self._indptr[i+1]])
+
+    def neighbourArray(self, i):
+        """
+        Return (read-only view) numpy array of neighbours of i
+        """
+        return self.indices[self.indptr[i]:self.indptr[i+1]]
+
+    def catattrMatch(self, attrname):
+        """
+        Return the CategoryMatch object (per-edge arrays aligned with
+        indices) for the categorical attribute attrname
+        """
+        return get_category_match(self, self.catattr_match, attrname,
+                                  self.indptr, self.indices)
+
+    def insertEdge(self, i, j):
+        """
+        Not supported: CSRGraph is immutable
+        """
+        raise Exception("cannot insert edge in immutable CSRGraph")
+
+    def removeEdge(self, i, j):
+        """
+        Not supported: CSRGraph is immutable
+        """
+        raise Exception("cannot remove edge in immutable CSRGraph")
+
+    def nodeIterator(self):
+        """
+        Return iterator over nodes of graph
+        """
+        return iter(range(self.numNodes()))
+
+    def edgeIterator(self):
+        """
+        Iterate over edges in graph
+
+        This is a generator function that yields a tuple (i, j) for
+        each edge (i, j) in the graph
+        """
+        # both i -- j and j -- i are stored so return only those with i < j
+        for i in range(self.numNodes()):
+            for j in self.neighbourIterator(i):
+                if i < j:
+                    yield (i, j)
+
+    def twoPaths(self, i, j):
+        """
+        Count undirected two-paths for (i, j): paths i -- v -- j for some v
+        (where v is distinct from both i and j, which are also distinct)
+
+        The counts are memoized in the twopaths_cache dict of this graph
+        (rather than with functools.cache, which would keep every graph
+        alive in a cache shared by all instances), keeping only the
+        TWOPATHS_CACHE_SIZE most recently used counts.
+        """
+        if i == j:
+            return 0
+        key = (i, j) if i < j else (j, i)
+        count = self.twopaths_cache.get(key)
+        if count is None:
+            count = len(np.intersect1d(self.neighbourArray(i),
+                                       self.neighbourArray(j),
+                                       assume_unique=True))
+            self.twopaths_cache[key] = count
+            if len(self.twopaths_cache) > TWOPATHS_CACHE_SIZE:
+                self.twopaths_cache.popitem(last = False)
+        else:
+            self.twopaths_cache.move_to_end(key)
+        return count
+
+    def save_binary(self, path):
+        """
+        Save the graph in the binary format (see save_binary_graph())
+        in the directory path, to be loaded with load_binary()
+        """
+        save_binary_graph(self, path, {'type': 'graph'},
+                          {'indptr': self.indptr, 'indices': self.indices})
+
+    def nbytes(self):
+        """
+        Return number of bytes used by the CSR arrays
+        """
+        return self.indptr.nbytes + self.indices.nbytes + self.degrees.nbytes
+
+
+
+class CSRDigraph(Digraph):
+    """CSRDigraph is an immutable directed graph, stored in compressed
+    sparse row (CSR) format, with a second (reverse) CSR structure for
+    the in-neighbours. It is a subclass of Digraph and provides the
+    same query methods (outdegree(), indegree(), isArc(), outIterator(),
+    inIterator(), etc.) so all the change statistics functions and
+    samplers work unchanged on it.
+
+    The out-neighbours of node i are indices[indptr[i]:indptr[i+1]]
+    and the in-neighbours of i are rev_indices[rev_indptr[i]:rev_indptr[i+1]],
+    each in sorted order, where all of these are int32 numpy arrays.
+    """
+
+    def __init__(self, G=None, indptr=None, indices=None,
+                 rev_indptr=None, rev_indices=None):
+        """
+        Construct CSR digraph either from an existing Digraph object or
+        from CSR arrays. The reverse CSR arrays are built here unless
+        they are supplied.
+
+        Parameters:
+            G       - Digraph object to convert (node attributes and
+                      snowball zones are also shared with it).
+                      If None then indptr and indices must be used instead.
+                      Default None
+            indptr  - CSR row pointer array (length N+1)
+                      (only if G is None). Default None
+            indices - CSR column indices array, with sorted out-neighbours
+                      for each node (only if G is None). Default None
+            rev_indptr  - reverse CSR row pointer array (only if G is
+                          None), or None to build it. Default None
+            rev_indices - reverse CSR column indices array (only if G
+                          is None), or None to build it. Default None
+        """
+        assert (G is None) != (indptr is None)
+        assert (indptr is None) == (indices is None)
+
+        self.binattr = None # binary attributes: dict name, array by node (int not boolean)
+        self.contattr = None # continuous attributes: dict name, array by node
+        self.catattr = None  # categorical attributes: dict name, array by node
+
+        # for conditional estimation on snowball sampling structure
+        self.zone    = None  # node snowball zone, list by node
+        self.max_zone= None  # maximum snowball zone number
+        self.inner_nodes = None # list of nodes with zone < max_zone
+
+        if G is not None:
+            (indptr, indices) = adjacency_to_csr(G.numNodes(), G.G)
+            self.binattr = G.binattr
+            self.contattr = G.contattr
+            self.catattr = G.catattr
+            self.zone = G.zone
+            self.max_zone = G.max_zone
+            self.inner_nodes = G.inner_nodes
+
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        if rev_indptr is None:
+            (rev_indptr, rev_indices) = reverse_csr(
+                len(self.indptr) - 1, self.indptr, self.indices)
+        self.rev_indptr = np.asarray(rev_indptr, dtype=np.int32)
+        self.rev_indices = np.asarray(rev_indices, dtype=np.int32)
+        self.outdegrees = np.diff(self.indptr)
+        self.indegrees = np.diff(self.rev_indptr)
+        self.catattr_match = {} # CategoryMatch for out-neighbours by attribute
+        self.catattr_in_match = {} # CategoryMatch for in-neighbours by attribute
+        self.make_views()
+
+
+    def make_views(self):
+        """
+        Make the memoryview objects on the CSR arrays used in the
+        query methods (see CSRGraph.make_views()).
+        """
+        self._indptr = memoryview(self.indptr)
+        self._indices = memoryview(self.indices)
+        self._rev_indptr = memoryview(self.rev_indptr)
+        self._rev_indices = memoryview(self.rev_indices)
+        self._outdegrees = memoryview(self.outdegrees)
+        self._indegrees = memoryview(self.indegrees)
+
+    def __getstate__(self):
+        """
+        Return state for pickling, without the (unpicklable) memoryviews
+        """
+        return {k: v for (k, v) in self.__dict__.items()
+                if not isinstance(v, memoryview)}
+
+    def __setstate__(self, state):
+        """
+        Restore state from pickling, remaking the memoryviews
+        """
+        self.__dict__.update(state)
+        self.make_views()
+
+    def numNodes(self):
+        """
+        Return number of nodes in digraph
+        """
+        return len(self.indptr) - 1
+
+    def numArcs(self):
+        """
+        Return number of arcs in digraph
+        """
+        return len(self.indices)
+
+    def outdegree(self, i):
+        """
+        Return Out-degree of node i
+        """
+        return self._outdegrees[i]
+
+    def indegree(self, i):
+        """
+        Return In-degree of node i
+        """
+        return self._indegrees[i]
+
+    def isArc(self, i, j):
+        """
+        Return True iff arc i -> j in digraph
+        """
+        # binary search in the (sorted) out-neighbours of i
+        end = self._indptr[i+1]
+        k = bisect.bisect_left(self._indices, j, self._indptr[i], end)
+        return k < end and self._indices[k] == j
+
+    def outIterator(self, i):
+        """
+        Return iterator over out-neighbours of i
+        """
+        return iter(self._indices[self._indptr[i]:self._indptr[i+1]])
+
+    def inIterator(self, i):
+        """
+        Return iterator over in-neighbours of i
+        """
+        return iter(self._rev_indices[self._rev_indptr[i]:self._rev_indptr[i+1]])
+
+    def outArray(self, i):
+        """
+        Return (read-only view) numpy array of out-neighbours of i
+        """
+        return self.indices[self.indptr[i]:self.indptr[i+1]]
+
+    def inArray(self, i):
+        """
+        Return (read-only view) numpy array of in-neighbours of i
+        """
+        return self.rev_indices[self.rev_indptr[i]:self.rev_indptr[i+1]]
+
+    def catattrOutMatch(self, attrname):
+        """
+        Return the CategoryMatch object for the out-neighbours (per-arc
+        arrays aligned with indices) for the categorical attribute attrname
+        """
+        return get_category_match(self, self.catattr_match, attrname,
+                                  self.indptr, self.indices)
+
+    def catattrInMatch(self, attrname):
+        """
+        Return the CategoryMatch object for the in-neighbours (per-arc
+        arrays aligned with rev_indices) for the categorical attribute
+        attrname
+        """
+        return get_category_match(self, self.catattr_in_match, attrname,
+                                  self.rev_indptr, self.rev_indices)
+
+    def insertArc(self, i, j, w = 1):
+        """
+        Not supported: CSRDigraph is immutable
+        """
+        raise Exception("cannot insert arc in immutable CSRDigraph")
+
+    def insertEdge(self, i, j, w = 1):
+        """
+        Insert arc i -> j as for insertArc(), which is not supported
+        (raises an exception) since CSRDigraph is immutable
+        """
+        self.insertArc(i, j, w)
+
+    def removeArc(self, i, j):
+        """
+        Not supported: CSRDigraph is immutable
+        """
+        raise Exception("cannot remove arc in immutable CSRDigraph")
+
+    def nodeIterator(self):
+        """
+        Return iterator over nodes of graph
+        """
+        return iter(range(self.numNodes()))
+
+    def edgeIterator(self):
+        """Iterate over arcs in graph
+
+        This is a generator function that yields a tuple (i, j) for
+        each arc (i, j) in the graph
+        """
+        for i in range(self.numNodes()):
+            for j in self.outIterator(i):
+                yield (i, j)
+
+    def save_binary(self, path):
+        """
+        Save the digraph in the binary format (see save_binary_graph())
+        in the directory path, to be loaded with load_binary()
+        """
+        save_binary_graph(self, path, {'type': 'digraph'},
+                          {'indptr': self.indptr, 'indices': self.indices,
+                           'rev_indptr': self.rev_indptr,
+                           'rev_indices': self.rev_indices})
+
+    def nbytes(self):
+        """
+        Return number of bytes used by the CSR arrays
+        """
+        return (self.indptr.nbytes + self.indices.nbytes +
+                self.rev_indptr.nbytes + self.rev_indices.nbytes +
+                self.outdegrees.nbytes + self.indegrees.nbytes)
+
+
+
+class CSRBipartiteGraph(CSRGraph, BipartiteGraph):
+    """CSRBipartiteGraph is an immutable bipartite (two-mode) graph,
+    stored in compressed sparse row (CSR) format. It is a subclass of
+    both CSRGraph (for the network structure) and BipartiteGraph
+    (for the node modes), so the bipartite change statistics and
+    the bipartite sampler work unchanged on it.
+
+    The two-paths matrix used for the four-cycle change statistics
+    is also stored in CSR format (CSRSparseMatrix).
+    """
+
+    def __init__(self, G=None, indptr=None, indices=None, num_A_nodes=None,
+                 twoPathsMatrix=None):
+        """
+        Construct CSR bipartite graph either from an existing
+        BipartiteGraph object or from CSR arrays.
+
+        Parameters:
+            G       - BipartiteGraph object to convert (node attributes
+                      and snowball zones are also shared with it).
+                      If None then indptr, indices and num_A_nodes
+                      must be used instead.
+                      Default None
+            indptr  - CSR row pointer array (length N+1)
+                      (only if G is None). Default None
+            indices - CSR column indices array, symmetric (both i -- j
+                      and j -- i present) with sorted neighbours for each
+                      node (only if G is None). Default None
+            num_A_nodes - number of mode A nodes; they are numbered
+                          0..num_A_nodes-1 (only if G is None). Default None
+            twoPathsMatrix - CSRSparseMatrix of two-path counts (only if
+                             G is None), or None to build it. Default None
+        """
+        assert (G is None) == (num_A_nodes is not None)
+        super().__init__(G, indptr, indices)
+        if G is not None:
+            self.num_A_nodes = G.num_A_nodes
+            self.twoPathsMatrix = CSRSparseMatrix(G.twoPathsMatrix)
+        elif twoPathsMatrix is not None:
+            self.num_A_nodes = num_A_nodes
+            self.twoPathsMatrix = twoPathsMatrix
+        else:
+            self.num_A_nodes = num_A_nodes
+            (tp_indptr, tp_indices, tp_data) = twopaths_csr(self.indptr,
+                                                            self.indices)
+            self.twoPathsMatrix = CSRSparseMatrix(indptr = tp_indptr,
+                                                  indices = tp_indices,
+                                                  data = tp_data)
+        self.num_B_nodes = self.numNodes() - self.num_A_nodes
+        assert(self.num_A_nodes <= self.numNodes())
+
+
+    def insertEdge(self, i, j):
+        """
+        Not supported: CSRBipartiteGraph is immutable
+        """
+        raise Exception("cannot insert edge in immutable CSRBipartiteGraph")
+
+    def nodeModeIterator(self, mode):
+        """
+        Return iterator over nodes of graph with supplied mode
+        (MODE_A or MODE_B)
+        """
+        assert mode == MODE_A or mode == MODE_B
+        return iter(range(0, self.num_A_nodes) if mode == MODE_A else
+                    range(self.num_A_nodes, self.numNodes()))
+
+    def updateTwoPathsMatrix(self, i, j):
+        """
+        Not supported: CSRBipartiteGraph is immutable
+        """
+        raise Exception("cannot update two-paths in immutable CSRBipartiteGraph")
+
+    def save_binary(self, path):
+        """
+        Save the bipartite graph in the binary format (see
+        save_binary_graph()) in the directory path, to be loaded
+        with load_binary()
+        """
+        save_binary_graph(self, path, {'type': 'bipartite',
+                                       'num_A_nodes': self.num_A_nodes},
+                          {'indptr': self.indptr, 'indices': self.indices,
+                           'twopaths_indptr': self.twoPathsMatrix.indptr,
+                           'twopaths_indices': self.twoPathsMatrix.indices,
+                           'twopaths_data': self.twoPathsMatrix.data})
+
+    def nbytes(self):
+        """
+        Return number of bytes used by the CSR arrays
+        """
+        return super().nbytes() + self.twoPathsMatrix.nbytes()
+
+
+
+def toCSR(G):
+    """Convert the Graph, Digraph or BipartiteGraph object G to the
+    equivalent immutable CSR object CSRGraph, CSRDigraph or
+    CSRBipartiteGraph.
+
+    Parameters:
+        G - Graph, Digraph or BipartiteGraph object
+
+    Return value:
+        CSRBipartiteGraph if G is a BipartiteGraph, else CSRDigraph if
+        G is a Digraph, else CSRGraph, representing the same graph as G
+        (sharing its node attributes and snowball zones).
+        If G is already a CSR object it is returned as is.
+    """
+    if isinstance(G, (CSRGraph, CSRDigraph)):
+        return G
+    elif isinstance(G, BipartiteGraph):
+        return CSRBipartiteGraph(G)
+    elif isinstance(G, Digraph):
+        return CSRDigraph(G)
+    else:
+        return CSRGraph(G)
+
+
+def getCSRGraph(G):
+    """Return the CSR version of G as from toCSR(), using the one cached
+    on G if there is one, otherwise converting it (and caching it on G).
+    As with the change statistics table cached on G (see
+    ChangeStatisticsTable.getChangeStatisticsTable()), G must not be
+    modified after this is called.
+
+    Parameters:
+        G - Graph, Digraph or BipartiteGraph object (or CSR object)
+
+    Return value:
+        CSR object representing the same graph as G (G itself if it
+        is already a CSR object)
+    """
+    if isinstance(G, (CSRGraph, CSRDigraph)):
+        return G
+    Gcsr = getattr(G, 'csr_graph', None)
+    if Gcsr is None:
+        Gcsr = toCSR(G)
+        G.csr_graph = Gcsr
+    return Gcsr
+
+
+
+# Version number of the binary graph format written by save_binary_graph()
+BINARY_FORMAT_VERSION = 1
+
+# Name of the file with the graph type, attribute names, etc. in the
+# binary graph format directory
+BINARY_METADATA_FILENAME = 'graph.json'
+
+
+def save_binary_graph(G, path, metadata, arrays, source = None):
+    """Save a CSR graph in binary format, used to implement the
+    save_binary() methods of CSRGraph, CSRDigraph and CSRBipartiteGraph.
+
+    The binary format is a directory containing a numpy .npy file for
+    each of the CSR arrays, and (if present) the node attributes as
+    columns of binattr.npy, contattr.npy and catattr.npy and the
+    snowball sampling zones in zone.npy. The graph type, attribute names
+    and so on are in the JSON file graph.json. Since they are
+    .npy files, the arrays can be loaded with memory mapping by
+    load_binary(), so they are only read from disk as they are used,
+    and shared between processes using the same graph.
+
+    Parameters:
+        G        - CSRGraph, CSRDigraph or CSRBipartiteGraph object
+        path     - directory to write the files in (created if it
+                   does not exist)
+        metadata - dict of graph type etc. to write in graph.json
+        arrays   - dict of name: numpy array of the CSR arrays to write,
+                   each in <name>.npy
+        source   - the source files key (from source_files_key()) if
+                   the graph was read from text files, to write in
+                   graph.json, or None (default)
+    """
+    os.makedirs(path, exist_ok = True)
+    metadata = dict(metadata)
+    metadata['format_version'] = BINARY_FORMAT_VERSION
+    metadata['source'] = source
+    for (name, arr) in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), arr)
+    for (attrtype, attrs, dtype) in [('binattr', G.binattr, BINATTR_DTYPE),
+                                     ('contattr', G.contattr, CONTATTR_DTYPE),
+                                     ('catattr', G.catattr, CATATTR_DTYPE)]:
+        if attrs is None:
+            metadata[attrtype] = None
+        else:
+            metadata[attrtype] = list(attrs.keys())
+            attrarray = np.zeros((G.numNodes(), len(attrs)), dtype = dtype)
+            for (k, values) in enumerate(attrs.values()):
+                attrarray[:, k] = values
+            np.save(os.path.join(path, attrtype + '.npy'), attrarray)
+    metadata['zone'] = G.zone is not None
+    if G.zone is not None:
+        np.save(os.path.join(path, 'zone.npy'),
+                np.asarray(G.zone, dtype = np.int32))
+    with open(os.path.join(path, BINARY_METADATA_FILENAME), 'w') as f:
+        json.dump(metadata, f)
+
+
+def read_binary_metadata(path):
+    """Return the dict from the graph.json file in the binary format
+    directory path, or None if there is no such (readable) file
+    """
+    try:
+        with open(os.path.join(path, BINARY_METADATA_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_binary(path, mmap_mode = 'r'):
+    """Load a graph saved in binary format by the save_binary() method
+    of CSRGraph, CSRDigraph or CSRBipartiteGraph.
+
+    Parameters:
+        path      - directory the graph was saved in
+        mmap_mode - mmap_mode for numpy.load(): 'r' (default) to
+                    memory map the (read-only) CSR arrays, or None
+                    to read them into memory
+
+    Return value:
+        CSRGraph, CSRDigraph or CSRBipartiteGraph object (as saved)
+    """
+    metadata = read_binary_metadata(path)
+    if metadata is None:
+        raise ValueError("no binary graph in " + path)
+    if metadata.get('format_version') != BINARY_FORMAT_VERSION:
+        raise ValueError("unsupported binary graph format version in " + path)
+
+    def load(name):
+        return np.load(os.path.join(path, name + '.npy'), mmap_mode = mmap_mode)
+
+    if metadata['type'] == 'digraph':
+        G = CSRDigraph(indptr = load('indptr'), indices = load('indices'),
+                       rev_indptr = load('rev_indptr'),
+                       rev_indices = load('rev_indices'))
+    elif metadata['type'] == 'bipartite':
+        twoPathsMatrix = CSRSparseMatrix(indptr = load('twopaths_indptr'),
+                                         indices = load('twopaths_indices'),
+                                         data = load('twopaths_data'))
+        G = CSRBipartiteGraph(indptr = load('indptr'), indices = load('indices'),
+                              num_A_nodes = metadata['num_A_nodes'],
+                              twoPathsMatrix = twoPathsMatrix)
+    else:
+        G = CSRGraph(indptr = load('indptr'), indices = load('indices'))
+
+    # attributes are stored as (writeable) numpy arrays, and zones
+    # as lists, as in Graph
+    for (attrtype, dtype) in [('binattr', BINATTR_DTYPE),
+                              ('contattr', CONTATTR_DTYPE),
+                              ('catattr', CATATTR_DTYPE)]:
+        if metadata[attrtype] is not None:
+            attrarray = np.load(os.path.join(path, attrtype + '.npy'))
+            setattr(G, attrtype, attribute_columns(
+                dict(zip(metadata[attrtype], attrarray.T)), dtype))
+    if metadata['zone']:
+        G.zone = np.load(os.path.join(path, 'zone.npy')).tolist()
+        G.max_zone = max(G.zone)
+        G.inner_nodes = [i for (i, z) in enumerate(G.zone) if z < G.max_zone]
+    return G
+
+
+def source_files_key(filenames, directed, bipartite):
+    """Return the key identifying the text files a graph is read from,
+    used to check if the binary cache of the graph is up to date: the
+    name, size and modification time of each file, and the graph type.
+
+    Parameters:
+        filenames - list of filenames (or None for files not used)
+        directed  - True for directed graph
+        bipartite - True for bipartite graph
+
+    Return value:
+        list that can be compared to the one stored in graph.json
+    """
+    key = [directed, bipartite]
+    for filename in filenames:
+        if filename is None:
+            key.append(None)
+        else:
+            st = os.stat(filename)
+            key.append([os.path.abspath(filename), st.st_size, st.st_mtime_ns])
+    return key
+
+
+def readCSRGraph(edgelist_filename, binattr_filename = None,
+                 contattr_filename = None, catattr_filename = None,
+                 zone_filename = None, directed = False, bipartite = False):
+    """Read the graph from the Pajek format network and attribute files
+    directly into the CSR representation, without building the
+    dictionary of dictionaries representation of Graph (or Digraph
+    or BipartiteGraph) first. The result is the same as converting
+    the Graph (or Digraph or BipartiteGraph) read from the files
+    with toCSR(), but much faster for large networks.
+
+    Parameters:
+        edgelist_filename - filename of Pajek format edgelist
+        binattr_filename  - binary attributes filename, or None (default)
+        contattr_filename - continuous attributes filename, or None (default)
+        catattr_filename  - categorical attributes filename, or None (default)
+        zone_filename     - snowball sample zone filename, or None (default)
+        directed          - True for directed network. Default False.
+        bipartite         - True for two-mode network. Default False.
+
+    Return value:
+        CSRGraph, CSRDigraph or CSRBipartiteGraph object
+    """
+    if directed and bipartite:
+        raise Exception("directed bipartite network not suppored")
+    (n, edges) = readPajekEdges(edgelist_filename,
+                                "*arcs" if directed else "*edges")
+    assert not np.any(edges[:, 0] == edges[:, 1]) # do not allow loops
+    if directed:
+        (indptr, indices) = edges_to_csr(n, edges[:, 0], edges[:, 1])
+        G = CSRDigraph(indptr = indptr, indices = indices)
+    else:
+        # both i -- j and j -- i are stored
+        (indptr, indices) = edges_to_csr(n, edges.ravel(),
+                                         edges[:, ::-1].ravel())
+        if bipartite:
+            with open(edgelist_filename) as f:
+                l = f.readline() # first line must be e.g. "*vertices 500 200"
+            try:
+                num_A_nodes = int(l.split()[2])
+            except IndexError:
+                raise ValueError('expecting "*vertices num_nodes num_A_nodes" for two-mode network')
+            if np.any((edges[:, 0] < num_A_nodes) ==
+                      (edges[:, 1] < num_A_nodes)):
+                raise ValueError("edge in bipartite graph inserted between nodes in same mode")
+            G = CSRBipartiteGraph(indptr = indptr, indices = indices,
+                                  num_A_nodes = num_A_nodes)
+        else:
+            G = CSRGraph(indptr = indptr, indices = indices)
+
+    if binattr_filename is not None:
+        G.binattr = readAttributeFile(binattr_filename, BINATTR_DTYPE)
+        assert(all([len(v) == n for v in G.binattr.values()]))
+    if contattr_filename is not None:
+        G.contattr = readAttributeFile(contattr_filename, CONTATTR_DTYPE)
+        assert(all([len(v) == n for v in G.contattr.values()]))
+    if catattr_filename is not None:
+        G.catattr = readAttributeFile(catattr_filename, CATATTR_DTYPE)
+        assert(all([len(v) == n for v in G.catattr.values()]))
+    if zone_filename is not None:
+        G.zone = readZoneFile(zone_filename)
+        assert(len(G.zone) == n)
+        G.max_zone = max(G.zone)
+        assert(min(G.zone) == 0)
+        assert(len(set(G.zone)) == G.max_zone + 1) # zones must be 0,1,..,max
+        # get list of nodes in inner waves, i.e. with zone < max_zone
+        G.inner_nodes = [i for (i, z) in enumerate(G.zone) if z < G.max_zone]
+    return G
+
+
+def load_graph_cached(edgelist_filename, binattr_filename = None,
+                      contattr_filename = None, catattr_filename = None,
+                      zone_filename = None, directed = False,
+                      bipartite = False):
+    """Load the graph from the Pajek format network and attribute files,
+    using a cache of it in binary format (see save_binary_graph())
+    in the directory <edgelist_filename>.cache next to the network file.
+
+    If the cache exists and was made from the same files (by name, size
+    and modification time), the graph is loaded from it with memory
+    mapping, which is much faster than parsing the text files.
+    Otherwise the graph is read from the text files (with
+    readCSRGraph()) and saved in the cache (replacing any existing
+    cache) for next time. If the cache cannot be written (e.g. the directory is
+    not writable) a warning is printed and the graph is still returned.
+
+    The cache is written to a temporary directory and then renamed,
+    so that e.g. job array tasks started at the same time do not
+    read a partially written cache.
+
+    Parameters:
+        edgelist_filename - filename of Pajek format edgelist
+        binattr_filename  - binary attributes filename, or None (default)
+        contattr_filename - continuous attributes filename, or None (default)
+        catattr_filename  - categorical attributes filename, or None (default)
+        zone_filename     - snowball sample zone filename, or None (default)
+        directed          - True for directed network. Default False.
+        bipartite         - True for two-mode network. Default False.
+
+    Return value:
+        CSRGraph, CSRDigraph or CSRBipartiteGraph object
+    """
+    if directed and bipartite:
+        raise Exception("directed bipartite network not suppored")
+    cachedir = edgelist_filename + os.extsep + 'cache'
+    source = source_files_key([edgelist_filename, binattr_filename,
+                               contattr_filename, catattr_filename,
+                               zone_filename], directed, bipartite)
+    metadata = read_binary_metadata(cachedir)
+    if (metadata is not None and
+        metadata.get('format_version') == BINARY_FORMAT_VERSION and
+        metadata.get('source') == source):
+        return load_binary(cachedir)
+
+    G = readCSRGraph(edgelist_filename, binattr_filename, contattr_filename,
+                     catattr_filename, zone_filename, directed, bipartite)
+
+    tmpdir = None
+    try:
+        tmpdir = tempfile.mkdtemp(dir = os.path.dirname(
+            os.path.abspath(cachedir)), prefix = os.path.basename(cachedir))
+        G.save_binary(tmpdir)
+        metadata = read_binary_metadata(tmpdir)
+        metadata['source'] = source
+        with open(os.path.join(tmpdir, BINARY_METADATA_FILENAME), 'w') as f:
+            json.dump(metadata, f)
+        if os.path.isdir(cachedir):
+            shutil.rmtree(cachedir, ignore_errors = True)
+        os.rename(tmpdir, cachedir)
+        tmpdir = None
+    except OSError as e:
+        sys.stderr.write("WARNING: could not write graph cache " + cachedir +
+                         ": " + str(e) + "\n")
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors = True)
+    return G
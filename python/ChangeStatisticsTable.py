@@ -0,0 +1,274 @@
+#
+# File:    ChangeStatisticsTable.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Precomputed table of change statistics that do not depend on the
+outcome vector.
+
+Many ALAAM change statistics (e.g. Activity, Two-Star, Triangle T1,
+oOb, and the directed Sender, Receiver, Reciprocity etc.) depend
+only on the fixed network and node attributes, and not on the
+outcome vector A. Since in ALAAM the network is fixed, these can be
+computed once for every node, and then the MCMC samplers (and the
+computation of observed statistics) just look up the row for a node
+rather than calling the change statistic functions on every proposal.
+
+The ChangeStatisticsTable object is cached on the graph object G by
+getChangeStatisticsTable(), so that the table is only computed once
+for a given network and list of change statistic functions (e.g. over
+all the calls of the sampler in an estimation). Note that this means
+the network and its attributes must not be modified after the
+table is computed, which is always the case for ALAAM estimation and
+simulation where the network is fixed.
+
+For the contagion-type change statistics (which do depend on the
+outcome vector), the table also uses the versions of the change
+statistics using the ActiveNeighbourCounts index (see
+ActiveNeighbourCounts.py) if an ActiveNeighbourCounts object is
+supplied to changeStats(). The samplers get this from
+activeNeighbourCounts() and update it when a move is accepted.
+When there are several such change statistics (for undirected graphs),
+they are computed together in a single pass over the neighbours of the
+node by FusedChangeStatistics (see FusedChangeStatistics.py).
+"""
+
+import functools
+import numpy as np         # used for matrix & vector data types and functions
+
+import changeStatisticsALAAM
+import changeStatisticsALAAMdirected
+import changeStatisticsALAAMbipartite
+from Digraph import Digraph
+from ActiveNeighbourCounts import ActiveNeighbourCounts,get_indexed_changestat
+from FusedChangeStatistics import FusedChangeStatistics
+
+
+# Change statistic functions that do not depend on the outcome vector A
+# (only the network and node attributes), so can be precomputed for all
+# nodes. Note that the bipartite statistics are all (before partial()
+# is applied) functions of the mode as well, but this does not matter here.
+OUTCOME_INDEPENDENT_CHANGESTATS = {
+    # undirected
+    changeStatisticsALAAM.changeDensity,
+    changeStatisticsALAAM.changeActivity,
+    changeStatisticsALAAM.changeTwoStar,
+    changeStatisticsALAAM.changeThreeStar,
+    changeStatisticsALAAM.changePartnerActivityTwoPath,
+    changeStatisticsALAAM.changeTriangleT1,
+    changeStatisticsALAAM.changeoOb,
+    changeStatisticsALAAM.changeo_Ob,
+    changeStatisticsALAAM.changeoOc,
+    changeStatisticsALAAM.changeo_Oc,
+    changeStatisticsALAAM.changeoO_Osame,
+    changeStatisticsALAAM.changeoO_Odiff,
+    changeStatisticsALAAM.changeGWActivity,
+    changeStatisticsALAAM.changeSamePartnerActivityTwoPath,
+    changeStatisticsALAAM.changeDiffPartnerActivityTwoPath,
+    changeStatisticsALAAM.changeAlterBinaryTwoStar1,
+    # directed
+    changeStatisticsALAAMdirected.changeSender,
+    changeStatisticsALAAMdirected.changeReceiver,
+    changeStatisticsALAAMdirected.changeReciprocity,
+    changeStatisticsALAAMdirected.changeEgoInTwoStar,
+    changeStatisticsALAAMdirected.changeEgoInThreeStar,
+    changeStatisticsALAAMdirected.changeEgoOutTwoStar,
+    changeStatisticsALAAMdirected.changeEgoOutThreeStar,
+    changeStatisticsALAAMdirected.changeMixedTwoStar,
+    changeStatisticsALAAMdirected.changeMixedTwoStarSource,
+    changeStatisticsALAAMdirected.changeMixedTwoStarSink,
+    changeStatisticsALAAMdirected.changeTransitiveTriangleT1,
+    changeStatisticsALAAMdirected.changeTransitiveTriangleD1,
+    changeStatisticsALAAMdirected.changeTransitiveTriangleU1,
+    changeStatisticsALAAMdirected.changeCyclicTriangleC1,
+    changeStatisticsALAAMdirected.changeSenderMatch,
+    changeStatisticsALAAMdirected.changeReceiverMatch,
+    changeStatisticsALAAMdirected.changeReciprocityMatch,
+    changeStatisticsALAAMdirected.changeSenderMismatch,
+    changeStatisticsALAAMdirected.changeReceiverMismatch,
+    changeStatisticsALAAMdirected.changeReciprocityMismatch,
+    changeStatisticsALAAMdirected.changeGWSender,
+    changeStatisticsALAAMdirected.changeGWReceiver,
+    # bipartite
+    changeStatisticsALAAMbipartite.changeBipartiteDensity,
+    changeStatisticsALAAMbipartite.changeBipartiteActivity,
+    changeStatisticsALAAMbipartite.changeBipartiteEgoTwoStar,
+    changeStatisticsALAAMbipartite.changeBipartiteEgoThreeStar,
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar1,
+    changeStatisticsALAAMbipartite.changeBipartiteFourCycle1,
+    changeStatisticsALAAMbipartite.changeBipartiteGWActivity,
+    changeStatisticsALAAMbipartite.changeBpAlterSameTwoStar1,
+    changeStatisticsALAAMbipartite.changeBpAlterDiffTwoStar1,
+    changeStatisticsALAAMbipartite.changeBpAlterBinaryTwoStar1,
+}
+
+
+def is_outcome_independent(changestat_func):
+    """Return True if the change statistic function does not depend on the
+    outcome vector A, else False.
+
+    Parameters:
+        changestat_func - change statistic function, possibly created
+                          with functools.partial(), e.g.
+                          partial(changeoOb, "gender")
+
+    Return value:
+        True if the change statistic only depends on the network and
+        node attributes (so can be precomputed for all nodes) else False.
+    """
+    while isinstance(changestat_func, functools.partial):
+        changestat_func = changestat_func.func
+    return changestat_func in OUTCOME_INDEPENDENT_CHANGESTATS
+
+
+class ChangeStatisticsTable:
+    """Change statistics for a list of change statistic functions, where
+    those that do not depend on the outcome vector are precomputed for
+    all nodes in an N x n matrix (N nodes, n change statistics), and
+    the others are computed by calling the change statistic function.
+    """
+
+    def __init__(self, G, changestats_func_list):
+        """
+        Construct the table, computing the outcome-independent change
+        statistics for every node in G.
+
+        Parameters:
+           G                   - Graph (or Digraph or BipartiteGraph) object
+           changestats_func_list  - list of change statistics funcions
+        """
+        self.changestats_func_list = tuple(changestats_func_list)
+        n = len(self.changestats_func_list)
+        self.fixed_indices = [l for l in range(n) if
+                              is_outcome_independent(
+                                  self.changestats_func_list[l])]
+        # list of (index, function) for the change statistics that
+        # depend on the outcome vector so must be computed each time
+        self.dynamic_funcs = [(l, self.changestats_func_list[l])
+                              for l in range(n)
+                              if l not in self.fixed_indices]
+        # if there is more than one change statistic that can be computed
+        # in a single pass over the neighbours, use FusedChangeStatistics
+        # for them when an ActiveNeighbourCounts object is given to
+        # changeStats()
+        self.fused = None
+        if not isinstance(G, Digraph):
+            fused = FusedChangeStatistics(self.changestats_func_list)
+            if len(fused.fused_indices) > 1:
+                self.fused = fused
+        fused_indices = [] if self.fused is None else self.fused.fused_indices
+        # and the others split into those that have versions using
+        # the active neighbour counts, which are used instead when
+        # an ActiveNeighbourCounts object is given to changeStats()
+        self.indexed_funcs = [(l, get_indexed_changestat(func))
+                              for (l, func) in self.dynamic_funcs
+                              if l not in fused_indices and
+                              get_indexed_changestat(func) is not None]
+        self.unindexed_funcs = [(l, func) for (l, func) in self.dynamic_funcs
+                                if l not in fused_indices and
+                                get_indexed_changestat(func) is None]
+        self.nbrcounts = None # ActiveNeighbourCounts from activeNeighbourCounts()
+        # N x n matrix, with the row for node i containing the
+        # outcome-independent change statistics for node i (and 0 in
+        # the columns for the other change statistics). Since these
+        # functions do not use A we can just pass None for it.
+        self.table = np.zeros((G.numNodes(), n))
+        for l in self.fixed_indices:
+            func = self.changestats_func_list[l]
+            self.table[:, l] = [func(G, None, i) for i in range(G.numNodes())]
+
+
+    def activeNeighbourCounts(self, G, A):
+        """
+        Return the ActiveNeighbourCounts object for outcome vector A
+        to use in changeStats(), or None if none of the change statistics
+        use active neighbour counts (or are fused). The same object is
+        returned on each call, updated to be correct for A.
+
+        Parameters:
+           G                   - Graph object the table was computed for
+           A                   - vector of 0/1 outcome variables for ALAAM
+
+        Return value:
+           ActiveNeighbourCounts object for A, or None.
+        """
+        if len(self.indexed_funcs) == 0 and self.fused is None:
+            return None
+        if self.nbrcounts is None:
+            self.nbrcounts = ActiveNeighbourCounts(G, A)
+        else:
+            self.nbrcounts.sync(G, A)
+        return self.nbrcounts
+
+
+    def changeStats(self, G, A, i, nbrcounts = None, changestats = None):
+        """
+        Return numpy vector of the change statistics for node i
+
+        Parameters:
+           G                   - Graph object the table was computed for
+           A                   - vector of 0/1 outcome variables for ALAAM
+           i                   - node to compute change statistics for
+           nbrcounts           - ActiveNeighbourCounts object for A
+                                 from activeNeighbourCounts(), or
+                                 None (default) to not use it.
+           changestats         - numpy vector to put the change statistics
+                                 in, or None (default) to allocate a
+                                 new one.
+
+        Return value:
+           numpy vector of change statistics, corresponding to the
+           list of change statistics functions.
+        """
+        if changestats is None:
+            changestats = self.table[i].copy()
+        else:
+            changestats[:] = self.table[i]
+        if nbrcounts is None:
+            for (l, func) in self.dynamic_funcs:
+                changestats[l] = func(G, A, i)
+        else:
+            if self.fused is not None:
+                self.fused.changeStats(G, A, i, nbrcounts, changestats)
+            for (l, func) in self.indexed_funcs:
+                changestats[l] = func(G, A, i, nbrcounts)
+            for (l, func) in self.unindexed_funcs:
+                changestats[l] = func(G, A, i)
+        return changestats
+
+
+# Maximum number of ChangeStatisticsTable objects cached on a graph by
+# getChangeStatisticsTable(), e.g. for the model being estimated and
+# the goodness-of-fit statistics, which are used alternately
+MAX_CACHED_TABLES = 8
+
+
+def getChangeStatisticsTable(G, changestats_func_list):
+    """
+    Return the ChangeStatisticsTable for the graph G and the list
+    of change statistic functions, using the one cached on G if it
+    was computed for the same change statistic functions, otherwise
+    computing it (and caching it on G). The tables are cached in a
+    dict on G keyed by the tuple of (identical) change statistic
+    function objects, of at most MAX_CACHED_TABLES tables (removing
+    the least recently computed one when it is full).
+
+    Parameters:
+       G                   - Graph (or Digraph or BipartiteGraph) object
+       changestats_func_list  - list of change statistics funcions
+
+    Return value:
+       ChangeStatisticsTable object for G and changestats_func_list
+    """
+    tables = getattr(G, 'changestats_tables', None)
+    if tables is None:
+        tables = {}
+        G.changestats_tables = tables
+    key = tuple(changestats_func_list)
+    cstable = tables.get(key)
+    if cstable is None:
+        if len(tables) >= MAX_CACHED_TABLES:
+            del tables[next(iter(tables))]
+        cstable = ChangeStatisticsTable(G, changestats_func_list)
+        tables[key] = cstable
+    return cstable
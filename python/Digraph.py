@@ -12,7 +12,11 @@
 #
 
 import math
-from utils import int_or_na,float_or_na,NA_VALUE
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import int_or_na,float_or_na,NA_VALUE,na_mask
+from utils import BINATTR_DTYPE,CATATTR_DTYPE,CONTATTR_DTYPE
+from readGraphFiles import readPajekEdges,adjacencyLists,readAttributeFile,readZoneFile
 
 
 
@@ -57,12 +61,19 @@ class Digraph:
     categorical, and NaN for continuous.
 
     Node attributes (binary, continuous, categorical; separately)
-    are each stored in a dictionary of lists. The key of the dictionary
-    is the attribute name, and the value is a list which is simply
-    indexed by node id i.e. a simple list of the attribute values in
+    are each stored in a dictionary of numpy arrays. The key of the
+    dictionary is the attribute name, and the value is a numpy array
+    which is simply indexed by node id i.e. the attribute values in
     node id order. So e.g. the categorical attribute 'class' for node id 2
     (the third node, so row 4 in data which has header)
     would be catattr['class'][2]
+    The arrays have type BINATTR_DTYPE (int32) for binary, CATATTR_DTYPE
+    (int32) for categorical, and CONTATTR_DTYPE (float64) for continuous
+    attributes (see utils.py), and na_mask() gives the mask of NA values.
+    Change statistics can therefore use vectorized (numpy) operations on
+    the attributes, while indexing them by node id, and their count() and
+    index() methods (see AttributeArray in utils.py), still work just as
+    for lists.
 
     Also there can be optionally be a 'zone' for each node, which is
     the snowball sampling zone: 0 for the seed nodes, 1 for nodes
@@ -101,9 +112,9 @@ class Digraph:
         self.G = None  # dict of dicts as described above
         self.Grev = None # version with all arcs reversed to get in-neighbours
         
-        self.binattr = None # binary attributes: dict name, list by node (int not boolean)
-        self.contattr = None # continuous attributes: dict name, list by node
-        self.catattr = None  # categorical attributes: dict name, list by node
+        self.binattr = None # binary attributes: dict name, array by node (int not boolean)
+        self.contattr = None # continuous attributes: dict name, array by node
+        self.catattr = None  # categorical attributes: dict name, array by node
 
         # for conditional estimation on snowball sampling structure
         self.zone    = None  # node snowball zone, list by node
@@ -111,9 +122,7 @@ class Digraph:
         self.inner_nodes = None # list of nodes with zone < max_zone
 
         if pajek_edgelist_filename is not None:
-            f =  open(pajek_edgelist_filename)
-            l = f.readline() # first line must be e.g. "*vertices 500"
-            n = int(l.split()[1])
+            (n, arcs) = readPajekEdges(pajek_edgelist_filename, "*arcs")
         else:
             n = num_nodes
 
@@ -122,41 +131,27 @@ class Digraph:
         self.Grev = dict(list(zip(list(range(n)), [dict() for i in range(n)])))
 
         if pajek_edgelist_filename is not None:
-            while l and l.rstrip().lower() != "*arcs":
-                l = f.readline()
-            if not l:
-                raise ValueError("no *arcs in Pajek file " + pajek_edgelist_filename)
-            lsplit = f.readline().split()
-            while len(lsplit) >= 2:
-                lsplit = lsplit[:2]  # only used first two (i,j) ignore weight
-                (i, j) = list(map(int, lsplit))
-                assert(i >= 1 and i <= n and j >= 1 and j <= n)
-                self.insertArc(i-1, j-1)    # input is 1-based but we are 0-based
-                lsplit = f.readline().split()
-
-        # Note in the following,
-        #  map(list, zip(*[row.split() for row in open(filename).readlines()]))
-        # reads the data and transposes it so we have a list of columns
-        # not a list of rows, which then makes it easy to convert to
-        # the dict where key is column header and value is list of values
-        # (converted to the appropraite data type from sting with int_or_na()
-        # etc.)
-        # https://stackoverflow.com/questions/6473679/transpose-list-of-lists#
-        
+            self.insertArcs(arcs)
+
+        # The attributes are read into dicts where key is column header
+        # and value is numpy array of values (see readGraphFiles.py)
         if binattr_filename is not None:
-            self.binattr = dict([(col[0], list(map(int_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(binattr_filename).readlines()])))])
+            self.binattr = readAttributeFile(binattr_filename,
+                                             BINATTR_DTYPE)
             assert(all([len(v) == n for v in self.binattr.values()]))
 
         if contattr_filename is not None:
-            self.contattr = dict([(col[0], list(map(float_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(contattr_filename).readlines()])))])
+            self.contattr = readAttributeFile(contattr_filename,
+                                              CONTATTR_DTYPE)
             assert(all([len(v) == n for v in self.contattr.values()]))
 
         if catattr_filename is not None:
-            self.catattr = dict([(col[0], list(map(int_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(catattr_filename).readlines()])))])
+            self.catattr = readAttributeFile(catattr_filename,
+                                             CATATTR_DTYPE)
             assert(all([len(v) == n for v in self.catattr.values()]))
 
         if zone_filename is not None:
-            self.zone = [int(s) for s in open(zone_filename).readlines()[1:]]
+            self.zone = readZoneFile(zone_filename)
             assert(len(self.zone) == n)
             self.max_zone = max(self.zone)
             assert(min(self.zone) == 0)
@@ -232,6 +227,26 @@ class Digraph:
         """
         self.insertArc(i, j, w)
         
+    def insertArcs(self, arcs):
+        """
+        Insert all the arcs in the m x 2 numpy array arcs in place
+        (with arc weight 1), the same as calling insertArc(i, j) for
+        each row (i, j) but much faster for a large number of arcs
+        """
+        assert not np.any(arcs[:, 0] == arcs[:, 1]) # do not allow loops
+        for (i, nbrs) in adjacencyLists(arcs[:, 0], arcs[:, 1]):
+            self.G[i].update(dict.fromkeys(nbrs, 1))
+        for (j, nbrs) in adjacencyLists(arcs[:, 1], arcs[:, 0]):
+            self.Grev[j].update(dict.fromkeys(nbrs, 1))
+
+    def insertEdges(self, arcs):
+        """
+        Insert all the arcs in the m x 2 numpy array arcs in place.
+        This just calls insertArcs(), and is here so we can use consistently
+        insertEdges() for Graph, BipartiteGraph and Digraph.
+        """
+        self.insertArcs(arcs)
+
     def removeArc(self, i, j):
         """
         Delete arc i -> j in place
@@ -250,17 +265,17 @@ class Digraph:
 
         if self.binattr is not None:
             for attrname in self.binattr.keys():
-                print('Binary attribute', attrname, 'has', self.binattr[attrname].count(NA_VALUE), 'NA values')
+                print('Binary attribute', attrname, 'has', np.count_nonzero(na_mask(self.binattr[attrname])), 'NA values')
         else:
             print('No binary attributes')
         if self.contattr is not None:
             for attrname in self.contattr.keys():
-                print('Continuous attribute', attrname, 'has', sum([math.isnan(x) for x in self.contattr[attrname]]), 'NA values')
+                print('Continuous attribute', attrname, 'has', np.count_nonzero(na_mask(self.contattr[attrname])), 'NA values')
         else:
             print('No continuous attributes')
         if self.catattr is not None:
             for attrname in self.catattr.keys():
-                print('Categorical attribute', attrname, 'has', self.catattr[attrname].count(NA_VALUE), 'NA values')
+                print('Categorical attribute', attrname, 'has', np.count_nonzero(na_mask(self.catattr[attrname])), 'NA values')
         else:
             print('No categorical attributes')
 
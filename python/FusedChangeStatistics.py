@@ -0,0 +1,180 @@
+#
+# File:    FusedChangeStatistics.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Fused evaluation of several contagion-type change statistics in a
+single pass over the neighbourhood of a node.
+
+A model with e.g. Contagion, PartnerAttributeActivity,
+IndirectPartnerAttribute and TriangleT2 would otherwise iterate over
+the neighbours of the node four times, through four Python function
+calls, for every proposal in the sampler. The FusedChangeStatistics
+object recognises the (undirected) change statistic functions it
+knows about in the list of change statistic functions (including
+those created with functools.partial() such as
+partial(changeGWContagion, log(2))) and computes all of them from
+one iteration over the neighbours of the node (and, only if
+TriangleT2 or TriangleT3 are in the model, of their neighbours),
+using the ActiveNeighbourCounts index (see ActiveNeighbourCounts.py).
+All other change statistics are not handled here, and are computed by
+ChangeStatisticsTable as usual.
+
+The change statistics computed are exactly the same as those computed
+by the change statistic functions in changeStatisticsALAAM.py.
+"""
+
+import math
+import functools
+
+import changeStatisticsALAAM
+
+
+# Change statistic functions that can be fused, mapped to the name used
+# for them here. Those that take a parameter (by functools.partial())
+# have the parameter as the single element of the partial args.
+FUSABLE_CHANGESTATS = {
+    changeStatisticsALAAM.changeContagion : 'Contagion',
+    changeStatisticsALAAM.changePartnerAttributeActivity :
+      'PartnerAttributeActivity',
+    changeStatisticsALAAM.changeIndirectPartnerAttribute :
+      'IndirectPartnerAttribute',
+    changeStatisticsALAAM.changePartnerPartnerAttribute :
+      'PartnerPartnerAttribute',
+    changeStatisticsALAAM.changeTriangleT2 : 'TriangleT2',
+    changeStatisticsALAAM.changeTriangleT3 : 'TriangleT3',
+    changeStatisticsALAAM.changeGWContagion : 'GWContagion',
+    changeStatisticsALAAM.changeLogContagion : 'LogContagion',
+    changeStatisticsALAAM.changePowerContagion : 'PowerContagion',
+}
+
+# The fused change statistics that have a parameter
+PARAMETERIZED_FUSABLE_CHANGESTATS = {'GWContagion', 'PowerContagion'}
+
+
+def get_fused_changestat(changestat_func):
+    """Return (name, parameter) for a change statistic function that can
+    be computed by FusedChangeStatistics, or None if it cannot.
+
+    Parameters:
+        changestat_func - change statistic function, possibly created
+                          with functools.partial(), e.g.
+                          partial(changeGWContagion, log(2))
+
+    Return value:
+        tuple (name, param) where name is the name of the change statistic
+        in FUSABLE_CHANGESTATS and param is its parameter (e.g. alpha
+        for GWContagion) or None if it has no parameter; or None
+        if the change statistic cannot be fused.
+    """
+    if isinstance(changestat_func, functools.partial):
+        name = FUSABLE_CHANGESTATS.get(changestat_func.func)
+        if (name in PARAMETERIZED_FUSABLE_CHANGESTATS and
+            len(changestat_func.args) == 1 and
+            not changestat_func.keywords):
+            return (name, changestat_func.args[0])
+        return None
+    name = FUSABLE_CHANGESTATS.get(changestat_func)
+    if name is None or name in PARAMETERIZED_FUSABLE_CHANGESTATS:
+        return None
+    return (name, None)
+
+
+class FusedChangeStatistics:
+    """Compute all the fusable change statistics in a list of change
+    statistic functions in a single pass over the neighbourhood of a node.
+    """
+
+    def __init__(self, changestats_func_list):
+        """
+        Construct the fused change statistics computation for the
+        change statistic functions in changestats_func_list that
+        can be fused.
+
+        Parameters:
+           changestats_func_list  - list of change statistics funcions
+        """
+        # list of (index, name, param) for the fused change statistics
+        self.fused_stats = []
+        for l in range(len(changestats_func_list)):
+            fused = get_fused_changestat(changestats_func_list[l])
+            if fused is not None:
+                self.fused_stats.append((l, fused[0], fused[1]))
+        self.fused_indices = [l for (l, name, param) in self.fused_stats]
+        # only need to iterate over neighbours of neighbours for triangles
+        self.need_triangles = any(name in ['TriangleT2', 'TriangleT3']
+                                  for (l, name, param) in self.fused_stats)
+
+
+    def changeStats(self, G, A, i, nbrcounts, changestats):
+        """
+        Compute the fused change statistics for node i, setting them
+        in the changestats vector.
+
+        Parameters:
+           G                   - Graph object for network (fixed)
+           A                   - vector of 0/1 outcome variables for ALAAM
+           i                   - node to compute change statistics for
+           nbrcounts           - ActiveNeighbourCounts object for A
+           changestats         - numpy vector of change statistics, the
+                                 elements for the fused change statistics
+                                 are set in it
+
+        Return value:
+           None (changestats is modified)
+        """
+        # i is a neighbour of each neighbour u, so is not counted as an
+        # active neighbour of u (as A[i] = 0 when computing change stats)
+        ai = nbrcounts.active[i]
+        count = nbrcounts.count
+        degi = G.degree(i)
+        ipa = 0         # sum over all neighbours of their active neighbours
+        degsum = 0      # sum of degrees of active neighbours
+        t2 = 0          # two-paths i--u--v with A[u] = 1, v--i
+        t3 = 0          # two-paths i--u--v with A[u] = A[v] = 1, v--i
+        active_counts = [] # active neighbour counts of active neighbours
+        for u in G.neighbourIterator(i):
+            cu = count[u] - ai
+            ipa += cu
+            if A[u] == 1:
+                active_counts.append(cu)
+                degsum += G.degree(u)
+                if self.need_triangles and degi >= 2:
+                    for v in G.neighbourIterator(u):
+                        if v != i and G.isEdge(i, v):
+                            t2 += 1
+                            if A[v] == 1:
+                                t3 += 1
+        nact = len(active_counts)
+
+        for (l, name, param) in self.fused_stats:
+            if name == 'Contagion':
+                changestats[l] = nact
+            elif name == 'PartnerAttributeActivity':
+                changestats[l] = nact * (degi - 2) + degsum
+            elif name == 'IndirectPartnerAttribute':
+                changestats[l] = ipa
+            elif name == 'PartnerPartnerAttribute':
+                changestats[l] = 2 * sum(active_counts) + nact * (nact - 1)
+            elif name == 'TriangleT2':
+                changestats[l] = t2
+            elif name == 'TriangleT3':
+                assert t3 % 2 == 0
+                changestats[l] = t3 / 2.0
+            elif name == 'GWContagion':
+                delta = 0
+                for cu in active_counts:
+                    delta += (math.exp(-param * (cu + 1)) -
+                              math.exp(-param * cu))
+                changestats[l] = delta + math.exp(-param * nact)
+            elif name == 'LogContagion':
+                delta = 0
+                for cu in active_counts:
+                    delta += math.log((cu + 2) / (cu + 1))
+                changestats[l] = delta + math.log(nact + 1)
+            elif name == 'PowerContagion':
+                delta = 0
+                for cu in active_counts:
+                    delta += (math.pow(cu + 1, 1/param) -
+                              math.pow(cu, 1/param))
+                changestats[l] = delta + math.pow(nact, 1/param)
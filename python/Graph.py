@@ -9,7 +9,11 @@
 
 import math
 import functools
-from utils import int_or_na,float_or_na,NA_VALUE
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import int_or_na,float_or_na,NA_VALUE,na_mask
+from utils import BINATTR_DTYPE,CATATTR_DTYPE,CONTATTR_DTYPE
+from readGraphFiles import readPajekEdges,adjacencyLists,readAttributeFile,readZoneFile
 
 
 
@@ -59,12 +63,19 @@ class Graph:
     categorical, and NaN for continuous.
 
     Node attributes (binary, continuous, categorical; separately)
-    are each stored in a dictionary of lists. The key of the dictionary
-    is the attribute name, and the value is a list which is simply
-    indexed by node id i.e. a simple list of the attribute values in
+    are each stored in a dictionary of numpy arrays. The key of the
+    dictionary is the attribute name, and the value is a numpy array
+    which is simply indexed by node id i.e. the attribute values in
     node id order. So e.g. the categorical attribute 'class' for node id 2
     (the third node, so row 4 in data which has header)
     would be catattr['class'][2]
+    The arrays have type BINATTR_DTYPE (int32) for binary, CATATTR_DTYPE
+    (int32) for categorical, and CONTATTR_DTYPE (float64) for continuous
+    attributes (see utils.py), and na_mask() gives the mask of NA values.
+    Change statistics can therefore use vectorized (numpy) operations on
+    the attributes, while indexing them by node id, and their count() and
+    index() methods (see AttributeArray in utils.py), still work just as
+    for lists.
 
     Also there can be optionally be a 'zone' for each node, which is
     the snowball sampling zone: 0 for the seed nodes, 1 for nodes
@@ -103,9 +114,9 @@ class Graph:
                     pajek_edgelist_filename is not None)
         assert num_nodes is not None or pajek_edgelist_filename is not None
         self.G = None  # dict of dicts as described above
-        self.binattr = None # binary attributes: dict name, list by node (int not boolean)
-        self.contattr = None # continuous attributes: dict name, list by node
-        self.catattr = None  # categorical attributes: dict name, list by node
+        self.binattr = None # binary attributes: dict name, array by node (int not boolean)
+        self.contattr = None # continuous attributes: dict name, array by node
+        self.catattr = None  # categorical attributes: dict name, array by node
 
         # for conditional estimation on snowball sampling structure
         self.zone    = None  # node snowball zone, list by node
@@ -113,9 +124,7 @@ class Graph:
         self.inner_nodes = None # list of nodes with zone < max_zone
 
         if pajek_edgelist_filename is not None:
-            f =  open(pajek_edgelist_filename)
-            l = f.readline() # first line must be e.g. "*vertices 500"
-            n = int(l.split()[1])
+            (n, edges) = readPajekEdges(pajek_edgelist_filename, "*edges")
         else:
             n = num_nodes
 
@@ -123,42 +132,27 @@ class Graph:
         self.G = dict(list(zip(list(range(n)), [dict() for i in range(n)])))
 
         if pajek_edgelist_filename is not None:
-            while l and l.rstrip().lower() != "*edges":
-                l = f.readline()
-            if not l:
-                raise ValueError("no *edges in Pajek file " +
-                                 pajek_edgelist_filename)
-            lsplit = f.readline().split()
-            while len(lsplit) >= 2:
-                lsplit = lsplit[:2]  # only used first two (i,j) ignore weight
-                (i, j) = list(map(int, lsplit))
-                assert(i >= 1 and i <= n and j >= 1 and j <= n)
-                self.insertEdge(i-1, j-1)    # input is 1-based but we are 0-based
-                lsplit = f.readline().split()
-
-        # Note in the following,
-        #  map(list, zip(*[row.split() for row in open(filename).readlines()]))
-        # reads the data and transposes it so we have a list of columns
-        # not a list of rows, which then makes it easy to convert to
-        # the dict where key is column header and value is list of values
-        # (converted to the appropraite data type from sting with int_or_na()
-        # etc.)
-        # https://stackoverflow.com/questions/6473679/transpose-list-of-lists#
-        
+            self.insertEdges(edges)
+
+        # The attributes are read into dicts where key is column header
+        # and value is numpy array of values (see readGraphFiles.py)
         if binattr_filename is not None:
-            self.binattr = dict([(col[0], list(map(int_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(binattr_filename).readlines()])))])
+            self.binattr = readAttributeFile(binattr_filename,
+                                             BINATTR_DTYPE)
             assert(all([len(v) == n for v in self.binattr.values()]))
 
         if contattr_filename is not None:
-            self.contattr = dict([(col[0], list(map(float_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(contattr_filename).readlines()])))])
+            self.contattr = readAttributeFile(contattr_filename,
+                                              CONTATTR_DTYPE)
             assert(all([len(v) == n for v in self.contattr.values()]))
 
         if catattr_filename is not None:
-            self.catattr = dict([(col[0], list(map(int_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(catattr_filename).readlines()])))])
+            self.catattr = readAttributeFile(catattr_filename,
+                                             CATATTR_DTYPE)
             assert(all([len(v) == n for v in self.catattr.values()]))
 
         if zone_filename is not None:
-            self.zone = [int(s) for s in open(zone_filename).readlines()[1:]]
+            self.zone = readZoneFile(zone_filename)
             assert(len(self.zone) == n)
             self.max_zone = max(self.zone)
             assert(min(self.zone) == 0)
@@ -216,6 +210,18 @@ class Graph:
         self.G[j][i] = 1
 
 
+    def insertEdges(self, edges):
+        """
+        Insert all the edges in the m x 2 numpy array edges in place,
+        the same as calling insertEdge(i, j) for each row (i, j)
+        but much faster for a large number of edges
+        """
+        assert not np.any(edges[:, 0] == edges[:, 1]) # do not allow loops
+        # both i -- j and j -- i for each edge, interleaved so that
+        # neighbours are in the same order as inserting one at a time
+        for (i, nbrs) in adjacencyLists(edges.ravel(), edges[:, ::-1].ravel()):
+            self.G[i].update(dict.fromkeys(nbrs, 1))
+
     def removeEdge(self, i, j):
         """
         Delete edge i -- j in place
@@ -235,17 +241,17 @@ class Graph:
 
         if self.binattr is not None:
             for attrname in self.binattr.keys():
-                print('Binary attribute', attrname, 'has', self.binattr[attrname].count(NA_VALUE), 'NA values')
+                print('Binary attribute', attrname, 'has', np.count_nonzero(na_mask(self.binattr[attrname])), 'NA values')
         else:
             print('No binary attributes')
         if self.contattr is not None:
             for attrname in self.contattr.keys():
-                print('Continuous attribute', attrname, 'has', sum([math.isnan(x) for x in self.contattr[attrname]]), 'NA values')
+                print('Continuous attribute', attrname, 'has', np.count_nonzero(na_mask(self.contattr[attrname])), 'NA values')
         else:
             print('No continuous attributes')
         if self.catattr is not None:
             for attrname in self.catattr.keys():
-                print('Categorical attribute', attrname, 'has', self.catattr[attrname].count(NA_VALUE), 'NA values')
+                print('Categorical attribute', attrname, 'has', np.count_nonzero(na_mask(self.catattr[attrname])), 'NA values')
         else:
             print('No categorical attributes')
 
@@ -6,6 +6,9 @@
 # Defines a sparse matrix data structure
 #
 
+import bisect
+import numpy as np         # used for matrix & vector data types and functions
+
 
 class SparseMatrix:
     """The sparse matrix is represented as a dictionary of
@@ -25,9 +28,10 @@ class SparseMatrix:
     which are effectively sparse adjacency matrix (adjacency list)
     storage, with operations specific to graphs.
 
-    An alternative would be something like compressed sparse row (CSR)
-    storage, using 3 arrays, but dictionaries are very convenient in
-    Python (and arrays are not).
+    An alternative is compressed sparse row (CSR) storage, using 3
+    arrays, but dictionaries are very convenient in Python (and arrays
+    are not) when the matrix has to be built incrementally. See
+    CSRSparseMatrix below for an immutable CSR version.
 
     """
 
@@ -101,3 +105,90 @@ class SparseMatrix:
         """
         self.A[i].pop(j)
 
+
+
+class CSRSparseMatrix:
+    """Immutable sparse matrix stored in compressed sparse row (CSR)
+    format, with the same query methods as SparseMatrix (getValue(),
+    rowNonZeroColumnsIterator(), etc.).
+
+    The nonzero columns in row i are indices[indptr[i]:indptr[i+1]],
+    in sorted order, and the corresponding values are
+    data[indptr[i]:indptr[i+1]], where these are numpy arrays.
+
+    This uses much less memory than the dictionary of dictionaries in
+    SparseMatrix, but cannot be modified after it is constructed.
+    """
+
+    def __init__(self, S=None, indptr=None, indices=None, data=None):
+        """
+        Construct CSR sparse matrix either from an existing SparseMatrix
+        or from CSR arrays.
+
+        Parameters:
+            S       - SparseMatrix object to convert. If None then
+                      indptr, indices and data must be used instead.
+                      Default None
+            indptr  - row pointer array (length n+1). Default None
+            indices - column indices array, sorted in each row.
+                      Default None
+            data    - values array corresponding to indices. Default None
+        """
+        assert (S is None) != (indptr is None)
+        if S is not None:
+            n = S.numRows()
+            indptr = np.zeros(n + 1, dtype=np.int32)
+            indices = []
+            data = []
+            for i in range(n):
+                for j in sorted(S.rowNonZeroColumnsIterator(i)):
+                    indices.append(j)
+                    data.append(S.getValue(i, j))
+                indptr[i+1] = len(indices)
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data)
+
+    def getValue(self, i, j):
+        """
+        Return value A(i, j)
+        """
+        end = self.indptr[i+1]
+        k = bisect.bisect_left(self.indices, j, self.indptr[i], end)
+        return self.data[k].item() if k < end and self.indices[k] == j else 0
+
+    def numRows(self):
+        """
+        Return number of rows in matrix
+        """
+        return len(self.indptr) - 1
+
+    def numNonZero(self):
+        """
+        Return number of nonzero entries in matrix
+        """
+        return len(self.indices)
+
+    def numNonZeroInRow(self, i):
+        """
+        Return number of nonzero entries in row i
+        """
+        return int(self.indptr[i+1] - self.indptr[i])
+
+    def rowNonZeroColumnsIterator(self, i):
+        """
+        Return iterator over columns of nonzero entries in row i
+        """
+        return iter(self.indices[self.indptr[i]:self.indptr[i+1]].tolist())
+
+    def rowNonZeroValuesIterator(self, i):
+        """
+        Return iterator over nonzero entries in row i
+        """
+        return iter(self.data[self.indptr[i]:self.indptr[i+1]].tolist())
+
+    def nbytes(self):
+        """
+        Return number of bytes used by the CSR arrays
+        """
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
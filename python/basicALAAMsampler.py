@@ -31,6 +31,7 @@ import numpy as np         # used for matrix & vector data types and functions
 
 from Graph import Graph,NA_VALUE
 from changeStatisticsALAAM import *
+from ChangeStatisticsTable import getChangeStatisticsTable
 
 
 
@@ -68,6 +69,8 @@ def basicALAAMsampler(G, A, changestats_func_list, theta, performMove,
     accepted = 0
     changeTo1ChangeStats = np.zeros(n)
     changeTo0ChangeStats = np.zeros(n)
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    nbrcounts = cstable.activeNeighbourCounts(G, A)
     for k in range(sampler_m):
         # basic sampler: select a node  i uniformly at random
         # and toggle outcome variable for it
@@ -79,10 +82,10 @@ def basicALAAMsampler(G, A, changestats_func_list, theta, performMove,
             A[i] = 0
 
         # compute change statistics for each of the n statistics using the
-        # list of change statistic functions
-        changestats = np.zeros(n)
-        for l in range(n):
-            changestats[l] = changestats_func_list[l](G, A, i)
+        # list of change statistic functions (or the precomputed values
+        # for those that do not depend on the outcome vector, and the
+        # active neighbour counts for contagion-type statistics)
+        changestats = cstable.changeStats(G, A, i, nbrcounts)
         changeSignMul = -1 if isChangeToZero else +1
         total = np.sum(theta * changeSignMul * changestats)
         if random.uniform(0, 1) < np.exp(total): #np.exp gives inf not overflow
@@ -93,6 +96,8 @@ def basicALAAMsampler(G, A, changestats_func_list, theta, performMove,
                 # For changeTo1 move, set outcome to 1 now
                 if not isChangeToZero:
                     A[i] = 1
+                if nbrcounts is not None:
+                    nbrcounts.update(G, A, i)
             else:
                 # if we are not to actually perform the moves, then reverse
                 # changes for changeTo0 move made so A same as before
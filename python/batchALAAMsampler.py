@@ -0,0 +1,204 @@
+#
+# File:    batchALAAMsampler.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Batch version of the basic ALAAM MCMC sampler. A node is chosen
+   uniformly at random and its outcome binary variable value toggled,
+   exactly as in the basic sampler (basicALAAMsampler.py), but the
+   random node indices and uniform random numbers for the acceptance
+   test are drawn in blocks from a numpy.random.Generator, the
+   acceptance test is done in log space, and the change statistics
+   vector is put into a preallocated buffer rather than allocating
+   new numpy vectors on every proposal. For models with cheap change
+   statistics, these overheads otherwise dominate the time taken.
+
+  The ALAAM is described in:
+
+  G. Daraganova and G. Robins. Autologistic actor attribute models. In
+  D. Lusher, J. Koskinen, and G. Robins, editors, Exponential Random
+  Graph Models for Social Networks, chapter 9, pages 102-114. Cambridge
+  University Press, New York, 2013.
+
+  G. Robins, P. Pattison, and P. Elliott. Network models for social
+  influence processes. Psychometrika, 66(2):161-189, 2001.
+
+"""
+
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import NA_VALUE
+from ChangeStatisticsTable import getChangeStatisticsTable
+
+
+# Maximum number of random values drawn at a time
+BLOCK_SIZE = 16384
+
+# Default random number generator used if none is specified.
+# To get reproducible results, use e.g.
+# partial(batchALAAMsampler, rng = np.random.default_rng(seed))
+# as the sampler function.
+default_rng = np.random.default_rng()
+
+
+def getNodesNotNA(G, A):
+    """
+    Return numpy array of the nodes that do not have NA outcome value.
+    The array is cached on G as G.not_na_nodes along with the list of
+    NA nodes, which is the key for the cache: if A has the same number
+    of NA values, and they are all at the NA nodes of the cached array,
+    then it has the same NA pattern so the cached array is returned.
+    (The samplers never change NA values so this is usually the case).
+
+    Parameters:
+       G   - Graph object for network (fixed)
+       A   - vector of 0/1 (or NA) outcome variables for ALAAM
+
+    Return value:
+       numpy array of nodes with outcome value not NA
+    """
+    if isinstance(A, list):
+        num_na = A.count(NA_VALUE)
+    else:
+        num_na = int(np.count_nonzero(np.asarray(A) == NA_VALUE))
+    cached = getattr(G, 'not_na_nodes', None)
+    if cached is not None:
+        (na_nodes, nodes) = cached
+        if (len(na_nodes) == num_na and len(nodes) + num_na == len(A) and
+            all(A[i] == NA_VALUE for i in na_nodes)):
+            return nodes
+    is_na = np.asarray(A) == NA_VALUE
+    nodes = np.nonzero(~is_na)[0]
+    G.not_na_nodes = (np.nonzero(is_na)[0].tolist(), nodes)
+    return nodes
+
+
+def batchALAAMsampler(G, A, changestats_func_list, theta, performMove,
+                      sampler_m, rng = None):
+    """
+    batchALAAMsampler - sample from ALAAM distribution with basic sampler,
+                        drawing random numbers in blocks,
+                        returning estimate of E(Delta_z(x_obs))
+
+    In ALAAM there is a fixed network and a vector of binary outcome
+    variables (indexed 0..N-1 corresponding to network nodes). Only
+    the outcome vector is changed in MCMC simulations, the network is
+    fixed.
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC move,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in this module.
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    # choosing uniformly from the nodes that are not NA is the same as
+    # the basic sampler choosing a node uniformly at random until it
+    # gets one that is not NA
+    return batchALAAMsamplerNodes(getNodesNotNA(G, A), G, A,
+                                  changestats_func_list, theta,
+                                  performMove, sampler_m, rng)
+
+
+def batchALAAMsamplerNodes(nodes, G, A, changestats_func_list, theta,
+                           performMove, sampler_m, rng = None):
+    """
+    batchALAAMsamplerNodes - sample from ALAAM distribution with basic
+                             sampler, choosing nodes uniformly at random
+                             from the specified array of nodes, drawing
+                             random numbers in blocks
+
+    This is used to implement batchALAAMsampler() and
+    conditionalALAAMsampler(), which just differ in the nodes that
+    can be chosen to have their outcome toggled.
+
+    Parameters:
+       nodes               - numpy array of nodes that can be chosen
+                             (outcome must not be NA for any of them)
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC move,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in this module.
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    if len(nodes) == 0:
+        raise Exception("no nodes with outcome not NA to sample")
+    if rng is None:
+        rng = default_rng
+    n = len(changestats_func_list)
+    accepted = 0
+    changeTo1ChangeStats = np.zeros(n)
+    changeTo0ChangeStats = np.zeros(n)
+    changestats = np.zeros(n)
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    nbrcounts = cstable.activeNeighbourCounts(G, A)
+    k = 0
+    while k < sampler_m:
+        blocksize = min(BLOCK_SIZE, sampler_m - k)
+        # convert to lists so elements are Python int and float,
+        # much faster than numpy scalars when used one at a time
+        node_block = nodes[rng.integers(len(nodes), size=blocksize)].tolist()
+        # log(1 - U) is log of uniform on (0, 1] so never log(0)
+        logu_block = np.log1p(-rng.random(blocksize)).tolist()
+        for (i, logu) in zip(node_block, logu_block):
+            isChangeToZero = (A[i] == 1)
+            if isChangeToZero:
+                A[i] = 0
+
+            # compute change statistics (into the changestats buffer)
+            cstable.changeStats(G, A, i, nbrcounts, changestats)
+            total = np.dot(theta, changestats)
+            if isChangeToZero:
+                total = -total
+            if logu < total:
+                accepted += 1
+                if performMove:
+                    # actually accept the move.
+                    # if changing to 0, we have already done it.
+                    # For changeTo1 move, set outcome to 1 now
+                    if not isChangeToZero:
+                        A[i] = 1
+                    if nbrcounts is not None:
+                        nbrcounts.update(G, A, i)
+                else:
+                    # if we are not to actually perform the moves, then
+                    # reverse changes for changeTo0 move made so A
+                    # same as before
+                    if isChangeToZero:
+                        A[i] = 1
+                if isChangeToZero:
+                    changeTo0ChangeStats += changestats
+                else:
+                    changeTo1ChangeStats += changestats
+            elif isChangeToZero: # move not accepted, so reverse change
+                A[i] = 1
+        k += blocksize
+
+    acceptance_rate = float(accepted) / sampler_m
+    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+#
+# File:    benchmarkALAAMsamplers.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Benchmark the ALAAM MCMC samplers, reporting the number of
+ proposals per second for the basic sampler and the batch version of it
+ (batchALAAMsampler.py), and the number of node updates per second
+ for the checkerboard sampler (checkerboardALAAMsampler.py) and the
+ random and systematic scan heat-bath samplers (heatBathALAAMsampler.py),
+ on the simulated n1000 example network with a cheap model (only
+ outcome-independent change statistics) and a model with contagion
+ statistics. If Numba is installed, the
+ compiled sampler (jitALAAMsampler.py) on the CSR version of the
+ network is also benchmarked.
+
+ Since the samplers mix at different rates, the effective sample size
+ (of the least well sampled statistic) per CPU-second is also reported,
+ for samples taken every sampler_m proposals after a burn-in.
+
+ Usage:
+     benchmarkALAAMsamplers.py [num_proposals]
+
+ Run from this directory (uses the data in ../examples/data).
+"""
+import sys
+import time
+from functools import partial
+from math import log
+import numpy as np         # used for matrix & vector data types and functions
+
+from Graph import Graph
+from changeStatisticsALAAM import *
+from basicALAAMsampler import basicALAAMsampler
+from batchALAAMsampler import batchALAAMsampler
+from CSRGraph import toCSR
+from computeObservedStatistics import computeObservedStatistics
+from jitChangeStatistics import HAVE_NUMBA
+from jitALAAMsampler import jitALAAMsampler
+from checkerboardALAAMsampler import checkerboardALAAMsampler
+from heatBathALAAMsampler import heatBathALAAMsampler
+from utils import effective_sample_size
+
+
+def benchmark_sampler(G, sampler_func, param_func_list, theta, num_proposals,
+                      sampler_m = 1000):
+    """Time the sampler, calling it with sampler_m proposals (performing
+    the moves) until num_proposals proposals have been done, as in the
+    EE algorithm, starting from an all zero outcome vector.
+
+    Parameters:
+       G                - Graph object for network
+       sampler_func     - ALAAM sampler function
+       param_func_list  - list of change statistic functions
+       theta            - numpy vector of parameter values
+       num_proposals    - total number of proposals
+       sampler_m        - number of proposals for each call of sampler_func
+
+    Return value:
+       tuple (proposals per second, acceptance rate)
+    """
+    A = np.zeros(G.numNodes(), dtype=int)
+    accepted = 0.0
+    start = time.time()
+    for k in range(num_proposals // sampler_m):
+        (acceptance_rate, changeTo1ChangeStats,
+         changeTo0ChangeStats) = sampler_func(G, A, param_func_list, theta,
+                                              True, sampler_m)
+        accepted += acceptance_rate * sampler_m
+    elapsed = time.time() - start
+    return (num_proposals / elapsed, accepted / num_proposals)
+
+
+def benchmark_ess(G, sampler_func, param_func_list, theta, num_proposals,
+                  sampler_m = 100, burnin = 100000):
+    """Estimate the effective sample size per CPU-second of the sampler,
+    taking a sample of the statistics after every sampler_m proposals,
+    after burnin proposals starting from an all zero outcome vector.
+    The statistics are tracked by adding the change statistics of the
+    moves made.
+
+    Parameters:
+       G                - Graph object for network
+       sampler_func     - ALAAM sampler function
+       param_func_list  - list of change statistic functions
+       theta            - numpy vector of parameter values
+       num_proposals    - total number of proposals (after burn-in)
+       sampler_m        - number of proposals between samples
+       burnin           - number of burn-in proposals
+
+    Return value:
+       minimum over the statistics of effective sample size per CPU-second
+    """
+    A = np.zeros(G.numNodes(), dtype=int)
+    sampler_func(G, A, param_func_list, theta, True, burnin)
+    Z = computeObservedStatistics(G, A, param_func_list)
+    num_samples = num_proposals // sampler_m
+    Zmatrix = np.empty((num_samples, len(param_func_list)))
+    start = time.process_time()
+    for k in range(num_samples):
+        (acceptance_rate, changeTo1ChangeStats,
+         changeTo0ChangeStats) = sampler_func(G, A, param_func_list, theta,
+                                              True, sampler_m)
+        Z += changeTo1ChangeStats - changeTo0ChangeStats
+        Zmatrix[k] = Z
+    elapsed = time.process_time() - start
+    ess = [effective_sample_size(Zmatrix[:, l])
+           for l in range(len(param_func_list))]
+    return np.nanmin(ess) / elapsed
+
+
+def main():
+    """
+    See usage message in module header block
+    """
+    num_proposals = 100000
+    if len(sys.argv) > 2:
+        sys.stderr.write("usage: " + sys.argv[0] + " [num_proposals]\n")
+        sys.exit(1)
+    elif len(sys.argv) == 2:
+        num_proposals = int(sys.argv[1])
+
+    datadir = "../examples/data/simulated_n1000_bin_cont/"
+    G = Graph(datadir + "n1000_kstar_simulate12750000.txt",
+              datadir + "binaryAttribute_50_50_n1000.txt",
+              datadir + "continuousAttributes_n1000.txt")
+
+    models = [
+        ("cheap",
+         [changeDensity, changeActivity, partial(changeoOb, "binaryAttribute"),
+          partial(changeoOc, "continuousAttribute")],
+         np.array([-0.5, 0.1, 0.5, 0.5])),
+        ("contagion",
+         [changeDensity, changeActivity, changeContagion,
+          partial(changeGWContagion, log(2)),
+          partial(changeoOb, "binaryAttribute"),
+          partial(changeoOc, "continuousAttribute")],
+         np.array([-0.5, 0.1, 0.2, 0.1, 0.5, 0.5]))
+        ]
+    samplers = [("basicALAAMsampler", basicALAAMsampler, G),
+                ("batchALAAMsampler", batchALAAMsampler, G),
+                ("checkerboardALAAMsampler", checkerboardALAAMsampler, G),
+                ("heatBathALAAMsampler", heatBathALAAMsampler, G),
+                ("heatBathALAAMsampler_systematic",
+                 partial(heatBathALAAMsampler, systematic = True), G)]
+    if HAVE_NUMBA:
+        G_csr = toCSR(G)
+        # first call compiles the kernels (if not cached), so do not time it
+        jitALAAMsampler(G_csr, np.zeros(G.numNodes(), dtype=int),
+                        models[-1][1], models[-1][2], False, 10)
+        samplers.append(("jitALAAMsampler", jitALAAMsampler, G_csr))
+
+    print("model", "sampler", "proposals_per_second", "acceptance_rate")
+    for (model_name, param_func_list, theta) in models:
+        for (sampler_name, sampler_func, graph) in samplers:
+            (rate, acceptance_rate) = benchmark_sampler(graph, sampler_func,
+                                                        param_func_list, theta,
+                                                        num_proposals)
+            print(model_name, sampler_name, round(rate), acceptance_rate)
+
+    print()
+    print("model", "sampler", "ess_per_cpu_second")
+    for (model_name, param_func_list, theta) in models:
+        for (sampler_name, sampler_func, graph) in samplers:
+            print(model_name, sampler_name,
+                  round(benchmark_ess(graph, sampler_func, param_func_list,
+                                      theta, num_proposals), 1))
+
+
+if __name__ == "__main__":
+    main()
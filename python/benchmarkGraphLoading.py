@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+#
+# File:    benchmarkGraphLoading.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Benchmark loading a network and its attributes from Pajek format
+ and attribute files, comparing the original method of reading one line
+ at a time (inserting each edge with insertEdge() and converting
+ each attribute value with int_or_na() etc.) with the vectorized
+ reading in Graph and Digraph (see readGraphFiles.py), and also
+ converting to the CSR representation with toCSR() compared to reading
+ directly into it with readCSRGraph().
+
+ Usage:
+     benchmarkGraphLoading.py [-d] [edgelist_filename [binattr_filename
+                               [contattr_filename [catattr_filename]]]]
+
+     -d : directed network (*arcs), default undirected (*edges)
+
+ Use "-" for attribute files that are not used. If no filenames are
+ given, the simulated n1000 example network in ../examples/data is used.
+ E.g. for the SNAP-derived networks in simulations/:
+
+     benchmarkGraphLoading.py soc-pokec-relationships-undirected.net
+"""
+import getopt
+import sys
+import time
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import int_or_na,float_or_na
+from Graph import Graph
+from Digraph import Digraph
+from CSRGraph import toCSR,readCSRGraph
+
+
+def loadLineByLine(G, pajek_edgelist_filename, binattr_filename,
+                   contattr_filename, catattr_filename, directed):
+    """Load the network and attributes into the empty graph G, one line
+    at a time, as Graph and Digraph used to do.
+
+    Parameters:
+        G                 - Graph or Digraph object with no nodes
+        pajek_edgelist_filename - edge list in Pajek format
+        binattr_filename  - binary attributes or None
+        contattr_filename - continuous attributes or None
+        catattr_filename  - categorical attributes or None
+        directed          - True for directed (*arcs) else *edges
+    """
+    section = "*arcs" if directed else "*edges"
+    f =  open(pajek_edgelist_filename)
+    l = f.readline() # first line must be e.g. "*vertices 500"
+    n = int(l.split()[1])
+    G.G = dict(list(zip(list(range(n)), [dict() for i in range(n)])))
+    if directed:
+        G.Grev = dict(list(zip(list(range(n)), [dict() for i in range(n)])))
+    while l and l.rstrip().lower() != section:
+        l = f.readline()
+    lsplit = f.readline().split()
+    while len(lsplit) >= 2:
+        lsplit = lsplit[:2]  # only used first two (i,j) ignore weight
+        (i, j) = list(map(int, lsplit))
+        assert(i >= 1 and i <= n and j >= 1 and j <= n)
+        G.insertEdge(i-1, j-1)    # input is 1-based but we are 0-based
+        lsplit = f.readline().split()
+    f.close()
+    if binattr_filename is not None:
+        G.binattr = dict([(col[0], list(map(int_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(binattr_filename).readlines()])))])
+    if contattr_filename is not None:
+        G.contattr = dict([(col[0], list(map(float_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(contattr_filename).readlines()])))])
+    if catattr_filename is not None:
+        G.catattr = dict([(col[0], list(map(int_or_na, col[1:]))) for col in map(list, list(zip(*[row.split() for row in open(catattr_filename).readlines()])))])
+
+
+def usage(progname):
+    """
+    print usage msg and exit
+    """
+    sys.stderr.write("usage: " + progname + " [-d] [edgelist_filename [binattr_filename [contattr_filename [catattr_filename]]]]\n")
+    sys.exit(1)
+
+
+def main():
+    """
+    See usage message in module header block
+    """
+    directed = False
+    try:
+        opts,args = getopt.getopt(sys.argv[1:], "d")
+    except:
+        usage(sys.argv[0])
+    for opt,arg in opts:
+        if opt == "-d":
+            directed = True
+        else:
+            usage(sys.argv[0])
+    if len(args) > 4:
+        usage(sys.argv[0])
+
+    if len(args) == 0:
+        datadir = "../examples/data/simulated_n1000_bin_cont/"
+        args = [datadir + "n1000_kstar_simulate12750000.txt",
+                datadir + "binaryAttribute_50_50_n1000.txt",
+                datadir + "continuousAttributes_n1000.txt"]
+    filenames = [None if a == "-" else a for a in args] + [None]*(4-len(args))
+    graph_class = Digraph if directed else Graph
+
+    start = time.time()
+    G_old = graph_class(num_nodes = 0)
+    loadLineByLine(G_old, *filenames, directed)
+    old_time = time.time() - start
+    start = time.time()
+    G_old_csr = toCSR(G_old)
+    old_csr_time = old_time + time.time() - start
+
+    start = time.time()
+    G_new = graph_class(*filenames)
+    new_time = time.time() - start
+
+    start = time.time()
+    G_new_csr = readCSRGraph(*filenames, directed = directed)
+    new_csr_time = time.time() - start
+
+    assert G_new.G == G_old.G
+    for (new_attrs, old_attrs) in [(G_new.binattr, G_old.binattr),
+                                   (G_new.contattr, G_old.contattr),
+                                   (G_new.catattr, G_old.catattr)]:
+        assert (new_attrs is None) == (old_attrs is None)
+        if new_attrs is not None:
+            assert all([np.array_equal(new_attrs[a], old_attrs[a],
+                                       equal_nan = True) for a in old_attrs])
+    assert (list(G_new_csr.indptr) == list(G_old_csr.indptr) and
+            list(G_new_csr.indices) == list(G_old_csr.indices))
+    print("representation", "line_by_line_seconds", "vectorized_seconds",
+          "speedup")
+    print("dict", old_time, new_time, old_time / new_time)
+    print("CSR", old_csr_time, new_csr_time, old_csr_time / new_csr_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ import numpy as np         # used for matrix & vector data types and functions
 
 from utils import NA_VALUE
 from BipartiteGraph import BipartiteGraph,MODE_A,MODE_B
+from ChangeStatisticsTable import getChangeStatisticsTable
 
 
 def bipartiteALAAMsampler(mode,
@@ -91,6 +92,8 @@ def bipartiteALAAMsampler(mode,
     accepted = 0
     changeTo1ChangeStats = np.zeros(n)
     changeTo0ChangeStats = np.zeros(n)
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    nbrcounts = cstable.activeNeighbourCounts(G, A)
     for k in range(sampler_m):
         # basic sampler for two-mode network: select a node i of the
         # specified mode unfiormly at random and toggle outcome
@@ -104,10 +107,10 @@ def bipartiteALAAMsampler(mode,
             A[i] = 0
 
         # compute change statistics for each of the n statistics using the
-        # list of change statistic functions
-        changestats = np.zeros(n)
-        for l in range(n):
-            changestats[l] = changestats_func_list[l](G, A, i)
+        # list of change statistic functions (or the precomputed values
+        # for those that do not depend on the outcome vector, and the
+        # active neighbour counts for contagion-type statistics)
+        changestats = cstable.changeStats(G, A, i, nbrcounts)
         changeSignMul = -1 if isChangeToZero else +1
         total = np.sum(theta * changeSignMul * changestats)
         if random.uniform(0, 1) < np.exp(total): #np.exp gives inf not overflow
@@ -118,6 +121,8 @@ def bipartiteALAAMsampler(mode,
                 # For changeTo1 move, set outcome to 1 now
                 if not isChangeToZero:
                     A[i] = 1
+                if nbrcounts is not None:
+                    nbrcounts.update(G, A, i)
             else:
                 # if we are not to actually perform the moves, then reverse
                 # changes for changeTo0 move made so A same as before
@@ -57,6 +57,7 @@ import functools
 
 from utils import NA_VALUE
 from Graph import Graph
+from CSRGraph import CSRGraph
 
 
 
@@ -339,10 +340,15 @@ def changeoO_Osame(attrname, G, A, i):
 
     {*}--{o}
     """
+    if isinstance(G, CSRGraph):
+        return G.catattrMatch(attrname).same_count[i]
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.neighbourIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] == G.catattr[attrname][i]):
+        if cat[u] == ci:
             delta += 1
     return delta
 
@@ -355,11 +361,16 @@ def changeoO_OsameContagion(attrname, G, A, i):
 
     {*}--{*}
     """
+    if isinstance(G, CSRGraph):
+        return len([u for u in G.catattrMatch(attrname).sameNeighbours(i)
+                    if A[u] == 1])
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.neighbourIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] == G.catattr[attrname][i] and
-            A[u] == 1):
+        if cat[u] == ci and A[u] == 1:
             delta += 1
     return delta
 
@@ -372,10 +383,15 @@ def changeoO_Odiff(attrname, G, A, i):
     {*}--<o>
 
     """
+    if isinstance(G, CSRGraph):
+        return G.catattrMatch(attrname).diff_count[i]
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.neighbourIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] != G.catattr[attrname][i]):
+        if cat[u] != NA_VALUE and cat[u] != ci:
             delta += 1
     return delta
 
@@ -539,6 +555,17 @@ def changeContagionDist(distmatrix, G, A, i):
 
 
 
+def two_path_ends_csr(G, i):
+    """Return numpy array of the end nodes v of all the two-paths
+    i -- u -- v (including v = i) in CSRGraph G, used for the
+    categorical attribute two-path change statistics.
+    """
+    nbrs = G.neighbourArray(i)
+    if len(nbrs) == 0:
+        return nbrs
+    return numpy.concatenate([G.neighbourArray(u) for u in nbrs.tolist()])
+
+
 def changeSamePartnerActivityTwoPath(attrname, G, A, i):
     r"""Change statistic for SamePartnerActivityTwoPath,
     two-path from a node with outcome attribute where both ends
@@ -552,13 +579,18 @@ def changeSamePartnerActivityTwoPath(attrname, G, A, i):
     have the same value of the supplied categorical attribute.
 
     """
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
+    if isinstance(G, CSRGraph):
+        # the two-path i -- u -- i is counted (once) for every neighbour u
+        return (numpy.count_nonzero(cat[two_path_ends_csr(G, i)] == ci) -
+                G.degree(i))
     delta = 0
     for u in G.neighbourIterator(i):
         for v in G.neighbourIterator(u):
-            if (v != i and
-                G.catattr[attrname][i] != NA_VALUE and
-                G.catattr[attrname][v] != NA_VALUE and
-                G.catattr[attrname][i] == G.catattr[attrname][v]):
+            if v != i and cat[v] == ci:
                 delta += 1
     return delta
 
@@ -576,13 +608,17 @@ def changeDiffPartnerActivityTwoPath(attrname, G, A, i):
     have different values of the supplied categorical attribute.
 
     """
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
+    if isinstance(G, CSRGraph):
+        endcat = cat[two_path_ends_csr(G, i)]
+        return numpy.count_nonzero((endcat != ci) & (endcat != NA_VALUE))
     delta = 0
     for u in G.neighbourIterator(i):
         for v in G.neighbourIterator(u):
-            if (v != i and
-                G.catattr[attrname][i] != NA_VALUE and
-                G.catattr[attrname][v] != NA_VALUE and
-                G.catattr[attrname][i] != G.catattr[attrname][v]):
+            if v != i and cat[v] != NA_VALUE and cat[v] != ci:
                 delta += 1
     return delta
 
@@ -602,13 +638,18 @@ def changeSameIndirectPartnerAttribute(attrname, G, A, i):
     the same value of the categorical attribute attrname.
 
     """
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
+    if isinstance(G, CSRGraph):
+        ends = two_path_ends_csr(G, i)
+        return len([v for v in ends[cat[ends] == ci].tolist()
+                    if v != i and A[v] == 1])
     delta = 0
     for u in G.neighbourIterator(i):
         for v in G.neighbourIterator(u):
-            if (v != i and A[v] == 1 and
-                G.catattr[attrname][i] != NA_VALUE and
-                G.catattr[attrname][v] != NA_VALUE and
-                G.catattr[attrname][i] == G.catattr[attrname][v]):
+            if v != i and A[v] == 1 and cat[v] == ci:
                 delta += 1
     return delta
 
@@ -628,13 +669,20 @@ def changeDiffIndirectPartnerAttribute(attrname, G, A, i):
     the same value of the categorical attribute attrname.
 
     """
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
+    if isinstance(G, CSRGraph):
+        ends = two_path_ends_csr(G, i)
+        endcat = cat[ends]
+        return len([v for v in ends[(endcat != ci) &
+                                    (endcat != NA_VALUE)].tolist()
+                    if A[v] == 1])
     delta = 0
     for u in G.neighbourIterator(i):
         for v in G.neighbourIterator(u):
-            if (v != i and A[v] == 1 and
-                G.catattr[attrname][i] != NA_VALUE and
-                G.catattr[attrname][v] != NA_VALUE and
-                G.catattr[attrname][i] != G.catattr[attrname][v]):
+            if v != i and A[v] == 1 and cat[v] != NA_VALUE and cat[v] != ci:
                 delta += 1
     return delta
 
@@ -60,6 +60,7 @@ import math
 
 from utils import NA_VALUE
 from Digraph import Digraph
+from CSRGraph import CSRDigraph
 
 
 
@@ -381,10 +382,15 @@ def changeSenderMatch(attrname, G, A, i):
 
     {*}-->{o}
     """
+    if isinstance(G, CSRDigraph):
+        return G.catattrOutMatch(attrname).same_count[i]
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.outIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] == G.catattr[attrname][i]):
+        if cat[u] == ci:
             delta += 1
     return delta
 
@@ -397,10 +403,15 @@ def changeReceiverMatch(attrname, G, A, i):
 
     {*}<--{o}
     """
+    if isinstance(G, CSRDigraph):
+        return G.catattrInMatch(attrname).same_count[i]
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.inIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] == G.catattr[attrname][i]):
+        if cat[u] == ci:
             delta += 1
     return delta
 
@@ -413,12 +424,16 @@ def changeReciprocityMatch(attrname, G, A, i):
 
     {*}<->{o}
     """
+    if isinstance(G, CSRDigraph):
+        return len([u for u in G.catattrOutMatch(attrname).sameNeighbours(i)
+                    if G.isArc(u, i)])
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.outIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and
-            G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] == G.catattr[attrname][i] and
-            G.isArc(u, i)):
+        if cat[u] == ci and G.isArc(u, i):
             delta += 1
     return delta
 
@@ -431,10 +446,15 @@ def changeSenderMismatch(attrname, G, A, i):
     {*}--><o>
 
     """
+    if isinstance(G, CSRDigraph):
+        return G.catattrOutMatch(attrname).diff_count[i]
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.outIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] != G.catattr[attrname][i]):
+        if cat[u] != NA_VALUE and cat[u] != ci:
             delta += 1
     return delta
 
@@ -447,10 +467,15 @@ def changeReceiverMismatch(attrname, G, A, i):
     {*}<--<o>
 
     """
+    if isinstance(G, CSRDigraph):
+        return G.catattrInMatch(attrname).diff_count[i]
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.inIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] != G.catattr[attrname][i]):
+        if cat[u] != NA_VALUE and cat[u] != ci:
             delta += 1
     return delta
 
@@ -463,12 +488,16 @@ def changeReciprocityMismatch(attrname, G, A, i):
     {*}<-><o>
 
     """
+    if isinstance(G, CSRDigraph):
+        return len([u for u in G.catattrOutMatch(attrname).diffNeighbours(i)
+                    if G.isArc(u, i)])
+    cat = G.catattr[attrname]
+    ci = cat[i]
+    if ci == NA_VALUE:
+        return 0
     delta = 0
     for u in G.outIterator(i):
-        if (G.catattr[attrname][u] != NA_VALUE and
-            G.catattr[attrname][i] != NA_VALUE and
-            G.catattr[attrname][u] != G.catattr[attrname][i] and
-            G.isArc(u, i)):
+        if cat[u] != NA_VALUE and cat[u] != ci and G.isArc(u, i):
             delta += 1
     return delta
 
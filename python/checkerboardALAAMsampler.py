@@ -0,0 +1,793 @@
+#
+# File:    checkerboardALAAMsampler.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Checkerboard (graph colouring) Gibbs sampler for the ALAAM.
+
+   Under the ALAAM, the conditional distribution of the outcome of a
+   node given all the others only depends on the outcomes of the nodes
+   within a small distance of it (the "radius" of the change
+   statistics): e.g. 1 for Contagion (neighbours only), 2 for
+   IndirectPartnerAttribute or GWContagion (neighbours of neighbours),
+   and 0 for statistics such as Activity or oOb which do not depend on
+   the outcome vector at all. So nodes that are further apart than
+   this have conditionally independent outcomes, and can be updated
+   simultaneously.
+
+   This sampler computes a distance-k colouring of the fixed network
+   once (where k is the largest radius of the change statistics),
+   in which no two nodes of the same colour are within distance k of
+   each other, and then performs heat-bath (Gibbs) updates of the
+   outcomes one colour class at a time: the change statistics for all
+   nodes of the class are computed as numpy array operations over the
+   whole class, and each node's outcome is set to 1 with probability
+   1 / (1 + exp(-theta * changestats)). The colour class to update is
+   chosen at random with probability proportional to its size (random
+   scan), so every node is updated at the same rate, and the sampler
+   does not need to keep track of where it is in a sweep between calls.
+
+   The outcome-independent change statistics are looked up in the
+   ChangeStatisticsTable, and the others are computed by the vectorized
+   change statistic functions here, using the number of neighbours of
+   each node with outcome 1 (in- and out-neighbours for directed graphs)
+   which is kept up to date as outcomes change. If there is no vectorized
+   version for one of the change statistics, the sampler just uses
+   batchALAAMsamplerNodes() (see batchALAAMsampler.py) instead, which
+   samples from the same distribution (but one node at a time with
+   Metropolis-Hastings rather than Gibbs updates).
+
+   The returned "acceptance rate" is the fraction of the node updates
+   that changed the outcome of the node, and the change statistics for
+   changeTo1 and changeTo0 moves are accumulated just as in the
+   Metropolis-Hastings samplers, so this sampler can be used as the
+   sampler function in estimation and simulation.
+
+  The ALAAM is described in:
+
+  G. Daraganova and G. Robins. Autologistic actor attribute models. In
+  D. Lusher, J. Koskinen, and G. Robins, editors, Exponential Random
+  Graph Models for Social Networks, chapter 9, pages 102-114. Cambridge
+  University Press, New York, 2013.
+
+  G. Robins, P. Pattison, and P. Elliott. Network models for social
+  influence processes. Psychometrika, 66(2):161-189, 2001.
+
+"""
+
+import functools
+import numpy as np         # used for matrix & vector data types and functions
+
+import changeStatisticsALAAM
+import changeStatisticsALAAMdirected
+import changeStatisticsALAAMbipartite
+from utils import NA_VALUE,same_func_list
+from BipartiteGraph import MODE_A,MODE_B
+from CSRGraph import CSRDigraph,getCSRGraph,edges_to_csr
+from ChangeStatisticsTable import getChangeStatisticsTable
+import batchALAAMsampler
+from batchALAAMsampler import batchALAAMsamplerNodes
+from conditionalALAAMsampler import getInnerNodesNotNA
+from directStatistics import edge_sources,neighbour_offsets,expand_neighbours,is_entry,common_neighbour_counts
+
+
+def distance_colouring(indptr, indices, k):
+    """
+    Colour the nodes of an undirected graph so that no two nodes of the
+    same colour are within distance k of each other.
+
+    Each colour class is a maximal set of such nodes, found (with numpy
+    operations over all the edges) by repeatedly choosing the candidate
+    nodes that have the highest priority (degree, then node number)
+    among the candidates within distance k of them, and removing the
+    candidates within distance k of the chosen nodes.
+
+    Parameters:
+        indptr  - CSR row pointer array of symmetric graph adjacency
+        indices - CSR column indices array of symmetric graph adjacency
+        k       - distance (k >= 1)
+
+    Return value:
+        numpy array of the colour (0, 1, ...) of each node
+    """
+    n = len(indptr) - 1
+    src = edge_sources(indptr)
+    dst = np.asarray(indices, dtype=np.int64)
+    priority = np.diff(indptr).astype(np.int64) * n + np.arange(n)
+
+    def spread_max(x):
+        for d in range(k):
+            y = x.copy()
+            np.maximum.at(y, src, x[dst])
+            x = y
+        return x
+
+    def spread_any(mask):
+        for d in range(k):
+            y = mask.copy()
+            y[src[mask[dst]]] = True
+            mask = y
+        return mask
+
+    colour = np.full(n, -1, dtype=np.int64)
+    c = 0
+    while np.any(colour < 0):
+        candidates = colour < 0
+        while np.any(candidates):
+            pr = np.where(candidates, priority, -1)
+            chosen = candidates & (spread_max(pr) == pr)
+            colour[chosen] = c
+            candidates &= ~spread_any(chosen)
+        c += 1
+    return colour
+
+
+class CheckerboardState:
+    """One or more outcome vectors, as a 0/1 int64 numpy array a (0 for
+    NA), and for undirected graphs the number c of neighbours of each
+    node with outcome 1, or for directed graphs the numbers oc and ic
+    of out- and in-neighbours with outcome 1.
+
+    For C outcome vectors (e.g. the chains of the ensemble sampler) the
+    arrays have length C*N, and the entries for node i in outcome
+    vector k are at "position" k*N + i; for a single outcome vector the
+    position of a node is just the node.
+    """
+
+    def __init__(self, G, A):
+        """
+        Construct the state for outcome vector A (or C x N matrix of
+        C outcome vectors) on CSR graph G
+        """
+        self.directed = isinstance(G, CSRDigraph)
+        self.N = G.numNodes()
+        size = np.size(A)
+        self.a = np.zeros(size, dtype=np.int64)
+        if self.directed:
+            self.oc = np.zeros(size, dtype=np.int64)
+            self.ic = np.zeros(size, dtype=np.int64)
+        else:
+            self.c = np.zeros(size, dtype=np.int64)
+        self.sync(G, A)
+
+    def split(self, positions):
+        """
+        Return the tuple (nodes, base) of numpy arrays for the array
+        of positions, where positions = base + nodes
+        """
+        nodes = positions % self.N
+        return (nodes, positions - nodes)
+
+    def set(self, G, positions, value):
+        """
+        Set the outcome at all the positions in the numpy array positions
+        to value (0 or 1), updating the counts
+        """
+        self.assign(G, positions, np.full(len(positions), value))
+
+    def assign(self, G, positions, values):
+        """
+        Set the outcome at each of the (distinct) positions in the
+        numpy array positions to the corresponding value (0 or 1) in
+        the numpy array values, updating the counts
+        """
+        changed = self.a[positions] != values
+        positions = positions[changed]
+        if len(positions) == 0:
+            return
+        delta = np.where(values[changed] == 1, 1, -1)
+        self.a[positions] += delta
+        (nodes, base) = self.split(positions)
+        if self.directed:
+            # u -> i so i is an out-neighbour of u
+            (owner, u) = expand_neighbours(G.rev_indptr, G.rev_indices, nodes)
+            np.add.at(self.oc, base[owner] + u, delta[owner])
+            (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+            np.add.at(self.ic, base[owner] + u, delta[owner])
+        else:
+            (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+            np.add.at(self.c, base[owner] + u, delta[owner])
+
+    def sync(self, G, A):
+        """
+        Update the state to be correct for the outcome vector A (or
+        matrix of outcome vectors)
+        """
+        a = (np.asarray(A) == 1).astype(np.int64).ravel()
+        changed = np.flatnonzero(a != self.a)
+        self.set(G, changed[a[changed] == 0], 0)
+        self.set(G, changed[a[changed] == 1], 1)
+
+
+########################## vectorized change statistics ######################
+#
+# These have the same parameters as the corresponding change
+# statistic functions, but instead of (G, A, i) they take
+# (G, state, positions) where G is the CSR graph, state the
+# CheckerboardState, and positions a numpy array of positions of nodes
+# in the state, which must all have outcome 0 in state and be further
+# apart than the radius of the change statistic (or in different
+# outcome vectors). They return the numpy array of the change
+# statistics for the node at each of the positions.
+#
+##############################################################################
+
+def vecContagion(G, state, positions):
+    return state.c[positions].astype(np.float64)
+
+def vecIndirectPartnerAttribute(G, state, positions):
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    return np.bincount(owner, weights=state.c[base[owner] + u],
+                       minlength=len(nodes))
+
+def vecPartnerAttributeActivity(G, state, positions):
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    w = state.a[base[owner] + u] * (G.degrees[nodes][owner] + G.degrees[u] - 2)
+    return np.bincount(owner, weights=w, minlength=len(nodes))
+
+def vecPartnerPartnerAttribute(G, state, positions):
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    pu = base[owner] + u
+    w = state.a[pu] * (2 * state.c[pu] + state.c[positions][owner] - 1)
+    return np.bincount(owner, weights=w, minlength=len(nodes))
+
+def triangle_counts(G, state, positions, w_mask):
+    """
+    Sum over the neighbours u of each node i (at the array of positions)
+    with outcome 1 of the number of common neighbours w of i and u (with
+    w_mask True at the position of w if w_mask is not None)
+    """
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    active = state.a[base[owner] + u] == 1
+    counts = common_neighbour_counts(G.indptr, G.indices,
+                                     nodes[owner][active], u[active], w_mask,
+                                     base[owner][active])
+    return np.bincount(owner[active], weights=counts, minlength=len(nodes))
+
+def vecTriangleT2(G, state, positions):
+    return triangle_counts(G, state, positions, None)
+
+def vecTriangleT3(G, state, positions):
+    return triangle_counts(G, state, positions, state.a == 1) / 2.0
+
+def vecoO_OsameContagion(attrname, G, state, positions):
+    cat = G.catattr[attrname]
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    ci = cat[nodes][owner]
+    w = (state.a[base[owner] + u] == 1) & (ci != NA_VALUE) & (cat[u] == ci)
+    return np.bincount(owner, weights=w, minlength=len(nodes))
+
+def vecAlterBinaryTwoStar2(attrname, G, state, positions):
+    b = G.binattr[attrname]
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    w = ((b[u] != NA_VALUE) & (b[u] != 0)) * state.c[base[owner] + u]
+    return np.bincount(owner, weights=w, minlength=len(nodes))
+
+def contagion_function_changes(f, indptr, indices, state, own_counts,
+                               nbr_counts, positions):
+    """
+    Change statistic for the contagion statistic sum_i a[i] * f(c[i])
+    where c[i] is the number of neighbours with outcome 1:
+    f(c[i]) for node i itself, plus f(c[u] + 1) - f(c[u]) for each
+    neighbour u of i with outcome 1. For directed graphs, this is
+    one of the two (out and in) parts, where own_counts and nbr_counts
+    are the out and in (or in and out) counts.
+    """
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(indptr, indices, nodes)
+    pu = base[owner] + u
+    cu = nbr_counts[pu]
+    w = state.a[pu] * (f(cu + 1) - f(cu))
+    return (np.bincount(owner, weights=w, minlength=len(nodes)) +
+            f(own_counts[positions]))
+
+def vecGWContagion(alpha, G, state, positions):
+    return contagion_function_changes(lambda c: np.exp(-alpha * c),
+                                      G.indptr, G.indices, state,
+                                      state.c, state.c, positions)
+
+def vecLogContagion(G, state, positions):
+    return contagion_function_changes(lambda c: np.log(c + 1),
+                                      G.indptr, G.indices, state,
+                                      state.c, state.c, positions)
+
+def vecPowerContagion(beta, G, state, positions):
+    return contagion_function_changes(lambda c: np.power(c, 1/beta),
+                                      G.indptr, G.indices, state,
+                                      state.c, state.c, positions)
+
+# directed
+
+def vecDirectedContagion(G, state, positions):
+    return (state.oc[positions] + state.ic[positions]).astype(np.float64)
+
+def vecContagionReciprocity(G, state, positions):
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    w = ((state.a[base[owner] + u] == 1) &
+         is_entry(G.indptr, G.indices, u, nodes[owner]))
+    return np.bincount(owner, weights=w, minlength=len(nodes))
+
+def vecAlterInTwoStar2(G, state, positions):
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.rev_indptr, G.rev_indices, nodes)
+    return np.bincount(owner, weights=state.oc[base[owner] + u],
+                       minlength=len(nodes))
+
+def vecAlterOutTwoStar2(G, state, positions):
+    (nodes, base) = state.split(positions)
+    (owner, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    return np.bincount(owner, weights=state.ic[base[owner] + u],
+                       minlength=len(nodes))
+
+def directed_contagion_function_changes(f, G, state, positions):
+    """
+    Change statistic for the directed contagion statistic
+    sum_i a[i] * (f(oc[i]) + f(ic[i]))
+    """
+    return (contagion_function_changes(f, G.indptr, G.indices, state,
+                                       state.oc, state.ic, positions) +
+            contagion_function_changes(f, G.rev_indptr, G.rev_indices,
+                                       state, state.ic, state.oc, positions))
+
+def vecDirectedGWContagion(alpha, G, state, positions):
+    return directed_contagion_function_changes(lambda c: np.exp(-alpha * c),
+                                               G, state, positions)
+
+def vecDirectedLogContagion(G, state, positions):
+    return directed_contagion_function_changes(lambda c: np.log(c + 1),
+                                               G, state, positions)
+
+def vecDirectedPowerContagion(beta, G, state, positions):
+    return directed_contagion_function_changes(lambda c: np.power(c, 1/beta),
+                                               G, state, positions)
+
+# bipartite
+
+def in_mode(mode, G, nodes):
+    """
+    Return boolean numpy array, True for the nodes (in the array nodes)
+    of the bipartite graph G in the given mode (MODE_A or MODE_B)
+    """
+    assert mode in [MODE_A, MODE_B]
+    return (nodes < G.num_A_nodes) if mode == MODE_A else (nodes >= G.num_A_nodes)
+
+def vecBipartiteAlterTwoStar2(mode, G, state, positions):
+    return (in_mode(mode, G, state.split(positions)[0]) *
+            vecIndirectPartnerAttribute(G, state, positions))
+
+def vecBipartiteFourCycle2(mode, G, state, positions):
+    tp = G.twoPathsMatrix
+    (nodes, base) = state.split(positions)
+    (owner, offsets) = neighbour_offsets(tp.indptr, nodes)
+    j = np.asarray(tp.indices)[offsets]
+    p = np.asarray(tp.data)[offsets]
+    w = state.a[base[owner] + j] * p * (p - 1) / 2
+    return in_mode(mode, G, nodes) * np.bincount(owner, weights=w,
+                                                 minlength=len(nodes))
+
+def vecBpAlterBinaryTwoStar2(mode, attrname, G, state, positions):
+    return (in_mode(mode, G, state.split(positions)[0]) *
+            vecAlterBinaryTwoStar2(attrname, G, state, positions))
+
+
+# Change statistic functions that depend on the outcome vector for which
+# there are vectorized versions. For each function, the value is a
+# tuple (radius, vectorized function) where radius is the largest
+# distance from node i of the nodes whose outcome the change statistic
+# for node i depends on (in the graph with arcs taken as undirected
+# for directed graphs).
+VECTOR_CHANGESTATS = {
+    # undirected
+    changeStatisticsALAAM.changeContagion : (1, vecContagion),
+    changeStatisticsALAAM.changeIndirectPartnerAttribute :
+      (2, vecIndirectPartnerAttribute),
+    changeStatisticsALAAM.changePartnerAttributeActivity :
+      (1, vecPartnerAttributeActivity),
+    changeStatisticsALAAM.changePartnerPartnerAttribute :
+      (2, vecPartnerPartnerAttribute),
+    changeStatisticsALAAM.changeTriangleT2 : (1, vecTriangleT2),
+    changeStatisticsALAAM.changeTriangleT3 : (1, vecTriangleT3),
+    changeStatisticsALAAM.changeoO_OsameContagion : (1, vecoO_OsameContagion),
+    changeStatisticsALAAM.changeAlterBinaryTwoStar2 :
+      (2, vecAlterBinaryTwoStar2),
+    changeStatisticsALAAM.changeGWContagion : (2, vecGWContagion),
+    changeStatisticsALAAM.changeLogContagion : (2, vecLogContagion),
+    changeStatisticsALAAM.changePowerContagion : (2, vecPowerContagion),
+    # directed
+    changeStatisticsALAAMdirected.changeContagion : (1, vecDirectedContagion),
+    changeStatisticsALAAMdirected.changeContagionReciprocity :
+      (1, vecContagionReciprocity),
+    changeStatisticsALAAMdirected.changeAlterInTwoStar2 :
+      (2, vecAlterInTwoStar2),
+    changeStatisticsALAAMdirected.changeAlterOutTwoStar2 :
+      (2, vecAlterOutTwoStar2),
+    changeStatisticsALAAMdirected.changeGWContagion :
+      (2, vecDirectedGWContagion),
+    changeStatisticsALAAMdirected.changeLogContagion :
+      (2, vecDirectedLogContagion),
+    changeStatisticsALAAMdirected.changePowerContagion :
+      (2, vecDirectedPowerContagion),
+    # bipartite
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar2 :
+      (2, vecBipartiteAlterTwoStar2),
+    changeStatisticsALAAMbipartite.changeBipartiteFourCycle2 :
+      (2, vecBipartiteFourCycle2),
+    changeStatisticsALAAMbipartite.changeBpAlterBinaryTwoStar2 :
+      (2, vecBpAlterBinaryTwoStar2),
+}
+
+
+def get_vector_changestat(changestat_func):
+    """Return the tuple (radius, vectorized change statistic function)
+    for a change statistic function, or None if there is no vectorized
+    version.
+
+    Parameters:
+        changestat_func - change statistic function, possibly created
+                          with functools.partial(), e.g.
+                          partial(changeGWContagion, log(2))
+
+    Return value:
+        tuple (radius, func) where func has the signature
+        (G, state, positions), e.g. partial(vecGWContagion, log(2)),
+        or None if the change statistic has no vectorized version.
+    """
+    if isinstance(changestat_func, functools.partial):
+        entry = get_vector_changestat(changestat_func.func)
+        if entry is None:
+            return None
+        (radius, vec_func) = entry
+        return (radius, functools.partial(vec_func, *changestat_func.args,
+                                          **changestat_func.keywords))
+    return VECTOR_CHANGESTATS.get(changestat_func)
+
+
+class VectorModel:
+    """The ChangeStatisticsTable and vectorized change statistic
+    functions for a graph and list of change statistic functions, used
+    to compute the change statistics for many nodes (or chains) at once,
+    and the CheckerboardState for the outcome vector (or matrix).
+    """
+
+    def __init__(self, G, changestats_func_list):
+        """
+        Construct the model. Use get_vector_model() rather than
+        constructing this directly.
+
+        Parameters:
+           G                   - Graph (or Digraph or BipartiteGraph) object
+           changestats_func_list  - list of change statistics funcions,
+                                    with a vectorized version for each
+                                    one that depends on the outcome vector
+        """
+        self.changestats_func_list = tuple(changestats_func_list)
+        self.cstable = getChangeStatisticsTable(G, changestats_func_list)
+        self.G = getCSRGraph(G)
+        self.vector_funcs = []
+        self.radius = 0
+        for (l, func) in self.cstable.dynamic_funcs:
+            (radius, vec_func) = get_vector_changestat(func)
+            self.vector_funcs.append((l, vec_func))
+            self.radius = max(self.radius, radius)
+        self.state = None # CheckerboardState from getState()
+
+
+    def getState(self, A):
+        """
+        Return the CheckerboardState for outcome vector A (or C x N
+        outcome matrix of C chains). The same object is returned on
+        each call with the same size of A, updated to be correct for A.
+        """
+        if self.state is None or len(self.state.a) != np.size(A):
+            self.state = CheckerboardState(self.G, A)
+        else:
+            self.state.sync(self.G, A)
+        return self.state
+
+
+    def changeStats(self, state, nodes, positions = None):
+        """
+        Return the matrix of change statistics for a set of nodes.
+
+        Parameters:
+           state     - CheckerboardState, with outcome 0 at positions
+           nodes     - numpy array of nodes
+           positions - numpy array of the positions of the nodes
+                       in state (i.e. k*N + nodes[k] for the node of
+                       chain k in an outcome matrix), or None
+                       (default) if state is for an outcome vector,
+                       so the positions are the nodes
+
+        Return value:
+           len(nodes) x n numpy matrix where row k is the change
+           statistics for nodes[k].
+        """
+        if positions is None:
+            positions = nodes
+        changestats = self.cstable.table[nodes]
+        for (l, vec_func) in self.vector_funcs:
+            changestats[:, l] = vec_func(self.G, state, positions)
+        return changestats
+
+
+class CheckerboardModel(VectorModel):
+    """The VectorModel for a graph and list of change statistic
+    functions, with the colour classes of the network, where the
+    nodes of a colour class are far enough apart that their change
+    statistics can all be computed (and their outcomes updated) at once.
+    """
+
+    def __init__(self, G, changestats_func_list):
+        """
+        Construct the model, colouring the network. Use
+        get_checkerboard_model() rather than constructing this directly.
+
+        Parameters:
+           G                   - Graph (or Digraph or BipartiteGraph) object
+           changestats_func_list  - list of change statistics funcions,
+                                    with a vectorized version for each
+                                    one that depends on the outcome vector
+        """
+        super().__init__(G, changestats_func_list)
+        N = self.G.numNodes()
+        if self.radius == 0:
+            colour = np.zeros(N, dtype=np.int64)
+        elif isinstance(self.G, CSRDigraph):
+            # arcs in either direction are edges for the colouring
+            src = edge_sources(self.G.indptr)
+            dst = np.asarray(self.G.indices, dtype=np.int64)
+            (indptr, indices) = edges_to_csr(N, np.concatenate((src, dst)),
+                                             np.concatenate((dst, src)))
+            colour = distance_colouring(indptr, indices, self.radius)
+        else:
+            colour = distance_colouring(self.G.indptr, self.G.indices,
+                                        self.radius)
+        order = np.argsort(colour, kind='stable')
+        ends = np.cumsum(np.bincount(colour))
+        self.classes = np.split(order, ends[:-1])
+
+
+def get_vector_model(G, changestats_func_list, model_class = VectorModel,
+                     cache_name = 'vector_model'):
+    """
+    Return the model_class (VectorModel or subclass) object for the
+    graph G and the list of change statistic functions, using the one
+    cached on G as G.<cache_name> if it was made for the same change
+    statistic functions, otherwise making it (and replacing the one
+    cached on G), or None if there is no vectorized version of one of
+    the change statistics.
+
+    Parameters:
+       G                   - Graph (or Digraph or BipartiteGraph) object
+       changestats_func_list  - list of change statistics funcions
+       model_class         - VectorModel or subclass to make.
+                             Default VectorModel.
+       cache_name          - name of attribute of G to cache the
+                             model in. Default 'vector_model'.
+
+    Return value:
+       model_class object for G and changestats_func_list, or None
+    """
+    model = getattr(G, cache_name, None)
+    if model is None or not same_func_list(model.changestats_func_list,
+                                           changestats_func_list):
+        cstable = getChangeStatisticsTable(G, changestats_func_list)
+        if any(get_vector_changestat(func) is None
+               for (l, func) in cstable.dynamic_funcs):
+            return None
+        model = model_class(G, changestats_func_list)
+        setattr(G, cache_name, model)
+    return model
+
+
+def get_checkerboard_model(G, changestats_func_list):
+    """
+    Return the CheckerboardModel for the graph G and the list of
+    change statistic functions, cached on G, or None if there is no
+    vectorized version of one of the change statistics
+    (see get_vector_model()).
+
+    Parameters:
+       G                   - Graph (or Digraph or BipartiteGraph) object
+       changestats_func_list  - list of change statistics funcions
+
+    Return value:
+       CheckerboardModel object for G and changestats_func_list, or None
+    """
+    return get_vector_model(G, changestats_func_list, CheckerboardModel,
+                            'checkerboard_model')
+
+
+def checkerboardALAAMsamplerNodes(nodes, G, A, changestats_func_list, theta,
+                                  performMove, sampler_m, rng = None):
+    """
+    checkerboardALAAMsamplerNodes - sample from ALAAM distribution with
+                                    heat-bath updates of colour classes,
+                                    updating only the specified nodes
+
+    Parameters:
+       nodes               - numpy array of nodes that can be updated
+                             (outcome must not be NA for any of them)
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    if len(nodes) == 0:
+        raise Exception("no nodes with outcome not NA to sample")
+    if rng is None:
+        rng = batchALAAMsampler.default_rng
+    model = get_checkerboard_model(G, changestats_func_list)
+    if model is None:
+        return batchALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                      theta, performMove, sampler_m, rng)
+    # (theta may be a 1 x n matrix, as in stochasticApproximation.py)
+    theta = np.asarray(theta, dtype=np.float64).ravel()
+    n = len(changestats_func_list)
+    changeTo1ChangeStats = np.zeros(n)
+    changeTo0ChangeStats = np.zeros(n)
+    state = model.getState(A)
+    allowed = np.zeros(model.G.numNodes(), dtype=bool)
+    allowed[nodes] = True
+    classes = [c for c in [c[allowed[c]] for c in model.classes] if len(c) > 0]
+    sizes = np.array([len(c) for c in classes])
+    changed = 0
+    k = 0
+    while k < sampler_m:
+        cls = classes[rng.choice(len(classes), p = sizes / np.sum(sizes))]
+        if len(cls) > sampler_m - k:
+            cls = rng.choice(cls, size = sampler_m - k, replace = False)
+        old = state.a[cls].copy()
+        state.set(model.G, cls, 0)
+        changestats = model.changeStats(state, cls)
+        # probability of outcome 1 given all the others is the
+        # logistic function of theta * changestats, written with
+        # tanh so it never overflows
+        p1 = 0.5 * (1 + np.tanh(0.5 * (changestats @ theta)))
+        new = (rng.random(len(cls)) < p1).astype(np.int64)
+        changeTo1ChangeStats += np.sum(changestats[(old == 0) & (new == 1)],
+                                       axis=0)
+        changeTo0ChangeStats += np.sum(changestats[(old == 1) & (new == 0)],
+                                       axis=0)
+        changed += np.count_nonzero(old != new)
+        state.set(model.G, cls[(new if performMove else old) == 1], 1)
+        k += len(cls)
+    if performMove:
+        Aarray = np.asarray(A)
+        nodes_changed = nodes[(Aarray[nodes] == 1) != (state.a[nodes] == 1)]
+        for i in nodes_changed.tolist():
+            A[i] = int(state.a[i])
+
+    acceptance_rate = float(changed) / sampler_m
+    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
+
+
+def checkerboardALAAMsampler(G, A, changestats_func_list, theta, performMove,
+                             sampler_m, rng = None):
+    """
+    checkerboardALAAMsampler - sample from ALAAM distribution with
+                               heat-bath updates of colour classes
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    nodes = np.nonzero(np.asarray(A) != NA_VALUE)[0]
+    return checkerboardALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                         theta, performMove, sampler_m, rng)
+
+
+def checkerboardBipartiteALAAMsampler(mode, G, A, changestats_func_list,
+                                      theta, performMove, sampler_m,
+                                      rng = None):
+    """
+    checkerboardBipartiteALAAMsampler - sample from ALAAM distribution on
+                                        bipartite network with heat-bath
+                                        updates of colour classes
+
+    Only the outcome variables for nodes in the given mode are varied.
+    As for bipartiteALAAMsampler(), use e.g.
+    partial(checkerboardBipartiteALAAMsampler, MODE_A) as the sampler
+    function.
+
+    Parameters:
+       mode                - network mode (node type) MODE_A or MODE_B
+                             on which the outcome variables in A are defined.
+       G                   - BipartiteGraph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    assert mode in [MODE_A, MODE_B]
+    if mode == MODE_A:
+        (first, last) = (0, G.num_A_nodes)
+    else:
+        (first, last) = (G.num_A_nodes, G.numNodes())
+    nodes = first + np.nonzero(np.asarray(A)[first:last] != NA_VALUE)[0]
+    return checkerboardALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                         theta, performMove, sampler_m, rng)
+
+
+def checkerboardConditionalALAAMsampler(G, A, changestats_func_list, theta,
+                                        performMove, sampler_m, rng = None):
+    """
+    checkerboardConditionalALAAMsampler - sample from ALAAM distribution
+                                          with heat-bath updates of colour
+                                          classes, conditional on snowball
+                                          sampling structure (only
+                                          the inner wave nodes are updated)
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    return checkerboardALAAMsamplerNodes(getInnerNodesNotNA(G, A), G, A,
+                                         changestats_func_list, theta,
+                                         performMove, sampler_m, rng)
@@ -0,0 +1,98 @@
+#
+# File:    checkpoint.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Checkpointing of the state of the estimation algorithms, so that
+   a long run (e.g. EE or stochastic approximation on a large network,
+   run as a batch job that may be preempted or limited in time) can be
+   resumed from where it stopped.
+
+   A checkpoint is a dict of the algorithm state (parameter values,
+   outcome vector, etc.), which is saved (along with the state of the
+   random number generators used by the samplers, so a resumed run
+   continues with the same random numbers) in a binary (pickle) file.
+   The file is written to a temporary file which is then renamed, so
+   that if the process is killed while writing the checkpoint, the
+   previous checkpoint is still there.
+
+   Note that state cached on the graph by some samplers (e.g. the
+   replicas of parallelTemperingALAAMsampler.py or the scan order of
+   heatBathALAAMsampler.py with systematic scan) is not saved, so a
+   resumed run with those samplers is a valid continuation of the
+   algorithm but not exactly the same as an uninterrupted run.
+"""
+
+import os
+import pickle
+import random
+import numpy as np         # used for matrix & vector data types and functions
+
+import batchALAAMsampler
+
+
+def get_rng_state():
+    """
+    Return the state of the random number generators used by the samplers
+
+    Return value:
+       dict of the state of the Python random module, the numpy global
+       random number generator, and the default_rng in batchALAAMsampler.py
+    """
+    return {'random': random.getstate(),
+            'numpy': np.random.get_state(),
+            'default_rng': batchALAAMsampler.default_rng.bit_generator.state}
+
+
+def set_rng_state(rng_state):
+    """
+    Restore the state of the random number generators used by the samplers
+
+    Parameters:
+       rng_state - dict from get_rng_state()
+    """
+    random.setstate(rng_state['random'])
+    np.random.set_state(rng_state['numpy'])
+    batchALAAMsampler.default_rng.bit_generator.state = rng_state['default_rng']
+
+
+def save_checkpoint(filename, state):
+    """
+    Save the algorithm state and the state of the random number generators
+    to a checkpoint file (overwriting it).
+
+    Parameters:
+       filename - name of checkpoint file
+       state    - dict of algorithm state, must contain 'algorithm'
+                  (name of algorithm) and 'labels' (list of parameter
+                  labels) so it can be checked when resuming
+    """
+    state = dict(state, rng_state = get_rng_state())
+    tmpfilename = filename + os.extsep + 'tmp'
+    with open(tmpfilename, 'wb') as f:
+        pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmpfilename, filename)
+
+
+def load_checkpoint(filename, algorithm, labels):
+    """
+    Load the algorithm state from a checkpoint file, and restore the
+    state of the random number generators.
+
+    Parameters:
+       filename  - name of checkpoint file
+       algorithm - name of the algorithm the checkpoint must be for
+       labels    - list of parameter labels the checkpoint must be for
+
+    Return value:
+       dict of algorithm state as saved by save_checkpoint()
+    """
+    with open(filename, 'rb') as f:
+        state = pickle.load(f)
+    if state['algorithm'] != algorithm or list(state['labels']) != list(labels):
+        raise ValueError("checkpoint file " + filename + " is for " +
+                         state['algorithm'] + " with parameters " +
+                         str(state['labels']) + " not " + algorithm +
+                         " with parameters " + str(labels))
+    set_rng_state(state['rng_state'])
+    return state
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+#
+# File:    computeALAAMEEcovariance.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Python version of the R/computeALAMEEcovariance.R script.
+
+ Read theta parameter MCMC estimates and simulated statistics from
+ ALAAMEE output (or use the traces in memory, as returned by
+ estimateALAAMEE.run_ee_parallel()) and use them to estimate parameter
+ values and standard errors.
+
+ For each independent (parallel) run, the parameter value and MCMC
+ covariance are estimated using the multivariate batch means method,
+ as mcse.multi(method="bm", size="sqroot", r=1) in the R mcmcse package.
+ As well as error due to MCMC, we also have the covariance due to use
+ of MLE; this is estimated from the Fisher information matrix as per
+ Snijders (2002) [see also Hunter & Handcock (2006)]. These two
+ covariance matrices are added to get the total uncertainty in the
+ theta estimates, from which we get a standard error estimate for
+ that run.
+
+ To combine the point estimates and estimated standard errors from
+ each run, inverse-variance weighting (See Ch. 4 of Hartung et al., 2008)
+ is used.
+
+ The computations are done for all runs at once with numpy (runs of
+ the same length are stacked into a single array), and the output is
+ in the same format as that of computeALAMEEcovariance.R, so it
+ can be parsed by parseEstimationEEOutput.py.
+
+ Usage:
+     computeALAAMEEcovariance.py [-r max_runs] thetaPrefix dzAprefix
+
+     -r max_runs : maximum number of runs to use (default all)
+
+     thetaPrefix is prefix of filenames for theta values
+     dzAprefix is prefix of filenames for dzA values
+
+ e.g.
+     computeALAAMEEcovariance.py theta_values_karate dzA_values_karate
+
+
+ References:
+
+ Flegal, J. M., & Jones, G. L. (2010). Batch means and spectral
+ variance estimators in Markov chain Monte Carlo. The Annals of
+ Statistics, 38(2), 1034-1070.
+
+ Hartung, J., Knapp, G., & Sinha, B. K. (2008). Statistical
+ meta-analysis with applications. John Wiley & Sons. Hoboken, NJ.
+
+ Hunter & Handcock (2006) "Inference in Curved Exponential Family
+ Models for Networks" J. Comp. Graph. Stat. 15:3, 565-583
+
+ Jones, G. L., Haran, M., Caffo, B. S., & Neath,
+ R. (2006). Fixed-width output analysis for Markov chain Monte
+ Carlo. Journal of the American Statistical Association, 101(476),
+ 1537-1547.
+
+ Snijders (2002) "Markov chain Monte Carlo estimation of exponential
+ random graph models" J. Social Structure 3(2):1-40).
+
+ Vats, D., Flegal, J. M., & Jones, G. L. (2019). Multivariate output
+ analysis for Markov chain Monte Carlo. Biometrika, 106(2), 321-337.
+"""
+import getopt
+import glob
+import os
+import re
+import sys
+from collections import namedtuple
+from statistics import NormalDist
+import numpy as np         # used for matrix & vector data types and functions
+
+
+ALPHA = 0.05  # for 95% confidence interval
+
+T_RATIO_THRESHOLD = 0.3 # abs t-ratio must be <= this value for convergence
+
+# First iteration number to use, to skip over initial burn-in
+FIRSTITER = 1000 # skip first 1000 iterations, as computeALAMEEcovariance.R
+
+
+# Result of computeEEestimates(). The per-run arrays have a row for
+# each run used (in the order of the runs given, skipping removed runs)
+# and a column for each parameter.
+EEEstimates = namedtuple('EEEstimates',
+                         ['runs',            # list of run numbers used
+                          'removed_runs',    # list of run numbers removed
+                          'theta_estimates', # runs x params point estimates
+                          'theta_sd',        # runs x params sd of theta
+                          'se_estimates',    # runs x params std. errors
+                          't_ratios',        # runs x params t-ratios
+                          'pooled_estimate', # pooled point estimates
+                          'pooled_sd',       # sd of theta over all runs
+                          'pooled_se',       # pooled standard errors
+                          'pooled_t_ratio']) # t-ratios over all runs
+
+
+def inverse_variance_wm(estimates, stderrs):
+    """Inverse-variance weighting to combine estimates and standard
+    error estimates of the runs (See Ch. 4 of Hartung et al., 2008).
+
+    Parameters:
+        estimates - numpy array of point estimates, one row for each run
+                    (and optionally a column for each parameter)
+        stderrs   - numpy array of standard error estimates, same shape
+                    as estimates
+
+    Return value:
+        tuple (estimate, se) of the inverse-variance weighted mean and
+        corresponding estimated standard error (for each column)
+    """
+    weights = 1 / np.square(stderrs)
+    theta_hat = np.sum(estimates * weights, axis = 0) / np.sum(weights, axis = 0)
+    sigma2_hat = 1 / np.sum(weights, axis = 0)
+    return (theta_hat, np.sqrt(sigma2_hat))
+
+
+def batch_means_covariance(X):
+    """Multivariate batch means estimate of the asymptotic covariance
+    matrix of the mean of an MCMC chain, the same as the cov
+    component of mcse.multi(method="bm", size="sqroot", r=1) in the
+    R mcmcse package (Vats et al., 2019). Note this is an estimate of
+    Sigma and not Sigma/n (for n samples).
+
+    Parameters:
+        X - numpy array of samples of shape (n, p) for n samples
+            of p variables, or shape (k, n, p) for k chains of the
+            same length, to compute the covariance matrix for each chain
+
+    Return value:
+        numpy array of shape (p, p) (or (k, p, p)) of the
+        covariance matrix (for each chain)
+    """
+    n = X.shape[-2]
+    b = int(np.floor(np.sqrt(n)))  # batch size
+    a = n // b                      # number of batches
+    mu_hat = np.mean(X, axis = -2)
+    # batch means of the first a*b samples, shape (..., a, p)
+    y_mean = np.mean(X[..., :a*b, :].reshape(X.shape[:-2] +
+                                             (a, b, X.shape[-1])),
+                     axis = -2)
+    D = y_mean - mu_hat[..., np.newaxis, :]
+    return b * np.matmul(np.swapaxes(D, -1, -2), D) / (a - 1)
+
+
+def readEEoutputFiles(theta_prefix, dzA_prefix):
+    """Read the theta and dzA output files of EE estimation runs, i.e.
+    <theta_prefix>_<run>.txt and <dzA_prefix>_<run>.txt for each run.
+
+    Parameters:
+        theta_prefix - prefix of filenames for theta values
+        dzA_prefix   - prefix of filenames for dzA values
+
+    Return value:
+        tuple (labels, runs, theta_values_list, dzA_values_list) where
+        labels is the list of parameter names, runs the sorted list
+        of run numbers, and theta_values_list and dzA_values_list the
+        lists of numpy arrays (columns t, each parameter, and for theta
+        also AcceptanceRate) read from the files for each run
+    """
+    run_re = re.compile(re.escape(theta_prefix) + r'_([0-9]+)[.]txt$')
+    runs = sorted(int(run_re.match(f).group(1)) for f in
+                  glob.glob(theta_prefix + '_[0-9]*.txt') if run_re.match(f))
+    labels = None
+    theta_values_list = []
+    dzA_values_list = []
+    for run in runs:
+        theta_filename = theta_prefix + '_' + str(run) + os.extsep + 'txt'
+        dzA_filename = dzA_prefix + '_' + str(run) + os.extsep + 'txt'
+        if labels is None:
+            with open(theta_filename) as f:
+                labels = f.readline().split()[1:-1] # remove t, AcceptanceRate
+        theta_values_list.append(np.loadtxt(theta_filename, skiprows = 1,
+                                            ndmin = 2))
+        dzA_values_list.append(np.loadtxt(dzA_filename, skiprows = 1,
+                                          ndmin = 2))
+    return (labels, runs, theta_values_list, dzA_values_list)
+
+
+def computeEEestimates(theta_values_list, dzA_values_list, runs = None,
+                       max_runs = None, firstiter = FIRSTITER):
+    """Compute the parameter estimates and standard errors for each
+    EE estimation run, and pooled over all runs, as computeALAMEEcovariance.R
+
+    Runs are removed (with a message to stderr) if they do not have
+    enough iterations, have NaN or huge theta values, or have
+    a computationally singular covariance matrix of dzA (possibly
+    degenerate model).
+
+    Parameters:
+        theta_values_list - list of numpy arrays of theta values for
+                            each run (columns t, each parameter,
+                            AcceptanceRate), as written to the theta
+                            output file by estimateALAAMEE.run_ee()
+        dzA_values_list   - list of numpy arrays of dzA values for
+                            each run (columns t, each parameter)
+        runs              - list of run numbers corresponding to
+                            theta_values_list and dzA_values_list.
+                            Default None for 0, 1, ..., num_runs-1.
+        max_runs          - maximum number of (not removed) runs to use.
+                            Default None to use all runs.
+        firstiter         - only use iterations after this one
+                            (skip initial burn-in). Default FIRSTITER.
+
+    Return value:
+        EEEstimates named tuple
+    """
+    if runs is None:
+        runs = list(range(len(theta_values_list)))
+    assert len(runs) == len(theta_values_list) == len(dzA_values_list)
+    used_runs = []
+    removed_runs = []
+    thetas = []
+    dzAs = []
+    for (run, theta_values, dzA_values) in zip(runs, theta_values_list,
+                                               dzA_values_list):
+        params = theta_values[:, 1:-1]
+        if theta_values.shape[0] == 0 or np.max(theta_values[:,0]) < firstiter:
+            sys.stderr.write("Removed run " + str(run) +
+                             " due to not enough iterations\n")
+        elif np.any(np.isnan(params)):
+            sys.stderr.write("Removed run " + str(run) + " due to NaN\n")
+        elif np.any(np.abs(params) > 1e10):
+            sys.stderr.write("Removed run " + str(run) +
+                             " due to huge values\n")
+        else:
+            this_dzA = dzA_values[dzA_values[:, 0] > firstiter, 1:]
+            if (this_dzA.shape[0] < 2 or
+                1 / np.linalg.cond(np.atleast_2d(np.cov(this_dzA,
+                                                        rowvar = False)), 1) <
+                np.finfo(float).eps):
+                sys.stderr.write("Removed run " + str(run) + " due to computationally singular covariance matrix (possibly degenerate model)\n")
+            else:
+                used_runs.append(run)
+                thetas.append(params[theta_values[:, 0] > firstiter, :])
+                dzAs.append(this_dzA)
+                if max_runs is not None and len(used_runs) == max_runs:
+                    break
+                continue
+        removed_runs.append(run)
+
+    num_runs = len(used_runs)
+    num_params = theta_values_list[0].shape[1] - 2 if runs else 0
+    theta_estimates = np.zeros((num_runs, num_params))
+    theta_sd = np.zeros((num_runs, num_params))
+    se_estimates = np.zeros((num_runs, num_params))
+    t_ratios = np.zeros((num_runs, num_params))
+    # compute for all runs with the same number of samples at once
+    lengths = [theta.shape[0] for theta in thetas]
+    for Nmcmc in set(lengths):
+        indices = [k for k in range(num_runs) if lengths[k] == Nmcmc]
+        this_theta = np.stack([thetas[k] for k in indices])
+        this_dzA = np.stack([dzAs[k] for k in indices])
+        assert this_dzA.shape[1] == Nmcmc
+        # covariance matrix for MCMC error; batch means returns
+        # asymptotic covariance matrix so need to divide by Nmcmc
+        mcmc_cov = batch_means_covariance(this_theta) / Nmcmc
+        # covariance matrix for ALAAM MLE error
+        acov = batch_means_covariance(this_dzA) / Nmcmc
+        mle_cov = np.linalg.inv(acov)
+        total_cov = mcmc_cov + mle_cov
+        theta_estimates[indices] = np.mean(this_theta, axis = 1)
+        theta_sd[indices] = np.std(this_theta, axis = 1, ddof = 1)
+        se_estimates[indices] = np.sqrt(np.diagonal(total_cov,
+                                                    axis1 = 1, axis2 = 2))
+        # estimated t-ratio is mean(dzA)/sd(dzA) for each parameter
+        t_ratios[indices] = (np.mean(this_dzA, axis = 1) /
+                             np.std(this_dzA, axis = 1, ddof = 1))
+
+    # meta-analysis (pooling runs by inverse-variance weighted mean)
+    if num_runs > 0:
+        (pooled_estimate, pooled_se) = inverse_variance_wm(theta_estimates,
+                                                           se_estimates)
+        all_theta = np.concatenate(thetas)
+        all_dzA = np.concatenate(dzAs)
+        pooled_sd = np.std(all_theta, axis = 0, ddof = 1)
+        pooled_t_ratio = (np.mean(all_dzA, axis = 0) /
+                          np.std(all_dzA, axis = 0, ddof = 1))
+    else:
+        pooled_estimate = pooled_sd = pooled_se = pooled_t_ratio = np.full(
+            num_params, np.nan)
+    return EEEstimates(used_runs, removed_runs, theta_estimates, theta_sd,
+                       se_estimates, t_ratios, pooled_estimate, pooled_sd,
+                       pooled_se, pooled_t_ratio)
+
+
+def is_significant(estimate, stderr, t_ratio):
+    """Return True if the estimate is significant (with the t-ratio
+    showing convergence), as marked with '*' in the output.
+    """
+    zSigma = NormalDist().inv_cdf(1 - ALPHA/2) # approx. 1.96 for alpha=0.05
+    return (not np.isnan(t_ratio) and abs(t_ratio) <= T_RATIO_THRESHOLD and
+            abs(estimate) > zSigma * stderr)
+
+
+def writeEEestimates(labels, estimates, total_runs, outfile = sys.stdout):
+    """Write the estimates computed by computeEEestimates() in the same
+    format as the output of computeALAMEEcovariance.R.
+
+    Parameters:
+        labels     - list of parameter names
+        estimates  - EEEstimates named tuple from computeEEestimates()
+        total_runs - total number of runs (including removed runs)
+        outfile    - open for write file to write to. Default stdout.
+    """
+    def fmt(x):
+        return 'NA' if np.isnan(x) else '%.7g' % x
+
+    for (k, run) in enumerate(estimates.runs):
+        # runs are numbered 0..N-1 after removing runs, as in the R script
+        outfile.write('\nRun  ' + str(k) + ' \n')
+        for (l, paramname) in enumerate(labels):
+            signif = ('*' if is_significant(estimates.theta_estimates[k, l],
+                                             estimates.se_estimates[k, l],
+                                             estimates.t_ratios[k, l])
+                      else '')
+            outfile.write(' '.join([paramname,
+                                    fmt(estimates.theta_estimates[k, l]),
+                                    fmt(estimates.theta_sd[k, l]),
+                                    fmt(estimates.se_estimates[k, l]),
+                                    fmt(estimates.t_ratios[k, l]),
+                                    signif]) + ' \n')
+    outfile.write('\nPooled\n')
+    for (l, paramname) in enumerate(labels):
+        if len(estimates.runs) > 0:
+            signif = ('*' if is_significant(estimates.pooled_estimate[l],
+                                             estimates.pooled_se[l],
+                                             estimates.pooled_t_ratio[l])
+                      else '')
+        else:
+            signif = ''
+        outfile.write(' '.join([paramname,
+                                fmt(estimates.pooled_estimate[l]),
+                                fmt(estimates.pooled_sd[l]),
+                                fmt(estimates.pooled_se[l]),
+                                fmt(estimates.pooled_t_ratio[l]),
+                                signif]) + ' \n')
+    outfile.write('TotalRuns ' + str(total_runs) + ' \n')
+    outfile.write('ConvergedRuns ' + str(len(estimates.runs)) + ' \n')
+
+
+def usage(progname):
+    """
+    print usage msg and exit
+    """
+    sys.stderr.write("usage: " + progname +
+                     " [-r max_runs] thetaPrefix dzAprefix\n")
+    sys.exit(1)
+
+
+def main():
+    """
+    See usage message in module header block
+    """
+    max_runs = None
+    try:
+        opts,args = getopt.getopt(sys.argv[1:], "r:")
+    except:
+        usage(sys.argv[0])
+    for opt,arg in opts:
+        if opt == "-r":
+            max_runs = int(arg)
+            sys.stderr.write("Using maximum of " + str(max_runs) + " runs\n")
+        else:
+            usage(sys.argv[0])
+
+    if len(args) != 2:
+        usage(sys.argv[0])
+
+    theta_prefix = args[0]
+    dzA_prefix = args[1]
+
+    (labels, runs, theta_values_list,
+     dzA_values_list) = readEEoutputFiles(theta_prefix, dzA_prefix)
+    estimates = computeEEestimates(theta_values_list, dzA_values_list, runs,
+                                   max_runs)
+    total_runs = len(runs)
+    if max_runs is not None:
+        total_runs = min(max_runs, total_runs)
+    sys.stderr.write("Using " + str(len(estimates.runs)) + " of " +
+                     str(total_runs) + " runs\n")
+    writeEEestimates(labels if labels is not None else [], estimates,
+                     total_runs)
+
+
+if __name__ == "__main__":
+    main()
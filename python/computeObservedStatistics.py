@@ -5,7 +5,8 @@
 #
 """
 Compute the observed values of ALAAM statistics by summing the change
-statistics for each 1 variable in the outcome variable vector.
+statistics for each 1 variable in the outcome variable vector (or
+equivalently, computing the statistics directly where possible).
 """
 import sys
 import numpy as np         # used for matrix & vector data types and functions
@@ -13,14 +14,25 @@ import numpy as np         # used for matrix & vector data types and functions
 from Graph import Graph,NA_VALUE
 from Digraph import Digraph
 from BipartiteGraph import BipartiteGraph
+from CSRGraph import load_graph_cached,getCSRGraph
 from utils import int_or_na
 from changeStatisticsALAAM import *
+from ChangeStatisticsTable import getChangeStatisticsTable
+from directStatistics import get_direct_statistic
 
 
 def computeObservedStatistics(G, Aobs, changestats_func_list):
     """
     Compute the observed values of ALAAM statistics by summing the change
     statistics for each 1 variable in the outcome variable vector.
+
+    The statistics that do not depend on the outcome vector are summed
+    from the ChangeStatisticsTable rows of the nodes with outcome 1,
+    and those for which there is a function computing the statistic
+    directly (see directStatistics.py) are computed with it, using the
+    CSR version of G (cached on G by getCSRGraph()). Only the remaining
+    statistics are computed by changing the outcome of each node with
+    outcome 1 in turn and summing the change statistics.
     
     Parameters:
        G                   - Graph object for graph to compute stats in
@@ -32,22 +44,38 @@ def computeObservedStatistics(G, Aobs, changestats_func_list):
         cangestats_func_list
 
     """
-    # Calculate observed statistics by summing change stats for each 1 variable
     n = len(changestats_func_list)
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
     Zobs = np.zeros(n)
-    Acopy = np.zeros(len(Aobs))
-    for i in range(len(Aobs)):
-        if Aobs[i] == NA_VALUE:
-            Acopy[i] = NA_VALUE
-        if Aobs[i] == 1:
-            for l in range(n):
-                Zobs[l] += changestats_func_list[l](G, Acopy, i)
-            Acopy[i] = 1
-    assert(np.all(Acopy == Aobs))
+    if cstable.fixed_indices:
+        Zobs[cstable.fixed_indices] = np.sum(
+            cstable.table[np.asarray(Aobs) == 1][:, cstable.fixed_indices],
+            axis=0)
+    direct_funcs = [(l, get_direct_statistic(func))
+                    for (l, func) in cstable.dynamic_funcs
+                    if get_direct_statistic(func) is not None]
+    if direct_funcs:
+        Gcsr = getCSRGraph(G)
+        for (l, stat_func) in direct_funcs:
+            Zobs[l] = stat_func(Gcsr, Aobs)
+    direct_indices = [l for (l, stat_func) in direct_funcs]
+    toggle_funcs = [(l, func) for (l, func) in cstable.dynamic_funcs
+                    if l not in direct_indices]
+    if toggle_funcs:
+        # Calculate observed statistics by summing change stats for
+        # each 1 variable
+        Acopy = np.zeros(len(Aobs))
+        for i in range(len(Aobs)):
+            if Aobs[i] == NA_VALUE:
+                Acopy[i] = NA_VALUE
+            if Aobs[i] == 1:
+                for (l, func) in toggle_funcs:
+                    Zobs[l] += func(G, Acopy, i)
+                Acopy[i] = 1
+        assert(np.all(Acopy == Aobs))
     return Zobs
 
 
-
 def get_observed_stats_from_network_attr(edgelist_filename, param_func_list,
                                          labels,
                                          outcome_bin_filename,
@@ -56,7 +84,8 @@ def get_observed_stats_from_network_attr(edgelist_filename, param_func_list,
                                          catattr_filename=None,
                                          directed=False,
                                          bipartite=False,
-                                         degreestats=False):
+                                         degreestats=False,
+                                         binary_cache=False):
     """Compute observed stats for outcome on specified network with binary
     and/or continuous and categorical attributes.
 
@@ -81,6 +110,11 @@ def get_observed_stats_from_network_attr(edgelist_filename, param_func_list,
          degreestats     - Default False.
                            If True then also compute mean and variance
                            of nodes with outcome variable = 1 (and also 0).
+         binary_cache    - Default False.
+                           If True then load the network (and attributes)
+                           from the binary cache next to the network file,
+                           creating it if it does not exist or is out of
+                           date (see CSRGraph.load_graph_cached()).
 
     Write output to stdout in format readable by R script
     plotSimulationDiagnostics.R
@@ -89,7 +123,11 @@ def get_observed_stats_from_network_attr(edgelist_filename, param_func_list,
     assert(len(param_func_list) == len(labels))
 
 
-    if directed:
+    if binary_cache:
+        G = load_graph_cached(edgelist_filename, binattr_filename,
+                              contattr_filename, catattr_filename,
+                              directed = directed, bipartite = bipartite)
+    elif directed:
         if bipartite:
             raise Exception("directed bipartite network not suppored")
         G = Digraph(edgelist_filename, binattr_filename, contattr_filename,
@@ -26,19 +26,41 @@
   G. L. (2020). Using Sampled Network Data With The Autologistic Actor
   Attribute Model. arXiv preprint arXiv:2002.00849.
 
+ This uses the batch version of the basic sampler (batchALAAMsampler.py),
+ drawing from an array of the inner wave nodes whose outcome is not NA,
+ so it is as fast as the (batch) basic sampler.
+
 """
 
-import random
-import math
 import numpy as np         # used for matrix & vector data types and functions
 
 from Graph import Graph,NA_VALUE
-from changeStatisticsALAAM import *
+from batchALAAMsampler import batchALAAMsamplerNodes
+
+
+def getInnerNodesNotNA(G, A):
+    """
+    Return numpy array of the nodes in the inner waves (i.e. in any
+    but the outermost wave) of the snowball sample that do not have
+    NA outcome value. The array of inner wave nodes (G.inner_nodes) is
+    cached on G as G.inner_nodes_array.
 
+    Parameters:
+       G   - Graph object for network with snowball sampling zones
+       A   - vector of 0/1 (or NA) outcome variables for ALAAM
+
+    Return value:
+       numpy array of inner wave nodes with outcome value not NA
+    """
+    inner_nodes_array = getattr(G, 'inner_nodes_array', None)
+    if inner_nodes_array is None:
+        inner_nodes_array = np.array(G.inner_nodes, dtype=int)
+        G.inner_nodes_array = inner_nodes_array
+    return inner_nodes_array[np.asarray(A)[inner_nodes_array] != NA_VALUE]
 
 
 def conditionalALAAMsampler(G, A, changestats_func_list, theta, performMove,
-                      sampler_m):
+                      sampler_m, rng = None):
     """
     conditionalALAAMsampler - sample from ALAAM distribution with basic sampler,
                    conditional on snowball sampling structure.
@@ -57,6 +79,8 @@ def conditionalALAAMsampler(G, A, changestats_func_list, theta, performMove,
                              updating the outcome vector A
                              (otherwise are not modified)
        sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
 
     Returns:
         acceptance_rate     - sampler acceptance rate
@@ -66,49 +90,10 @@ def conditionalALAAMsampler(G, A, changestats_func_list, theta, performMove,
     Note A is updated in place if performMove is True
     otherwise unchanged
     """
-    n = len(changestats_func_list)
-#    assert(len(theta) == n)
-    accepted = 0
-    changeTo1ChangeStats = np.zeros(n)
-    changeTo0ChangeStats = np.zeros(n)
-    for k in range(sampler_m):
-        # basic sampler, conditional on snowball sampling zone: select
-        # a node in the inner waves (i.e. in any but the outermost
-        # wave) uniformly at random and toggle outcome variable for it
-        i = random.sample(G.inner_nodes, 1)[0]
-        while A[i] == NA_VALUE:  # keep going until we get one that is not NA
-            i = random.sample(G.inner_nodes, 1)[0]
-        isChangeToZero = (A[i] == 1)
-        if isChangeToZero:
-            A[i] = 0
-
-        # compute change statistics for each of the n statistics using the
-        # list of change statistic functions
-        changestats = np.zeros(n)
-        for l in range(n):
-            changestats[l] = changestats_func_list[l](G, A, i)
-        changeSignMul = -1 if isChangeToZero else +1
-        total = np.sum(theta * changeSignMul * changestats)
-        if random.uniform(0, 1) < np.exp(total): #np.exp gives inf not overflow
-            accepted += 1
-            if performMove:
-                # actually accept the move.
-                # if changing to 0, we have already done it.
-                # For changeTo1 move, set outcome to 1 now
-                if not isChangeToZero:
-                    A[i] = 1
-            else:
-                # if we are not to actually perform the moves, then reverse
-                # changes for changeTo0 move made so A same as before
-                if isChangeToZero:
-                    A[i] = 1
-            if isChangeToZero:
-                changeTo0ChangeStats += changestats
-            else:
-                changeTo1ChangeStats += changestats
-        elif isChangeToZero: # move not accepted, so reverse change 
-            A[i] = 1
-
-    acceptance_rate = float(accepted) / sampler_m
-    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
-
+    # basic sampler, conditional on snowball sampling zone: select
+    # a node in the inner waves (i.e. in any but the outermost
+    # wave), and not NA, uniformly at random and toggle outcome variable
+    # for it
+    return batchALAAMsamplerNodes(getInnerNodesNotNA(G, A), G, A,
+                                  changestats_func_list, theta, performMove,
+                                  sampler_m, rng)
@@ -0,0 +1,949 @@
+#
+# File:    directStatistics.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+r"""Functions to compute the value of ALAAM statistics directly for
+the whole network, rather than by summing the change statistics for
+each node with outcome variable 1 (one node at a time, in node order)
+as computeObservedStatistics() otherwise does. Each function takes a
+CSR graph (CSRGraph, CSRDigraph or CSRBipartiteGraph, see CSRGraph.py)
+G and outcome vector A (which may contain NA_VALUE, treated as not 1)
+and returns the value of the statistic, computed with numpy operations
+on the CSR arrays and the outcome vector.
+
+The statistics here are those for the change statistic functions in
+changeStatisticsALAAM.py, changeStatisticsALAAMdirected.py and
+changeStatisticsALAAMbipartite.py that depend on the outcome vector
+(the outcome-independent ones, such as Activity, TwoStar, TriangleT1,
+oOb and GWActivity, are just the sum of the column of the
+ChangeStatisticsTable over the nodes with outcome 1). As for the
+change statistics, functools.partial() is used to supply the
+bipartite mode, attribute name, or other parameters, which come
+before G, e.g. partial(statGWContagion, log(2)). Use
+get_direct_statistic() to get the function corresponding to a change
+statistic function.
+
+The value of each statistic is the same as the sum of the change
+statistics (it is the telescoping sum of the changes in the statistic
+as each node's outcome is changed from 0 to 1 in node order), exactly
+for integer-valued statistics, and up to floating point rounding for
+the others. Some of the statistics are derived as follows, where
+c[i] is the number of neighbours of node i with outcome 1 (oc[i] and
+ic[i] the out- and in-neighbours for directed graphs) and a[i] is 1 if
+node i has outcome 1 else 0:
+
+  Contagion                   sum_i a[i] * c[i] / 2
+  IndirectPartnerAttribute    sum_u c[u] * (c[u] - 1) / 2
+  PartnerAttributeActivity    sum_i a[i] * c[i] * (deg(i) - 1)
+  PartnerPartnerAttribute     sum_i a[i] * c[i] * (c[i] - 1)
+  GWContagion                 sum_i a[i] * exp(-alpha * c[i])
+  TriangleT2                  sum over edges i -- j with a[i] = a[j] = 1
+                              of the number of triangles containing i -- j
+  TriangleT3                  number of triangles with all outcomes 1
+
+and the bipartite statistics for mode M are the corresponding
+undirected statistics with a[i] = 0 for nodes i not in mode M.
+
+There are also functions computing, for some of these statistics, the
+change statistic for every node at once (the delta functions, see
+get_direct_change_statistic()), as used for the design matrix of the
+pseudo-likelihood.
+"""
+
+import functools
+import numpy as np         # used for matrix & vector data types and functions
+
+import changeStatisticsALAAM
+import changeStatisticsALAAMdirected
+import changeStatisticsALAAMbipartite
+from utils import NA_VALUE
+from BipartiteGraph import MODE_A,MODE_B
+from CSRGraph import getCSRGraph
+
+
+def outcome_indicator(A):
+    """
+    Return int64 numpy array with 1 for the nodes with outcome 1 in A
+    and 0 for the others (outcome 0 or NA)
+    """
+    return (np.asarray(A) == 1).astype(np.int64)
+
+
+def mode_indicator(mode, G, A):
+    """
+    Return outcome_indicator(A) with 0 also for the nodes of the
+    bipartite graph G not in the given mode (MODE_A or MODE_B)
+    """
+    assert mode in [MODE_A, MODE_B]
+    a = outcome_indicator(A)
+    if mode == MODE_A:
+        a[G.num_A_nodes:] = 0
+    else:
+        a[:G.num_A_nodes] = 0
+    return a
+
+
+def edge_sources(indptr):
+    """
+    Return int64 numpy array of the row (source node) of each entry of
+    the CSR indices array with row pointer array indptr
+    """
+    n = len(indptr) - 1
+    return np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+
+
+def neighbour_sums(indptr, indices, x):
+    """
+    Return numpy array with the sum of x over the neighbours of each
+    node, i.e. sum(x[indices[indptr[i]:indptr[i+1]]]) for each node i
+    """
+    cs = np.concatenate(([0], np.cumsum(x[indices])))
+    return cs[indptr[1:]] - cs[indptr[:-1]]
+
+
+def neighbour_offsets(indptr, nodes):
+    """
+    Return the offsets in the CSR indices array of the neighbour lists
+    of the nodes in an array.
+
+    Parameters:
+        indptr  - CSR row pointer array
+        nodes   - numpy array of nodes
+
+    Return value:
+        tuple (owner, offsets) of numpy arrays, where offsets is the
+        concatenation of the offsets (in the indices array) of the
+        neighbours of each node in nodes, and owner is the index in
+        nodes of the node each is a neighbour of.
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    starts = indptr[nodes].astype(np.int64)
+    d = indptr[nodes + 1].astype(np.int64) - starts
+    owner = np.repeat(np.arange(len(nodes)), d)
+    offsets = (np.arange(len(owner)) - np.repeat(np.cumsum(d) - d, d) +
+               np.repeat(starts, d))
+    return (owner, offsets)
+
+
+def expand_neighbours(indptr, indices, nodes):
+    """
+    Concatenate the neighbour lists of the nodes in an array.
+
+    Parameters:
+        indptr  - CSR row pointer array
+        indices - CSR column indices array
+        nodes   - numpy array of nodes
+
+    Return value:
+        tuple (owner, nbrs) of numpy arrays, where nbrs is the
+        concatenation of the neighbours of each node in nodes, and
+        owner is the index in nodes of the node each is a neighbour of.
+    """
+    (owner, offsets) = neighbour_offsets(indptr, nodes)
+    return (owner, indices[offsets].astype(np.int64))
+
+
+def is_entry(indptr, indices, i, j):
+    """
+    Return boolean numpy array which is True where there is an entry
+    (edge or arc) i[k] -> j[k] in the CSR arrays (with sorted rows),
+    for the node arrays i and j.
+    """
+    i = np.asarray(i, dtype=np.int64)
+    j = np.asarray(j, dtype=np.int64)
+    if len(indices) == 0:
+        return np.zeros(len(i), dtype=bool)
+    # binary search for j[k] in each row i[k] at once
+    lo = indptr[i].astype(np.int64)
+    end = indptr[i + 1].astype(np.int64)
+    hi = end
+    searching = lo < hi
+    while np.any(searching):
+        mid = (lo + hi) // 2
+        less = indices[np.minimum(mid, len(indices) - 1)] < j
+        lo = np.where(searching & less, mid + 1, lo)
+        hi = np.where(searching & ~less, mid, hi)
+        searching = lo < hi
+    return (lo < end) & (indices[np.minimum(lo, len(indices) - 1)] == j)
+
+
+def common_neighbour_counts(indptr, indices, i, j, w_mask = None,
+                            w_base = 0):
+    """
+    Count the common neighbours w of each pair of nodes i[k], j[k]
+    (i.e. the number of triangles i[k] -- j[k] -- w -- i[k]), only
+    counting those w with w_mask[w_base + w] True if w_mask is not None,
+    where w_base is an offset into w_mask, either a scalar or an array
+    with one offset for each pair.
+    """
+    # expand the neighbours of the end with lower degree
+    swap = (indptr[i + 1] - indptr[i]) > (indptr[j + 1] - indptr[j])
+    (x, y) = (np.where(swap, j, i), np.where(swap, i, j))
+    (owner, w) = expand_neighbours(indptr, indices, x)
+    found = (w != y[owner]) & is_entry(indptr, indices, y[owner], w)
+    if w_mask is not None:
+        found &= w_mask[(w_base[owner] if np.ndim(w_base) else w_base) + w]
+    return np.bincount(owner[found], minlength=len(i))
+
+
+def category_pair_counts(src, dst, cat, mask):
+    """
+    For each distinct pair (src[k], cat[dst[k]]) with mask[k] True,
+    count the number of such k. Returns the numpy array of counts.
+    """
+    (values, catidx) = np.unique(cat, return_inverse=True)
+    keys = src[mask] * len(values) + catidx[dst[mask]]
+    return np.unique(keys, return_counts=True)[1]
+
+
+def pairs(c):
+    """
+    Return the number of (unordered) pairs in each of the counts in c
+    i.e. c * (c - 1) / 2, summed
+    """
+    return int(np.sum(c * (c - 1))) // 2
+
+
+# ============================ undirected ====================================
+
+def statContagion(G, A):
+    r"""
+    Contagion (partner attribute)
+
+    *--*
+    """
+    a = outcome_indicator(A)
+    return int(np.dot(a, neighbour_sums(G.indptr, G.indices, a))) // 2
+
+
+def statIndirectPartnerAttribute(G, A):
+    r"""
+    Indirect partner attribute (Alter-2Star2)
+
+    *--o--*
+    """
+    return pairs(neighbour_sums(G.indptr, G.indices, outcome_indicator(A)))
+
+
+def statPartnerAttributeActivity(G, A):
+    r"""
+    Partner attribute activity
+
+    *--*--o
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return int(np.sum(a * c * (np.diff(G.indptr) - 1)))
+
+
+def statPartnerPartnerAttribute(G, A):
+    r"""
+    Partner-partner-attribute (partner-resource), counted twice as
+    for the change statistic
+
+    *--*--*
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return int(np.sum(a * c * (c - 1)))
+
+
+def active_edges(G, a):
+    """
+    Return tuple (i, j) of numpy arrays of the edges i -- j with i < j in
+    the undirected graph G where a[i] = a[j] = 1
+    """
+    src = edge_sources(G.indptr)
+    dst = np.asarray(G.indices, dtype=np.int64)
+    mask = (src < dst) & (a[src] == 1) & (a[dst] == 1)
+    return (src[mask], dst[mask])
+
+
+def statTriangleT2(G, A):
+    r"""
+    Partner attribute triangle (T2)
+
+      *
+     / \
+    *---o
+    """
+    (i, j) = active_edges(G, outcome_indicator(A))
+    return int(np.sum(common_neighbour_counts(G.indptr, G.indices, i, j)))
+
+
+def statTriangleT3(G, A):
+    r"""
+    Partner-partner attribute triangle (T3)
+
+      *
+     / \
+    *---*
+    """
+    a = outcome_indicator(A)
+    (i, j) = active_edges(G, a)
+    return int(np.sum(common_neighbour_counts(G.indptr, G.indices, i, j,
+                                              a == 1))) // 3
+
+
+def statoO_OsameContagion(attrname, G, A):
+    r"""
+    Categorical matching exogenous attributes oO_Osame contagion
+
+    {*}--{*}
+    """
+    a = outcome_indicator(A)
+    cat = G.catattr[attrname]
+    src = edge_sources(G.indptr)
+    dst = G.indices
+    return int(np.count_nonzero((a[src] == 1) & (a[dst] == 1) &
+                                (cat[src] != NA_VALUE) &
+                                (cat[src] == cat[dst]))) // 2
+
+
+def statSameIndirectPartnerAttribute(attrname, G, A):
+    r"""
+    SameIndirectPartnerAttribute
+
+    {*}--o--{*}
+    """
+    a = outcome_indicator(A)
+    cat = G.catattr[attrname]
+    src = edge_sources(G.indptr)
+    dst = np.asarray(G.indices, dtype=np.int64)
+    mask = (a[dst] == 1) & (cat[dst] != NA_VALUE)
+    return pairs(category_pair_counts(src, dst, cat, mask))
+
+
+def statDiffIndirectPartnerAttribute(attrname, G, A):
+    r"""
+    DiffIndirectPartnerAttribute
+
+    {*}--o--<*>
+    """
+    a = outcome_indicator(A)
+    cat = G.catattr[attrname]
+    src = edge_sources(G.indptr)
+    dst = np.asarray(G.indices, dtype=np.int64)
+    mask = (a[dst] == 1) & (cat[dst] != NA_VALUE)
+    # all pairs of two-path ends with attribute, less those with same value
+    return (pairs(np.bincount(src[mask], minlength=G.numNodes())) -
+            pairs(category_pair_counts(src, dst, cat, mask)))
+
+
+def statAlterBinaryTwoStar2(attrname, G, A):
+    r"""
+    AlterBinaryTwoStar2
+
+    *--[o]--*
+    """
+    b = G.binattr[attrname]
+    c = neighbour_sums(G.indptr, G.indices, outcome_indicator(A))
+    return pairs(c[(b != NA_VALUE) & (b != 0)])
+
+
+def statGWContagion(alpha, G, A):
+    r"""
+    Geometrically Weighted Contagion
+
+       *
+      /
+     *--*
+      \ :
+       *
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return float(np.sum(np.exp(-alpha * c[a == 1])))
+
+
+def statLogContagion(G, A):
+    r"""
+    Logarithmic Contagion
+
+       *
+      /
+     *--*
+      \ :
+       *
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return float(np.sum(np.log(c[a == 1] + 1)))
+
+
+def statPowerContagion(beta, G, A):
+    r"""
+    Power Contagion
+
+       *
+      /
+     *--*
+      \ :
+       *
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return float(np.sum(np.power(c[a == 1], 1/beta)))
+
+
+def statSettingHomophily(settingGraph, G, A):
+    r"""
+    Setting-Homophily: number of edges in the setting network
+    (settingGraph, converted to CSR if it is not already)
+    between actors with outcome attribute
+
+    *...*
+    """
+    return statContagion(getCSRGraph(settingGraph), A)
+
+
+def statGeographicHomophily(distmatrix, G, A):
+    r"""
+    GeographicHomophily: sum of distances distmatrix[i, j] for all
+    pairs of nodes j < i with outcome attribute
+
+    *...*
+    """
+    nodes = np.flatnonzero(outcome_indicator(A))
+    return float(np.sum(np.tril(distmatrix[np.ix_(nodes, nodes)], -1)))
+
+
+def statContagionDist(distmatrix, G, A):
+    r"""
+    ContagionDist: sum of distances distmatrix[i, j] for all edges
+    i -- j (j < i) between nodes with outcome attribute
+
+    *...*
+     ---
+    """
+    (j, i) = active_edges(G, outcome_indicator(A))
+    return float(np.sum(distmatrix[i, j]))
+
+
+# ============================= directed =====================================
+
+def arc_counts(G, a):
+    """
+    Return tuple (oc, ic) of numpy arrays of the number of out- and
+    in-neighbours with outcome 1 of each node in directed graph G
+    """
+    return (neighbour_sums(G.indptr, G.indices, a),
+            neighbour_sums(G.rev_indptr, G.rev_indices, a))
+
+
+def active_arcs(G, a):
+    """
+    Return tuple (i, j) of numpy arrays of the arcs i -> j in directed
+    graph G where a[i] = a[j] = 1
+    """
+    src = edge_sources(G.indptr)
+    dst = np.asarray(G.indices, dtype=np.int64)
+    mask = (a[src] == 1) & (a[dst] == 1)
+    return (src[mask], dst[mask])
+
+
+def statDirectedContagion(G, A):
+    r"""
+    Directed Contagion (partner attribute)
+
+    *->*
+    """
+    a = outcome_indicator(A)
+    return int(np.dot(a, neighbour_sums(G.indptr, G.indices, a)))
+
+
+def statContagionReciprocity(G, A):
+    r"""
+    Contagion Reciprocity (mutual contagion)
+
+    *<->*
+    """
+    (i, j) = active_arcs(G, outcome_indicator(A))
+    return int(np.count_nonzero(is_entry(G.indptr, G.indices, j, i))) // 2
+
+
+def statTransitiveTriangleT3(G, A):
+    r"""
+    Transitive triangle T3 (contagion clustering)
+
+      *
+     > \
+    /   >
+    *-->*
+    """
+    a = outcome_indicator(A)
+    (x, z) = active_arcs(G, a)
+    # count y with x -> y -> z for each arc x -> z
+    (owner, y) = expand_neighbours(G.indptr, G.indices, x)
+    found = ((a[y] == 1) & (y != z[owner]) &
+             is_entry(G.indptr, G.indices, y, z[owner]))
+    return int(np.count_nonzero(found))
+
+
+def statCyclicTriangleC3(G, A):
+    r"""
+    Cyclic triangle C3
+
+       *
+      > \
+     /   >
+     *<--*
+    """
+    a = outcome_indicator(A)
+    (x, y) = active_arcs(G, a)
+    # count z with y -> z -> x for each arc x -> y
+    (owner, z) = expand_neighbours(G.indptr, G.indices, y)
+    found = ((a[z] == 1) & (z != x[owner]) &
+             is_entry(G.indptr, G.indices, z, x[owner]))
+    return int(np.count_nonzero(found)) // 3
+
+
+def statAlterInTwoStar2(G, A):
+    r"""
+    AlterInTwoStar2
+
+    *<--o-->*
+    """
+    return pairs(arc_counts(G, outcome_indicator(A))[0])
+
+
+def statAlterOutTwoStar2(G, A):
+    r"""
+    AlterOutTwoStar2
+
+    *-->o<--*
+    """
+    return pairs(arc_counts(G, outcome_indicator(A))[1])
+
+
+def statDirectedGWContagion(alpha, G, A):
+    r"""
+    Directed Geometrically Weighted Contagion
+
+        >*
+      /
+     *-->*
+      \ :
+       >*
+    """
+    a = outcome_indicator(A)
+    (oc, ic) = arc_counts(G, a)
+    return float(np.sum(np.exp(-alpha * oc[a == 1]) +
+                        np.exp(-alpha * ic[a == 1])))
+
+
+def statDirectedLogContagion(G, A):
+    r"""
+    Directed Log Contagion
+
+        >*
+      /
+     *-->*
+      \ :
+       >*
+    """
+    a = outcome_indicator(A)
+    (oc, ic) = arc_counts(G, a)
+    return float(np.sum(np.log(oc[a == 1] + 1) + np.log(ic[a == 1] + 1)))
+
+
+def statDirectedPowerContagion(beta, G, A):
+    r"""
+    Directed Power Contagion
+
+        >*
+      /
+     *-->*
+      \ :
+       >*
+    """
+    a = outcome_indicator(A)
+    (oc, ic) = arc_counts(G, a)
+    return float(np.sum(np.power(oc[a == 1], 1/beta) +
+                        np.power(ic[a == 1], 1/beta)))
+
+
+# ============================= bipartite ====================================
+
+def statBipartiteAlterTwoStar2(mode, G, A):
+    r"""
+    Bipartite alter two-star 2
+    AlterX-2Star2[mode]
+
+    *--o--*
+    """
+    return statIndirectPartnerAttribute(G, mode_indicator(mode, G, A))
+
+
+def statBipartiteFourCycle2(mode, G, A):
+    r"""
+    Bipartite four-cycle 2
+    C4X-2[mode]
+
+        o
+       / \
+      *   *
+       \ /
+        o
+    """
+    a = mode_indicator(mode, G, A)
+    nodes = np.flatnonzero(a)
+    # all two-paths i -- u -- v between nodes i, v with outcome 1
+    (owner1, u) = expand_neighbours(G.indptr, G.indices, nodes)
+    (owner2, v) = expand_neighbours(G.indptr, G.indices, u)
+    i = nodes[owner1[owner2]]
+    mask = (a[v] == 1) & (v != i)
+    # number of two-paths p between each (ordered) pair i, v, and
+    # four-cycles are pairs of two-paths, each counted from both ends
+    p = np.unique(i[mask] * G.numNodes() + v[mask], return_counts=True)[1]
+    return pairs(p) // 2
+
+
+def statBpAlterSameTwoStar2(mode, attrname, G, A):
+    r"""
+    Bipartite alter two-star 2 with matching categorical attribute
+
+    {*}--o--{*}
+    """
+    return statSameIndirectPartnerAttribute(attrname, G,
+                                            mode_indicator(mode, G, A))
+
+
+def statBpAlterDiffTwoStar2(mode, attrname, G, A):
+    r"""
+    Bipartite alter two-star 2 with mismatching categorical attribute
+
+    {*}--o--<*>
+    """
+    return statDiffIndirectPartnerAttribute(attrname, G,
+                                            mode_indicator(mode, G, A))
+
+
+def statBpAlterBinaryTwoStar2(mode, attrname, G, A):
+    r"""
+    Bipartite alter two-star 2 with binary attribute on central node
+
+    *--[o]--*
+    """
+    return statAlterBinaryTwoStar2(attrname, G, mode_indicator(mode, G, A))
+
+
+# Map from change statistic functions (that depend on the outcome vector)
+# to the functions computing the corresponding statistic directly
+DIRECT_STATISTICS = {
+    # undirected
+    changeStatisticsALAAM.changeContagion : statContagion,
+    changeStatisticsALAAM.changeIndirectPartnerAttribute :
+      statIndirectPartnerAttribute,
+    changeStatisticsALAAM.changePartnerAttributeActivity :
+      statPartnerAttributeActivity,
+    changeStatisticsALAAM.changePartnerPartnerAttribute :
+      statPartnerPartnerAttribute,
+    changeStatisticsALAAM.changeTriangleT2 : statTriangleT2,
+    changeStatisticsALAAM.changeTriangleT3 : statTriangleT3,
+    changeStatisticsALAAM.changeoO_OsameContagion : statoO_OsameContagion,
+    changeStatisticsALAAM.changeSameIndirectPartnerAttribute :
+      statSameIndirectPartnerAttribute,
+    changeStatisticsALAAM.changeDiffIndirectPartnerAttribute :
+      statDiffIndirectPartnerAttribute,
+    changeStatisticsALAAM.changeAlterBinaryTwoStar2 : statAlterBinaryTwoStar2,
+    changeStatisticsALAAM.changeGWContagion : statGWContagion,
+    changeStatisticsALAAM.changeLogContagion : statLogContagion,
+    changeStatisticsALAAM.changePowerContagion : statPowerContagion,
+    changeStatisticsALAAM.changeSettingHomophily : statSettingHomophily,
+    changeStatisticsALAAM.changeGeographicHomophily : statGeographicHomophily,
+    changeStatisticsALAAM.changeContagionDist : statContagionDist,
+    # directed
+    changeStatisticsALAAMdirected.changeContagion : statDirectedContagion,
+    changeStatisticsALAAMdirected.changeContagionReciprocity :
+      statContagionReciprocity,
+    changeStatisticsALAAMdirected.changeTransitiveTriangleT3 :
+      statTransitiveTriangleT3,
+    changeStatisticsALAAMdirected.changeCyclicTriangleC3 :
+      statCyclicTriangleC3,
+    changeStatisticsALAAMdirected.changeAlterInTwoStar2 : statAlterInTwoStar2,
+    changeStatisticsALAAMdirected.changeAlterOutTwoStar2 :
+      statAlterOutTwoStar2,
+    changeStatisticsALAAMdirected.changeGWContagion : statDirectedGWContagion,
+    changeStatisticsALAAMdirected.changeLogContagion :
+      statDirectedLogContagion,
+    changeStatisticsALAAMdirected.changePowerContagion :
+      statDirectedPowerContagion,
+    # bipartite
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar2 :
+      statBipartiteAlterTwoStar2,
+    changeStatisticsALAAMbipartite.changeBipartiteFourCycle2 :
+      statBipartiteFourCycle2,
+    changeStatisticsALAAMbipartite.changeBpAlterSameTwoStar2 :
+      statBpAlterSameTwoStar2,
+    changeStatisticsALAAMbipartite.changeBpAlterDiffTwoStar2 :
+      statBpAlterDiffTwoStar2,
+    changeStatisticsALAAMbipartite.changeBpAlterBinaryTwoStar2 :
+      statBpAlterBinaryTwoStar2,
+}
+
+
+def get_direct_statistic(changestat_func):
+    """Return the function computing the statistic corresponding to a
+    change statistic function directly, or None if there is no such
+    function.
+
+    Parameters:
+        changestat_func - change statistic function, possibly created
+                          with functools.partial(), e.g.
+                          partial(changeGWContagion, log(2))
+
+    Return value:
+        Function with the signature (G, A) computing the statistic
+        for CSR graph G and outcome vector A, e.g.
+        partial(statGWContagion, log(2)), or None if the change
+        statistic has no direct version.
+    """
+    if isinstance(changestat_func, functools.partial):
+        stat_func = get_direct_statistic(changestat_func.func)
+        if stat_func is None:
+            return None
+        return functools.partial(stat_func, *changestat_func.args,
+                                 **changestat_func.keywords)
+    return DIRECT_STATISTICS.get(changestat_func)
+
+
+# ================= change statistics for all nodes at once ==================
+#
+# The change statistics, for every node i at once, for changing the
+# outcome of i from 0 to 1 with the outcomes of all the other nodes as
+# in A (the outcome of i itself is treated as 0, as in the samplers).
+# These are used for the design matrix of the pseudo-likelihood
+# (initialEstimator.mple_design_matrix()), and are for the same change
+# statistics as the versions using the active neighbour counts
+# (ActiveNeighbourCounts.py), from which the formulae are derived.
+
+def neighbour_increments(indptr, indices, a, c, g):
+    """
+    Return numpy array with, for each node i, the sum over the
+    neighbours j of i with a[j] = 1 of g(d + 1) - g(d), where
+    d = c[j] - a[i] is the count c[j] not counting i itself.
+    """
+    src = edge_sources(indptr)
+    dst = np.asarray(indices, dtype=np.int64)
+    d = c[dst] - a[src]
+    return np.bincount(src, weights = a[dst] * (g(d + 1) - g(d)),
+                       minlength = len(indptr) - 1)
+
+
+def deltaContagion(G, A):
+    r"""
+    Contagion (partner attribute) change statistics for all nodes
+
+    *--*
+    """
+    return neighbour_sums(G.indptr, G.indices, outcome_indicator(A))
+
+
+def deltaIndirectPartnerAttribute(G, A):
+    r"""
+    Indirect partner attribute (Alter-2Star2) change statistics for
+    all nodes
+
+    *--o--*
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return neighbour_sums(G.indptr, G.indices, c) - a * np.diff(G.indptr)
+
+
+def deltaPartnerAttributeActivity(G, A):
+    r"""
+    Partner attribute activity change statistics for all nodes
+
+    *--*--o
+    """
+    a = outcome_indicator(A)
+    deg = np.diff(G.indptr)
+    return (neighbour_sums(G.indptr, G.indices, a) * (deg - 2) +
+            neighbour_sums(G.indptr, G.indices, a * deg))
+
+
+def deltaPartnerPartnerAttribute(G, A):
+    r"""
+    Partner-partner-attribute (partner-resource) change statistics for
+    all nodes
+
+    *--*--*
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return (2 * (neighbour_sums(G.indptr, G.indices, a * c) - a * c) +
+            c * (c - 1))
+
+
+def delta_contagion_function(g, G, A):
+    """
+    Return change statistics for all nodes for the contagion statistic
+    sum over nodes i with outcome 1 of g(c[i]), e.g. g(x) = exp(-alpha * x)
+    for GWContagion
+    """
+    a = outcome_indicator(A)
+    c = neighbour_sums(G.indptr, G.indices, a)
+    return neighbour_increments(G.indptr, G.indices, a, c, g) + g(c)
+
+
+def deltaGWContagion(alpha, G, A):
+    r"""
+    Geometrically Weighted Contagion change statistics for all nodes
+    """
+    return delta_contagion_function(lambda x: np.exp(-alpha * x), G, A)
+
+
+def deltaLogContagion(G, A):
+    r"""
+    Logarithmic Contagion change statistics for all nodes
+    """
+    return delta_contagion_function(lambda x: np.log(x + 1), G, A)
+
+
+def deltaPowerContagion(beta, G, A):
+    r"""
+    Power Contagion change statistics for all nodes
+    """
+    return delta_contagion_function(lambda x: np.power(x, 1/beta), G, A)
+
+
+def deltaDirectedContagion(G, A):
+    r"""
+    Directed Contagion (partner attribute) change statistics for all nodes
+
+    *->*
+    """
+    (oc, ic) = arc_counts(G, outcome_indicator(A))
+    return oc + ic
+
+
+def deltaAlterInTwoStar2(G, A):
+    r"""
+    AlterInTwoStar2 change statistics for all nodes
+
+    *<--o-->*
+    """
+    a = outcome_indicator(A)
+    (oc, ic) = arc_counts(G, a)
+    return (neighbour_sums(G.rev_indptr, G.rev_indices, oc) -
+            a * np.diff(G.rev_indptr))
+
+
+def deltaAlterOutTwoStar2(G, A):
+    r"""
+    AlterOutTwoStar2 change statistics for all nodes
+
+    *-->o<--*
+    """
+    a = outcome_indicator(A)
+    (oc, ic) = arc_counts(G, a)
+    return neighbour_sums(G.indptr, G.indices, ic) - a * np.diff(G.indptr)
+
+
+def delta_directed_contagion_function(g, G, A):
+    """
+    Return change statistics for all nodes for the directed contagion
+    statistic sum over nodes i with outcome 1 of g(oc[i]) + g(ic[i])
+    """
+    a = outcome_indicator(A)
+    (oc, ic) = arc_counts(G, a)
+    return (neighbour_increments(G.indptr, G.indices, a, ic, g) + g(oc) +
+            neighbour_increments(G.rev_indptr, G.rev_indices, a, oc, g) +
+            g(ic))
+
+
+def deltaDirectedGWContagion(alpha, G, A):
+    r"""
+    Directed Geometrically Weighted Contagion change statistics for
+    all nodes
+    """
+    return delta_directed_contagion_function(lambda x: np.exp(-alpha * x),
+                                             G, A)
+
+
+def deltaDirectedLogContagion(G, A):
+    r"""
+    Directed Log Contagion change statistics for all nodes
+    """
+    return delta_directed_contagion_function(lambda x: np.log(x + 1), G, A)
+
+
+def deltaDirectedPowerContagion(beta, G, A):
+    r"""
+    Directed Power Contagion change statistics for all nodes
+    """
+    return delta_directed_contagion_function(lambda x: np.power(x, 1/beta),
+                                             G, A)
+
+
+def deltaBipartiteAlterTwoStar2(mode, G, A):
+    r"""
+    Bipartite alter two-star 2 change statistics for all nodes
+    (0 for nodes not in the given mode)
+
+    *--o--*
+    """
+    assert mode in [MODE_A, MODE_B]
+    delta = deltaIndirectPartnerAttribute(G, A)
+    if mode == MODE_A:
+        delta[G.num_A_nodes:] = 0
+    else:
+        delta[:G.num_A_nodes] = 0
+    return delta
+
+
+# Map from change statistic functions (that depend on the outcome vector)
+# to the functions computing the change statistics for all nodes at once
+DIRECT_CHANGE_STATISTICS = {
+    # undirected
+    changeStatisticsALAAM.changeContagion : deltaContagion,
+    changeStatisticsALAAM.changeIndirectPartnerAttribute :
+      deltaIndirectPartnerAttribute,
+    changeStatisticsALAAM.changePartnerAttributeActivity :
+      deltaPartnerAttributeActivity,
+    changeStatisticsALAAM.changePartnerPartnerAttribute :
+      deltaPartnerPartnerAttribute,
+    changeStatisticsALAAM.changeGWContagion : deltaGWContagion,
+    changeStatisticsALAAM.changeLogContagion : deltaLogContagion,
+    changeStatisticsALAAM.changePowerContagion : deltaPowerContagion,
+    # directed
+    changeStatisticsALAAMdirected.changeContagion : deltaDirectedContagion,
+    changeStatisticsALAAMdirected.changeAlterInTwoStar2 : deltaAlterInTwoStar2,
+    changeStatisticsALAAMdirected.changeAlterOutTwoStar2 :
+      deltaAlterOutTwoStar2,
+    changeStatisticsALAAMdirected.changeGWContagion : deltaDirectedGWContagion,
+    changeStatisticsALAAMdirected.changeLogContagion :
+      deltaDirectedLogContagion,
+    changeStatisticsALAAMdirected.changePowerContagion :
+      deltaDirectedPowerContagion,
+    # bipartite
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar2 :
+      deltaBipartiteAlterTwoStar2,
+}
+
+
+def get_direct_change_statistic(changestat_func):
+    """Return the function computing a change statistic for all nodes
+    at once, or None if there is no such function.
+
+    Parameters:
+        changestat_func - change statistic function, possibly created
+                          with functools.partial(), e.g.
+                          partial(changeGWContagion, log(2))
+
+    Return value:
+        Function with the signature (G, A) returning the numpy array
+        of the change statistic for each node of CSR graph G for
+        outcome vector A, e.g. partial(deltaGWContagion, log(2)), or
+        None if the change statistic has no such version.
+    """
+    if isinstance(changestat_func, functools.partial):
+        delta_func = get_direct_change_statistic(changestat_func.func)
+        if delta_func is None:
+            return None
+        return functools.partial(delta_func, *changestat_func.args,
+                                 **changestat_func.keywords)
+    return DIRECT_CHANGE_STATISTICS.get(changestat_func)
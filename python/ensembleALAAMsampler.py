@@ -0,0 +1,296 @@
+#
+# File:    ensembleALAAMsampler.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Ensemble version of the basic ALAAM MCMC sampler, which advances
+   C independent chains (Markov chains of outcome vectors) on the same
+   network in lockstep in one process. The outcome vectors are the rows
+   of a C x N matrix. At each step, each chain chooses a node uniformly
+   at random and proposes to toggle its outcome, exactly as in the basic
+   sampler (basicALAAMsampler.py), but the change statistics for the C
+   proposals are computed together with numpy array operations, using
+   the ChangeStatisticsTable for those that do not depend on the outcome
+   vector and the vectorized change statistics of the checkerboard
+   sampler (checkerboardALAAMsampler.py) for the others, and the C
+   acceptance tests are also done together. So the Python interpreter
+   overhead of each step is shared by all C chains, and the network is
+   only loaded (and converted to CSR) once, no matter how many chains.
+
+   The parameter vector theta can be the same for all the chains, or
+   there can be a different one for each chain (as a C x n matrix).
+
+   If there is no vectorized version for one of the change statistics,
+   the chains are just run one after the other with
+   batchALAAMsamplerNodes() (see batchALAAMsampler.py).
+
+  The ALAAM is described in:
+
+  G. Daraganova and G. Robins. Autologistic actor attribute models. In
+  D. Lusher, J. Koskinen, and G. Robins, editors, Exponential Random
+  Graph Models for Social Networks, chapter 9, pages 102-114. Cambridge
+  University Press, New York, 2013.
+
+  G. Robins, P. Pattison, and P. Elliott. Network models for social
+  influence processes. Psychometrika, 66(2):161-189, 2001.
+
+"""
+
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import NA_VALUE
+from BipartiteGraph import MODE_A,MODE_B
+from CSRGraph import getCSRGraph
+from ChangeStatisticsTable import getChangeStatisticsTable
+from batchALAAMsampler import BLOCK_SIZE,batchALAAMsamplerNodes
+import batchALAAMsampler
+from conditionalALAAMsampler import getInnerNodesNotNA
+from checkerboardALAAMsampler import VectorModel,get_vector_model
+
+
+def get_ensemble_model(G, changestats_func_list):
+    """
+    Return the VectorModel (see checkerboardALAAMsampler.py) for the
+    graph G and the list of change statistic functions, cached on G,
+    or None if there is no vectorized version of one of the change
+    statistics (see get_vector_model()). This is cached separately
+    from the CheckerboardModel, so the network is not coloured.
+
+    Parameters:
+       G                   - Graph (or Digraph or BipartiteGraph) object
+       changestats_func_list  - list of change statistics funcions
+
+    Return value:
+       VectorModel object for G and changestats_func_list, or None
+    """
+    return get_vector_model(G, changestats_func_list, VectorModel,
+                            'ensemble_model')
+
+
+def ensembleALAAMsamplerNodes(nodes, G, Amatrix, changestats_func_list,
+                              theta, performMove, sampler_m, rng = None):
+    """
+    ensembleALAAMsamplerNodes - sample from ALAAM distribution with basic
+                                sampler in each of C chains, choosing
+                                nodes uniformly at random from the
+                                specified array of nodes
+
+    Parameters:
+       nodes               - numpy array of nodes that can be chosen
+                             (outcome must not be NA for any of them
+                             in any chain)
+       G                   - Graph object for network (fixed)
+       Amatrix             - C x N numpy array where each row is the
+                             vector of 0/1 outcome variables for a chain
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values,
+                             or C x n numpy array with the theta vector
+                             for each chain
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome matrix Amatrix
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+                             in each chain
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - numpy vector of sampler acceptance rate
+                              for each chain
+        changeTo1ChangeStats  - C x n numpy array of change stats for
+                                changeTo1 moves in each chain
+        changeTo0ChangeStats  - C x n numpy array of change stats for
+                                changeTo0 moves in each chain
+
+    Note Amatrix is updated in place if performMove is True
+    otherwise unchanged
+    """
+    if len(nodes) == 0:
+        raise Exception("no nodes with outcome not NA to sample")
+    if rng is None:
+        rng = batchALAAMsampler.default_rng
+    (C, N) = np.shape(Amatrix)
+    n = len(changestats_func_list)
+    theta = np.asarray(theta, dtype=np.float64)
+    model = get_ensemble_model(G, changestats_func_list)
+    if model is None:
+        thetas = np.broadcast_to(theta, (C, n))
+        results = [batchALAAMsamplerNodes(nodes, G, Amatrix[k],
+                                          changestats_func_list, thetas[k],
+                                          performMove, sampler_m, rng)
+                   for k in range(C)]
+        return (np.array([r[0] for r in results]),
+                np.array([r[1] for r in results]),
+                np.array([r[2] for r in results]))
+    accepted = np.zeros(C, dtype=np.int64)
+    changeTo1ChangeStats = np.zeros((C, n))
+    changeTo0ChangeStats = np.zeros((C, n))
+    state = model.getState(Amatrix)
+    chain_base = np.arange(C) * N
+    k = 0
+    while k < sampler_m:
+        blocksize = min(max(BLOCK_SIZE // C, 1), sampler_m - k)
+        node_block = nodes[rng.integers(len(nodes), size=(blocksize, C))]
+        # log(1 - U) is log of uniform on (0, 1] so never log(0)
+        logu_block = np.log1p(-rng.random((blocksize, C)))
+        for (chain_nodes, logu) in zip(node_block, logu_block):
+            positions = chain_base + chain_nodes
+            isChangeToZero = state.a[positions] == 1
+            state.set(model.G, positions[isChangeToZero], 0)
+            changestats = model.changeStats(state, chain_nodes, positions)
+            total = np.sum(changestats * theta, axis=1)
+            total[isChangeToZero] = -total[isChangeToZero]
+            accept = logu < total
+            accepted += accept
+            changeTo1ChangeStats[accept & ~isChangeToZero] += changestats[accept & ~isChangeToZero]
+            changeTo0ChangeStats[accept & isChangeToZero] += changestats[accept & isChangeToZero]
+            if performMove:
+                # outcome is 1 if changed to 1, or not changed from 1
+                state.assign(model.G, positions, accept != isChangeToZero)
+            else:
+                state.assign(model.G, positions, isChangeToZero)
+        k += blocksize
+    if performMove:
+        a = state.a.reshape((C, N))
+        changed = (Amatrix != NA_VALUE) & ((Amatrix == 1) != (a == 1))
+        Amatrix[changed] = a[changed]
+
+    acceptance_rate = accepted / float(sampler_m)
+    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
+
+
+def ensembleALAAMsampler(G, Amatrix, changestats_func_list, theta,
+                         performMove, sampler_m, rng = None):
+    """
+    ensembleALAAMsampler - sample from ALAAM distribution with basic
+                           sampler in each of C chains
+
+    The NA outcome values must be the same in every chain.
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       Amatrix             - C x N numpy array where each row is the
+                             vector of 0/1 outcome variables for a chain
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values,
+                             or C x n numpy array with the theta vector
+                             for each chain
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome matrix Amatrix
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+                             in each chain
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - numpy vector of sampler acceptance rate
+                              for each chain
+        changeTo1ChangeStats  - C x n numpy array of change stats for
+                                changeTo1 moves in each chain
+        changeTo0ChangeStats  - C x n numpy array of change stats for
+                                changeTo0 moves in each chain
+
+    Note Amatrix is updated in place if performMove is True
+    otherwise unchanged
+    """
+    na = np.asarray(Amatrix) == NA_VALUE
+    if not np.all(na == na[0]):
+        raise ValueError("NA outcome values must be the same in every chain")
+    nodes = np.nonzero(~na[0])[0]
+    return ensembleALAAMsamplerNodes(nodes, G, Amatrix, changestats_func_list,
+                                     theta, performMove, sampler_m, rng)
+
+
+def ensembleBipartiteALAAMsampler(mode, G, Amatrix, changestats_func_list,
+                                  theta, performMove, sampler_m, rng = None):
+    """
+    ensembleBipartiteALAAMsampler - sample from ALAAM distribution on
+                                    bipartite network with basic sampler
+                                    in each of C chains
+
+    Only the outcome variables for nodes in the given mode are varied.
+    As for bipartiteALAAMsampler(), use e.g.
+    partial(ensembleBipartiteALAAMsampler, MODE_A) as the sampler
+    function. The NA outcome values must be the same in every chain.
+
+    Parameters:
+       mode                - network mode (node type) MODE_A or MODE_B
+                             on which the outcome variables are defined.
+       G                   - BipartiteGraph object for network (fixed)
+       Amatrix             - C x N numpy array where each row is the
+                             vector of 0/1 outcome variables for a chain
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values,
+                             or C x n numpy array with the theta vector
+                             for each chain
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome matrix Amatrix
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+                             in each chain
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - numpy vector of sampler acceptance rate
+                              for each chain
+        changeTo1ChangeStats  - C x n numpy array of change stats for
+                                changeTo1 moves in each chain
+        changeTo0ChangeStats  - C x n numpy array of change stats for
+                                changeTo0 moves in each chain
+
+    Note Amatrix is updated in place if performMove is True
+    otherwise unchanged
+    """
+    assert mode in [MODE_A, MODE_B]
+    if mode == MODE_A:
+        (first, last) = (0, G.num_A_nodes)
+    else:
+        (first, last) = (G.num_A_nodes, G.numNodes())
+    nodes = first + np.nonzero(np.asarray(Amatrix)[0, first:last] != NA_VALUE)[0]
+    return ensembleALAAMsamplerNodes(nodes, G, Amatrix, changestats_func_list,
+                                     theta, performMove, sampler_m, rng)
+
+
+def ensembleConditionalALAAMsampler(G, Amatrix, changestats_func_list, theta,
+                                    performMove, sampler_m, rng = None):
+    """
+    ensembleConditionalALAAMsampler - sample from ALAAM distribution with
+                                      basic sampler in each of C chains,
+                                      conditional on snowball sampling
+                                      structure (only the inner wave
+                                      nodes are changed)
+
+    The NA outcome values must be the same in every chain.
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       Amatrix             - C x N numpy array where each row is the
+                             vector of 0/1 outcome variables for a chain
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values,
+                             or C x n numpy array with the theta vector
+                             for each chain
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome matrix Amatrix
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+                             in each chain
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - numpy vector of sampler acceptance rate
+                              for each chain
+        changeTo1ChangeStats  - C x n numpy array of change stats for
+                                changeTo1 moves in each chain
+        changeTo0ChangeStats  - C x n numpy array of change stats for
+                                changeTo0 moves in each chain
+
+    Note Amatrix is updated in place if performMove is True
+    otherwise unchanged
+    """
+    return ensembleALAAMsamplerNodes(getInnerNodesNotNA(G, np.asarray(Amatrix)[0]),
+                                     G, Amatrix, changestats_func_list, theta,
+                                     performMove, sampler_m, rng)
@@ -45,9 +45,106 @@ THETA_PREFIX = 'theta_values_' # prefix for theta output filename
 DZA_PREFIX = 'dzA_values_'     # prefix for dzA output filename
 sampler_m  = 1000              # number of sampler iterations
 
+
+class EEStoppingRule:
+    """Stopping rule for algorithm_EE(), evaluated on the theta and
+    dzA values of the iterations in consecutive non-overlapping
+    windows of a fixed number of iterations. At the end of each window,
+    the algorithm is stopped if, for every parameter, the mean of dzA
+    over the window is small relative to its standard deviation (dzA is
+    fluctuating around zero, i.e. the simulated statistics match the
+    observed statistics on average) and the mean of theta over the window
+    has changed only by a small fraction from the previous window (theta
+    is no longer drifting). Only sums over the current window and the
+    mean theta of the previous window are kept, so the memory and time
+    for each iteration do not depend on the window size.
+    """
+
+    def __init__(self, window = 1000, dzA_threshold = 0.1,
+                 theta_tolerance = 0.01, min_iterations = 0):
+        """
+        Construct the stopping rule
+
+        Parameters:
+           window          - number of iterations in each window.
+                             Default 1000.
+           dzA_threshold   - maximum value of |mean(dzA)| / sd(dzA) over
+                             the window for each parameter. Default 0.1.
+           theta_tolerance - maximum change in mean theta over the window
+                             from the previous window, relative to the
+                             absolute value of the previous mean (or minTheta
+                             of algorithm_EE() if that is smaller), for
+                             each parameter. Default 0.01.
+           min_iterations  - minimum number of iterations before stopping.
+                             Default 0.
+        """
+        self.window = window
+        self.dzA_threshold = dzA_threshold
+        self.theta_tolerance = theta_tolerance
+        self.min_iterations = min_iterations
+        self.count = 0
+        self.dzA_sum = 0
+        self.dzA_sumsq = 0
+        self.theta_sum = 0
+        self.prev_theta_mean = None
+        self.reason = None    # set to the reason for stopping, if stopped
+
+
+    def update(self, t, theta, dzA, minTheta = 0.01):
+        """
+        Add the theta and dzA values of an iteration and check the
+        stopping rule at the end of each window.
+
+        Parameters:
+           t        - iteration number
+           theta    - numpy vector of theta values after the iteration
+           dzA      - numpy vector of dzA values after the iteration
+           minTheta - minimum absolute value of theta to use in the
+                      relative change in theta. Default 0.01.
+
+        Return value:
+           True if the algorithm should stop (self.reason is then
+           set to a string describing why), else False
+        """
+        self.count += 1
+        self.dzA_sum = self.dzA_sum + dzA
+        self.dzA_sumsq = self.dzA_sumsq + dzA**2
+        self.theta_sum = self.theta_sum + theta
+        if self.count < self.window:
+            return False
+        dzA_mean = self.dzA_sum / self.count
+        dzA_sd = np.sqrt(np.maximum(self.dzA_sumsq / self.count - dzA_mean**2,
+                                    0))
+        theta_mean = self.theta_sum / self.count
+        prev_theta_mean = self.prev_theta_mean
+        (self.count, self.dzA_sum, self.dzA_sumsq, self.theta_sum) = (0, 0, 0, 0)
+        self.prev_theta_mean = theta_mean
+        if prev_theta_mean is None or t + 1 < self.min_iterations:
+            return False
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dzA_ratio = np.abs(dzA_mean) / dzA_sd
+        theta_change = (np.abs(theta_mean - prev_theta_mean) /
+                        np.maximum(np.abs(prev_theta_mean), minTheta))
+        if (np.all(dzA_ratio < self.dzA_threshold) and
+            np.all(theta_change < self.theta_tolerance)):
+            self.reason = ('after ' + str(t + 1) + ' iterations, ' +
+                           'max |mean(dzA)|/sd(dzA) = ' +
+                           str(np.max(dzA_ratio)) + ' < ' +
+                           str(self.dzA_threshold) +
+                           ' and max relative change in mean theta = ' +
+                           str(np.max(theta_change)) + ' < ' +
+                           str(self.theta_tolerance) +
+                           ' over window of ' + str(self.window) +
+                           ' iterations')
+            return True
+        return False
+
+
 def algorithm_EE(G, A, changestats_func_list, theta,
                  M, theta_outfile, dzA_outfile, learningRate = 0.01,
-                 sampler_func = basicALAAMsampler):
+                 sampler_func = basicALAAMsampler,
+                 checkpoint_func = None, checkpoint_interval = 1000,
+                 t_start = 0, dzA = None, stopping_rule = None):
     """
     Algorithm EE (Equilibrium Expectation).
     Version from Borisenko et al. (2019) with only learning rate
@@ -67,6 +164,24 @@ def algorithm_EE(G, A, changestats_func_list, theta,
                              (G, A, changestats_func_list, theta, performMove,
                               sampler_m); see basicALAAMsampler.py
                              default basicALAAMsampler
+       checkpoint_func     - function called with (t, theta, dzA) every
+                             checkpoint_interval iterations and at the end,
+                             where t is the number of iterations done,
+                             to save a checkpoint, or None.
+                             Default None.
+       checkpoint_interval - number of iterations between calls of
+                             checkpoint_func. Default 1000.
+       t_start             - iteration to start at (e.g. when resuming
+                             from a checkpoint). Default 0.
+       dzA                 - vector of accumulated statistics changes
+                             to start with (e.g. when resuming from a
+                             checkpoint) or None for zero. Default None.
+                             Modified in place.
+       stopping_rule       - EEStoppingRule object to stop the algorithm
+                             before M iterations, or None to always do
+                             M iterations. If the algorithm is stopped
+                             by it, the reason is in stopping_rule.reason.
+                             Default None.
 
 
      Returns:
@@ -82,8 +197,9 @@ def algorithm_EE(G, A, changestats_func_list, theta,
     learningRateVec = learningRate * np.ones(n)
     minThetaVec = minTheta * np.ones(n)
 
-    dzA = np.zeros(n)  # zero outside loop, dzA accumulates in loop
-    for t in range(M):
+    if dzA is None:
+        dzA = np.zeros(n)  # zero outside loop, dzA accumulates in loop
+    for t in range(t_start, M):
         accepted = 0
         (acceptance_rate,
          changeTo1ChangeStats,
@@ -98,11 +214,21 @@ def algorithm_EE(G, A, changestats_func_list, theta,
 
         theta += theta_step
 
-        if t % 100 == 0:
+        stop = (stopping_rule is not None and
+                stopping_rule.update(t, theta, dzA, minTheta))
+
+        if t % 100 == 0 or stop:
             theta_outfile.write(str(t) + ' ' + ' '.join([str(x) for x in theta]) + 
                             ' ' + str(acceptance_rate) + '\n')
             dzA_outfile.write(str(t) + ' ' + ' '.join([str(x) for x in dzA]) + '\n')
 
+        if checkpoint_func is not None and ((t + 1) % checkpoint_interval == 0
+                                            or t + 1 == M or stop):
+            checkpoint_func(t + 1, theta, dzA)
+
+        if stop:
+            break
+
 
     return theta
 
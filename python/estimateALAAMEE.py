@@ -41,6 +41,7 @@ import time
 import os
 import random
 import math
+import copy
 import numpy as np         # used for matrix & vector data types and functions
 from functools import partial
 
@@ -48,11 +49,15 @@ from utils import NA_VALUE,int_or_na
 from Graph import Graph
 from Digraph import Digraph
 from BipartiteGraph import BipartiteGraph
+from CSRGraph import CSRGraph,load_graph_cached
 from changeStatisticsALAAM import *
-from initialEstimator import algorithm_S
+from initialEstimator import algorithm_S,algorithm_MPLE
 #OLD:from equilibriumExpectation import algorithm_EE,THETA_PREFIX,DZA_PREFIX
-from equilibriumExpectationBorisenko import algorithm_EE,THETA_PREFIX,DZA_PREFIX
+from equilibriumExpectationBorisenko import algorithm_EE,EEStoppingRule,THETA_PREFIX,DZA_PREFIX
 from basicALAAMsampler import basicALAAMsampler
+from ChangeStatisticsTable import getChangeStatisticsTable
+from checkpoint import save_checkpoint,load_checkpoint
+from parallelWorkers import worker_pool,get_worker_args,seed_samplers
 
 
 def run_on_network_attr(edgelist_filename, param_func_list, labels,
@@ -66,7 +71,13 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
                         sampler_func = basicALAAMsampler,
                         zone_filename= None,
                         directed = False,
-                        bipartite = False):
+                        bipartite = False,
+                        binary_cache = False,
+                        use_mple = False,
+                        checkpoint_filename = None,
+                        checkpoint_interval = 1000,
+                        resume_from = None,
+                        stopping_rule = None):
     """Run estimation using EE algorithm on specified network with binary 
     and/or continuous and categorical attributes.
     
@@ -106,7 +117,23 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
                            True for directed network else undirected.
          bipartite       - Default False.
                            True for two-mode network else one-mode.
-
+         binary_cache    - Default False.
+                           If True then load the network (and attributes)
+                           from the binary cache next to the network file,
+                           creating it if it does not exist or is out of
+                           date (see CSRGraph.load_graph_cached()).
+         use_mple        - Default False.
+                           If True then use the maximum pseudo-likelihood
+                           estimate (MPLE) rather than Algorithm S for
+                           the initial estimate (see run_ee()).
+         checkpoint_filename - filename to save checkpoints to, or None
+                           (see run_ee()). Default None.
+         checkpoint_interval - number of EE iterations between
+                           checkpoints (see run_ee()). Default 1000.
+         resume_from     - filename of checkpoint to resume from, or None
+                           (see run_ee()). Default None.
+         stopping_rule   - EEStoppingRule object to stop EE early, or None
+                           (see run_ee()). Default None.
 
 
     Write output to theta_values_<basename>_<run>.txt and
@@ -120,7 +147,11 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
     assert(len(param_func_list) == len(labels))
     basename = os.path.splitext(os.path.basename(edgelist_filename))[0]
 
-    if directed:
+    if binary_cache:
+        G = load_graph_cached(edgelist_filename, binattr_filename,
+                              contattr_filename, catattr_filename,
+                              zone_filename, directed, bipartite)
+    elif directed:
         if bipartite:
             raise Exception("directed bipartite network not suppored")
         G = Digraph(edgelist_filename, binattr_filename, contattr_filename,
@@ -143,7 +174,12 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
            EEiterations    = EEiterations,
            run = run,
            learningRate = learningRate,
-           sampler_func = sampler_func)
+           sampler_func = sampler_func,
+           use_mple = use_mple,
+           checkpoint_filename = checkpoint_filename,
+           checkpoint_interval = checkpoint_interval,
+           resume_from = resume_from,
+           stopping_rule = stopping_rule)
 
     
 
@@ -167,7 +203,12 @@ def run_ee(G, outcome_vector, basename, param_func_list, labels,
            EEiterations    = 50000,
            run = None,
            learningRate = 0.01,
-           sampler_func = basicALAAMsampler):
+           sampler_func = basicALAAMsampler,
+           use_mple = False,
+           checkpoint_filename = None,
+           checkpoint_interval = 1000,
+           resume_from = None,
+           stopping_rule = None):
     """Run estimation using EE algorithm with supplied Graph (or Digraph
     or BipartiteGraph) object (which also contains (fixed) nodal
     attributes and snowball sampling zone information) and outcome
@@ -197,10 +238,37 @@ def run_ee(G, outcome_vector, basename, param_func_list, labels,
                                (G, A, changestats_func_list, theta, performMove,
                                 sampler_m); see basicALAAMsampler.py
                                default basicALAAMsampler
+         use_mple            - if True, use the maximum pseudo-likelihood
+                               estimate (MPLE, see
+                               initialEstimator.algorithm_MPLE()) as the
+                               initial estimate rather than Algorithm S.
+                               Algorithm S is still used if the MPLE
+                               does not exist. Default False.
+         checkpoint_filename - filename to save the state of the
+                               EE algorithm (see checkpoint.py) to every
+                               checkpoint_interval iterations, so the run
+                               can be resumed (with resume_from) if it is
+                               stopped, or None. Default None.
+                               WARNING: file overwritten.
+         checkpoint_interval - number of EE iterations between checkpoints
+                               (a multiple of 100). Default 1000.
+         resume_from         - filename of checkpoint to resume the EE
+                               algorithm from, continuing the run exactly
+                               where the checkpoint was saved, appending to
+                               the theta and dzA output files (written up to
+                               the checkpoint) rather than overwriting them,
+                               or None. Default None.
+         stopping_rule       - EEStoppingRule object (see
+                               equilibriumExpectationBorisenko.py) to stop
+                               the EE algorithm before EEiterations
+                               iterations when theta has settled, or None
+                               to always do EEiterations iterations.
+                               Default None. (When resuming, the stopping
+                               rule state saved in the checkpoint is used).
 
     Write output to theta_values_<basename>_<run>.txt and
                     dzA_values_<basename>_<run>.txt
-    WARNING: these files are overwritten.
+    WARNING: these files are overwritten (unless resuming).
 
     """
     bipartite = isinstance(G, BipartiteGraph)
@@ -240,31 +308,190 @@ def run_ee(G, outcome_vector, basename, param_func_list, labels,
     print('M1 = ', M1, ' EEiterations = ', EEiterations, end=' ') 
     print('learningRate = ', learningRate, end=' ')
     
-    theta_outfile = open(THETA_OUTFILENAME, 'w',1) # 1 means line buffering
-    theta_outfile.write('t ' + ' '.join(labels) + ' ' + 'AcceptanceRate' + '\n')
-    print('Running Algorithm S...', end=' ')
-    start = time.time()
-    (theta, Dmean) = algorithm_S(G, A, param_func_list, M1, theta_outfile,
-                                 sampler_func)
-    print(time.time() - start, 's')
-    print('after Algorithm S:')
-    print('theta = ', theta)
-    print('Dmean = ', Dmean)
-    dzA_outfile = open(DZA_OUTFILENAME, 'w',1)
-    dzA_outfile.write('t ' + ' '.join(labels) + '\n')
+    assert checkpoint_interval % 100 == 0
+
+    def save_ee_checkpoint(t, theta, dzA):
+        """save EE state after t iterations, including the position
+        in the output files so they can be truncated to it on resume"""
+        theta_outfile.flush()
+        dzA_outfile.flush()
+        save_checkpoint(checkpoint_filename,
+                        {'algorithm': 'EE', 'labels': list(labels),
+                         't': t, 'theta': theta, 'dzA': dzA, 'A': A,
+                         'stopping_rule': stopping_rule,
+                         'theta_file_pos': theta_outfile.tell(),
+                         'dzA_file_pos': dzA_outfile.tell()})
+
+    checkpoint_func = (save_ee_checkpoint if checkpoint_filename is not None
+                       else None)
+
+    if resume_from is not None:
+        state = load_checkpoint(resume_from, 'EE', labels)
+        print('Resuming Algorithm EE from', resume_from, 'at t =', state['t'])
+        A = state['A']
+        theta = state['theta']
+        (t_start, dzA) = (state['t'], state['dzA'])
+        stopping_rule = state['stopping_rule']
+        # discard any output written after the checkpoint
+        theta_outfile = open(THETA_OUTFILENAME, 'r+', 1)
+        theta_outfile.seek(state['theta_file_pos'])
+        theta_outfile.truncate()
+        dzA_outfile = open(DZA_OUTFILENAME, 'r+', 1)
+        dzA_outfile.seek(state['dzA_file_pos'])
+        dzA_outfile.truncate()
+    else:
+        theta_outfile = open(THETA_OUTFILENAME, 'w',1) # 1 means line buffering
+        theta_outfile.write('t ' + ' '.join(labels) + ' ' + 'AcceptanceRate' + '\n')
+        theta = None
+        if use_mple:
+            print('Running MPLE...', end=' ')
+            start = time.time()
+            (theta, std_error) = algorithm_MPLE(G, A, param_func_list,
+                                                theta_outfile)
+            print(time.time() - start, 's')
+            if theta is not None:
+                print('MPLE:')
+                print('theta = ', theta)
+                print('std_error = ', std_error)
+        if theta is None:
+            print('Running Algorithm S...', end=' ')
+            start = time.time()
+            (theta, Dmean) = algorithm_S(G, A, param_func_list, M1, theta_outfile,
+                                         sampler_func)
+            print(time.time() - start, 's')
+            print('after Algorithm S:')
+            print('theta = ', theta)
+            print('Dmean = ', Dmean)
+        dzA_outfile = open(DZA_OUTFILENAME, 'w',1)
+        dzA_outfile.write('t ' + ' '.join(labels) + '\n')
+        (t_start, dzA) = (0, np.zeros(len(param_func_list)))
+        if checkpoint_func is not None:
+            # so the initial estimation is not repeated when resuming
+            checkpoint_func(t_start, theta, dzA)
     print('Running Algorithm EE...', end=' ')
     start = time.time()
     #OLD: theta = algorithm_EE(G, A, param_func_list, theta, Dmean,
     #OLD:                     Mouter, Msteps, theta_outfile, dzA_outfile)
     theta = algorithm_EE(G, A, param_func_list, theta, 
                          EEiterations, theta_outfile, dzA_outfile, learningRate,
-                         sampler_func)
+                         sampler_func, checkpoint_func, checkpoint_interval,
+                         t_start, dzA, stopping_rule)
 
     print(time.time() - start, 's')
+    if stopping_rule is not None and stopping_rule.reason is not None:
+        print('Algorithm EE stopped early', stopping_rule.reason)
     theta_outfile.close()
     dzA_outfile.close()
     print('at end theta = ', theta)
 
     print
-    if isinstance(G, BipartiteGraph):
+    if isinstance(G, CSRGraph):
+        print("twoPaths cache size: ", len(G.twopaths_cache))
+    elif isinstance(G, BipartiteGraph):
         print("twoPaths cache info: ", G.twoPaths.cache_info())
+
+
+
+def _run_ee_parallel_worker(run, seedseq):
+    """
+    Run one EE estimation for run_ee_parallel() in a worker process.
+
+    Parameters:
+        run     - run number, used as suffix on output filenames
+        seedseq - numpy.random.SeedSequence for this run
+
+    Return value:
+        tuple (theta_values, dzA_values) of numpy arrays read from the
+        theta and dzA output files written by run_ee()
+    """
+    (G, outcome_vector, basename, param_func_list, labels, EEiterations,
+     learningRate, sampler_func, use_mple, stopping_rule) = get_worker_args()
+    seed_samplers(seedseq)
+    run_ee(G, outcome_vector, basename, param_func_list, labels,
+           EEiterations = EEiterations, run = run,
+           learningRate = learningRate, sampler_func = sampler_func,
+           use_mple = use_mple, stopping_rule = copy.deepcopy(stopping_rule))
+    theta_values = np.loadtxt(THETA_PREFIX + basename + '_' + str(run) +
+                              os.extsep + 'txt', skiprows = 1, ndmin = 2)
+    dzA_values = np.loadtxt(DZA_PREFIX + basename + '_' + str(run) +
+                            os.extsep + 'txt', skiprows = 1, ndmin = 2)
+    return (theta_values, dzA_values)
+
+
+def run_ee_parallel(G, outcome_vector, basename, param_func_list, labels,
+                    num_runs, processes = None,
+                    EEiterations    = 50000,
+                    learningRate = 0.01,
+                    sampler_func = basicALAAMsampler,
+                    seed = None,
+                    use_mple = False,
+                    stopping_rule = None):
+    """Run num_runs independent estimations using EE algorithm in
+    parallel with multiple processes, with supplied Graph (or Digraph
+    or BipartiteGraph) object and outcome attribute vector (list).
+
+    This does the same as running run_ee() (or run_on_network_attr())
+    with run numbers 0..num_runs-1 (e.g. with GNU parallel or a SLURM
+    job array), but using multiple processes on a single computer,
+    with the graph loaded only once (and shared by the worker processes
+    where the fork start method is available, see worker_pool() in
+    parallelWorkers.py).
+
+    Parameters:
+         G                 - Graph (or Digraph or BipartiteGraph) object
+                             containing network and node covariates and
+                             any snowball sampling zone information.
+         outcome_vector    - list of binary (0 or 1) outcome variables,
+                             corresponding to nodes in G
+         basename          - basename for theta and dzA output files
+                             theta_values_<basename>_<run>.txt and
+                             dzA_values_<basename>_<run>.txt
+         param_func_list   - list of change statistic functions corresponding
+                             to parameters to estimate
+         labels            - list of strings corresponding to param_func_list
+                             to label output (header line)
+         num_runs          - number of (independent) EE runs
+         processes         - number of worker processes. Default None
+                             in which case os.cpu_count() is used.
+         EEiterations     - Number of iterations of the EE algorithm.
+                            Default 50000.
+         learningRate        - learning rate (step size multiplier, a)
+                               defult 0.01
+         sampler_func        - ALAAM sampler function with signature
+                               (G, A, changestats_func_list, theta, performMove,
+                                sampler_m); see basicALAAMsampler.py
+                               default basicALAAMsampler
+         seed             - seed for the random number generators, from
+                            which a different seed for each run is
+                            generated. Default None for unpredictable seeds.
+         use_mple         - if True, use the MPLE rather than Algorithm S
+                            for the initial estimate (see run_ee()).
+                            Default False.
+         stopping_rule    - EEStoppingRule object to stop each EE run
+                            early (each run uses its own copy), or None
+                            (see run_ee()). Default None.
+
+    Return value:
+         list of num_runs tuples (theta_values, dzA_values), one for
+         each run, where theta_values is the numpy array of the theta
+         values (columns t, each parameter in labels, AcceptanceRate)
+         and dzA_values the numpy array of the dzA values (columns t,
+         each parameter in labels), i.e. the contents of the output files.
+
+    Write output to theta_values_<basename>_<run>.txt and
+                    dzA_values_<basename>_<run>.txt
+    for run = 0, 1, ..., num_runs-1.
+    WARNING: these files are overwritten.
+
+    """
+    # build the change statistics table before creating the worker
+    # processes, so they get it with G rather than each building it
+    getChangeStatisticsTable(G, param_func_list)
+    seedseqs = np.random.SeedSequence(seed).spawn(num_runs)
+    with worker_pool(processes, (G, outcome_vector, basename,
+                                 param_func_list, labels, EEiterations,
+                                 learningRate, sampler_func, use_mple,
+                                 stopping_rule)) as pool:
+        results = pool.starmap(_run_ee_parallel_worker,
+                               zip(range(num_runs), seedseqs))
+    return results
@@ -44,12 +44,15 @@ from utils import int_or_na,NA_VALUE
 from Graph import Graph
 from Digraph import Digraph
 from BipartiteGraph import BipartiteGraph,MODE_A,MODE_B
+from CSRGraph import CSRGraph,load_graph_cached
 from changeStatisticsALAAM import *
 from changeStatisticsALAAMbipartite import *
 from changeStatisticsALAAMdirected import *
 from stochasticApproximation import stochasticApproximation
+from initialEstimator import algorithm_MPLE
 from computeObservedStatistics import computeObservedStatistics
 from gofALAAM import gof
+from checkpoint import save_checkpoint,load_checkpoint
 from basicALAAMsampler import basicALAAMsampler
 from bipartiteALAAMsampler import bipartiteALAAMsampler
 from simulateALAAM import rand_bin_array
@@ -69,7 +72,16 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
                         bipartiteGoFfixedMode = None,
                         add_gof_param_func_list = None,
                         outputGoFstatsFilename = None,
-                        outputObsStatsFilename = None
+                        outputObsStatsFilename = None,
+                        binary_cache = False,
+                        use_mple = False,
+                        num_chains = 1,
+                        ensemble_sampler_func = None,
+                        GoFnum_chains = 1,
+                        GoFprocesses = None,
+                        checkpoint_filename = None,
+                        checkpoint_interval = 100,
+                        resume_from = None
                         ):
     """Run estimation using stochastic approximation algorithm
     on specified network with binary and/or continuous and
@@ -127,6 +139,31 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
                                  WARNING: file overwritten.
          outputObsStatsFilename- Filename to write observed statistics to or
                                  None. Default None. WARNING: file overwritten.
+         binary_cache    - Default False.
+                           If True then load the network (and attributes)
+                           from the binary cache next to the network file,
+                           creating it if it does not exist or is out of
+                           date (see CSRGraph.load_graph_cached()).
+         use_mple        - Default False.
+                           If True then start the stochastic approximation
+                           from the maximum pseudo-likelihood estimate
+                           (MPLE) rather than zero (see run_sa()).
+         num_chains      - number of chains for phases 1 and 3 of the
+                           stochastic approximation (see run_sa()).
+                           Default 1.
+         ensemble_sampler_func - ensemble ALAAM sampler function used
+                           if num_chains > 1, or None (see run_sa()).
+                           Default None.
+         GoFnum_chains   - number of independent chains for GoF
+                           (see run_sa()). Default 1.
+         GoFprocesses    - number of worker processes for GoF
+                           (see run_sa()). Default None.
+         checkpoint_filename - filename to save checkpoints to, or None
+                           (see run_sa()). Default None.
+         checkpoint_interval - number of phase 2 iterations between
+                           checkpoints (see run_sa()). Default 100.
+         resume_from     - filename of checkpoint to resume from, or None
+                           (see run_sa()). Default None.
 
     Writes output to stdout.
 
@@ -136,7 +173,11 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
     assert not (bipartiteGoFfixedMode is not None and not bipartite)
     assert not (zone_filename is not None and bipartite)
 
-    if directed:
+    if binary_cache:
+        G = load_graph_cached(edgelist_filename, binattr_filename,
+                              contattr_filename, catattr_filename,
+                              zone_filename, directed, bipartite)
+    elif directed:
         if bipartite:
             raise Exception("directed bipartite network not suppored")
         G = Digraph(edgelist_filename, binattr_filename, contattr_filename,
@@ -161,7 +202,15 @@ def run_on_network_attr(edgelist_filename, param_func_list, labels,
            bipartiteGoFfixedMode = bipartiteGoFfixedMode,
            add_gof_param_func_list = add_gof_param_func_list,
            outputGoFstatsFilename = outputGoFstatsFilename,
-           outputObsStatsFilename = outputObsStatsFilename)
+           outputObsStatsFilename = outputObsStatsFilename,
+           use_mple = use_mple,
+           num_chains = num_chains,
+           ensemble_sampler_func = ensemble_sampler_func,
+           GoFnum_chains = GoFnum_chains,
+           GoFprocesses = GoFprocesses,
+           checkpoint_filename = checkpoint_filename,
+           checkpoint_interval = checkpoint_interval,
+           resume_from = resume_from)
 
 
 
@@ -212,7 +261,15 @@ def run_sa(G, outcome_vector, param_func_list, labels,
            bipartiteGoFfixedMode = None,
            add_gof_param_func_list = None,
            outputGoFstatsFilename = None,
-           outputObsStatsFilename = None
+           outputObsStatsFilename = None,
+           use_mple = False,
+           num_chains = 1,
+           ensemble_sampler_func = None,
+           GoFnum_chains = 1,
+           GoFprocesses = None,
+           checkpoint_filename = None,
+           checkpoint_interval = 100,
+           resume_from = None
            ):
     """Run estimation using stochastic approximation algorithm with
     supplied Graph (or Digraph or BipartiteGraph) object (which also
@@ -256,6 +313,39 @@ def run_sa(G, outcome_vector, param_func_list, labels,
                                  WARNING: file overwritten.
          outputObsStatsFilename- Filename to write observed statistics to or
                                  None. Default None. WARNING: file overwritten.
+         use_mple          - if True, start the stochastic approximation
+                             from the maximum pseudo-likelihood estimate
+                             (MPLE, see initialEstimator.algorithm_MPLE())
+                             rather than zero. Zero is still used if
+                             the MPLE does not exist. Default False.
+         num_chains        - number of chains to run together with
+                             ensemble_sampler_func in phases 1 and 3 of
+                             the stochastic approximation. Default 1.
+         ensemble_sampler_func - ensemble ALAAM sampler function (see
+                             ensembleALAAMsampler.py) updating the same
+                             nodes as sampler_func, used if num_chains > 1,
+                             or None to use ensembleConditionalALAAMsampler
+                             if G has snowball sampling zones, otherwise
+                             ensembleALAAMsampler. Default None.
+         GoFnum_chains     - number of independent chains, run in
+                             parallel processes, for GoF (see gofALAAM.gof()).
+                             Default 1.
+         GoFprocesses      - number of worker processes for GoF when
+                             GoFnum_chains > 1. Default None
+                             in which case os.cpu_count() is used.
+         checkpoint_filename - filename to save the state of the
+                             stochastic approximation (see checkpoint.py)
+                             to, at the start of each subphase of phase 2
+                             and every checkpoint_interval iterations in
+                             it, and at the start of phase 3, so the
+                             estimation can be resumed (with resume_from)
+                             if it is stopped, or None. Default None.
+                             WARNING: file overwritten.
+         checkpoint_interval - number of phase 2 iterations between
+                             checkpoints. Default 100.
+         resume_from       - filename of checkpoint to resume the
+                             estimation from, continuing exactly where the
+                             checkpoint was saved, or None. Default None.
 
     Writes output to stdout.
 
@@ -282,12 +372,37 @@ def run_sa(G, outcome_vector, param_func_list, labels,
     Zobs = computeObservedStatistics(G, A, param_func_list)
     print('Zobs = ', Zobs)
 
-    theta = np.zeros(len(param_func_list))
+    resume_state = None
+    if resume_from is not None:
+        resume_state = load_checkpoint(resume_from, 'SA', labels)
+
+    theta = None
+    if use_mple and resume_state is None:
+        print('Computing MPLE...')
+        start = time.time()
+        (theta, mple_std_error) = algorithm_MPLE(G, A, param_func_list)
+        print('MPLE took', time.time() - start, 's')
+        if theta is not None:
+            print('           ',labels)
+            print('MPLE theta     =', theta)
+            print('MPLE std_error =', mple_std_error)
+    if theta is None:
+        theta = np.zeros(len(param_func_list))
 
     estimation_start = time.time()
     max_runs = 20
     i = 0
     converged = False
+    if resume_state is not None:
+        i = resume_state['run'] - 1
+        print('Resuming stochastic approximation from', resume_from)
+
+    checkpoint_func = None
+    if checkpoint_filename is not None:
+        checkpoint_func = lambda state: save_checkpoint(
+            checkpoint_filename,
+            dict(state, algorithm = 'SA', labels = list(labels), run = i))
+
     while i < max_runs and not converged:
         i += 1
         print('Running stochastic approximation (run', i,' of at most',max_runs,')...')
@@ -295,7 +410,13 @@ def run_sa(G, outcome_vector, param_func_list, labels,
         (theta, std_error, t_ratio) = stochasticApproximation(G, A,
                                                               param_func_list,
                                                               theta, Zobs,
-                                                              sampler_func) 
+                                                              sampler_func,
+                                                              num_chains,
+                                                              ensemble_sampler_func,
+                                                              checkpoint_func,
+                                                              checkpoint_interval,
+                                                              resume_state)
+        resume_state = None
 
         print('Stochastic approximation took',time.time() - start, 's')
         if theta is None:
@@ -395,7 +516,9 @@ def run_sa(G, outcome_vector, param_func_list, labels,
                         bipartiteFixedMode = bipartiteGoFfixedMode,
                         outputStatsFilename = outputGoFstatsFilename,
                         outputObsStatsFilename = outputObsStatsFilename,
-                        labels = goflabels)
+                        labels = goflabels,
+                        num_chains = GoFnum_chains,
+                        processes = GoFprocesses)
         print('GoF took',time.time() - start, 's')
         print('           ',goflabels)
         print('t_ratios = ',gofresult[0])
@@ -412,6 +535,8 @@ def run_sa(G, outcome_vector, param_func_list, labels,
                          ('Mahalanobis_distance', gofresult[1]))
         print()
 
-        if isinstance(G, BipartiteGraph):
+        if isinstance(G, CSRGraph):
+            print("twoPaths cache size: ", len(G.twopaths_cache))
+        elif isinstance(G, BipartiteGraph):
             print("twoPaths cache info: ", G.twoPaths.cache_info())
     
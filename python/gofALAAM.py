@@ -18,14 +18,18 @@
   influence processes. Psychometrika, 66(2):161-189, 2001.
 """
 import math
+import os
 import numpy as np         # used for matrix & vector data types and functions
 import sys
 
 from Graph import Graph,NA_VALUE,int_or_na
+from utils import RunningMeanCovariance
 from changeStatisticsALAAM import *
 from simulateALAAM import simulateALAAM
 from computeObservedStatistics import computeObservedStatistics
 from basicALAAMsampler import basicALAAMsampler
+from ChangeStatisticsTable import getChangeStatisticsTable
+from parallelWorkers import worker_pool,get_worker_args,seed_samplers
 
 
 def gof(G, Aobs, changestats_func_list, theta, numSamples = 1000,
@@ -34,7 +38,10 @@ def gof(G, Aobs, changestats_func_list, theta, numSamples = 1000,
         bipartiteFixedMode = None,
         outputStatsFilename = None,
         outputObsStatsFilename = None,
-        labels = None
+        labels = None,
+        num_chains = 1,
+        processes = None,
+        seed = None
         ):
     """
     ALAAM goodness-of-fit by simulating from estimated parameters, and 
@@ -75,6 +82,21 @@ def gof(G, Aobs, changestats_func_list, theta, numSamples = 1000,
                                outputStatsFilename.. Default None.
                                Must be set if outputStatsFilename or
                                outputObsStatsFilename is not None.
+       num_chains            - number of independent chains to divide the
+                               numSamples samples between, each with its
+                               own burn-in. If more than 1, the chains
+                               are run in parallel by multiple processes
+                               (sharing the graph), and the potential
+                               scale reduction factor (R-hat) of each
+                               statistic is printed as a between-chain
+                               convergence diagnostic. Default 1.
+       processes             - number of worker processes when
+                               num_chains > 1. Default None
+                               in which case os.cpu_count() is used.
+       seed                  - seed for the random number generators, from
+                               which a different seed for each chain is
+                               generated, when num_chains > 1.
+                               Default None for unpredictable seeds.
 
     Return value:
        tuple(tratios, mdist) where
@@ -86,8 +108,9 @@ def gof(G, Aobs, changestats_func_list, theta, numSamples = 1000,
     assert len(theta) == n
     assert not ((outputStatsFilename is not None or
                  outputObsStatsFilename is not None) and labels is None)
+    assert num_chains == 1 or numSamples >= 2 * num_chains
 
-    print('Gof numSamples =', numSamples, 'iterationInStep =', iterationInStep, 'burnIn = ', burnIn)
+    print('Gof numSamples =', numSamples, 'iterationInStep =', iterationInStep, 'burnIn = ', burnIn, 'num_chains =', num_chains)
 
     # Calculate observed statistics by summing change stats for each 1 variable
     Zobs = computeObservedStatistics(G, Aobs, changestats_func_list)
@@ -98,44 +121,160 @@ def gof(G, Aobs, changestats_func_list, theta, numSamples = 1000,
             outfile.write(' '.join(labels) + '\n')
             outfile.write(' '.join([str(z) for z in Zobs]) + '\n')
 
-    # Compute simulated outcome vector statistics from MCMC
+    if num_chains == 1:
+        Zstats = simulated_statistics(G, Aobs, changestats_func_list, theta,
+                                      numSamples, sampler_func, Ainitial,
+                                      iterationInStep, burnIn,
+                                      bipartiteFixedMode, outputStatsFilename,
+                                      labels)
+    else:
+        # each chain writes its simulated statistics to its own file,
+        # which are then concatenated
+        chain_filenames = [None] * num_chains
+        if outputStatsFilename is not None:
+            chain_filenames = [outputStatsFilename + os.extsep + str(chain)
+                               for chain in range(num_chains)]
+        chain_numSamples = [len(x) for x in
+                            np.array_split(np.arange(numSamples), num_chains)]
+        # build the change statistics table before creating the worker
+        # processes, so they get it with G rather than each building it
+        getChangeStatisticsTable(G, changestats_func_list)
+        seedseqs = np.random.SeedSequence(seed).spawn(num_chains)
+        with worker_pool(processes, (G, Aobs, changestats_func_list, theta,
+                                     sampler_func, Ainitial, iterationInStep,
+                                     burnIn, bipartiteFixedMode,
+                                     labels)) as pool:
+            chain_stats = pool.starmap(_gof_worker,
+                                       zip(chain_numSamples, chain_filenames,
+                                           seedseqs))
+        if outputStatsFilename is not None:
+            with open(outputStatsFilename, 'w') as outfile:
+                for (chain, filename) in enumerate(chain_filenames):
+                    with open(filename) as infile:
+                        if chain > 0:
+                            infile.readline() # skip header line
+                        for line in infile:
+                            outfile.write(line)
+                    os.remove(filename)
+        Zstats = RunningMeanCovariance(n)
+        for stats in chain_stats:
+            Zstats.merge(stats)
+        print('R-hat      =', potential_scale_reduction(chain_stats))
+
+    assert Zstats.count == numSamples
+    return gof_from_moments(Zobs, Zstats)
+
+
+def simulated_statistics(G, Aobs, changestats_func_list, theta, numSamples,
+                         sampler_func, Ainitial, iterationInStep, burnIn,
+                         bipartiteFixedMode, outputStatsFilename, labels):
+    """
+    Simulate from the ALAAM for gof(), consuming the samples as they are
+    generated, keeping only the running mean and covariance of the
+    statistics (and writing each sample to the simulated statistics file,
+    if output filename provided), so the memory used does not depend on
+    numSamples.
+
+    Parameters:
+       As for gof()
+
+    Return value:
+       RunningMeanCovariance object of the simulated statistics
+    """
     sim_results = simulateALAAM(G, changestats_func_list,  theta,
                                 numSamples, iterationInStep, burnIn,
                                 sampler_func, Ainitial,
                                 bipartiteFixedMode, Aobs)
-
-    # write simulated statistics if output filename provided
+    Zstats = RunningMeanCovariance(len(changestats_func_list))
+    outfile = None
     if outputStatsFilename is not None:
-        # sim_results is an iterator from simulateALAAM() so convert
-        # to list since we need to use it again below in computing t-ratios etc
-        # only include the parts we need (notably not simvec which might
-        # use a lot of memory)
+        outfile = open(outputStatsFilename, 'w')
+        outfile.write(' '.join(['t'] + labels + ['acceptance_rate']) + '\n')
+    try:
         # simulateALAAM() yields tuples (simvec,stats,acceptance_rate,t)
-        sim_results = [(None, r[1], r[2], r[3]) for r in sim_results]
-        with open(outputStatsFilename, 'w') as outfile:
-            outfile.write(' '.join(['t'] + labels +
-                                   ['acceptance_rate']) + '\n')
-            for (simvec, stats, acceptance_rate, t) in sim_results:
+        for (simvec, stats, acceptance_rate, t) in sim_results:
+            Zstats.update(stats)
+            if outfile is not None:
                 outfile.write(' '.join([str(t)] +
                                        [str(x) for x in list(stats)] +
                                        [str(acceptance_rate)]) + '\n')
+    finally:
+        if outfile is not None:
+            outfile.close()
+    return Zstats
+
+
+def _gof_worker(numSamples, outputStatsFilename, seedseq):
+    """
+    Run one chain of gof() in a worker process.
+
+    Parameters:
+       numSamples          - number of samples in this chain
+       outputStatsFilename - filename to write simulated statistics to
+                             or None
+       seedseq             - numpy.random.SeedSequence for this chain
+
+    Return value:
+       RunningMeanCovariance object of the simulated statistics
+    """
+    (G, Aobs, changestats_func_list, theta, sampler_func, Ainitial,
+     iterationInStep, burnIn, bipartiteFixedMode, labels) = get_worker_args()
+    seed_samplers(seedseq)
+    return simulated_statistics(G, Aobs, changestats_func_list, theta,
+                                numSamples, sampler_func, Ainitial,
+                                iterationInStep, burnIn, bipartiteFixedMode,
+                                outputStatsFilename, labels)
+
+
+def potential_scale_reduction(chain_stats):
+    """
+    Gelman-Rubin potential scale reduction factor (R-hat) of each
+    statistic, comparing the between-chain and within-chain variances.
+    Values much larger than 1 (e.g. > 1.1) indicate the chains have not
+    converged to the same distribution.
+
+    A. Gelman and D. B. Rubin. Inference from iterative simulation using
+    multiple sequences. Statistical Science, 7(4):457-472, 1992.
 
-    # simulateALAAM() return list of tuples (simvec,stats,acceptance_rate,t)
-    # convert to matrix where each row is sample, each column is statistic
-    Zmatrix = np.stack([r[1] for r in sim_results])
-    assert(np.shape(Zmatrix) == (numSamples, n))
-    Zmean = np.mean(Zmatrix, axis=0)
-    Zsd = np.std(Zmatrix, axis=0)
-    print('Zmatrix = ',Zmatrix) #XXX
+    Parameters:
+       chain_stats - list of RunningMeanCovariance objects, one for each
+                     chain (each with at least 2 samples)
+
+    Return value:
+       numpy vector of R-hat values, one for each statistic (NaN if the
+       statistic is constant)
+    """
+    n = np.mean([stats.count for stats in chain_stats])
+    W = np.mean([stats.variance(ddof = 1) for stats in chain_stats], axis=0)
+    B_over_n = np.var([stats.mean for stats in chain_stats], axis=0, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(((n - 1) / n * W + B_over_n) / W)
+
+
+def gof_from_moments(Zobs, Zstats):
+    """
+    Compute the goodness-of-fit t-ratios and Mahalanobis distance of the
+    observed statistics from the mean and covariance of the simulated
+    statistics.
+
+    Parameters:
+       Zobs   - numpy vector of observed statistics
+       Zstats - RunningMeanCovariance object of the simulated statistics
+
+    Return value:
+       tuple(tratios, mdist) as for gof()
+    """
+    Zmean = Zstats.mean
+    Zsd = np.sqrt(Zstats.variance())
     print('obs stats  =', Zobs)
     print('mean stats =', Zmean)
     print('sd stats   =', Zsd)
-    
+
     # compute t-statistics
     tratio = (Zmean - Zobs) / Zsd
 
     # compute Mahalanobis distance
-    mahaldist = mahalanobis(Zobs, Zmatrix)
+    mahaldist = mahalanobis_from_moments(Zobs, Zmean, Zstats.covariance())
 
     return (tratio,mahaldist)
 
@@ -157,6 +296,22 @@ def mahalanobis(u, X):
     # rowvar=False means each column is a variable, each row is an observation
     # in computing the covariance matrix
     Sigma = np.cov(X, rowvar = False)
+    return mahalanobis_from_moments(u, colmeans, Sigma)
+
+
+def mahalanobis_from_moments(u, colmeans, Sigma):
+    """
+    Mahalanobis distance of the observation vector u from the distribution
+    with the given mean and covariance matrix.
+
+    Parameters:
+       u        - numpy vector of observation
+       colmeans - numpy vector of mean of distribution
+       Sigma    - covariance matrix of distribution
+
+    Return value:
+      Mahalanobis distance of u from distribution
+    """
     try:
         SigmaInv = np.linalg.inv(Sigma) # inverse covariance matrix
     except np.linalg.LinAlgError:
@@ -167,4 +322,3 @@ def mahalanobis(u, X):
     diffmean = u - colmeans
     Dsquared = np.dot(np.dot(diffmean, SigmaInv), diffmean) # diffmean^T*SimaInv*diffmean
     return math.sqrt(Dsquared)
-
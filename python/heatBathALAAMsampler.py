@@ -0,0 +1,330 @@
+#
+# File:    heatBathALAAMsampler.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Heat-bath (Gibbs) ALAAM MCMC sampler. Instead of proposing to toggle
+   the outcome of a node and accepting the proposal with the Metropolis
+   probability min(1, exp(+/-theta * changestats)) as the basic sampler
+   (basicALAAMsampler.py) does, the heat-bath sampler sets the outcome of
+   the node to 1 with its conditional probability given the outcomes of
+   all the other nodes, 1 / (1 + exp(-theta * changestats)), where the
+   change statistics are those for changing the outcome of the node
+   from 0 to 1. There are therefore no rejected proposals as such: the
+   "acceptance rate" returned is the fraction of updates that changed
+   the outcome, and the change statistics for those changes are
+   accumulated exactly as for accepted moves in the Metropolis samplers,
+   so this can be used as the sampler function for estimation and
+   simulation.
+
+   The node to update is either chosen uniformly at random (random scan),
+   or taken in turn from a random permutation of the nodes computed once
+   and then repeated (systematic scan), continuing from where the
+   previous call left off (the SystematicScan object is cached on the
+   graph). A sweep of systematic-scan updates visits every node exactly
+   once, which generally mixes better than the same number of
+   random-scan updates, some of which hit the same node again while
+   others miss nodes altogether.
+
+   As in the batch sampler (batchALAAMsampler.py) the random numbers are
+   drawn in blocks from a numpy.random.Generator.
+
+  The ALAAM is described in:
+
+  G. Daraganova and G. Robins. Autologistic actor attribute models. In
+  D. Lusher, J. Koskinen, and G. Robins, editors, Exponential Random
+  Graph Models for Social Networks, chapter 9, pages 102-114. Cambridge
+  University Press, New York, 2013.
+
+  G. Robins, P. Pattison, and P. Elliott. Network models for social
+  influence processes. Psychometrika, 66(2):161-189, 2001.
+
+  The random and systematic scan Gibbs samplers are compared in:
+
+  G. O. Roberts and S. K. Sahu. Updating schemes, correlation structure,
+  blocking and parameterization for the Gibbs sampler. Journal of the
+  Royal Statistical Society: Series B, 59(2):291-317, 1997.
+
+"""
+
+import math
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import NA_VALUE
+from BipartiteGraph import MODE_A,MODE_B
+from ChangeStatisticsTable import getChangeStatisticsTable
+from batchALAAMsampler import BLOCK_SIZE
+import batchALAAMsampler
+from conditionalALAAMsampler import getInnerNodesNotNA
+
+
+class SystematicScan:
+    """A random permutation of a set of nodes, and the position in it of
+    the next node to be updated, so that the nodes can be updated in the
+    same order repeatedly, across calls of the sampler.
+    """
+
+    def __init__(self, nodes, rng):
+        """
+        Construct the scan for the nodes
+
+        Parameters:
+           nodes - numpy array of nodes to update
+           rng   - numpy.random.Generator used for the permutation
+        """
+        self.nodes = np.array(nodes) # copy of the nodes the scan is for
+        self.order = rng.permutation(self.nodes)
+        self.pos = 0
+
+
+    def nextNodes(self, m):
+        """
+        Return the next m nodes in the scan order (wrapping around to
+        the start of the permutation at the end of each sweep)
+
+        Parameters:
+           m  - number of nodes
+
+        Return value:
+           numpy array of m nodes
+        """
+        block = self.order[(self.pos + np.arange(m)) % len(self.order)]
+        self.pos = (self.pos + m) % len(self.order)
+        return block
+
+
+
+def getSystematicScan(G, nodes, rng):
+    """
+    Return the SystematicScan for the nodes, using the one cached on G
+    if it is for the same nodes, otherwise constructing (and caching)
+    a new one.
+
+    Parameters:
+       G     - Graph object for network (fixed)
+       nodes - numpy array of nodes to update
+       rng   - numpy.random.Generator used for the permutation
+
+    Return value:
+       SystematicScan object for the nodes
+    """
+    scan = getattr(G, 'systematic_scan', None)
+    if scan is None or not np.array_equal(scan.nodes, nodes):
+        scan = SystematicScan(nodes, rng)
+        G.systematic_scan = scan
+    return scan
+
+
+def heatBathALAAMsamplerNodes(nodes, G, A, changestats_func_list, theta,
+                              performMove, sampler_m, rng = None,
+                              systematic = False):
+    """
+    heatBathALAAMsamplerNodes - sample from ALAAM distribution with
+                                heat-bath updates of the specified
+                                array of nodes
+
+    Parameters:
+       nodes               - numpy array of nodes that can be updated
+                             (outcome must not be NA for any of them)
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+       systematic          - if True, update the nodes in the order of
+                             a fixed random permutation (systematic scan)
+                             rather than choosing each one uniformly at
+                             random (random scan). Default False.
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    if len(nodes) == 0:
+        raise Exception("no nodes with outcome not NA to sample")
+    if rng is None:
+        rng = batchALAAMsampler.default_rng
+    if systematic:
+        scan = getSystematicScan(G, nodes, rng)
+    n = len(changestats_func_list)
+    changed = 0
+    changeTo1ChangeStats = np.zeros(n)
+    changeTo0ChangeStats = np.zeros(n)
+    changestats = np.zeros(n)
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    nbrcounts = cstable.activeNeighbourCounts(G, A)
+    k = 0
+    while k < sampler_m:
+        blocksize = min(BLOCK_SIZE, sampler_m - k)
+        # convert to lists so elements are Python int and float,
+        # much faster than numpy scalars when used one at a time
+        if systematic:
+            node_block = scan.nextNodes(blocksize).tolist()
+        else:
+            node_block = nodes[rng.integers(len(nodes), size=blocksize)].tolist()
+        u_block = rng.random(blocksize).tolist()
+        for (i, u) in zip(node_block, u_block):
+            wasOne = (A[i] == 1)
+            if wasOne:
+                A[i] = 0
+
+            # change statistics (into the changestats buffer) for
+            # changing the outcome of node i from 0 to 1
+            cstable.changeStats(G, A, i, nbrcounts, changestats)
+            # probability that the outcome of node i is 1 given all the
+            # others is the logistic function of theta * changestats,
+            # written with tanh so it never overflows
+            p1 = 0.5 * (1.0 + math.tanh(0.5 * np.dot(theta, changestats)))
+            isOne = (u < p1)
+            if isOne != wasOne:
+                changed += 1
+                if isOne:
+                    changeTo1ChangeStats += changestats
+                else:
+                    changeTo0ChangeStats += changestats
+                if performMove:
+                    # if changing to 0, we have already done it.
+                    if isOne:
+                        A[i] = 1
+                    if nbrcounts is not None:
+                        nbrcounts.update(G, A, i)
+                elif wasOne:
+                    # not actually performing the moves so restore A
+                    A[i] = 1
+            elif wasOne: # outcome not changed, so reverse change
+                A[i] = 1
+        k += blocksize
+
+    acceptance_rate = float(changed) / sampler_m
+    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
+
+
+def heatBathALAAMsampler(G, A, changestats_func_list, theta, performMove,
+                         sampler_m, rng = None, systematic = False):
+    """
+    heatBathALAAMsampler - sample from ALAAM distribution with heat-bath
+                           (Gibbs) sampler
+
+    Use e.g. partial(heatBathALAAMsampler, systematic = True) as the
+    sampler function for the systematic scan version.
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+       systematic          - if True, systematic scan, otherwise random
+                             scan. Default False.
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    nodes = np.nonzero(np.asarray(A) != NA_VALUE)[0]
+    return heatBathALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                     theta, performMove, sampler_m, rng,
+                                     systematic)
+
+
+def heatBathBipartiteALAAMsampler(mode, G, A, changestats_func_list, theta,
+                                  performMove, sampler_m, rng = None,
+                                  systematic = False):
+    """
+    heatBathBipartiteALAAMsampler - sample from ALAAM distribution on
+                                    bipartite network with heat-bath
+                                    (Gibbs) sampler
+
+    Only the outcome variables for nodes in the given mode are varied.
+    As for bipartiteALAAMsampler(), use e.g.
+    partial(heatBathBipartiteALAAMsampler, MODE_A) as the sampler
+    function.
+
+    Parameters:
+       mode                - network mode (node type) MODE_A or MODE_B
+                             on which the outcome variables in A are defined.
+       G                   - BipartiteGraph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+       systematic          - if True, systematic scan, otherwise random
+                             scan. Default False.
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    assert mode in [MODE_A, MODE_B]
+    if mode == MODE_A:
+        (first, last) = (0, G.num_A_nodes)
+    else:
+        (first, last) = (G.num_A_nodes, G.numNodes())
+    nodes = first + np.nonzero(np.asarray(A)[first:last] != NA_VALUE)[0]
+    return heatBathALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                     theta, performMove, sampler_m, rng,
+                                     systematic)
+
+
+def heatBathConditionalALAAMsampler(G, A, changestats_func_list, theta,
+                                    performMove, sampler_m, rng = None,
+                                    systematic = False):
+    """
+    heatBathConditionalALAAMsampler - sample from ALAAM distribution with
+                                      heat-bath (Gibbs) sampler,
+                                      conditional on snowball sampling
+                                      structure (only the inner wave
+                                      nodes are updated)
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of node updates (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+       systematic          - if True, systematic scan, otherwise random
+                             scan. Default False.
+
+    Returns:
+        acceptance_rate     - fraction of node updates that changed outcome
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    return heatBathALAAMsamplerNodes(getInnerNodesNotNA(G, A), G, A,
+                                     changestats_func_list, theta,
+                                     performMove, sampler_m, rng, systematic)
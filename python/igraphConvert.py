@@ -26,7 +26,8 @@ import igraph
 from Graph import Graph
 from Digraph import Digraph
 from BipartiteGraph import BipartiteGraph
-from utils import NA_VALUE
+from utils import NA_VALUE,attribute_columns
+from utils import BINATTR_DTYPE,CATATTR_DTYPE,CONTATTR_DTYPE
 
 def convert_to_int_cat(attrs):
     """
@@ -122,7 +123,14 @@ def fromIgraph(g):
             raise ValueError('Unsupported type ' +
                              str(type(g.vs[attrname][0])) +
                              ' for vertex attribute ' + attrname)
-        
+
+    # the attributes are stored as numpy arrays (see Graph.py)
+    if gnew.binattr is not None:
+        gnew.binattr = attribute_columns(gnew.binattr, BINATTR_DTYPE)
+    if gnew.contattr is not None:
+        gnew.contattr = attribute_columns(gnew.contattr, CONTATTR_DTYPE)
+    if gnew.catattr is not None:
+        gnew.catattr = attribute_columns(gnew.catattr, CATATTR_DTYPE)
     return gnew
 
 
@@ -151,15 +159,16 @@ def toIgraph(g):
                           directed = isinstance(g, Digraph))
 
     # Now convert vertex attributes
-    # Use list() or list comprehension to make sure it is a copy not reference
+    # Use tolist() or list comprehension to make sure it is a copy not
+    # reference (and has Python rather than numpy types)
     if g.binattr is not None:
         for attrname in g.binattr.keys():
             gi.vs[attrname] = [bool(x) for x in g.binattr[attrname]]
     if g.contattr is not None:
         for attrname in g.contattr.keys():
-            gi.vs[attrname] = list(g.contattr[attrname])
+            gi.vs[attrname] = g.contattr[attrname].tolist()
     if g.catattr is not None:
         for attrname in g.catattr.keys():
-            gi.vs[attrname] = list(g.catattr[attrname])
+            gi.vs[attrname] = g.catattr[attrname].tolist()
         
     return gi
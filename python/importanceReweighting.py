@@ -0,0 +1,191 @@
+#
+# File:    importanceReweighting.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Importance reweighting of simulated ALAAM statistics to other
+   parameter values.
+
+   Since the ALAAM is an exponential family, the statistics Z of
+   outcome vectors sampled with parameters theta are sufficient to
+   estimate the expected value of any function of the statistics under
+   the model with other parameters theta', by weighting each sample
+   with
+
+       w = exp((theta' - theta) * Z) / sum over samples of exp((theta' - theta) * Z)
+
+   (self-normalized importance sampling, so the normalizing constants of
+   the two distributions are not needed). This lets e.g. the mean
+   statistics at a dense grid of theta values be estimated from
+   simulations at only a sparse set of theta values.
+
+   The estimates are only reliable if theta' is close enough to theta
+   that the weights are not dominated by a few samples. This is measured
+   by the (Kish) effective sample size of the weights
+
+       ESS = 1 / sum of w^2
+
+   which is the number of samples if all the weights are equal. Note
+   that this does not account for the autocorrelation of the samples in
+   the Markov chain, so it is the fraction ESS / (number of samples) that
+   should be considered, along with the effective sample size of the
+   samples themselves (utils.effective_sample_size()).
+
+   Reference:
+
+   C. J. Geyer and E. A. Thompson. Constrained Monte Carlo maximum
+   likelihood for dependent data. Journal of the Royal Statistical
+   Society, Series B, 54(3):657-699, 1992.
+
+"""
+
+import numpy as np         # used for matrix & vector data types and functions
+
+
+class ReweightedSamples:
+    """The statistics of outcome vectors sampled from the ALAAM with
+    parameters theta, for importance reweighting to other parameters.
+    Only the statistics are kept, not the outcome vectors.
+    """
+
+    def __init__(self, theta, Zmatrix = None):
+        """
+        Construct the sample set, initially with the rows of Zmatrix
+        (or empty if None)
+
+        Parameters:
+           theta   - numpy vector of theta values the samples are from
+           Zmatrix - numpy array of statistics, one row per sample, or None
+        """
+        self.theta = np.array(theta, dtype=np.float64)
+        self.Zlist = [] if Zmatrix is None else list(np.asarray(Zmatrix,
+                                                                dtype=np.float64))
+        self.Zmatrix = None  # cached np.array of Zlist
+
+
+    @classmethod
+    def fromSimulation(cls, theta, sim_iterator):
+        """
+        Construct the sample set from all the samples from a simulation
+        i.e. the (A, Z, acceptance_rate, t) tuples yielded by
+        simulateALAAM.simulateALAAM()
+
+        Parameters:
+           theta        - numpy vector of theta values simulated with
+           sim_iterator - iterable of (A, Z, acceptance_rate, t) tuples
+
+        Return value:
+           ReweightedSamples object
+        """
+        samples = cls(theta)
+        for (A, Z, acceptance_rate, t) in sim_iterator:
+            samples.add(Z)
+        return samples
+
+
+    def add(self, Z):
+        """
+        Add the statistics of a sample
+
+        Parameters:
+           Z - numpy vector of statistics of sample
+        """
+        self.Zlist.append(np.array(Z, dtype=np.float64))
+        self.Zmatrix = None
+
+
+    def numSamples(self):
+        """
+        Return the number of samples
+        """
+        return len(self.Zlist)
+
+
+    def getZmatrix(self):
+        """
+        Return the numpy array of the statistics, one row per sample
+        """
+        if self.Zmatrix is None:
+            self.Zmatrix = np.array(self.Zlist)
+        return self.Zmatrix
+
+
+    def weights(self, target_theta):
+        """
+        Return the normalized importance weights of the samples for
+        target_theta.
+
+        Parameters:
+           target_theta - numpy vector of theta values to reweight to
+
+        Return value:
+           numpy vector of weights (summing to 1), one for each sample
+        """
+        Zmatrix = self.getZmatrix()
+        logw = Zmatrix @ (np.asarray(target_theta, dtype=np.float64) -
+                          self.theta)
+        w = np.exp(logw - np.max(logw))  # subtract max to avoid overflow
+        return w / np.sum(w)
+
+
+    def estimate(self, target_theta, min_ess_fraction = 0.1):
+        """
+        Estimate the mean and variance of the statistics under the
+        ALAAM with parameters target_theta
+
+        Parameters:
+           target_theta     - numpy vector of theta values to reweight to
+           min_ess_fraction - minimum effective sample size, as a
+                              fraction of the number of samples, for the
+                              estimate to be considered reliable.
+                              Default 0.1.
+
+        Return value:
+           tuple (mean, variance, ess, reliable) where
+             mean is numpy vector of the estimated mean statistics
+             variance is numpy vector of the estimated variances of the
+               statistics
+             ess is the effective sample size of the weights
+             reliable is True if ess >= min_ess_fraction * number of samples
+        """
+        assert self.numSamples() > 0
+        Zmatrix = self.getZmatrix()
+        w = self.weights(target_theta)
+        mean = w @ Zmatrix
+        variance = w @ (Zmatrix - mean)**2
+        ess = 1.0 / np.sum(w**2)
+        reliable = bool(ess >= min_ess_fraction * self.numSamples())
+        return (mean, variance, ess, reliable)
+
+
+
+def reweight_theta_grid(samples_list, theta_grid, min_ess_fraction = 0.1):
+    """
+    Estimate the mean and variance of the statistics at each point of
+    a grid of theta values from the samples at a (sparser) set of
+    theta values, using for each point the sample set with the largest
+    effective sample size for it.
+
+    Parameters:
+       samples_list     - list of ReweightedSamples objects
+       theta_grid       - sequence of theta vectors e.g. 2d numpy array
+                          with one row for each grid point
+       min_ess_fraction - minimum effective sample size, as a fraction
+                          of the number of samples, for the estimate to
+                          be considered reliable. Default 0.1.
+
+    Return value:
+       list of tuples (mean, variance, ess, reliable, samples), one for each
+       point in theta_grid, where (mean, variance, ess, reliable) is
+       from ReweightedSamples.estimate() and samples is the
+       ReweightedSamples object it was estimated from
+    """
+    results = []
+    for target_theta in theta_grid:
+        best = None
+        for samples in samples_list:
+            est = samples.estimate(target_theta, min_ess_fraction)
+            if best is None or est[2] > best[2]:
+                best = est + (samples,)
+        results.append(best)
+    return results
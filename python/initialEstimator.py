@@ -18,13 +18,30 @@
     large network data". Scientific Reports 8:11509
     doi:10.1038/s41598-018-29725-8
 
+ Alternatively, the maximum pseudo-likelihood estimate (MPLE) can be
+ used as the initial estimate (algorithm_MPLE()). For ALAAM this is
+ just the logistic regression of the outcome of each node on its
+ change statistics (given the outcomes of all the other nodes), so
+ requires no MCMC simulation, and is usually a much better starting
+ point than Algorithm S. The pseudo-likelihood for ALAAM is described
+ in:
+
+  G. Robins, P. Pattison, and P. Elliott. Network models for social
+  influence processes. Psychometrika, 66(2):161-189, 2001.
+
 """
 
+import sys
 import numpy as np         # used for matrix & vector data types and functions
 
 from Graph import Graph
+from utils import NA_VALUE
 from changeStatisticsALAAM import *
 from basicALAAMsampler import basicALAAMsampler
+from conditionalALAAMsampler import getInnerNodesNotNA
+from ChangeStatisticsTable import getChangeStatisticsTable
+from CSRGraph import getCSRGraph
+from directStatistics import get_direct_change_statistic
 
 
 #
@@ -89,4 +106,142 @@ def algorithm_S(G, A, changestats_func_list, M1, theta_outfile,
                             + ' ' + str(acceptance_rate) + '\n')
     Dmean = sampler_m / D0
     return(theta, Dmean)
-        
+
+
+
+def mple_design_matrix(G, A, changestats_func_list, nodes):
+    """
+    Return the design matrix for the pseudo-likelihood: the change
+    statistics for changing the outcome of each node to 1, given the
+    outcomes of all the other nodes.
+
+    The change statistics that do not depend on the outcome vector are
+    taken from the ChangeStatisticsTable (which computes them for all
+    nodes at once), and those for which there is a function computing
+    them for all nodes at once (see directStatistics.py) are computed
+    with it, using the CSR version of G; only the others are computed
+    node by node.
+
+    Parameters:
+        G                   - Graph object for graph to estimate
+        A                   - vector of 0/1 outcome variables for ALAAM
+        changestats_func_list - list of change statistics funcions
+        nodes               - numpy array of the nodes to use
+
+    Return value:
+        len(nodes) x n numpy matrix where n is the number of change
+        statistics, row k is the change statistics for nodes[k]
+    """
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    X = cstable.table[nodes]   # (fancy indexing makes a copy)
+    delta_funcs = [(l, get_direct_change_statistic(func))
+                   for (l, func) in cstable.dynamic_funcs
+                   if get_direct_change_statistic(func) is not None]
+    if delta_funcs:
+        Gcsr = getCSRGraph(G)
+        for (l, delta_func) in delta_funcs:
+            X[:, l] = delta_func(Gcsr, A)[nodes]
+    delta_indices = [l for (l, delta_func) in delta_funcs]
+    toggle_funcs = [(l, func) for (l, func) in cstable.dynamic_funcs
+                    if l not in delta_indices]
+    if toggle_funcs:
+        # list rather than numpy array as much faster to index one
+        # element at a time
+        Awork = np.asarray(A).tolist()
+        for (k, i) in enumerate(nodes.tolist()):
+            # change statistic for outcome of i from 0 to 1 with all
+            # other outcomes fixed at their observed values
+            a = Awork[i]
+            Awork[i] = 0
+            for (l, func) in toggle_funcs:
+                X[k, l] = func(G, Awork, i)
+            Awork[i] = a
+    return X
+
+
+def algorithm_MPLE(G, A, changestats_func_list, theta_outfile = None,
+                   nodes = None, max_iterations = 100, tolerance = 1e-8):
+    """
+
+     Maximum pseudo-likelihood estimate (MPLE), as an alternative to
+     Algorithm S for the initial estimate.
+
+     The conditional probability that the outcome of node i is 1,
+     given the outcomes of all the other nodes, is
+     1 / (1 + exp(-theta . delta_i)) where delta_i is the vector of
+     change statistics for changing the outcome of i from 0 to 1. So
+     the MPLE is the logistic regression of the outcomes on the
+     change statistics, which is found by Newton-Raphson iteration.
+
+     Parameters:
+        G                   - Graph object for graph to estimate
+        A                   - vector of 0/1 outcome variables for ALAAM
+        changestats_func_list - list of change statistics funcions
+        theta_outfile       - open for write file to write theta values
+                              (one line for each Newton-Raphson iteration,
+                              with negative iteration numbers as for
+                              Algorithm S) or None. Default None.
+        nodes               - numpy array of the nodes to use. Default
+                              None to use all nodes with outcome not NA
+                              (only those in the inner waves if G has
+                              snowball sampling zones, as for
+                              conditionalALAAMsampler()).
+        max_iterations      - maximum number of Newton-Raphson iterations.
+                              Default 100.
+        tolerance           - stop when no element of the Newton-Raphson
+                              step is larger than this. Default 1e-8.
+
+     Returns:
+       tuple with:
+         theta               - numpy vector of MPLE theta values
+         std_error           - numpy vector of the (pseudo-likelihood)
+                               standard errors; note these are
+                               known to be underestimated so are not
+                               useful for inference, only as a guide.
+       or (None, None) if the MPLE does not exist (e.g. the outcomes
+       are separated by the change statistics) or the Newton-Raphson
+       iterations did not converge.
+
+    """
+    if nodes is None:
+        if G.zone is not None:
+            nodes = getInnerNodesNotNA(G, A)
+        else:
+            nodes = np.nonzero(np.asarray(A) != NA_VALUE)[0]
+    X = mple_design_matrix(G, A, changestats_func_list, nodes)
+    y = (np.asarray(A)[nodes] == 1).astype(float)
+    n = len(changestats_func_list)
+    theta = np.zeros(n)
+    theta_values = []
+    converged = False
+    for t in range(max_iterations):
+        # logistic function, written with tanh so it does not overflow
+        p = 0.5 * (1 + np.tanh(0.5 * (X @ theta)))
+        gradient = X.T @ (y - p)
+        hessian = (X.T * (p * (1 - p))) @ X
+        # least squares rather than solve so a singular Hessian (e.g.
+        # when the outcomes are separated) does not raise an exception
+        theta_step = np.linalg.lstsq(hessian, gradient, rcond = None)[0]
+        theta = theta + theta_step
+        theta_values.append(theta)
+        if np.max(np.abs(theta_step), initial = 0) < tolerance:
+            converged = True
+            break
+    p = 0.5 * (1 + np.tanh(0.5 * (X @ theta)))
+    hessian = (X.T * (p * (1 - p))) @ X
+    # if the outcomes are (quasi-)separated by the change statistics, the
+    # MPLE does not exist: theta diverges and the fitted probabilities
+    # go to 0 or 1, so the Hessian becomes singular
+    if (not converged or not np.all(np.isfinite(theta)) or
+        np.linalg.matrix_rank(hessian) < n):
+        sys.stderr.write("WARNING: MPLE does not exist or did not converge "
+                         "(possibly separation, or degenerate model)\n")
+        return (None, None)
+    std_error = np.sqrt(np.diag(np.linalg.inv(hessian)))
+    if theta_outfile is not None:
+        for (t, theta_t) in enumerate(theta_values):
+            # no sampler so there is no acceptance rate
+            theta_outfile.write(str(t - len(theta_values)) + ' ' +
+                                ' '.join([str(x) for x in theta_t]) +
+                                ' NaN\n')
+    return (theta, std_error)
@@ -0,0 +1,295 @@
+#
+# File:    jitALAAMsampler.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Compiled versions of the basic, bipartite, and conditional ALAAM
+   MCMC samplers, for CSR graphs (see CSRGraph.py). A node is chosen
+   uniformly at random and its outcome binary variable value toggled,
+   drawing the random numbers in blocks exactly as the batch sampler
+   does (batchALAAMsampler.py), but the loop over the proposals in each
+   block, and the change statistics that depend on the outcome vector,
+   are computed by kernels compiled with Numba (see jitChangeStatistics.py).
+   The change statistics that do not depend on the outcome vector are
+   just looked up in the ChangeStatisticsTable.
+
+   Numba is optional: if it is not installed (or the graph is not a CSR
+   graph, or there is no kernel for one of the change statistics) these
+   samplers just use batchALAAMsamplerNodes(), which gives the same
+   results with the same random number generator, but more slowly.
+
+  The ALAAM is described in:
+
+  G. Daraganova and G. Robins. Autologistic actor attribute models. In
+  D. Lusher, J. Koskinen, and G. Robins, editors, Exponential Random
+  Graph Models for Social Networks, chapter 9, pages 102-114. Cambridge
+  University Press, New York, 2013.
+
+  G. Robins, P. Pattison, and P. Elliott. Network models for social
+  influence processes. Psychometrika, 66(2):161-189, 2001.
+
+"""
+
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import NA_VALUE
+from BipartiteGraph import MODE_A,MODE_B
+from ChangeStatisticsTable import getChangeStatisticsTable
+from batchALAAMsampler import BLOCK_SIZE,batchALAAMsamplerNodes,getNodesNotNA
+import batchALAAMsampler
+from conditionalALAAMsampler import getInnerNodesNotNA
+from jitChangeStatistics import HAVE_NUMBA,njit,get_kernel_model,change_stat_kernel
+
+
+@njit(cache=True)
+def sampler_kernel(node_block, logu_block, A, performMove, theta, table,
+                   dynamic, codes, params, cols, modes, graph, attrs,
+                   changestats, changeTo1ChangeStats, changeTo0ChangeStats):
+    """
+    The loop over the proposals in one block of the sampler, the same
+    as in batchALAAMsamplerNodes(), with the change statistics in the
+    dynamic array of indices computed with the kernels, and the others
+    copied from the row of the ChangeStatisticsTable matrix.
+
+    Return value:
+       number of accepted proposals
+    """
+    n = len(theta)
+    accepted = 0
+    for k in range(len(node_block)):
+        i = node_block[k]
+        isChangeToZero = (A[i] == 1)
+        if isChangeToZero:
+            A[i] = 0
+        for l in range(n):
+            changestats[l] = table[i, l]
+        for l in dynamic:
+            changestats[l] = change_stat_kernel(codes[l], params[l], cols[l],
+                                                modes[l], i, A, graph, attrs)
+        total = 0.0
+        for l in range(n):
+            total += theta[l] * changestats[l]
+        if isChangeToZero:
+            total = -total
+        if logu_block[k] < total:
+            accepted += 1
+            if performMove:
+                # if changing to 0, we have already done it.
+                if not isChangeToZero:
+                    A[i] = 1
+            elif isChangeToZero:
+                A[i] = 1
+            if isChangeToZero:
+                for l in range(n):
+                    changeTo0ChangeStats[l] += changestats[l]
+            else:
+                for l in range(n):
+                    changeTo1ChangeStats[l] += changestats[l]
+        elif isChangeToZero: # move not accepted, so reverse change
+            A[i] = 1
+    return accepted
+
+
+def kernelALAAMsamplerNodes(nodes, G, A, changestats_func_list, theta,
+                            performMove, sampler_m, rng = None):
+    """
+    kernelALAAMsamplerNodes - sample from ALAAM distribution with basic
+                              sampler, choosing nodes uniformly at random
+                              from the specified array of nodes, with
+                              the change statistic and sampler kernels
+
+    This always uses the kernels, even if Numba is not installed (when it
+    is very slow), so it can be tested against batchALAAMsamplerNodes().
+    Use jitALAAMsamplerNodes() instead, which only uses the kernels
+    if they are compiled.
+
+    Parameters:
+       nodes               - numpy array of nodes that can be chosen
+                             (outcome must not be NA for any of them)
+       G                   - CSRGraph, CSRDigraph or CSRBipartiteGraph
+                             object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+                                (there must be a kernel for each one
+                                that depends on the outcome vector)
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC move,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    if len(nodes) == 0:
+        raise Exception("no nodes with outcome not NA to sample")
+    if rng is None:
+        rng = batchALAAMsampler.default_rng
+    model = get_kernel_model(G, changestats_func_list)
+    if model is None:
+        raise ValueError("no change statistic kernels for this graph and change statistics")
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    dynamic = np.array([l for (l, func) in cstable.dynamic_funcs],
+                       dtype=np.int64)
+    n = len(changestats_func_list)
+    # (theta may be a 1 x n matrix, as in stochasticApproximation.py)
+    theta = np.asarray(theta, dtype=np.float64).ravel()
+    changeTo1ChangeStats = np.zeros(n)
+    changeTo0ChangeStats = np.zeros(n)
+    changestats = np.zeros(n)
+    # the kernels need A as a numpy array; if it is not one (e.g. a list)
+    # then copy it, and copy the result back at the end
+    Aarray = A if isinstance(A, np.ndarray) else np.array(A, dtype=np.int64)
+    accepted = 0
+    k = 0
+    while k < sampler_m:
+        blocksize = min(BLOCK_SIZE, sampler_m - k)
+        node_block = nodes[rng.integers(len(nodes), size=blocksize)]
+        # log(1 - U) is log of uniform on (0, 1] so never log(0)
+        logu_block = np.log1p(-rng.random(blocksize))
+        accepted += sampler_kernel(node_block, logu_block, Aarray,
+                                   performMove, theta, cstable.table,
+                                   dynamic, model.codes, model.params,
+                                   model.cols, model.modes, model.graph,
+                                   model.attrs, changestats,
+                                   changeTo1ChangeStats, changeTo0ChangeStats)
+        k += blocksize
+    if Aarray is not A and performMove:
+        A[:] = Aarray.tolist()
+
+    acceptance_rate = float(accepted) / sampler_m
+    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
+
+
+def jitALAAMsamplerNodes(nodes, G, A, changestats_func_list, theta,
+                         performMove, sampler_m, rng = None):
+    """
+    jitALAAMsamplerNodes - sample from ALAAM distribution with basic
+                           sampler, choosing nodes uniformly at random
+                           from the specified array of nodes
+
+    Uses kernelALAAMsamplerNodes() if Numba is installed and there
+    are kernels for the graph and change statistics, otherwise
+    batchALAAMsamplerNodes(). The parameters and return value are the
+    same as those functions.
+    """
+    if HAVE_NUMBA and get_kernel_model(G, changestats_func_list) is not None:
+        return kernelALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                       theta, performMove, sampler_m, rng)
+    else:
+        return batchALAAMsamplerNodes(nodes, G, A, changestats_func_list,
+                                      theta, performMove, sampler_m, rng)
+
+
+def jitALAAMsampler(G, A, changestats_func_list, theta, performMove,
+                    sampler_m, rng = None):
+    """
+    jitALAAMsampler - sample from ALAAM distribution with basic sampler,
+                      compiled version of batchALAAMsampler()
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC move,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    return jitALAAMsamplerNodes(getNodesNotNA(G, A), G, A,
+                                changestats_func_list, theta,
+                                performMove, sampler_m, rng)
+
+
+def jitBipartiteALAAMsampler(mode, G, A, changestats_func_list, theta,
+                             performMove, sampler_m, rng = None):
+    """
+    jitBipartiteALAAMsampler - sample from ALAAM distribution on bipartite
+                               network with basic sampler, compiled
+                               version of bipartiteALAAMsampler()
+
+    Only the outcome variables for nodes in the given mode are varied.
+    As for bipartiteALAAMsampler(), use e.g.
+    partial(jitBipartiteALAAMsampler, MODE_A) as the sampler function.
+
+    Parameters:
+       mode                - network mode (node type) MODE_A or MODE_B
+                             on which the outcome variables in A are defined.
+       G                   - BipartiteGraph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC move,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    assert mode in [MODE_A, MODE_B]
+    if mode == MODE_A:
+        (first, last) = (0, G.num_A_nodes)
+    else:
+        (first, last) = (G.num_A_nodes, G.numNodes())
+    nodes = first + np.nonzero(np.asarray(A)[first:last] != NA_VALUE)[0]
+    return jitALAAMsamplerNodes(nodes, G, A, changestats_func_list, theta,
+                                performMove, sampler_m, rng)
+
+
+def jitConditionalALAAMsampler(G, A, changestats_func_list, theta,
+                               performMove, sampler_m, rng = None):
+    """
+    jitConditionalALAAMsampler - sample from ALAAM distribution with
+                                 basic sampler, conditional on snowball
+                                 sampling structure, compiled version
+                                 of conditionalALAAMsampler()
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC move,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    return jitALAAMsamplerNodes(getInnerNodesNotNA(G, A), G, A,
+                                changestats_func_list, theta, performMove,
+                                sampler_m, rng)
@@ -0,0 +1,896 @@
+#
+# File:    jitChangeStatistics.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Compiled kernels for the built-in undirected, directed and
+bipartite ALAAM change statistics, operating directly on the CSR
+arrays of CSRGraph, CSRDigraph and CSRBipartiteGraph (see CSRGraph.py).
+
+If Numba (https://numba.pydata.org/) is installed, the kernels are
+compiled with numba.njit, and are used by the compiled sampler loop in
+jitALAAMsampler.py. If Numba is not installed, the kernels are still
+defined (as ordinary Python functions, which is very slow), so that they
+can be tested, but the samplers just use the Python change statistic
+functions (see HAVE_NUMBA). The change statistic functions in
+changeStatisticsALAAM.py, changeStatisticsALAAMdirected.py and
+changeStatisticsALAAMbipartite.py remain the reference implementations.
+
+Each kernel does the same operations in the same order as the
+corresponding Python change statistic function does on a CSR graph
+(neighbours in sorted order), so the results are identical, not just
+close, to those from the Python functions.
+
+A list of change statistic functions is converted to the arrays used
+by the kernels with get_kernel_model(): each function is identified
+(after removing functools.partial() arguments) in the
+KERNEL_CHANGESTATS table, which gives the integer code of the
+kernel and the kinds of the arguments applied with partial()
+(the bipartite mode, attribute name, or decay etc. parameter).
+"""
+
+import functools
+import math
+import numpy as np         # used for matrix & vector data types and functions
+
+import changeStatisticsALAAM
+import changeStatisticsALAAMdirected
+import changeStatisticsALAAMbipartite
+from utils import NA_VALUE,BINATTR_DTYPE,CATATTR_DTYPE,CONTATTR_DTYPE,same_func_list
+from BipartiteGraph import MODE_A,MODE_B
+from CSRGraph import CSRGraph,CSRDigraph,CSRBipartiteGraph
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    def njit(*args, **kwargs):
+        """Used instead of numba.njit if Numba is not installed:
+        just returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Kinds of graph the change statistic kernels can be used for
+UNDIRECTED = 0   # CSRGraph (including CSRBipartiteGraph)
+DIRECTED   = 1   # CSRDigraph
+BIPARTITE  = 2   # CSRBipartiteGraph only
+ANY        = 3   # only uses the node attributes, so any CSR graph
+
+# Codes for the change statistic kernels
+# undirected
+DENSITY                          = 0
+ACTIVITY                         = 1
+TWOSTAR                          = 2
+THREESTAR                        = 3
+PARTNER_ACTIVITY_TWOPATH         = 4
+TRIANGLE_T1                      = 5
+CONTAGION                        = 6
+INDIRECT_PARTNER_ATTRIBUTE       = 7
+PARTNER_ATTRIBUTE_ACTIVITY       = 8
+PARTNER_PARTNER_ATTRIBUTE        = 9
+TRIANGLE_T2                      = 10
+TRIANGLE_T3                      = 11
+OOB                              = 12
+O_OB                             = 13
+OOC                              = 14
+O_OC                             = 15
+OO_OSAME                         = 16
+OO_OSAME_CONTAGION               = 17
+OO_ODIFF                         = 18
+GW_ACTIVITY                      = 19
+SAME_PARTNER_ACTIVITY_TWOPATH    = 20
+DIFF_PARTNER_ACTIVITY_TWOPATH    = 21
+SAME_INDIRECT_PARTNER_ATTRIBUTE  = 22
+DIFF_INDIRECT_PARTNER_ATTRIBUTE  = 23
+ALTER_BINARY_TWOSTAR1            = 24
+ALTER_BINARY_TWOSTAR2            = 25
+GW_CONTAGION                     = 26
+LOG_CONTAGION                    = 27
+POWER_CONTAGION                  = 28
+# bipartite
+BIPARTITE_FOURCYCLE1             = 40
+BIPARTITE_FOURCYCLE2             = 41
+# directed
+SENDER                           = 60
+RECEIVER                         = 61
+RECIPROCITY                      = 62
+EGO_IN_TWOSTAR                   = 63
+EGO_IN_THREESTAR                 = 64
+EGO_OUT_TWOSTAR                  = 65
+EGO_OUT_THREESTAR                = 66
+MIXED_TWOSTAR                    = 67
+MIXED_TWOSTAR_SOURCE             = 68
+MIXED_TWOSTAR_SINK               = 69
+DIRECTED_CONTAGION               = 70
+CONTAGION_RECIPROCITY            = 71
+TRANSITIVE_TRIANGLE_T1           = 72
+TRANSITIVE_TRIANGLE_T3           = 73
+TRANSITIVE_TRIANGLE_D1           = 74
+TRANSITIVE_TRIANGLE_U1           = 75
+CYCLIC_TRIANGLE_C1               = 76
+CYCLIC_TRIANGLE_C3               = 77
+ALTER_IN_TWOSTAR2                = 78
+ALTER_OUT_TWOSTAR2               = 79
+SENDER_MATCH                     = 80
+RECEIVER_MATCH                   = 81
+RECIPROCITY_MATCH                = 82
+SENDER_MISMATCH                  = 83
+RECEIVER_MISMATCH                = 84
+RECIPROCITY_MISMATCH             = 85
+GW_SENDER                        = 86
+GW_RECEIVER                      = 87
+DIRECTED_GW_CONTAGION            = 88
+DIRECTED_LOG_CONTAGION           = 89
+DIRECTED_POWER_CONTAGION         = 90
+
+
+# Change statistic functions for which there are kernels. For each
+# function, the value is a tuple (code, graph kind, argument kinds)
+# where the argument kinds are the kinds of the arguments before G,
+# which are applied with functools.partial(): 'mode' for the bipartite
+# mode (MODE_A or MODE_B), 'binattr', 'contattr' or 'catattr' for the
+# name of a binary, continuous or categorical attribute, and 'param'
+# for a numeric parameter (e.g. alpha for GWActivity).
+KERNEL_CHANGESTATS = {
+    # undirected
+    changeStatisticsALAAM.changeDensity : (DENSITY, ANY, ()),
+    changeStatisticsALAAM.changeActivity : (ACTIVITY, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeTwoStar : (TWOSTAR, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeThreeStar : (THREESTAR, UNDIRECTED, ()),
+    changeStatisticsALAAM.changePartnerActivityTwoPath :
+      (PARTNER_ACTIVITY_TWOPATH, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeTriangleT1 : (TRIANGLE_T1, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeContagion : (CONTAGION, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeIndirectPartnerAttribute :
+      (INDIRECT_PARTNER_ATTRIBUTE, UNDIRECTED, ()),
+    changeStatisticsALAAM.changePartnerAttributeActivity :
+      (PARTNER_ATTRIBUTE_ACTIVITY, UNDIRECTED, ()),
+    changeStatisticsALAAM.changePartnerPartnerAttribute :
+      (PARTNER_PARTNER_ATTRIBUTE, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeTriangleT2 : (TRIANGLE_T2, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeTriangleT3 : (TRIANGLE_T3, UNDIRECTED, ()),
+    changeStatisticsALAAM.changeoOb : (OOB, ANY, ('binattr',)),
+    changeStatisticsALAAM.changeo_Ob : (O_OB, UNDIRECTED, ('binattr',)),
+    changeStatisticsALAAM.changeoOc : (OOC, ANY, ('contattr',)),
+    changeStatisticsALAAM.changeo_Oc : (O_OC, UNDIRECTED, ('contattr',)),
+    changeStatisticsALAAM.changeoO_Osame :
+      (OO_OSAME, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeoO_OsameContagion :
+      (OO_OSAME_CONTAGION, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeoO_Odiff :
+      (OO_ODIFF, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeGWActivity :
+      (GW_ACTIVITY, UNDIRECTED, ('param',)),
+    changeStatisticsALAAM.changeSamePartnerActivityTwoPath :
+      (SAME_PARTNER_ACTIVITY_TWOPATH, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeDiffPartnerActivityTwoPath :
+      (DIFF_PARTNER_ACTIVITY_TWOPATH, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeSameIndirectPartnerAttribute :
+      (SAME_INDIRECT_PARTNER_ATTRIBUTE, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeDiffIndirectPartnerAttribute :
+      (DIFF_INDIRECT_PARTNER_ATTRIBUTE, UNDIRECTED, ('catattr',)),
+    changeStatisticsALAAM.changeAlterBinaryTwoStar1 :
+      (ALTER_BINARY_TWOSTAR1, UNDIRECTED, ('binattr',)),
+    changeStatisticsALAAM.changeAlterBinaryTwoStar2 :
+      (ALTER_BINARY_TWOSTAR2, UNDIRECTED, ('binattr',)),
+    changeStatisticsALAAM.changeGWContagion :
+      (GW_CONTAGION, UNDIRECTED, ('param',)),
+    changeStatisticsALAAM.changeLogContagion :
+      (LOG_CONTAGION, UNDIRECTED, ()),
+    changeStatisticsALAAM.changePowerContagion :
+      (POWER_CONTAGION, UNDIRECTED, ('param',)),
+    # bipartite: these are the undirected change statistics, but
+    # zero for nodes not in the given mode
+    changeStatisticsALAAMbipartite.changeBipartiteDensity :
+      (DENSITY, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteActivity :
+      (ACTIVITY, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteEgoTwoStar :
+      (TWOSTAR, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteEgoThreeStar :
+      (THREESTAR, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar1 :
+      (PARTNER_ACTIVITY_TWOPATH, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteAlterTwoStar2 :
+      (INDIRECT_PARTNER_ATTRIBUTE, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteFourCycle1 :
+      (BIPARTITE_FOURCYCLE1, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteFourCycle2 :
+      (BIPARTITE_FOURCYCLE2, BIPARTITE, ('mode',)),
+    changeStatisticsALAAMbipartite.changeBipartiteGWActivity :
+      (GW_ACTIVITY, BIPARTITE, ('mode', 'param')),
+    changeStatisticsALAAMbipartite.changeBpAlterSameTwoStar1 :
+      (SAME_PARTNER_ACTIVITY_TWOPATH, BIPARTITE, ('mode', 'catattr')),
+    changeStatisticsALAAMbipartite.changeBpAlterDiffTwoStar1 :
+      (DIFF_PARTNER_ACTIVITY_TWOPATH, BIPARTITE, ('mode', 'catattr')),
+    changeStatisticsALAAMbipartite.changeBpAlterSameTwoStar2 :
+      (SAME_INDIRECT_PARTNER_ATTRIBUTE, BIPARTITE, ('mode', 'catattr')),
+    changeStatisticsALAAMbipartite.changeBpAlterDiffTwoStar2 :
+      (DIFF_INDIRECT_PARTNER_ATTRIBUTE, BIPARTITE, ('mode', 'catattr')),
+    changeStatisticsALAAMbipartite.changeBpAlterBinaryTwoStar1 :
+      (ALTER_BINARY_TWOSTAR1, BIPARTITE, ('mode', 'binattr')),
+    changeStatisticsALAAMbipartite.changeBpAlterBinaryTwoStar2 :
+      (ALTER_BINARY_TWOSTAR2, BIPARTITE, ('mode', 'binattr')),
+    # directed
+    changeStatisticsALAAMdirected.changeSender : (SENDER, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeReceiver : (RECEIVER, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeReciprocity :
+      (RECIPROCITY, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeEgoInTwoStar :
+      (EGO_IN_TWOSTAR, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeEgoInThreeStar :
+      (EGO_IN_THREESTAR, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeEgoOutTwoStar :
+      (EGO_OUT_TWOSTAR, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeEgoOutThreeStar :
+      (EGO_OUT_THREESTAR, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeMixedTwoStar :
+      (MIXED_TWOSTAR, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeMixedTwoStarSource :
+      (MIXED_TWOSTAR_SOURCE, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeMixedTwoStarSink :
+      (MIXED_TWOSTAR_SINK, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeContagion :
+      (DIRECTED_CONTAGION, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeContagionReciprocity :
+      (CONTAGION_RECIPROCITY, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeTransitiveTriangleT1 :
+      (TRANSITIVE_TRIANGLE_T1, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeTransitiveTriangleT3 :
+      (TRANSITIVE_TRIANGLE_T3, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeTransitiveTriangleD1 :
+      (TRANSITIVE_TRIANGLE_D1, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeTransitiveTriangleU1 :
+      (TRANSITIVE_TRIANGLE_U1, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeCyclicTriangleC1 :
+      (CYCLIC_TRIANGLE_C1, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeCyclicTriangleC3 :
+      (CYCLIC_TRIANGLE_C3, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeAlterInTwoStar2 :
+      (ALTER_IN_TWOSTAR2, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeAlterOutTwoStar2 :
+      (ALTER_OUT_TWOSTAR2, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changeSenderMatch :
+      (SENDER_MATCH, DIRECTED, ('catattr',)),
+    changeStatisticsALAAMdirected.changeReceiverMatch :
+      (RECEIVER_MATCH, DIRECTED, ('catattr',)),
+    changeStatisticsALAAMdirected.changeReciprocityMatch :
+      (RECIPROCITY_MATCH, DIRECTED, ('catattr',)),
+    changeStatisticsALAAMdirected.changeSenderMismatch :
+      (SENDER_MISMATCH, DIRECTED, ('catattr',)),
+    changeStatisticsALAAMdirected.changeReceiverMismatch :
+      (RECEIVER_MISMATCH, DIRECTED, ('catattr',)),
+    changeStatisticsALAAMdirected.changeReciprocityMismatch :
+      (RECIPROCITY_MISMATCH, DIRECTED, ('catattr',)),
+    changeStatisticsALAAMdirected.changeGWSender :
+      (GW_SENDER, DIRECTED, ('param',)),
+    changeStatisticsALAAMdirected.changeGWReceiver :
+      (GW_RECEIVER, DIRECTED, ('param',)),
+    changeStatisticsALAAMdirected.changeGWContagion :
+      (DIRECTED_GW_CONTAGION, DIRECTED, ('param',)),
+    changeStatisticsALAAMdirected.changeLogContagion :
+      (DIRECTED_LOG_CONTAGION, DIRECTED, ()),
+    changeStatisticsALAAMdirected.changePowerContagion :
+      (DIRECTED_POWER_CONTAGION, DIRECTED, ('param',)),
+}
+
+
+class KernelModel:
+    """The arrays used by the change statistic kernels for a list of
+    change statistic functions on a CSR graph: for each change statistic,
+    the code of its kernel, its numeric parameter, the row of the
+    attribute matrix it uses, and its bipartite mode (0 for MODE_A,
+    1 for MODE_B, or -1 if not a bipartite statistic); and the graph
+    arrays and attribute matrices.
+    """
+
+    def __init__(self, G, changestats_func_list, codes, params, cols, modes,
+                 binattr, contattr, catattr):
+        """
+        Construct the kernel model. Use get_kernel_model() rather than
+        constructing this directly.
+
+        Parameters:
+           G                   - CSRGraph, CSRDigraph or CSRBipartiteGraph
+           changestats_func_list  - list of change statistics funcions
+           codes               - list of kernel codes
+           params              - list of numeric parameters
+           cols                - list of attribute matrix rows
+           modes               - list of bipartite modes (0, 1, or -1)
+           binattr             - list of binary attribute arrays used
+           contattr            - list of continuous attribute arrays used
+           catattr             - list of categorical attribute arrays used
+        """
+        N = G.numNodes()
+        self.changestats_func_list = tuple(changestats_func_list)
+        self.codes = np.array(codes, dtype=np.int64)
+        self.params = np.array(params, dtype=np.float64)
+        self.cols = np.array(cols, dtype=np.int64)
+        self.modes = np.array(modes, dtype=np.int64)
+        self.binattr = np.array(binattr, dtype=BINATTR_DTYPE).reshape(-1, N)
+        self.contattr = np.array(contattr, dtype=CONTATTR_DTYPE).reshape(-1, N)
+        self.catattr = np.array(catattr, dtype=CATATTR_DTYPE).reshape(-1, N)
+        empty = np.zeros(0, dtype=np.int32)
+        if isinstance(G, CSRDigraph):
+            (rev_indptr, rev_indices) = (G.rev_indptr, G.rev_indices)
+        else:
+            (rev_indptr, rev_indices) = (G.indptr, G.indices)
+        if isinstance(G, CSRBipartiteGraph):
+            num_A = G.num_A_nodes
+            tp_indptr = G.twoPathsMatrix.indptr
+            tp_indices = G.twoPathsMatrix.indices
+            tp_data = np.asarray(G.twoPathsMatrix.data, dtype=np.int64)
+        else:
+            num_A = N
+            (tp_indptr, tp_indices) = (empty, empty)
+            tp_data = np.zeros(0, dtype=np.int64)
+        self.graph = (G.indptr, G.indices, rev_indptr, rev_indices,
+                      tp_indptr, tp_indices, tp_data, num_A)
+        self.attrs = (self.binattr, self.contattr, self.catattr)
+
+    def changeStats(self, A, i, changestats = None):
+        """
+        Return numpy vector of the change statistics for node i
+        computed with the kernels.
+
+        Parameters:
+           A                   - numpy integer vector of 0/1 (or NA)
+                                 outcome variables for ALAAM
+           i                   - node to compute change statistics for
+           changestats         - numpy vector to put the change statistics
+                                 in, or None (default) to allocate a
+                                 new one.
+
+        Return value:
+           numpy vector of change statistics, corresponding to the
+           list of change statistics functions.
+        """
+        if changestats is None:
+            changestats = np.zeros(len(self.codes))
+        change_stats_kernel(self.codes, self.params, self.cols, self.modes,
+                            self.graph, self.attrs, A, i, changestats)
+        return changestats
+
+
+def graph_kind_ok(G, kind):
+    """
+    Return True if the change statistic kernel for graph kind
+    (UNDIRECTED, DIRECTED, BIPARTITE or ANY) can be used on G.
+    """
+    if kind == ANY:
+        return isinstance(G, (CSRGraph, CSRDigraph))
+    elif kind == UNDIRECTED:
+        return isinstance(G, CSRGraph)
+    elif kind == DIRECTED:
+        return isinstance(G, CSRDigraph)
+    else:
+        return isinstance(G, CSRBipartiteGraph)
+
+
+def make_kernel_model(G, changestats_func_list):
+    """
+    Return a new KernelModel for the list of change statistic functions
+    on G, or None if G is not a CSR graph or there is not a kernel
+    for one of the change statistics.
+
+    Parameters:
+       G                   - Graph (or Digraph or BipartiteGraph) object
+       changestats_func_list  - list of change statistics funcions
+
+    Return value:
+       KernelModel object or None
+    """
+    codes = []
+    params = []
+    cols = []
+    modes = []
+    attrlists = {'binattr' : [], 'contattr' : [], 'catattr' : []}
+    for func in changestats_func_list:
+        args = ()
+        while isinstance(func, functools.partial):
+            if func.keywords:
+                return None
+            args = func.args + args
+            func = func.func
+        spec = KERNEL_CHANGESTATS.get(func)
+        if spec is None:
+            return None
+        (code, kind, argkinds) = spec
+        if not graph_kind_ok(G, kind) or len(args) != len(argkinds):
+            return None
+        (param, col, mode) = (0.0, 0, -1)
+        for (argkind, arg) in zip(argkinds, args):
+            if argkind == 'mode':
+                assert arg in [MODE_A, MODE_B]
+                mode = 0 if arg == MODE_A else 1
+            elif argkind == 'param':
+                param = float(arg)
+            else:
+                attrs = getattr(G, argkind)
+                if attrs is None or arg not in attrs:
+                    return None
+                col = len(attrlists[argkind])
+                attrlists[argkind].append(attrs[arg])
+        codes.append(code)
+        params.append(param)
+        cols.append(col)
+        modes.append(mode)
+    return KernelModel(G, changestats_func_list, codes, params, cols, modes,
+                       attrlists['binattr'], attrlists['contattr'],
+                       attrlists['catattr'])
+
+
+def get_kernel_model(G, changestats_func_list):
+    """
+    Return the KernelModel for the graph G and the list of change
+    statistic functions, using the one cached on G if it was made for
+    the same change statistic functions, otherwise making it (and
+    replacing the one cached on G). Returns None if the kernels
+    cannot be used for G and these change statistics.
+
+    Parameters:
+       G                   - Graph (or Digraph or BipartiteGraph) object
+       changestats_func_list  - list of change statistics funcions
+
+    Return value:
+       KernelModel object for G and changestats_func_list, or None
+    """
+    model = getattr(G, 'kernel_model', None)
+    if model is None or not same_func_list(model.changestats_func_list,
+                                           changestats_func_list):
+        model = make_kernel_model(G, changestats_func_list)
+        if model is None:
+            return None
+        G.kernel_model = model
+    return model
+
+
+############################ kernels ########################################
+
+
+@njit(cache=True)
+def is_arc(indptr, indices, i, j):
+    """
+    Return True iff j is in the (sorted) row i of the CSR arrays,
+    i.e. arc i -> j (or edge i -- j), by binary search.
+    """
+    lo = indptr[i]
+    hi = indptr[i+1]
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if indices[mid] < j:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo < indptr[i+1] and indices[lo] == j
+
+
+@njit(cache=True)
+def contagion_kernel(indptr, indices, rev_indptr, rev_indices, A, i,
+                     code, param, delta):
+    """
+    The geometrically weighted, log, or power contagion change statistic
+    for the neighbours j of i in the indptr/indices CSR arrays and the
+    neighbours v of j in the rev_indptr/rev_indices arrays (which are
+    the same for undirected graphs). code is GW_CONTAGION,
+    LOG_CONTAGION or POWER_CONTAGION. The terms are added to delta
+    (in the same order as the Python functions) and the total returned.
+    """
+    diplus = 0
+    for k in range(indptr[i], indptr[i+1]):
+        j = indices[k]
+        djplus = 0
+        if A[j] == 1:
+            diplus += 1
+            for l in range(rev_indptr[j], rev_indptr[j+1]):
+                if A[rev_indices[l]] == 1:
+                    djplus += 1
+            if code == GW_CONTAGION:
+                delta += (math.exp(-param * (djplus + 1)) -
+                          math.exp(-param * djplus))
+            elif code == LOG_CONTAGION:
+                delta += math.log((djplus + 2) / (djplus + 1))
+            else:
+                delta += (math.pow(djplus + 1, 1/param) -
+                          math.pow(djplus, 1/param))
+    if code == GW_CONTAGION:
+        delta += math.exp(-param * diplus)
+    elif code == LOG_CONTAGION:
+        delta += math.log(diplus + 1)
+    else:
+        delta += math.pow(diplus, 1/param)
+    return delta
+
+
+@njit(cache=True)
+def undirected_kernel(code, param, col, i, A, graph, attrs):
+    """
+    Return the undirected (or bipartite four-cycle) change statistic
+    with the given kernel code for node i.
+    """
+    (indptr, indices, rev_indptr, rev_indices,
+     tp_indptr, tp_indices, tp_data, num_A) = graph
+    (binattr, contattr, catattr) = attrs
+    start = indptr[i]
+    end = indptr[i+1]
+    deg = np.int64(end - start)  # so products of degrees do not overflow
+    if code == DENSITY:
+        return 1.0
+    elif code == ACTIVITY:
+        return deg
+    elif code == TWOSTAR:
+        return (deg * (deg - 1))/2.0 if deg > 1 else 0.0
+    elif code == THREESTAR:
+        return deg * (deg - 1) * (deg - 2) / 6.0 if deg > 2 else 0.0
+    elif code == PARTNER_ACTIVITY_TWOPATH:
+        delta = 0
+        for k in range(start, end):
+            v = indices[k]
+            delta += indptr[v+1] - indptr[v] - 1
+        return delta
+    elif code == TRIANGLE_T1 or code == TRIANGLE_T2 or code == TRIANGLE_T3:
+        delta = 0
+        if deg < 2:
+            return 0.0
+        for k in range(start, end):
+            u = indices[k]
+            if code != TRIANGLE_T1 and A[u] != 1:
+                continue
+            for l in range(indptr[u], indptr[u+1]):
+                v = indices[l]
+                if (v != i and (code != TRIANGLE_T3 or A[v] == 1) and
+                    is_arc(indptr, indices, i, v)):
+                    delta += 1
+        return delta if code == TRIANGLE_T2 else delta / 2.0
+    elif code == CONTAGION:
+        delta = 0
+        for k in range(start, end):
+            if A[indices[k]] == 1:
+                delta += 1
+        return delta
+    elif code == INDIRECT_PARTNER_ATTRIBUTE:
+        delta = 0
+        for k in range(start, end):
+            u = indices[k]
+            for l in range(indptr[u], indptr[u+1]):
+                v = indices[l]
+                if v != i and A[v] == 1:
+                    delta += 1
+        return delta
+    elif code == PARTNER_ATTRIBUTE_ACTIVITY:
+        delta = 0
+        for k in range(start, end):
+            u = indices[k]
+            if A[u] == 1:
+                delta += deg + indptr[u+1] - indptr[u] - 2
+        return delta
+    elif code == PARTNER_PARTNER_ATTRIBUTE:
+        delta = 0
+        for k in range(start, end):
+            u = indices[k]
+            if A[u] == 1:
+                for l in range(indptr[u], indptr[u+1]):
+                    if A[indices[l]] == 1:
+                        delta += 2
+                for l in range(start, end):
+                    v = indices[l]
+                    if A[v] == 1 and v != u:
+                        delta += 1
+        return delta
+    elif code == OOB:
+        return 0 if binattr[col, i] == NA_VALUE else binattr[col, i]
+    elif code == O_OB:
+        delta = 0
+        for k in range(start, end):
+            u = indices[k]
+            delta += (0 if binattr[col, u] == NA_VALUE else
+                      np.int64(binattr[col, u]))
+        return delta
+    elif code == OOC:
+        return 0.0 if math.isnan(contattr[col, i]) else contattr[col, i]
+    elif code == O_OC:
+        delta = 0.0
+        for k in range(start, end):
+            u = indices[k]
+            delta += 0 if math.isnan(contattr[col, u]) else contattr[col, u]
+        return delta
+    elif code == GW_ACTIVITY:
+        return math.exp(-param * deg)
+    elif code == GW_CONTAGION or code == LOG_CONTAGION or code == POWER_CONTAGION:
+        return contagion_kernel(indptr, indices, indptr, indices, A, i,
+                                code, param, 0.0)
+    elif code == ALTER_BINARY_TWOSTAR1:
+        delta = 0
+        for k in range(start, end):
+            v = indices[k]
+            if binattr[col, v] != NA_VALUE and binattr[col, v] != 0:
+                delta += indptr[v+1] - indptr[v] - 1
+        return delta
+    elif code == ALTER_BINARY_TWOSTAR2:
+        delta = 0
+        for k in range(start, end):
+            u = indices[k]
+            if binattr[col, u] != NA_VALUE and binattr[col, u] != 0:
+                for l in range(indptr[u], indptr[u+1]):
+                    v = indices[l]
+                    if v != i and A[v] == 1:
+                        delta += 1
+        return delta
+    elif code == BIPARTITE_FOURCYCLE1 or code == BIPARTITE_FOURCYCLE2:
+        delta = 0.0
+        for k in range(tp_indptr[i], tp_indptr[i+1]):
+            if code == BIPARTITE_FOURCYCLE1 or A[tp_indices[k]] == 1:
+                p = tp_data[k]
+                delta += p * (p - 1) / 2
+        return delta
+    # the remaining statistics all use the categorical attribute,
+    # and are zero if it is NA for i
+    ci = catattr[col, i]
+    if ci == NA_VALUE:
+        return 0.0
+    delta = 0
+    if code == OO_OSAME or code == OO_OSAME_CONTAGION or code == OO_ODIFF:
+        for k in range(start, end):
+            u = indices[k]
+            cu = catattr[col, u]
+            if code == OO_ODIFF:
+                if cu != NA_VALUE and cu != ci:
+                    delta += 1
+            elif cu == ci and (code == OO_OSAME or A[u] == 1):
+                delta += 1
+        return delta
+    # two-path statistics i -- u -- v, v != i
+    for k in range(start, end):
+        u = indices[k]
+        for l in range(indptr[u], indptr[u+1]):
+            v = indices[l]
+            if v == i:
+                continue
+            cv = catattr[col, v]
+            if code == SAME_PARTNER_ACTIVITY_TWOPATH:
+                if cv == ci:
+                    delta += 1
+            elif code == DIFF_PARTNER_ACTIVITY_TWOPATH:
+                if cv != NA_VALUE and cv != ci:
+                    delta += 1
+            elif code == SAME_INDIRECT_PARTNER_ATTRIBUTE:
+                if A[v] == 1 and cv == ci:
+                    delta += 1
+            else: # DIFF_INDIRECT_PARTNER_ATTRIBUTE
+                if A[v] == 1 and cv != NA_VALUE and cv != ci:
+                    delta += 1
+    return delta
+
+
+@njit(cache=True)
+def directed_kernel(code, param, col, i, A, graph, attrs):
+    """
+    Return the directed change statistic with the given kernel code
+    for node i.
+    """
+    (indptr, indices, rev_indptr, rev_indices,
+     tp_indptr, tp_indices, tp_data, num_A) = graph
+    catattr = attrs[2]
+    start = indptr[i]
+    end = indptr[i+1]
+    rstart = rev_indptr[i]
+    rend = rev_indptr[i+1]
+    # int64 so products of degrees do not overflow
+    outdeg = np.int64(end - start)
+    indeg = np.int64(rend - rstart)
+    delta = 0
+    if code == SENDER:
+        return outdeg
+    elif code == RECEIVER:
+        return indeg
+    elif code == RECIPROCITY or code == CONTAGION_RECIPROCITY:
+        for k in range(start, end):
+            u = indices[k]
+            if ((code == RECIPROCITY or A[u] == 1) and
+                is_arc(indptr, indices, u, i)):
+                delta += 1
+        return delta
+    elif code == EGO_IN_TWOSTAR:
+        return (indeg * (indeg - 1))/2.0 if indeg > 1 else 0.0
+    elif code == EGO_IN_THREESTAR:
+        return indeg * (indeg - 1) * (indeg - 2) / 6.0 if indeg > 2 else 0.0
+    elif code == EGO_OUT_TWOSTAR:
+        return (outdeg * (outdeg - 1))/2.0 if outdeg > 1 else 0.0
+    elif code == EGO_OUT_THREESTAR:
+        return (outdeg * (outdeg - 1) * (outdeg - 2) / 6.0 if outdeg > 2
+                else 0.0)
+    elif code == MIXED_TWOSTAR:
+        # number of nodes that are both in- and out-neighbours of i
+        for k in range(start, end):
+            if is_arc(indptr, indices, indices[k], i):
+                delta += 1
+        return indeg * outdeg - delta
+    elif code == MIXED_TWOSTAR_SOURCE:
+        for k in range(start, end):
+            u = indices[k]
+            delta += (indptr[u+1] - indptr[u] -
+                      (1 if is_arc(indptr, indices, u, i) else 0))
+        return delta
+    elif code == MIXED_TWOSTAR_SINK:
+        for k in range(rstart, rend):
+            u = rev_indices[k]
+            delta += (rev_indptr[u+1] - rev_indptr[u] -
+                      (1 if is_arc(indptr, indices, i, u) else 0))
+        return delta
+    elif code == DIRECTED_CONTAGION:
+        for k in range(start, end):
+            if A[indices[k]] == 1:
+                delta += 1
+        for k in range(rstart, rend):
+            if A[rev_indices[k]] == 1:
+                delta += 1
+        return delta
+    elif code == TRANSITIVE_TRIANGLE_T1:
+        for k in range(start, end):
+            u = indices[k]
+            for l in range(rev_indptr[u], rev_indptr[u+1]):
+                v = rev_indices[l]
+                if v != i and is_arc(indptr, indices, v, i):
+                    delta += 1
+        return delta
+    elif code == TRANSITIVE_TRIANGLE_T3:
+        for k in range(start, end):
+            u = indices[k]
+            if A[u] == 1:
+                for l in range(indptr[u], indptr[u+1]):
+                    v = indices[l]
+                    if (v != i and is_arc(indptr, indices, i, v) and
+                        A[v] == 1):
+                        delta += 1
+        for k in range(start, end):
+            u = indices[k]
+            if A[u] == 1:
+                for l in range(rev_indptr[u], rev_indptr[u+1]):
+                    v = rev_indices[l]
+                    if (v != i and is_arc(indptr, indices, v, i) and
+                        A[v] == 1):
+                        delta += 1
+        for k in range(rstart, rend):
+            u = rev_indices[k]
+            if A[u] == 1:
+                for l in range(indptr[u], indptr[u+1]):
+                    v = indices[l]
+                    if (v != i and is_arc(indptr, indices, v, i) and
+                        A[v] == 1):
+                        delta += 1
+        return delta
+    elif code == TRANSITIVE_TRIANGLE_D1:
+        for k in range(start, end):
+            u = indices[k]
+            for l in range(indptr[u], indptr[u+1]):
+                v = indices[l]
+                if v != i and is_arc(indptr, indices, i, v):
+                    delta += 1
+        return delta
+    elif code == TRANSITIVE_TRIANGLE_U1:
+        for k in range(rstart, rend):
+            u = rev_indices[k]
+            for l in range(indptr[u], indptr[u+1]):
+                v = indices[l]
+                if v != i and is_arc(indptr, indices, v, i):
+                    delta += 1
+        return delta
+    elif code == CYCLIC_TRIANGLE_C1 or code == CYCLIC_TRIANGLE_C3:
+        for k in range(start, end):
+            u = indices[k]
+            if code == CYCLIC_TRIANGLE_C3 and A[u] != 1:
+                continue
+            for l in range(indptr[u], indptr[u+1]):
+                v = indices[l]
+                if (v != i and is_arc(indptr, indices, v, i) and
+                    (code == CYCLIC_TRIANGLE_C1 or A[v] == 1)):
+                    delta += 1
+        return delta
+    elif code == ALTER_IN_TWOSTAR2:
+        for k in range(rstart, rend):
+            u = rev_indices[k]
+            for l in range(indptr[u], indptr[u+1]):
+                v = indices[l]
+                if v != i and A[v] == 1:
+                    delta += 1
+        return delta
+    elif code == ALTER_OUT_TWOSTAR2:
+        for k in range(start, end):
+            u = indices[k]
+            for l in range(rev_indptr[u], rev_indptr[u+1]):
+                v = rev_indices[l]
+                if v != i and A[v] == 1:
+                    delta += 1
+        return delta
+    elif code == GW_SENDER:
+        return math.exp(-param * outdeg)
+    elif code == GW_RECEIVER:
+        return math.exp(-param * indeg)
+    elif (code == DIRECTED_GW_CONTAGION or code == DIRECTED_LOG_CONTAGION or
+          code == DIRECTED_POWER_CONTAGION):
+        # same as undirected but over out-neighbours then in-neighbours
+        ucode = (GW_CONTAGION if code == DIRECTED_GW_CONTAGION else
+                 LOG_CONTAGION if code == DIRECTED_LOG_CONTAGION else
+                 POWER_CONTAGION)
+        outdelta = contagion_kernel(indptr, indices, rev_indptr,
+                                    rev_indices, A, i, ucode, param, 0.0)
+        return contagion_kernel(rev_indptr, rev_indices, indptr, indices,
+                                A, i, ucode, param, outdelta)
+    # the remaining statistics are the categorical attribute
+    # match/mismatch statistics, zero if the attribute is NA for i
+    ci = catattr[col, i]
+    if ci == NA_VALUE:
+        return 0.0
+    if code == RECEIVER_MATCH or code == RECEIVER_MISMATCH:
+        for k in range(rstart, rend):
+            cu = catattr[col, rev_indices[k]]
+            if code == RECEIVER_MATCH:
+                if cu == ci:
+                    delta += 1
+            elif cu != NA_VALUE and cu != ci:
+                delta += 1
+        return delta
+    for k in range(start, end):
+        u = indices[k]
+        cu = catattr[col, u]
+        if code == SENDER_MATCH:
+            if cu == ci:
+                delta += 1
+        elif code == SENDER_MISMATCH:
+            if cu != NA_VALUE and cu != ci:
+                delta += 1
+        elif code == RECIPROCITY_MATCH:
+            if cu == ci and is_arc(indptr, indices, u, i):
+                delta += 1
+        else: # RECIPROCITY_MISMATCH
+            if (cu != NA_VALUE and cu != ci and
+                is_arc(indptr, indices, u, i)):
+                delta += 1
+    return delta
+
+
+@njit(cache=True)
+def change_stat_kernel(code, param, col, mode, i, A, graph, attrs):
+    """
+    Return the change statistic with the given kernel code, numeric
+    parameter, attribute matrix row, and bipartite mode (or -1) for
+    changing the outcome of node i to 1.
+
+    Parameters:
+       code    - kernel code (e.g. CONTAGION)
+       param   - numeric parameter (e.g. alpha for GW_ACTIVITY) or 0
+       col     - row of the attribute matrix for attribute statistics or 0
+       mode    - 0 or 1 for bipartite statistics on MODE_A or MODE_B
+                 nodes, or -1 for not a bipartite statistic
+       i       - node to compute change statistic for
+       A       - numpy integer vector of outcome variables
+       graph   - tuple (indptr, indices, rev_indptr, rev_indices,
+                 tp_indptr, tp_indices, tp_data, num_A) of graph arrays
+                 (see KernelModel)
+       attrs   - tuple (binattr, contattr, catattr) of attribute matrices
+
+    Return value:
+       change statistic value (as float)
+    """
+    if mode >= 0 and (1 if i >= graph[7] else 0) != mode:
+        return 0.0
+    if code >= SENDER:
+        return directed_kernel(code, param, col, i, A, graph, attrs)
+    else:
+        return undirected_kernel(code, param, col, i, A, graph, attrs)
+
+
+@njit(cache=True)
+def change_stats_kernel(codes, params, cols, modes, graph, attrs, A, i,
+                        changestats):
+    """
+    Put the change statistics for node i for all the kernel codes
+    (with corresponding parameters, attribute rows and modes, see
+    change_stat_kernel()) into the changestats vector.
+    """
+    for l in range(len(codes)):
+        changestats[l] = change_stat_kernel(codes[l], params[l], cols[l],
+                                            modes[l], i, A, graph, attrs)
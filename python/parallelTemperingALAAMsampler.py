@@ -0,0 +1,289 @@
+#
+# File:    parallelTemperingALAAMsampler.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Parallel tempering (replica exchange) ALAAM MCMC sampler.
+
+   Near a phase transition (e.g. large Contagion or Activity parameters)
+   the ALAAM distribution can have two modes, with nearly all outcomes
+   0 or nearly all 1, and the single node toggle samplers then stay in
+   one of the modes for a very long time. Parallel tempering runs K
+   replicas of the chain, replica k sampling from the tempered
+   distribution with parameters beta[k] * theta, where
+   1 = beta[0] > beta[1] > ... > beta[K-1] > 0 is the "ladder" of inverse
+   temperatures. The hotter (smaller beta) replicas have flatter
+   distributions and so move between the modes easily. Periodically,
+   swapping the states of replicas at neighbouring temperatures is
+   proposed, and accepted with probability
+
+       min(1, exp((beta[k] - beta[k+1]) * theta * (Z[k+1] - Z[k])))
+
+   where Z[k] is the statistics vector of the replica at temperature k,
+   so that the chain at temperature 1 (the "cold" chain) still samples
+   from the ALAAM distribution with parameters theta, but gets the moves
+   between the modes made at higher temperatures.
+
+   The replicas are run together as the chains of the ensemble sampler
+   (ensembleALAAMsampler.py), each with its own tempered parameters. Rather
+   than exchanging the outcome vectors of the replicas, their
+   temperatures are exchanged. The replicas and their statistics are
+   kept (in a ParallelTempering object cached on the graph) between
+   calls of the sampler, and the outcome vector A that the sampler is
+   called with is the state of the cold chain. Since a swap can change
+   the cold chain to a different replica, the change statistics returned
+   are the positive (changeTo1ChangeStats) and negative
+   (changeTo0ChangeStats) parts of the net change in the statistics of
+   the cold chain, rather than sums over the individual moves. So the
+   statistics of A still change by changeTo1ChangeStats -
+   changeTo0ChangeStats, as for the other samplers, and this can be used
+   as the sampler function in simulation, goodness-of-fit, and
+   estimation.
+
+   Reference:
+
+   C. J. Geyer. Markov chain Monte Carlo maximum likelihood. In
+   Computing Science and Statistics: Proceedings of the 23rd Symposium
+   on the Interface, pages 156-163, 1991.
+
+   D. J. Earl and M. W. Deem. Parallel tempering: Theory, applications,
+   and new perspectives. Physical Chemistry Chemical Physics,
+   7(23):3910-3916, 2005.
+
+"""
+
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import NA_VALUE
+from computeObservedStatistics import computeObservedStatistics
+import batchALAAMsampler
+from batchALAAMsampler import batchALAAMsampler
+from ensembleALAAMsampler import ensembleALAAMsampler
+
+
+def geometric_temperature_ladder(num_replicas, max_temperature):
+    """
+    Return the inverse temperatures (beta values) of a geometric
+    temperature ladder from temperature 1 to max_temperature.
+
+    Parameters:
+       num_replicas     - number of temperatures (at least 2)
+       max_temperature  - highest temperature (> 1)
+
+    Return value:
+       numpy vector of num_replicas inverse temperatures, decreasing
+       from 1 to 1/max_temperature
+    """
+    assert num_replicas >= 2 and max_temperature > 1
+    return max_temperature ** -(np.arange(num_replicas) / (num_replicas - 1.0))
+
+
+# Default temperature ladder
+DEFAULT_BETAS = geometric_temperature_ladder(8, 4.0)
+
+
+class ParallelTempering:
+    """The outcome vectors and statistics of the replicas, the
+    temperature of each replica, and the counts of attempted and
+    accepted swaps between each pair of neighbouring temperatures.
+    """
+
+    def __init__(self, G, A, changestats_func_list, betas):
+        """
+        Construct the replicas, all starting from outcome vector A
+
+        Parameters:
+           G                   - Graph object for network (fixed)
+           A                   - vector of 0/1 outcome variables for ALAAM
+           changestats_func_list  - list of change statistics funcions
+           betas               - numpy vector of inverse temperatures,
+                                 decreasing from 1
+        """
+        K = len(betas)
+        self.changestats_func_list = tuple(changestats_func_list)
+        self.betas = np.array(betas, dtype=np.float64)
+        self.Amatrix = np.tile(np.asarray(A, dtype=np.float64), (K, 1))
+        self.Zmatrix = np.tile(computeObservedStatistics(G, A,
+                                                         changestats_func_list),
+                               (K, 1))
+        self.temperature = np.arange(K) # index in betas of each replica
+        self.swap_attempts = np.zeros(K - 1, dtype=np.int64)
+        self.swap_accepted = np.zeros(K - 1, dtype=np.int64)
+        self.swap_parity = 0
+
+
+    def isFor(self, changestats_func_list, betas):
+        """
+        Return True if this is for the same change statistic function
+        objects and temperature ladder.
+        """
+        return (len(changestats_func_list) == len(self.changestats_func_list)
+                and all(f is g for (f, g) in
+                        zip(changestats_func_list, self.changestats_func_list))
+                and np.array_equal(betas, self.betas))
+
+
+    def coldReplica(self):
+        """
+        Return the index of the replica at temperature 1
+        """
+        return int(np.nonzero(self.temperature == 0)[0][0])
+
+
+    def swapAcceptanceRates(self):
+        """
+        Return numpy vector of the fraction of accepted swaps between
+        temperatures k and k+1 for each k (NaN if none attempted)
+        """
+        with np.errstate(invalid='ignore'):
+            return self.swap_accepted / self.swap_attempts
+
+
+    def proposeSwaps(self, theta, rng):
+        """
+        Propose swapping the temperatures of the replicas at each pair of
+        neighbouring temperatures (k, k+1) for even k or for odd k,
+        alternately on each call.
+
+        Parameters:
+           theta - numpy vector of theta (parameter) values
+           rng   - numpy.random.Generator to use
+        """
+        K = len(self.betas)
+        replica_at = np.argsort(self.temperature) # replica at each temperature
+        for k in range(self.swap_parity, K - 1, 2):
+            (r, s) = (replica_at[k], replica_at[k + 1])
+            logr = ((self.betas[k] - self.betas[k + 1]) *
+                    np.dot(theta, self.Zmatrix[s] - self.Zmatrix[r]))
+            self.swap_attempts[k] += 1
+            if np.log1p(-rng.random()) < logr:
+                self.swap_accepted[k] += 1
+                (self.temperature[r], self.temperature[s]) = (k + 1, k)
+        self.swap_parity = 1 - self.swap_parity
+
+
+
+def getParallelTempering(G, A, changestats_func_list, betas):
+    """
+    Return the ParallelTempering object for the graph, change statistics
+    and temperature ladder, using the one cached on G if there is one
+    (and it is for the same change statistics and ladder), otherwise
+    constructing (and caching) a new one (also if the NA values are
+    different). The cold chain is set to A if it is not already the
+    same as A.
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       betas               - numpy vector of inverse temperatures
+
+    Return value:
+       ParallelTempering object
+    """
+    pt = getattr(G, 'parallel_tempering', None)
+    if (pt is None or not pt.isFor(changestats_func_list, betas) or
+        np.shape(pt.Amatrix)[1] != len(A) or
+        not np.array_equal(pt.Amatrix[0] == NA_VALUE,
+                           np.asarray(A) == NA_VALUE)):
+        pt = ParallelTempering(G, A, changestats_func_list, betas)
+        G.parallel_tempering = pt
+    else:
+        cold = pt.coldReplica()
+        if not np.array_equal(pt.Amatrix[cold], np.asarray(A)):
+            pt.Amatrix[cold] = A
+            pt.Zmatrix[cold] = computeObservedStatistics(G, A,
+                                                         changestats_func_list)
+    return pt
+
+
+def parallelTemperingALAAMsampler(G, A, changestats_func_list, theta,
+                                  performMove, sampler_m,
+                                  betas = DEFAULT_BETAS,
+                                  swap_interval = None,
+                                  ensemble_sampler_func = ensembleALAAMsampler,
+                                  rng = None):
+    """
+    parallelTemperingALAAMsampler - sample from ALAAM distribution with
+                                    parallel tempering
+
+    Each replica does sampler_m proposals, with swaps of neighbouring
+    temperatures proposed after every swap_interval proposals (and
+    at the end). Use e.g.
+    partial(parallelTemperingALAAMsampler, betas = geometric_temperature_ladder(16, 10))
+    to specify the temperature ladder. The swap acceptance rates are
+    available from G.parallel_tempering.swapAcceptanceRates().
+
+    If performMove is False, there is no tempering: the returned values
+    are from batchALAAMsampler() with theta.
+
+    Parameters:
+       G                   - Graph object for network (fixed)
+       A                   - vector of 0/1 outcome variables for ALAAM
+       changestats_func_list  - list of change statistics funcions
+       theta               - numpy vector of theta (parameter) values
+       performMove         - if True, actually do the MC moves,
+                             updating the outcome vector A
+                             (otherwise are not modified)
+       sampler_m           - number of proposals (iterations of sampler)
+                             in each replica
+       betas               - numpy vector of inverse temperatures,
+                             decreasing from 1.
+                             Default geometric ladder of 8 temperatures
+                             from 1 to 4.
+       swap_interval       - number of proposals (in each replica)
+                             between swap proposals. Default None
+                             for the number of nodes.
+       ensemble_sampler_func - ensemble ALAAM sampler function (see
+                             ensembleALAAMsampler.py) to run the replicas.
+                             Default ensembleALAAMsampler.
+       rng                 - numpy.random.Generator to use. Default None
+                             to use default_rng in batchALAAMsampler.py
+
+    Returns:
+        acceptance_rate     - sampler acceptance rate (of the cold chain)
+        changeTo1ChangeStats      - numpy vector of change stats for changeTo1 moves
+        changeTo0ChangeStats      - numpy vector of change stats for changeTo0  moves
+
+    Note A is updated in place if performMove is True
+    otherwise unchanged
+    """
+    if rng is None:
+        rng = batchALAAMsampler.default_rng
+    if not performMove:
+        return batchALAAMsampler(G, A, changestats_func_list, theta,
+                                 performMove, sampler_m, rng)
+    assert betas[0] == 1
+    if swap_interval is None:
+        swap_interval = G.numNodes()
+    theta = np.asarray(theta, dtype=np.float64).ravel()
+    n = len(changestats_func_list)
+    pt = getParallelTempering(G, A, changestats_func_list, betas)
+    cold = pt.coldReplica()
+    Zstart = np.copy(pt.Zmatrix[cold])
+    accepted = 0.0
+    k = 0
+    while k < sampler_m:
+        m = min(swap_interval, sampler_m - k)
+        thetas = np.outer(pt.betas[pt.temperature], theta)
+        (acceptance_rate,
+         changeTo1ChangeStats,
+         changeTo0ChangeStats) = ensemble_sampler_func(G, pt.Amatrix,
+                                                       changestats_func_list,
+                                                       thetas, True, m,
+                                                       rng = rng)
+        pt.Zmatrix += changeTo1ChangeStats - changeTo0ChangeStats
+        accepted += acceptance_rate[pt.coldReplica()] * m
+        pt.proposeSwaps(theta, rng)
+        k += m
+
+    # the cold chain may now be a different replica
+    cold = pt.coldReplica()
+    Acold = pt.Amatrix[cold]
+    for i in np.nonzero((np.asarray(A) == 1) != (Acold == 1))[0].tolist():
+        A[i] = int(Acold[i])
+    delta = pt.Zmatrix[cold] - Zstart
+    changeTo1ChangeStats = np.maximum(delta, 0)
+    changeTo0ChangeStats = np.maximum(-delta, 0)
+    acceptance_rate = accepted / sampler_m
+    return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
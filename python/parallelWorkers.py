@@ -0,0 +1,87 @@
+#
+# File:    parallelWorkers.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Worker process pools for running independent estimations, simulations,
+   or goodness-of-fit chains in parallel (see run_ee_parallel() in
+   estimateALAAMEE.py, simulate_theta_path() in simulateALAAM.py, and
+   gof() in gofALAAM.py).
+
+   The arguments that are the same for every task (the graph, change
+   statistic functions, sampler etc.) are given once to worker_pool(),
+   and each worker process gets them with get_worker_args(), so only
+   the per-task arguments are sent with each task. Where the fork start
+   method is available (Linux, macOS) it is used, so the worker processes
+   share the memory of the parent (copy on write) and the graph is not
+   copied at all; otherwise (Windows) the arguments are pickled and
+   copied once to each worker process.
+"""
+
+import random
+import multiprocessing
+import numpy as np         # used for matrix & vector data types and functions
+
+import batchALAAMsampler
+
+
+# Arguments given to worker_pool(), set by _init_worker() in each
+# worker process
+_worker_args = None
+
+
+def _init_worker(*args):
+    """
+    Initialize a worker process, saving the arguments given to
+    worker_pool() in the global _worker_args.
+    """
+    global _worker_args
+    _worker_args = args
+
+
+def get_worker_args():
+    """
+    Return the tuple of arguments given to worker_pool(), in a worker
+    process of the pool
+    """
+    return _worker_args
+
+
+def worker_pool(processes, args):
+    """
+    Create a pool of worker processes, each of which can get the
+    arguments args with get_worker_args(). The fork start method is
+    used if it is available, regardless of the default start method,
+    so that args are shared with the parent process rather than copied.
+
+    Parameters:
+        processes - number of worker processes, or None in which case
+                    os.cpu_count() is used
+        args      - tuple of arguments for all the tasks
+
+    Return value:
+        multiprocessing.Pool object
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    return context.Pool(processes, initializer = _init_worker,
+                        initargs = args)
+
+
+def seed_samplers(seedseq):
+    """
+    Seed all the random number generators used by the samplers (the
+    Python random module, the numpy global random number generator, and
+    the default_rng in batchALAAMsampler.py), so that each worker process
+    uses different random numbers (otherwise forked processes would all
+    start with the same random number generator states).
+
+    Parameters:
+        seedseq - numpy.random.SeedSequence for the task
+    """
+    seeds = seedseq.generate_state(2)
+    random.seed(int(seeds[0]))
+    np.random.seed(int(seeds[1]))
+    batchALAAMsampler.default_rng = np.random.default_rng(seedseq)
@@ -0,0 +1,151 @@
+#
+# File:    readGraphFiles.py
+# Author:  Alex Stivala
+# Created: October 2026
+#
+"""Functions to read the Pajek format network files and the node
+attribute and snowball sampling zone files used by Graph, Digraph,
+and BipartiteGraph.
+
+Rather than reading the files one line at a time and converting each
+field with int() (or int_or_na() etc.), the whole file is read at once
+and converted with numpy, which is much faster for networks with
+millions of edges. The results are the same as reading the
+files one line at a time.
+
+See the documentation in Graph.py for the file formats.
+"""
+
+import io
+import re
+import numpy as np         # used for matrix & vector data types and functions
+
+from utils import NA_VALUE,attribute_columns
+
+
+def readPajekEdges(filename, section):
+    """Read the network from a Pajek format edge list (or arc list) file.
+
+    The first line must be e.g. "*vertices 500" and the edges are the lines
+    following the section line (e.g. "*edges"), up to the first line
+    with fewer than two fields (or the end of the file). Only the
+    first two fields (i, j) of each line are used (any weight is
+    ignored). The nodes must be numbered 1..N.
+
+    Parameters:
+        filename - filename of Pajek format edge list
+        section  - section line for the edges, "*edges" or "*arcs"
+
+    Return value:
+        tuple (n, edges) where n is the number of nodes, and edges is
+        an m x 2 numpy int64 array of the (i, j) edges (or arcs i -> j),
+        with nodes numbered 0..N-1, in the order in the file.
+    """
+    with open(filename, 'rb') as f:
+        text = f.read()
+    n = int(text.split(None, 2)[1]) # first line must be e.g. "*vertices 500"
+
+    m = re.search(rb'^' + re.escape(section.encode()) + rb'[ \t\r\f\v]*$',
+                  text, re.IGNORECASE | re.MULTILINE)
+    if m is None:
+        raise ValueError("no " + section + " in Pajek file " + filename)
+    block = text[m.end() + 1:]
+
+    # count the fields on each line, to find the first line with fewer
+    # than two fields, where the edges end
+    data = np.frombuffer(block, dtype=np.uint8)
+    line_ends = np.flatnonzero(data == ord('\n'))
+    space = (data <= ord(' '))  # whitespace (and other control characters)
+    field_start = ~space
+    field_start[1:] &= space[:-1]
+    # line number of each field is the number of newlines before it
+    fields = np.bincount(np.searchsorted(line_ends, np.flatnonzero(field_start)),
+                         minlength=len(line_ends) + 1)
+    short_lines = np.flatnonzero(fields < 2)
+    num_lines = short_lines[0] if len(short_lines) > 0 else len(fields)
+    if num_lines == 0:
+        edges = np.zeros((0, 2), dtype=np.int64)
+    else:
+        end = line_ends[num_lines - 1] if num_lines <= len(line_ends) else len(block)
+        block = block[:end]
+        if np.all(fields[:num_lines] == 2):
+            edges = np.fromstring(block, dtype=np.int64,
+                                  sep=' ').reshape(num_lines, 2)
+        else:
+            # some lines have more than two fields (weights) so just
+            # use the first two
+            edges = np.loadtxt(io.BytesIO(block), dtype=np.int64,
+                               usecols=(0, 1), ndmin=2)
+    assert np.all((edges >= 1) & (edges <= n))
+    return (n, edges - 1)   # input is 1-based but we are 0-based
+
+
+def adjacencyLists(src, dst):
+    """Group the (src, dst) pairs by src node.
+
+    Parameters:
+        src - numpy array of source nodes
+        dst - numpy array of destination nodes, corresponding to src
+
+    Return value:
+        list of tuples (v, nbrs) for each node v in src (in sorted order)
+        where nbrs is the list of dst nodes of the pairs with src
+        node v, in the same order as they are in the arrays.
+    """
+    m = len(src)
+    if m > 0 and int(np.max(src)) < (2**63 - 1) // m:
+        # sorting on src * m + index is the same as a stable sort on
+        # src, but faster
+        order = np.argsort(src * m + np.arange(m))
+    else:
+        order = np.argsort(src, kind='stable')
+    src = src[order]
+    dst = dst[order].tolist()
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(src)) + 1,
+                             [m])).tolist()
+    nodes = src[starts[:-1]].tolist() if m > 0 else []
+    return [(nodes[k], dst[starts[k]:starts[k+1]]) for k in range(len(nodes))]
+
+
+def readAttributeFile(filename, dtype):
+    """Read a node attributes file: a header line with whitespace-delimited
+    attribute names, followed by (whitespace delimited) attributes one
+    line per node. NA values ("NA") are converted to NA_VALUE for binary
+    and categorical attributes and NaN for continuous attributes, just
+    as by int_or_na() and float_or_na().
+
+    Parameters:
+        filename   - filename of attributes file
+        dtype      - numpy data type of the attributes, BINATTR_DTYPE,
+                     CATATTR_DTYPE, or CONTATTR_DTYPE (see utils.py)
+
+    Return value:
+        dict where the key is the attribute name and the value is
+        the numpy array of attribute values in node order
+    """
+    with open(filename) as f:
+        header = f.readline().split()
+        values = np.array(f.read().split()).reshape(-1, len(header))
+    na_mask = (values == "NA")
+    if np.dtype(dtype).kind == 'f':
+        attrvalues = np.full(values.shape, np.nan)
+    else:
+        attrvalues = np.full(values.shape, NA_VALUE, dtype=np.int64)
+    attrvalues[~na_mask] = values[~na_mask].astype(attrvalues.dtype)
+    return attribute_columns(dict(zip(header, attrvalues.T)), dtype)
+
+
+def readZoneFile(filename):
+    """Read a snowball sampling zone file: a header line that must just
+    be one column name "zone", then the zone number for each node, one
+    per line.
+
+    Parameters:
+        filename - filename of zone file
+
+    Return value:
+        list of zone numbers in node order
+    """
+    with open(filename) as f:
+        f.readline()
+        return np.array(f.read().split(), dtype=np.int64).tolist()
@@ -30,9 +30,13 @@ import numpy as np         # used for matrix & vector data types and functions
 from Graph import Graph,NA_VALUE
 from Digraph import Digraph
 from BipartiteGraph import BipartiteGraph,MODE_A,MODE_B
+from CSRGraph import load_graph_cached
 from changeStatisticsALAAM import *
 from basicALAAMsampler import basicALAAMsampler
+from ensembleALAAMsampler import ensembleALAAMsampler
 from computeObservedStatistics import computeObservedStatistics
+from ChangeStatisticsTable import getChangeStatisticsTable
+from parallelWorkers import worker_pool,get_worker_args,seed_samplers
 
 
 
@@ -56,6 +60,66 @@ def rand_bin_array(K, N):
 
 
 
+def initial_outcome_vector(G, Ainitial = None, bipartiteFixedMode = None,
+                           Aobs = None):
+    """
+    Return the outcome vector to start a simulation from.
+
+    Parameters:
+       G                   - Graph object for graph to simulate ALAAM on
+       Ainitial            - vector of 0/1 outcome variables to initialize
+                             the outcome vector to, or None for random
+                             initialization. Default None.
+       bipartiteFixedMode  - for bipartite networks only, the mode
+                             (MODE_A or MODE_B that is fixed to NA
+                             in simulation, or None. Default None.
+       Aobs                - vector of 0/1 observed outcome variables for ALAAM
+                             for use with snowball conditional estimation only,
+                             or None (default None).
+
+    Return value:
+       numpy vector of 0/1 (or NA) outcome variables
+    """
+    bipartite = isinstance(G, BipartiteGraph)
+    if Ainitial is not None:
+        A = np.copy(Ainitial)
+    else:
+        START_FROM_ZERO = False 
+        if START_FROM_ZERO: # start from zero vector
+            A = np.zeros(G.numNodes())  # initialize outcmoe vector to zero
+        else:   # do not use all zero,to avoid special case of proposal probability
+            if G.zone is not None: # snowball conditional estimation
+                # For snowball conditional estimation, we must not start with
+                # random initial outcome vector, but rather make sure the
+                # nodes in the outermost zone have the same outcome attributes
+                # as the obseved vector
+                A= np.copy(Aobs) # copy of observed vector
+                # make vector of 50% ones, size of number of inner nodes
+                Arandom_inner = rand_bin_array(int(0.5*len(G.inner_nodes)), len(G.inner_nodes))
+                # set the outcome for inner nodes to random values, leaving
+                # value of outermost nodes at the original observed values
+                A[G.inner_nodes] = Arandom_inner
+            elif bipartite:
+                # initialize outcome vector to all NA for one mode and
+                # 50% zero for other mode, depending which mode we want fixed
+                # to all NA values.
+                if bipartiteFixedMode == MODE_B:
+                    A = np.concatenate(
+                        (rand_bin_array(int(0.5*G.num_A_nodes), G.num_A_nodes),
+                          np.ones(G.num_B_nodes)*NA_VALUE) )
+                elif bipartiteFixedMode == MODE_A:
+                    A = np.concatenate(
+                        (np.ones(G.num_A_nodes)*NA_VALUE,
+                       rand_bin_array(int(0.5*G.num_B_nodes), G.num_B_nodes)) )
+                else:
+                    # initialize outcome vector to 50% ones
+                    A = rand_bin_array(int(0.5*G.numNodes()), G.numNodes())
+            else:
+                # initialize outcome vector to 50% ones
+                A = rand_bin_array(int(0.5*G.numNodes()), G.numNodes())
+    return A
+
+
 def simulateALAAM(G, changestats_func_list, theta, numSamples,
                   iterationInStep = None, burnIn = None,
                   sampler_func = basicALAAMsampler, Ainitial = None,
@@ -115,42 +179,7 @@ def simulateALAAM(G, changestats_func_list, theta, numSamples,
     if burnIn is None:
         burnIn = 10*iterationInStep
 
-    if Ainitial is not None:
-        A = np.copy(Ainitial)
-    else:
-        START_FROM_ZERO = False 
-        if START_FROM_ZERO: # start from zero vector
-            A = np.zeros(G.numNodes())  # initialize outcmoe vector to zero
-        else:   # do not use all zero,to avoid special case of proposal probability
-            if G.zone is not None: # snowball conditional estimation
-                # For snowball conditional estimation, we must not start with
-                # random initial outcome vector, but rather make sure the
-                # nodes in the outermost zone have the same outcome attributes
-                # as the obseved vector
-                A= np.copy(Aobs) # copy of observed vector
-                # make vector of 50% ones, size of number of inner nodes
-                Arandom_inner = rand_bin_array(int(0.5*len(G.inner_nodes)), len(G.inner_nodes))
-                # set the outcome for inner nodes to random values, leaving
-                # value of outermost nodes at the original observed values
-                A[G.inner_nodes] = Arandom_inner
-            elif bipartite:
-                # initialize outcome vector to all NA for one mode and
-                # 50% zero for other mode, depending which mode we want fixed
-                # to all NA values.
-                if bipartiteFixedMode == MODE_B:
-                    A = np.concatenate(
-                        (rand_bin_array(int(0.5*G.num_A_nodes), G.num_A_nodes),
-                          np.ones(G.num_B_nodes)*NA_VALUE) )
-                elif bipartiteFixedMode == MODE_A:
-                    A = np.concatenate(
-                        (np.ones(G.num_A_nodes)*NA_VALUE,
-                       rand_bin_array(int(0.5*G.num_B_nodes), G.num_B_nodes)) )
-                else:
-                    # initialize outcome vector to 50% ones
-                    A = rand_bin_array(int(0.5*G.numNodes()), G.numNodes())
-            else:
-                # initialize outcome vector to 50% ones
-                A = rand_bin_array(int(0.5*G.numNodes()), G.numNodes())
+    A = initial_outcome_vector(G, Ainitial, bipartiteFixedMode, Aobs)
 
     # And compute observed statistics by summing change stats for each
     # 1 variable (note if instead starting at all zero A vector don't
@@ -181,6 +210,282 @@ def simulateALAAM(G, changestats_func_list, theta, numSamples,
 
 
 
+def simulateALAAMensemble(G, changestats_func_list, theta, numSamples,
+                          num_chains, iterationInStep = None, burnIn = None,
+                          sampler_func = ensembleALAAMsampler,
+                          Ainitial = None, bipartiteFixedMode = None,
+                          Aobs = None):
+    """
+    Simulate ALAAM (generate binary outcome vector) given model parameters
+    and network (including node attributes), with num_chains independent
+    chains run together by an ensemble sampler (see ensembleALAAMsampler.py),
+    each with its own burn-in.
+    This is a generator function (i.e. use it as an iterator).
+
+    Parameters:
+       G                   - Graph object for graph to simulate ALAAM on
+       changestats_func_list-list of change statistics funcions
+       theta               - corresponding vector of theta values
+       numSamples          - total number of samples to yield (from all chains)
+       num_chains          - number of chains
+       iterationInStep     - number of sampler iterations in each chain
+                             i.e. the number of iterations between samples
+                             (or 10*numNodes if None)
+       burnIn              - number of iterations to discard at start
+                             of each chain (or 10*iterationInStep if None)
+       sampler_func        - ensemble ALAAM sampler function with signature
+                             (G, Amatrix, changestats_func_list, theta,
+                              performMove, sampler_m); see
+                             ensembleALAAMsampler.py. Use
+                             ensembleConditionalALAAMsampler for snowball
+                             conditional simulation.
+                             Default ensembleALAAMsampler.
+       Ainitial            - vector of 0/1 outcome variables to initialize
+                             the outcome vector of every chain to before
+                             simulation process, rather than random.
+                             Default None, for random initialization here.
+       bipartiteFixedMode  - for bipartite networks only, the mode
+                             (MODE_A or MODE_B that is fixed to NA
+                             in simulation, for when outcome
+                             variable not defined for that mode,
+                             or None. Default None.
+       Aobs                - vector of 0/1 observed outcome variables for ALAAM
+                             for use with snowball conditional estimation only,
+                             or None (default None).
+
+     Returns:
+       This is a generator function that yields tuple
+        (A, stats, acceptance_Rate, t) where
+          A is vector of 0/1 ALAAM outcome and
+          stats is vector of the model sufficient statistics
+          acceptance_rate is the sampler acceptance rate of the chain
+          t is the iteration number (in the chain)
+       values on each call, taking one sample from each chain in turn.
+    """
+    assert len(theta) == len(changestats_func_list)
+    assert bipartiteFixedMode in [None, MODE_A, MODE_B]
+    assert not (bipartiteFixedMode is not None and not isinstance(G, BipartiteGraph))
+
+    if iterationInStep is None:
+        iterationInStep = 10 * G.numNodes()
+
+    if burnIn is None:
+        burnIn = 10*iterationInStep
+
+    Amatrix = np.array([initial_outcome_vector(G, Ainitial, bipartiteFixedMode,
+                                               Aobs)
+                        for k in range(num_chains)], dtype=np.float64)
+    Zmatrix = np.array([computeObservedStatistics(G, A, changestats_func_list)
+                        for A in Amatrix])
+
+    (acceptance_rate,
+     changeTo1ChangeStats,
+     changeTo0ChangeStats) = sampler_func(G, Amatrix,
+                                          changestats_func_list,
+                                          theta,
+                                          performMove = True,
+                                          sampler_m = burnIn)
+    Zmatrix += changeTo1ChangeStats - changeTo0ChangeStats
+
+    i = 0
+    while i < numSamples:
+        (acceptance_rate,
+         changeTo1ChangeStats,
+         changeTo0ChangeStats) = sampler_func(G, Amatrix,
+                                              changestats_func_list,
+                                              theta,
+                                              performMove = True,
+                                              sampler_m = iterationInStep)
+        Zmatrix += changeTo1ChangeStats - changeTo0ChangeStats
+        t = (i // num_chains + 1) * iterationInStep + burnIn
+        for k in range(min(num_chains, numSamples - i)):
+            yield (np.array(Amatrix[k]), np.array(Zmatrix[k]),
+                   acceptance_rate[k], t)
+        i += num_chains
+
+
+def theta_path_segment(G, changestats_func_list, theta_grid, numSamples,
+                       iterationInStep, burnIn, warmBurnIn, sampler_func,
+                       Ainitial, bipartiteFixedMode, Aobs, hysteresis):
+    """
+    Walk one segment of the grid of theta values for simulate_theta_path(),
+    simulating at each point starting from the final outcome vector of
+    the previous point.
+
+    Parameters:
+       As for simulate_theta_path(), with theta_grid the segment of
+       the grid (2d numpy array, one row per point) and burnIn the
+       burn-in at its first point.
+
+    Return value:
+       list of tuples (theta, direction, Zmatrix, acceptance_rates, A)
+       as for simulate_theta_path(), for the points of the segment in
+       the order they were simulated.
+    """
+    path = [(theta, 1) for theta in theta_grid]
+    if hysteresis:
+        path += [(theta, -1) for theta in theta_grid[::-1]]
+    A = Ainitial
+    results = []
+    for (j, (theta, direction)) in enumerate(path):
+        # only keep the statistics of each sample, and the final outcome
+        # vector, not every outcome vector
+        Zlist = []
+        acceptance_rates = []
+        sims = simulateALAAM(G, changestats_func_list, theta, numSamples,
+                             iterationInStep,
+                             burnIn if j == 0 else warmBurnIn,
+                             sampler_func = sampler_func, Ainitial = A,
+                             bipartiteFixedMode = bipartiteFixedMode,
+                             Aobs = Aobs)
+        for (Asim, Z, acc, t) in sims:
+            Zlist.append(Z)
+            acceptance_rates.append(acc)
+        A = Asim
+        results.append((np.array(theta), direction, np.array(Zlist),
+                        np.array(acceptance_rates), A))
+    return results
+
+
+def _theta_path_worker(theta_grid, seedseq):
+    """
+    Walk one segment of the theta grid for simulate_theta_path() in a
+    worker process.
+
+    Parameters:
+       theta_grid - segment of the grid of theta values
+       seedseq    - numpy.random.SeedSequence for this segment
+
+    Return value:
+       list of tuples from theta_path_segment()
+    """
+    (G, changestats_func_list, numSamples, iterationInStep, burnIn,
+     warmBurnIn, sampler_func, Ainitial, bipartiteFixedMode, Aobs,
+     hysteresis) = get_worker_args()
+    seed_samplers(seedseq)
+    return theta_path_segment(G, changestats_func_list, theta_grid,
+                              numSamples, iterationInStep, burnIn,
+                              warmBurnIn, sampler_func, Ainitial,
+                              bipartiteFixedMode, Aobs, hysteresis)
+
+
+def simulate_theta_path(G, changestats_func_list, theta_grid, numSamples,
+                        iterationInStep = None, burnIn = None,
+                        warmBurnIn = None,
+                        sampler_func = basicALAAMsampler, Ainitial = None,
+                        bipartiteFixedMode = None, Aobs = None,
+                        hysteresis = False, num_segments = 1,
+                        processes = None, seed = None):
+    """
+    Simulate ALAAM at each of a grid of theta values (e.g. to find a
+    phase transition as the Contagion or Activity parameter is varied),
+    walking along the grid and starting the simulation at each point
+    from the final outcome vector simulated at the previous point,
+    so that only a short burn-in (warmBurnIn) is needed rather than the
+    full burn-in from a random outcome vector. Optionally, the grid is
+    then walked backwards again from the last point, so that hysteresis
+    (different statistics on the forward and backward paths near
+    a phase transition) can be seen.
+
+    The grid can be divided into num_segments contiguous segments,
+    each walked independently (starting with a full burn-in) in
+    parallel by multiple processes, with the graph loaded only once
+    (and shared by the worker processes where the fork start method is
+    available, see worker_pool() in parallelWorkers.py). Each segment
+    uses a different random seed.
+
+    Parameters:
+       G                   - Graph object for graph to simulate ALAAM on
+       changestats_func_list-list of change statistics funcions
+       theta_grid          - sequence of theta vectors (each
+                             corresponding to changestats_func_list)
+                             in the order to walk them e.g. 2d numpy
+                             array with one row for each grid point
+       numSamples          - number of samples at each grid point
+       iterationInStep     - number of sampler iterations
+                             i.e. the number of iterations between samples
+                             (or 10*numNodes if None)
+       burnIn              - number of iterations to discard at the
+                             first point of each segment
+                             (or 10*iterationInStep if None)
+       warmBurnIn          - number of iterations to discard at the other
+                             points (or iterationInStep if None)
+       sampler_func        - ALAAM sampler function with signature
+                             (G, A, changestats_func_list, theta, performMove,
+                              sampler_m); see basicALAAMsampler.py
+                             default basicALAAMsampler
+       Ainitial            - vector of 0/1 outcome variables to initialize
+                             the outcome vector to at the first point of
+                             each segment, or None (default) for random
+                             initialization.
+       bipartiteFixedMode  - for bipartite networks only, the mode
+                             (MODE_A or MODE_B that is fixed to NA
+                             in simulation, or None. Default None.
+       Aobs                - vector of 0/1 observed outcome variables for ALAAM
+                             for use with snowball conditional estimation only,
+                             or None (default None).
+       hysteresis          - if True, after walking forward along (each
+                             segment of) the grid, walk back along it to
+                             the start. Default False.
+       num_segments        - number of segments to divide the grid into.
+                             Default 1 (one walk along the whole grid,
+                             in this process).
+       processes           - number of worker processes when
+                             num_segments > 1. Default None
+                             in which case os.cpu_count() is used.
+       seed                - seed for the random number generators, from
+                             which a different seed for each segment is
+                             generated, when num_segments > 1.
+                             Default None for unpredictable seeds.
+
+    Return value:
+       list of tuples (theta, direction, Zmatrix, acceptance_rates, A),
+       one for each point simulated, in the order the points were
+       simulated (forward along the grid, then backward for hysteresis,
+       for each segment in turn), where
+          theta is the numpy vector of theta values
+          direction is 1 on the forward path, -1 on the backward path
+          Zmatrix is the numSamples x n numpy array of the statistics of
+             the samples (where n = len(changestats_func_list))
+          acceptance_rates is the numpy vector of numSamples sampler
+             acceptance rates
+          A is the final outcome vector
+    """
+    theta_grid = np.asarray(theta_grid, dtype=float)
+    assert theta_grid.ndim == 2
+    assert theta_grid.shape[1] == len(changestats_func_list)
+    assert numSamples > 0
+    assert 1 <= num_segments <= len(theta_grid)
+
+    if iterationInStep is None:
+        iterationInStep = 10 * G.numNodes()
+
+    if burnIn is None:
+        burnIn = 10*iterationInStep
+
+    if warmBurnIn is None:
+        warmBurnIn = iterationInStep
+
+    if num_segments == 1:
+        return theta_path_segment(G, changestats_func_list, theta_grid,
+                                  numSamples, iterationInStep, burnIn,
+                                  warmBurnIn, sampler_func, Ainitial,
+                                  bipartiteFixedMode, Aobs, hysteresis)
+
+    # build the change statistics table before creating the worker
+    # processes, so they get it with G rather than each building it
+    getChangeStatisticsTable(G, changestats_func_list)
+    segments = np.array_split(theta_grid, num_segments)
+    seedseqs = np.random.SeedSequence(seed).spawn(num_segments)
+    with worker_pool(processes, (G, changestats_func_list, numSamples,
+                                 iterationInStep, burnIn, warmBurnIn,
+                                 sampler_func, Ainitial, bipartiteFixedMode,
+                                 Aobs, hysteresis)) as pool:
+        results = pool.starmap(_theta_path_worker, zip(segments, seedseqs))
+    return [point for segment in results for point in segment]
+
+
+
 def simulate_from_network_attr(arclist_filename, param_func_list, labels,
                                theta,
                                binattr_filename=None,
@@ -197,7 +502,8 @@ def simulate_from_network_attr(arclist_filename, param_func_list, labels,
                                outputSimulatedVectors = False,
                                simvecFilePrefix = "sim_outcome",
                                Ainitial = None,
-                               bipartiteFixedMode = None):
+                               bipartiteFixedMode = None,
+                               binary_cache = False):
     """Simulate ALAAM from on specified network with binary and/or continuous
     and categorical attributes.
 
@@ -260,6 +566,11 @@ def simulate_from_network_attr(arclist_filename, param_func_list, labels,
                                  in simulation, for when outcome
                                  variable not defined for that mode,
                                  or None. Default None.
+         binary_cache    - Default False.
+                           If True then load the network (and attributes)
+                           from the binary cache next to the network file,
+                           creating it if it does not exist or is out of
+                           date (see CSRGraph.load_graph_cached()).
 
     The output is written to stdout in a format for reading by
     the R script plotSimulationDiagnostics.R.
@@ -267,7 +578,11 @@ def simulate_from_network_attr(arclist_filename, param_func_list, labels,
     assert(len(param_func_list) == len(labels))
     assert not (bipartiteFixedMode is not None and not bipartite)
 
-    if directed:
+    if binary_cache:
+        G = load_graph_cached(arclist_filename, binattr_filename,
+                              contattr_filename, catattr_filename,
+                              zone_filename, directed, bipartite)
+    elif directed:
         if bipartite:
             raise Exception("directed bipartite network not suppored")
         G = Digraph(arclist_filename, binattr_filename, contattr_filename,
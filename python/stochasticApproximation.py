@@ -30,10 +30,117 @@ import numpy as np         # used for matrix & vector data types and functions
 from Graph import Graph,NA_VALUE
 from changeStatisticsALAAM import *
 from basicALAAMsampler import basicALAAMsampler
+from ensembleALAAMsampler import ensembleALAAMsampler,ensembleConditionalALAAMsampler
+
+
+def sample_statistics(G, A, Z, changestats_func_list, theta, sampler_func,
+                      num_steps, iterationInStep, burnin = 0,
+                      num_chains = 1,
+                      ensemble_sampler_func = None):
+    """
+    Sample statistics vectors for phase 1 or phase 3 of the stochastic
+    approximation algorithm.
+
+    Parameters:
+       G                   - Graph object for graph to estimate
+       A                   - vector of 0/1 outcome variables for ALAAM
+                             to start from
+       Z                   - vector of statistics for A
+       changestats_func_list-list of change statistics funcions
+       theta               - vector of theta values
+       sampler_func        - ALAAM sampler function
+       num_steps           - number of statistics vectors to sample
+       iterationInStep     - number of sampler iterations between samples
+       burnin              - number of sampler iterations to discard
+                             at start (of each chain). Default 0.
+       num_chains          - number of chains. If more than 1, the
+                             chains all start from A and are run with
+                             the ensemble_sampler_func, each
+                             providing num_steps / num_chains (rounded up)
+                             of the samples. Default 1.
+       ensemble_sampler_func - ensemble ALAAM sampler function (see
+                             ensembleALAAMsampler.py), updating the same
+                             nodes as sampler_func, or None to use
+                             ensembleConditionalALAAMsampler if G has
+                             snowball sampling zones, otherwise
+                             ensembleALAAMsampler. Default None.
+                             ensembleALAAMsampler cannot be used if G
+                             has snowball sampling zones, as it does
+                             not sample conditional on them.
+
+    Return value:
+       tuple (Zmatrix, A, Z) where Zmatrix is the matrix with a sampled
+       statistics vector in each row, and A and Z are the outcome
+       vector and its statistics at the end of (the first) chain.
+    """
+    if num_chains > 1:
+        if ensemble_sampler_func is None:
+            ensemble_sampler_func = (ensembleALAAMsampler if G.zone is None
+                                     else ensembleConditionalALAAMsampler)
+        elif G.zone is not None and ensemble_sampler_func is ensembleALAAMsampler:
+            raise ValueError("ensembleALAAMsampler does not sample conditional"
+                             " on snowball sampling zones, use"
+                             " ensembleConditionalALAAMsampler")
+
+    if num_chains == 1:
+        A = np.copy(A)
+        Z = np.copy(Z)
+        Zmatrix = np.empty((num_steps, len(Z))) # rows statistics Z vectors, 1 per step
+        if burnin > 0:
+            (acceptance_rate,
+             changeTo1ChangeStats,
+             changeTo0ChangeStats) = sampler_func(G, A,
+                                                  changestats_func_list,
+                                                  theta,
+                                                  performMove = True,
+                                                  sampler_m = burnin)
+            Z += changeTo1ChangeStats - changeTo0ChangeStats
+        for i in range(num_steps):
+            (acceptance_rate,
+             changeTo1ChangeStats,
+             changeTo0ChangeStats) = sampler_func(G, A,
+                                                  changestats_func_list,
+                                                  theta,
+                                                  performMove = True,
+                                                  sampler_m = iterationInStep)
+            Z += changeTo1ChangeStats - changeTo0ChangeStats
+            Zmatrix[i, ] = Z
+        return (Zmatrix, A, Z)
+
+    Amatrix = np.tile(np.asarray(A, dtype=np.float64), (num_chains, 1))
+    Zchains = np.tile(np.asarray(Z, dtype=np.float64), (num_chains, 1))
+    chain_steps = -(-num_steps // num_chains) # rounded up
+    Zmatrix = np.empty((chain_steps, num_chains, len(Z)))
+    if burnin > 0:
+        (acceptance_rate,
+         changeTo1ChangeStats,
+         changeTo0ChangeStats) = ensemble_sampler_func(G, Amatrix,
+                                                       changestats_func_list,
+                                                       theta,
+                                                       performMove = True,
+                                                       sampler_m = burnin)
+        Zchains += changeTo1ChangeStats - changeTo0ChangeStats
+    for i in range(chain_steps):
+        (acceptance_rate,
+         changeTo1ChangeStats,
+         changeTo0ChangeStats) = ensemble_sampler_func(G, Amatrix,
+                                                       changestats_func_list,
+                                                       theta,
+                                                       performMove = True,
+                                                       sampler_m = iterationInStep)
+        Zchains += changeTo1ChangeStats - changeTo0ChangeStats
+        Zmatrix[i] = Zchains
+    Zmatrix = np.reshape(Zmatrix, (chain_steps * num_chains, len(Z)))
+    return (Zmatrix, Amatrix[0], Zchains[0])
 
 
 def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
-                            Zobs, sampler_func=basicALAAMsampler):
+                            Zobs, sampler_func=basicALAAMsampler,
+                            num_chains = 1,
+                            ensemble_sampler_func = None,
+                            checkpoint_func = None,
+                            checkpoint_interval = 100,
+                            resume_state = None):
     """
     Robbins-Monro stochastic approximation to estimate ALAAM parameers.
 
@@ -54,6 +161,28 @@ def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
                              (G, A, changestats_func_list, theta, performMove,
                               sampler_m); see basicALAAMsampler.py
                              default basicALAAMsampler
+       num_chains          - number of chains to sample the statistics
+                             in phases 1 and 3 with, run together with
+                             ensemble_sampler_func. Default 1 (just
+                             the one chain, with sampler_func).
+       ensemble_sampler_func - ensemble ALAAM sampler function, see
+                             ensembleALAAMsampler.py, updating the
+                             same nodes as sampler_func (e.g.
+                             ensembleConditionalALAAMsampler for
+                             conditionalALAAMsampler), or None to
+                             choose according to G (see
+                             sample_statistics()). Default None.
+       checkpoint_func     - function called with a dict of the state of
+                             the algorithm at the start of each subphase
+                             of phase 2 and every checkpoint_interval
+                             iterations in it, and at the start of
+                             phase 3, to save a checkpoint, or None.
+                             Default None.
+       checkpoint_interval - number of phase 2 iterations between calls
+                             of checkpoint_func. Default 100.
+       resume_state        - dict of the state of the algorithm as passed
+                             to checkpoint_func, to resume from, or None
+                             to start from the beginning. Default None.
 
 
      Returns:
@@ -85,45 +214,48 @@ def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
     phase3steps = 1000
     burnin       = int(round(0.1 * phase3steps * iterationInStep))
     
-    #
-    # Phase 1: estimate covariance matrix
-    #
-    print('Phase 1 steps = ', phase1steps, 'iters per step = ',iterationInStep)
-    start = time.time()
-    Z = np.copy(Zobs)  # start at observed statistics vector
-    Zmatrix = np.empty((phase1steps, n)) # rows statistics Z vectors, 1 per step
-    for i in range(phase1steps):
-        (acceptance_rate,
-         changeTo1ChangeStats,
-         changeTo0ChangeStats) = sampler_func(G, A,
-                                              changestats_func_list,
-                                              theta,
-                                              performMove = True,
-                                              sampler_m = iterationInStep)
-        Z += changeTo1ChangeStats - changeTo0ChangeStats
-        Zmatrix[i, ] = Z
-
-    Zmean = np.mean(Zmatrix, axis=0)
-    Zmean = np.reshape(Zmean, (1, len(Zmean))) # make it a row vector
-    theta = np.reshape(theta, (1, len(theta)))
-    print('Zmean = ', Zmean)
-
-    # Dcov = np.cov(np.transpose(Zmatrix))
-    # print 'Dcov = ', Dcov
-
-    Zmatrix -= Zmean
-    D = (1.0/phase1steps) * np.matmul(np.transpose(Zmatrix), Zmatrix)
-
-    print('D = ')
-    print(D)
-
-    if 1.0/np.linalg.cond(D) < epsilon:
-        sys.stdout.write("Covariance matrix is singular: may be degenerate model\n")
-        return (None, None, None)
-    Dinv = np.linalg.inv(D)
-
-
-    print('Phase 1 took', time.time() - start, 's')
+    if resume_state is None:
+        #
+        # Phase 1: estimate covariance matrix
+        #
+        print('Phase 1 steps = ', phase1steps, 'iters per step = ',iterationInStep)
+        start = time.time()
+        Z = np.copy(Zobs)  # start at observed statistics vector
+        (Zmatrix, A, Z) = sample_statistics(G, A, Z, changestats_func_list,
+                                            theta, sampler_func, phase1steps,
+                                            iterationInStep, 0, num_chains,
+                                            ensemble_sampler_func)
+
+        Zmean = np.mean(Zmatrix, axis=0)
+        Zmean = np.reshape(Zmean, (1, len(Zmean))) # make it a row vector
+        theta = np.reshape(theta, (1, len(theta)))
+        print('Zmean = ', Zmean)
+
+        # Dcov = np.cov(np.transpose(Zmatrix))
+        # print 'Dcov = ', Dcov
+
+        Zmatrix -= Zmean
+        D = (1.0/len(Zmatrix)) * np.matmul(np.transpose(Zmatrix), Zmatrix)
+
+        print('D = ')
+        print(D)
+
+        if 1.0/np.linalg.cond(D) < epsilon:
+            sys.stdout.write("Covariance matrix is singular: may be degenerate model\n")
+            return (None, None, None)
+        Dinv = np.linalg.inv(D)
+
+
+        print('Phase 1 took', time.time() - start, 's')
+        resume_state = {'phase': 2, 'subphase': 0, 'i': 0, 'a': a_initial}
+    else:
+        print('Resuming at phase', resume_state['phase'],
+              'subphase', resume_state['subphase'],
+              'iteration', resume_state['i'])
+        A = np.copy(resume_state['A'])
+        Z = np.copy(resume_state['Z'])
+        theta = np.copy(resume_state['theta'])
+        Dinv = resume_state['Dinv']
 
     #
     # Phase 2 (main phase): In each subphase, generate simulated
@@ -135,16 +267,34 @@ def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
     # new theta value. Value of Robbins-Monro multiplier a is halved
     # between each subphase.
     #
+    def phase2_state(k, i):
+        """state at iteration i of subphase k of phase 2 for checkpoint"""
+        return {'phase': 2, 'subphase': k, 'i': i, 'a': a, 'A': A, 'Z': Z,
+                'theta': theta, 'thetaSum': thetaSum,
+                'sumSuccessiveProducts': sumSuccessiveProducts,
+                'acceptance_rate': acceptance_rate, 'Dinv': Dinv}
+
     print('Phase 2 subphases = ',numSubphases, ' iters per step = ', iterationInStep)
     start = time.time()
-    a = a_initial
-    for k in range(numSubphases):
+    a = resume_state['a']
+    acceptance_rate = resume_state.get('acceptance_rate')
+    # first subphase to run is numSubphases if resuming in phase 3
+    first_subphase = (resume_state['subphase'] if resume_state['phase'] == 2
+                      else numSubphases)
+    for k in range(first_subphase, numSubphases):
         NkMin  = int(round(2.0**(4.0 * k / 3.0) * (7 + n)))
         NkMax  = NkMin + 200
         print('subphase', k, 'a = ', a, 'NkMin = ',NkMin,'NkMax = ',NkMax, 'theta = ', theta)
-        i = 0
-        sumSuccessiveProducts = np.zeros(n)
-        thetaSum = np.zeros((1,n))
+        if k == first_subphase and resume_state['i'] > 0:
+            i = resume_state['i']
+            sumSuccessiveProducts = np.copy(resume_state['sumSuccessiveProducts'])
+            thetaSum = np.copy(resume_state['thetaSum'])
+        else:
+            i = 0
+            sumSuccessiveProducts = np.zeros(n)
+            thetaSum = np.zeros((1,n))
+            if checkpoint_func is not None:
+                checkpoint_func(phase2_state(k, i))
         while i < NkMax and (i <= NkMin or not np.all(sumSuccessiveProducts < 0)):
             oldZ = np.copy(Z)
             (acceptance_rate,
@@ -162,12 +312,18 @@ def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
             sumSuccessiveProducts += ((Z - Zobs) * (oldZ - Zobs))
             ##print '    sumSuccessiveProducts =',sumSuccessiveProducts
             i += 1
+            if checkpoint_func is not None and i % checkpoint_interval == 0:
+                checkpoint_func(phase2_state(k, i))
         if k > 1:     # use initial value of a in first two subphases
             a /= 2.0  # otherwise halve a for next subphase (gain sequence)
         print('  subphase',k,'finished after',i,'iterations (acceptance rate =',acceptance_rate,')')
         theta = thetaSum / i # average theta
 
     print('Phase 2 took', time.time() - start, 's')
+    if checkpoint_func is not None and first_subphase < numSubphases:
+        checkpoint_func({'phase': 3, 'subphase': numSubphases, 'i': 0,
+                         'a': a, 'A': A, 'Z': Z, 'theta': theta,
+                         'Dinv': Dinv})
     
     #
     # Phase 3: Used only to estimate covariance matrix of estimator and
@@ -175,29 +331,11 @@ def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
     # 
     print('Phase 3 steps = ', phase3steps, 'iters per step = ',iterationInStep, 'burnin = ', burnin)
     start = time.time()
-    Zmatrix = np.empty((phase3steps, n)) # rows statistics Z vectors, 1 per step
-
-    # burn-in iterations
-    (acceptance_rate,
-     changeTo1ChangeStats,
-     changeTo0ChangeStats) = sampler_func(G, A,
-                                          changestats_func_list,
-                                          theta,
-                                          performMove = True,
-                                          sampler_m = burnin)
-    Z += changeTo1ChangeStats - changeTo0ChangeStats
-
-    
-    for i in range(phase3steps):
-        (acceptance_rate,
-         changeTo1ChangeStats,
-         changeTo0ChangeStats) = sampler_func(G, A,
-                                              changestats_func_list,
-                                              theta,
-                                              performMove = True,
-                                              sampler_m = iterationInStep)
-        Z += changeTo1ChangeStats - changeTo0ChangeStats
-        Zmatrix[i, ] = Z
+    # burn-in iterations then phase 3 steps
+    (Zmatrix, A, Z) = sample_statistics(G, A, Z, changestats_func_list, theta,
+                                        sampler_func, phase3steps,
+                                        iterationInStep, burnin, num_chains,
+                                        ensemble_sampler_func)
 
     print('XXX Zmatrix = ')
     print(Zmatrix) #XXX
@@ -210,7 +348,7 @@ def stochasticApproximation(G, Aobs, changestats_func_list, theta0,
     # print 'Dcov = ', Dcov
 
     Zmatrix -= Zmean
-    D = (1.0/phase3steps) * np.matmul(np.transpose(Zmatrix), Zmatrix)
+    D = (1.0/len(Zmatrix)) * np.matmul(np.transpose(Zmatrix), Zmatrix)
 
     print('Phase 3 covariance matrix D = ')
     print(D)
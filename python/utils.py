@@ -6,10 +6,19 @@
 # Utility functions
 #
 
+import numpy as np         # used for matrix & vector data types and functions
 
 # NA values for categorical and binary attributes (continuous uses float("nan"))
 NA_VALUE = -1
 
+# numpy data types of the node attribute arrays (binary, categorical, and
+# continuous attributes, respectively), see attribute_columns(). Binary
+# attributes are not stored as int8 as change statistics sum them over
+# neighbours, which would overflow for nodes with degree over 127.
+BINATTR_DTYPE = np.int32
+CATATTR_DTYPE = np.int32
+CONTATTR_DTYPE = np.float64
+
 def int_or_na(s):
     """
     Convert string to integer or NA value for "NA" for missing data
@@ -35,3 +44,183 @@ def float_or_na(s):
     """
     return float("NaN") if s == "NA" else float(s)
 
+
+def same_func_list(func_list1, func_list2):
+    """
+    Return True if func_list1 and func_list2 are the same lists of
+    (identical) function objects, e.g. to check if a model cached on a
+    graph was made for the change statistic functions in a list.
+    """
+    return (len(func_list1) == len(func_list2) and
+            all(f is g for (f, g) in zip(func_list1, func_list2)))
+
+
+class AttributeArray(np.ndarray):
+    """
+    numpy array of node attribute values, which also has the count()
+    and index() methods of the lists the attributes were previously
+    stored in, so that code using them still works.
+    """
+
+    def count(self, value):
+        """
+        Return the number of elements equal to value
+        """
+        return int(np.count_nonzero(np.asarray(self) == value))
+
+
+    def index(self, value):
+        """
+        Return the index of the first element equal to value,
+        raising ValueError if there is none
+        """
+        indices = np.flatnonzero(np.asarray(self) == value)
+        if len(indices) == 0:
+            raise ValueError(str(value) + " is not in array")
+        return int(indices[0])
+
+
+def attribute_columns(attrs, dtype):
+    """
+    Convert node attributes to the numpy arrays used to store them
+    in Graph (and Digraph etc.) objects
+
+    Parameters:
+       attrs - dict where the key is the attribute name and the value is
+               the sequence (e.g. list) of attribute values in node order,
+               with NA_VALUE (or NaN for continuous attributes) for NA
+       dtype - numpy data type for the attribute type, BINATTR_DTYPE,
+               CATATTR_DTYPE, or CONTATTR_DTYPE
+
+    Return value:
+      dict where the key is the attribute name and the value is the
+      (contiguous) numpy array (AttributeArray) of the attribute values
+      with type dtype
+    """
+    return dict([(name,
+                  np.ascontiguousarray(values, dtype=dtype).view(AttributeArray))
+                 for (name, values) in attrs.items()])
+
+
+def na_mask(values):
+    """
+    Return the mask of NA values in an attribute array
+
+    Parameters:
+       values - numpy array of binary or categorical attribute values
+                (NA is NA_VALUE) or continuous attribute values (NA is NaN)
+
+    Return value:
+      numpy boolean array, True for NA values
+    """
+    values = np.asarray(values)
+    return np.isnan(values) if values.dtype.kind == 'f' else values == NA_VALUE
+
+
+def effective_sample_size(x):
+    """
+    Estimate the effective sample size of a sequence of (correlated)
+    values from a Markov chain, using Geyer's initial positive sequence
+    estimator of the integrated autocorrelation time.
+
+    C. J. Geyer. Practical Markov chain Monte Carlo. Statistical Science,
+    7(4):473-483, 1992.
+
+    Parameters:
+       x - numpy vector of values of a statistic, in the order sampled
+
+    Return value:
+       estimated effective sample size (NaN if x is constant)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    x = x - np.mean(x)
+    # autocovariances at all lags, computed with the FFT (zero padded
+    # so it is not circular)
+    f = np.fft.rfft(x, 2 * n)
+    acov = np.fft.irfft(f * np.conj(f))[:n] / n
+    if acov[0] == 0:
+        return float("nan")
+    rho = acov / acov[0]
+    # sums of adjacent pairs of autocorrelations, truncated at the first
+    # one that is not positive
+    pairsums = rho[0:n-1:2] + rho[1:n:2]
+    nonpositive = np.nonzero(pairsums <= 0)[0]
+    if len(nonpositive) > 0:
+        pairsums = pairsums[:nonpositive[0]]
+    tau = max(-1.0 + 2.0 * np.sum(pairsums), 1.0 / n)
+    return n / tau
+
+
+class RunningMeanCovariance:
+    """
+    Running mean and covariance of a sequence of vectors, updated one
+    vector at a time (Welford's algorithm), so the vectors do not all
+    need to be kept in memory. Two of these can be merged (Chan et al.'s
+    pairwise algorithm), e.g. to combine the statistics of samples from
+    different chains.
+
+    B. P. Welford. Note on a method for calculating corrected sums of
+    squares and products. Technometrics, 4(3):419-420, 1962.
+
+    T. F. Chan, G. H. Golub, and R. J. LeVeque. Updating formulae and a
+    pairwise algorithm for computing sample variances. In COMPSTAT 1982,
+    pages 30-41. Physica-Verlag, 1982.
+    """
+
+    def __init__(self, k):
+        """
+        Construct the running mean and covariance of (no) vectors
+
+        Parameters:
+           k - length of the vectors
+        """
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.M2 = np.zeros((k, k)) # sum of outer products of deviations
+
+
+    def update(self, x):
+        """
+        Add a vector
+
+        Parameters:
+           x - numpy vector of length k
+        """
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.M2 += np.outer(delta, x - self.mean)
+
+
+    def merge(self, other):
+        """
+        Add all the vectors of another RunningMeanCovariance object
+
+        Parameters:
+           other - RunningMeanCovariance object for vectors of the same length
+        """
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.M2 += other.M2 + np.outer(delta, delta) * (self.count *
+                                                         other.count / count)
+        self.mean += delta * (other.count / count)
+        self.count = count
+
+
+    def variance(self, ddof = 0):
+        """
+        Return the numpy vector of variances (as np.var(X, axis=0, ddof=ddof)
+        for X with the vectors as rows)
+        """
+        return np.diag(self.M2) / (self.count - ddof)
+
+
+    def covariance(self, ddof = 1):
+        """
+        Return the covariance matrix (as np.cov(X, rowvar=False, ddof=ddof)
+        for X with the vectors as rows)
+        """
+        return self.M2 / (self.count - ddof)
@@ -20,6 +20,12 @@
       of exponential-family random graph models: terms and computational
       aspects. Journal of Statistical Software, 24(4), 1548.
 
+   The nodes with outcome 0 and outcome 1 are kept in two arrays
+   (ZooNodeSets), with removal by swapping with the last element, so
+   that choosing a node and computing the proposal ratio is O(1) rather
+   than O(N) for each proposal. The ZooNodeSets object is cached on the
+   graph, and updated only for the nodes that have changed between calls.
+
 """
 
 import random
@@ -28,9 +34,92 @@ import numpy as np         # used for matrix & vector data types and functions
 
 from Graph import Graph,NA_VALUE
 from changeStatisticsALAAM import *
+from ChangeStatisticsTable import getChangeStatisticsTable
+
+
+class ZooNodeSets:
+    """The nodes with outcome 0 and with outcome 1 (NA nodes are in
+    neither), each in a list, with the position of each node in its
+    list, so that a node can be moved from one to the other in O(1)
+    by swapping it with the last element of the list and removing that.
+    """
+
+    def __init__(self, A):
+        """
+        Construct the node sets for outcome vector A
+
+        Parameters:
+           A   - vector of 0/1 (or NA) outcome variables for ALAAM
+        """
+        self.A = np.array(A)  # copy of outcome vector the sets are for
+        self.nodes = {0: np.nonzero(self.A == 0)[0].tolist(),
+                      1: np.nonzero(self.A == 1)[0].tolist()}
+        self.pos = [None] * len(self.A) # position of node in its list
+        for value in [0, 1]:
+            for (k, i) in enumerate(self.nodes[value]):
+                self.pos[i] = k
+
+
+    def move(self, i, value):
+        """
+        Update the node sets for the outcome of node i being changed to value
+
+        Parameters:
+           i     - node whose outcome has changed
+           value - new outcome value of node i (0, 1 or NA_VALUE)
+        """
+        oldvalue = self.A[i]
+        if oldvalue == value:
+            return
+        if oldvalue != NA_VALUE:
+            # remove i by moving last element of list into its position
+            nodelist = self.nodes[oldvalue]
+            last = nodelist.pop()
+            if last != i:
+                nodelist[self.pos[i]] = last
+                self.pos[last] = self.pos[i]
+        if value != NA_VALUE:
+            self.pos[i] = len(self.nodes[value])
+            self.nodes[value].append(i)
+        else:
+            self.pos[i] = None
+        self.A[i] = value
+
+
+    def sync(self, A):
+        """
+        Update the node sets so they are correct for the outcome vector A,
+        updating only for nodes whose outcome has changed.
+
+        Parameters:
+           A   - vector of 0/1 (or NA) outcome variables for ALAAM
+        """
+        for i in np.nonzero(self.A != np.asarray(A))[0].tolist():
+            self.move(i, A[i])
 
 
 
+def getZooNodeSets(G, A):
+    """
+    Return the ZooNodeSets for outcome vector A, using (and updating)
+    the one cached on G if there is one.
+
+    Parameters:
+       G   - Graph object for network (fixed)
+       A   - vector of 0/1 (or NA) outcome variables for ALAAM
+
+    Return value:
+       ZooNodeSets object for A
+    """
+    nodesets = getattr(G, 'zoo_node_sets', None)
+    if nodesets is None or len(nodesets.A) != len(A):
+        nodesets = ZooNodeSets(A)
+        G.zoo_node_sets = nodesets
+    else:
+        nodesets.sync(A)
+    return nodesets
+
+
 def zooALAAMsampler(G, A, changestats_func_list, theta, performMove,
                       sampler_m):
     """
@@ -67,13 +156,18 @@ def zooALAAMsampler(G, A, changestats_func_list, theta, performMove,
     """
     n = len(changestats_func_list)
 
+    nodesets = getZooNodeSets(G, A)
+    zero_nodes = nodesets.nodes[0]
+    one_nodes = nodesets.nodes[1]
     # number of elements of A that are not NA (so 0 or 1)
-    numNodes = len(A)
-    num_not_na = len(A) - len(np.where(A == NA_VALUE)[0])
+    num_not_na = len(zero_nodes) + len(one_nodes)
+    Dmax = float(num_not_na)                # max possible outcome=1 nodes
 
     accepted = 0
     changeTo1ChangeStats = np.zeros(n)
     changeTo0ChangeStats = np.zeros(n)
+    cstable = getChangeStatisticsTable(G, changestats_func_list)
+    nbrcounts = cstable.activeNeighbourCounts(G, A)
     for k in range(sampler_m):
         # ZOO sampler: first choose a zero-to-one or one-to-zero move
         # with equal probability (1/2) by choosing a node with 0
@@ -82,39 +176,40 @@ def zooALAAMsampler(G, A, changestats_func_list, theta, performMove,
 
         # if all non-NA elements are 1 then must do 1 to 0 move
         # of if all non-NA elements are 0 must do 0 to 1 move
-        if len(np.where(A == 1)[0]) == num_not_na:
+        num_ones = len(one_nodes)
+        if num_ones == num_not_na:
             isChangeToZero = True
-        elif len(np.where(A == 0)[0]) == num_not_na:
+        elif num_ones == 0:
             isChangeToZero = False
         else:
             isChangeToZero = (random.uniform(0, 1) < 0.5)
 
-        i = np.random.choice(np.where(A == (1 if isChangeToZero else 0))[0])
-        while A[i] == NA_VALUE:  # keep going until we get one that is not NA
-            i = np.random.choice(np.where(A == (1 if isChangeToZero else 0))[0])
-        
         if isChangeToZero:
+            i = one_nodes[random.randrange(num_ones)]
             assert(A[i] == 1)
             A[i] = 0
+        else:
+            i = zero_nodes[random.randrange(num_not_na - num_ones)]
 
         assert(A[i] == 0)
 
         # compute change statistics for each of the n statistics using the
-        # list of change statistic functions
-        changestats = np.zeros(n)
-        for l in range(n):
-            changestats[l] = changestats_func_list[l](G, A, i)
+        # list of change statistic functions (or the precomputed values
+        # for those that do not depend on the outcome vector, and the
+        # active neighbour counts for contagion-type statistics)
+        changestats = cstable.changeStats(G, A, i, nbrcounts)
         changeSignMul = -1 if isChangeToZero else +1
         total = np.sum(theta * changeSignMul * changestats)
 
-        Dmax = float(num_not_na)                # max possible outcome=1 nodes
-        Dy   = float(len(np.where(A == 1)[0]))  # number of outcome=1 nodes now
+        # number of outcome=1 nodes now (i.e. with A[i] = 0)
+        Dy = float(num_ones - 1 if isChangeToZero else num_ones)
         # TODO should handle special cases for all zero and all one
         if isChangeToZero:
-            log_proposal_ratio = np.log(Dy / (Dmax - Dy))
+            log_proposal_ratio = (math.log(Dy / (Dmax - Dy)) if Dy > 0
+                                  else -math.inf)
         else:
-            log_proposal_ratio = np.log((Dmax - Dy) / Dy)
-        
+            log_proposal_ratio = (math.log((Dmax - Dy) / Dy) if Dy > 0
+                                  else math.inf)
 
         alpha = np.exp(log_proposal_ratio + total)#np.exp gives inf not overflow
 
@@ -126,6 +221,9 @@ def zooALAAMsampler(G, A, changestats_func_list, theta, performMove,
                 # For changeTo1 move, set outcome to 1 now
                 if not isChangeToZero:
                     A[i] = 1
+                nodesets.move(i, A[i])
+                if nbrcounts is not None:
+                    nbrcounts.update(G, A, i)
             else:
                 # if we are not to actually perform the moves, then reverse
                 # changes for changeTo0 move made so A same as before
@@ -140,4 +238,3 @@ def zooALAAMsampler(G, A, changestats_func_list, theta, performMove,
 
     acceptance_rate = float(accepted) / sampler_m
     return (acceptance_rate, changeTo1ChangeStats, changeTo0ChangeStats)
-
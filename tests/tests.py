@@ -14,15 +14,47 @@ from math import log,exp,isclose
 import math
 from collections import Counter
 import numpy
+import os
+import tempfile
+import pickle
+import weakref
+import gc
 
 from Graph import Graph,int_or_na
 from Digraph import Digraph
 from BipartiteGraph import BipartiteGraph,MODE_A,MODE_B
+from CSRGraph import CSRGraph,CSRDigraph,CSRBipartiteGraph,toCSR,getCSRGraph,load_binary,load_graph_cached,readCSRGraph
+import shutil
+from ChangeStatisticsTable import ChangeStatisticsTable,getChangeStatisticsTable,is_outcome_independent
+from ActiveNeighbourCounts import ActiveNeighbourCounts,get_indexed_changestat
+from FusedChangeStatistics import FusedChangeStatistics,get_fused_changestat
+from basicALAAMsampler import basicALAAMsampler
+from batchALAAMsampler import batchALAAMsampler,batchALAAMsamplerNodes,getNodesNotNA
+from zooALAAMsampler import zooALAAMsampler,ZooNodeSets
+from conditionalALAAMsampler import conditionalALAAMsampler
+from jitChangeStatistics import HAVE_NUMBA,get_kernel_model
+from jitALAAMsampler import kernelALAAMsamplerNodes,jitBipartiteALAAMsampler
+from estimateALAAMEE import run_ee,run_ee_parallel
+from estimateALAAMSA import run_sa
+from initialEstimator import algorithm_MPLE,mple_design_matrix
+from computeALAAMEEcovariance import batch_means_covariance,inverse_variance_wm,computeEEestimates,readEEoutputFiles,writeEEestimates
+from parseEstimationEEOutput import parseEstimationEEOutput
 from computeObservedStatistics import computeObservedStatistics
+from directStatistics import get_direct_statistic,get_direct_change_statistic
+from checkerboardALAAMsampler import checkerboardALAAMsampler,get_checkerboard_model
+from heatBathALAAMsampler import heatBathALAAMsampler,SystematicScan
+from ensembleALAAMsampler import ensembleALAAMsampler
+from parallelTemperingALAAMsampler import parallelTemperingALAAMsampler,geometric_temperature_ladder
+from simulateALAAM import simulateALAAM,simulateALAAMensemble,simulate_theta_path
+from importanceReweighting import ReweightedSamples,reweight_theta_grid
+from stochasticApproximation import sample_statistics,stochasticApproximation
+from utils import effective_sample_size,RunningMeanCovariance,attribute_columns,BINATTR_DTYPE
 from changeStatisticsALAAM import *
 import changeStatisticsALAAMdirected
 from changeStatisticsALAAMbipartite import *
-from gofALAAM import mahalanobis
+from gofALAAM import gof,mahalanobis,potential_scale_reduction
+from checkpoint import save_checkpoint,load_checkpoint
+from equilibriumExpectationBorisenko import EEStoppingRule
 
 DEFAULT_NUM_TESTS = 10000 # number of random node samples
 
@@ -908,6 +940,1731 @@ def test_new_bipartite_change_stats_tiny():
     print("OK")
     print()
 
+
+
+def test_csr_graphs():
+    """
+    test immutable CSR versions of Graph, Digraph and BipartiteGraph
+    give same structure and same observed statistics as the dictionary
+    of dictionaries versions
+    """
+    print("testing CSR graphs...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    csrg = toCSR(g)
+    assert isinstance(csrg, CSRGraph) and isinstance(csrg, Graph)
+    assert csrg.numNodes() == g.numNodes()
+    assert csrg.numEdges() == g.numEdges()
+    assert csrg.density() == g.density()
+    assert all([csrg.degree(i) == g.degree(i) for i in g.nodeIterator()])
+    assert all([set(csrg.neighbourIterator(i)) == set(g.neighbourIterator(i))
+                for i in g.nodeIterator()])
+    assert all([csrg.isEdge(i, j) == g.isEdge(i, j)
+                for i in g.nodeIterator() for j in g.nodeIterator()])
+    assert all([csrg.twoPaths(i, j) == g.twoPaths(i, j)
+                for i in g.nodeIterator() for j in g.nodeIterator()])
+    # twoPaths() is memoized per graph, which is not kept alive by it
+    assert len(csrg.twopaths_cache) == g.numNodes() * (g.numNodes() - 1) // 2
+    assert len(toCSR(g).twopaths_cache) == 0
+    h = toCSR(g)
+    h.twoPaths(0, 1)
+    csrg_ref = weakref.ref(h)
+    del h
+    gc.collect()
+    assert csrg_ref() is None
+    # and only the most recently used counts are kept
+    import CSRGraph as csrgraph_module
+    cache_size = csrgraph_module.TWOPATHS_CACHE_SIZE
+    csrgraph_module.TWOPATHS_CACHE_SIZE = 10
+    try:
+        h = toCSR(g)
+        for j in range(1, 20):
+            assert h.twoPaths(0, j) == g.twoPaths(0, j)
+            h.twoPaths(1, 0)
+        assert len(h.twopaths_cache) == 10
+        assert (0, 1) in h.twopaths_cache and (0, 2) not in h.twopaths_cache
+    finally:
+        csrgraph_module.TWOPATHS_CACHE_SIZE = cache_size
+    assert sorted(csrg.edgeIterator()) == sorted(g.edgeIterator())
+    csrg.printSummary()
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeActivity, changeTwoStar, changeThreeStar, changeContagion, changeTriangleT1, changeTriangleT2, changeTriangleT3, changeIndirectPartnerAttribute, changePartnerAttributeActivity, changePartnerPartnerAttribute, partial(changeoOb, "senior"), partial(changeo_Ob, "senior"), partial(changeoOc, "age"), partial(changeo_Oc, "age"), partial(changeoO_Osame, "gender"), partial(changeGWActivity, log(2)), partial(changeGWContagion, log(2))]
+    assert numpy.allclose(computeObservedStatistics(csrg, outcome_binvar, statfuncs),
+                          computeObservedStatistics(g, outcome_binvar, statfuncs))
+
+    g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net",
+                catattr_filename = "../examples/data/directed/HighSchoolFriendship/highschool_friendship_catattr.txt")
+    csrg = toCSR(g)
+    assert isinstance(csrg, CSRDigraph) and isinstance(csrg, Digraph)
+    assert csrg.numNodes() == g.numNodes()
+    assert csrg.numArcs() == g.numArcs()
+    assert all([csrg.outdegree(i) == g.outdegree(i) and
+                csrg.indegree(i) == g.indegree(i) for i in g.nodeIterator()])
+    assert all([set(csrg.outIterator(i)) == set(g.outIterator(i)) and
+                set(csrg.inIterator(i)) == set(g.inIterator(i))
+                for i in g.nodeIterator()])
+    assert all([csrg.isArc(i, j) == g.isArc(i, j)
+                for i in g.nodeIterator() for j in g.nodeIterator()])
+    outcome_binvar = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeStatisticsALAAMdirected.changeSender, changeStatisticsALAAMdirected.changeReceiver, changeStatisticsALAAMdirected.changeReciprocity, changeStatisticsALAAMdirected.changeContagion, changeStatisticsALAAMdirected.changeMixedTwoStar, changeStatisticsALAAMdirected.changeTransitiveTriangleT3, changeStatisticsALAAMdirected.changeCyclicTriangleC1, changeStatisticsALAAMdirected.changeAlterInTwoStar2, partial(changeStatisticsALAAMdirected.changeSenderMatch, "class"), partial(changeStatisticsALAAMdirected.changeGWContagion, log(2))]
+    assert numpy.allclose(computeObservedStatistics(csrg, outcome_binvar, statfuncs),
+                          computeObservedStatistics(g, outcome_binvar, statfuncs))
+
+    g = BipartiteGraph("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net")
+    csrg = toCSR(g)
+    assert isinstance(csrg, CSRBipartiteGraph) and isinstance(csrg, BipartiteGraph)
+    assert csrg.density() == g.density()
+    assert list(csrg.nodeModeIterator(MODE_A)) == list(g.nodeModeIterator(MODE_A))
+    assert list(csrg.nodeModeIterator(MODE_B)) == list(g.nodeModeIterator(MODE_B))
+    # two-paths matrix built from arrays must be same as converted one
+    csrg2 = CSRBipartiteGraph(indptr = csrg.indptr, indices = csrg.indices,
+                              num_A_nodes = csrg.num_A_nodes)
+    for i in g.nodeIterator():
+        assert (list(csrg.twoPathsMatrix.rowNonZeroColumnsIterator(i)) ==
+                list(csrg2.twoPathsMatrix.rowNonZeroColumnsIterator(i)) ==
+                sorted(g.twoPathsMatrix.rowNonZeroColumnsIterator(i)))
+        for j in csrg.twoPathsMatrix.rowNonZeroColumnsIterator(i):
+            assert (csrg.twoPathsMatrix.getValue(i, j) ==
+                    csrg2.twoPathsMatrix.getValue(i, j) ==
+                    g.twoPathsMatrix.getValue(i, j))
+    outcome_binvar = list(map(int_or_na, open("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_outcome.txt").read().split()[1:]))
+    statfuncs = [partial(changeBipartiteDensity, MODE_A), partial(changeBipartiteActivity, MODE_A), partial(changeBipartiteEgoTwoStar, MODE_A), partial(changeBipartiteAlterTwoStar1,MODE_A), partial(changeBipartiteAlterTwoStar2,MODE_A), partial(changeBipartiteFourCycle1, MODE_A), partial(changeBipartiteFourCycle2, MODE_A)]
+    obs_stats = computeObservedStatistics(csrg2, outcome_binvar, statfuncs)
+    assert all(obs_stats == numpy.array([39, 129, 347, 1258, 266, 718, 122]))
+
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_changestats_table():
+    """
+    test the precomputed change statistics table for change statistics
+    that do not depend on the outcome vector gives the same change
+    statistics as calling the change statistic functions
+    """
+    print("testing change statistics table...")
+    start = time.time()
+    assert is_outcome_independent(changeTriangleT1)
+    assert is_outcome_independent(partial(changeoOb, "senior"))
+    assert is_outcome_independent(partial(changeBipartiteFourCycle1, MODE_A))
+    assert is_outcome_independent(changeStatisticsALAAMdirected.changeSender)
+    assert not is_outcome_independent(changeContagion)
+    assert not is_outcome_independent(partial(changeGWContagion, log(2)))
+    assert not is_outcome_independent(partial(changeBipartiteFourCycle2, MODE_A))
+
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    A = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeActivity, changeTwoStar, changeContagion, changeTriangleT1, changeTriangleT3, partial(changeoOb, "senior"), partial(changeoOc, "age"), partial(changeoO_Osame, "gender"), partial(changeGWActivity, log(2))]
+    cstable = getChangeStatisticsTable(g, statfuncs)
+    assert cstable.fixed_indices == [0, 1, 2, 4, 6, 7, 8, 9]
+    for i in g.nodeIterator():
+        assert all(cstable.changeStats(g, A, i) ==
+                   numpy.array([f(g, A, i) for f in statfuncs]))
+    # table is cached on the graph for the same list of functions
+    assert getChangeStatisticsTable(g, statfuncs) is cstable
+    assert getChangeStatisticsTable(g, list(statfuncs)) is cstable
+    cstable2 = getChangeStatisticsTable(g, statfuncs[:-1])
+    assert cstable2 is not cstable
+    # and both tables stay cached when the lists are used alternately
+    assert getChangeStatisticsTable(g, statfuncs) is cstable
+    assert getChangeStatisticsTable(g, statfuncs[:-1]) is cstable2
+
+    g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net",
+                catattr_filename = "../examples/data/directed/HighSchoolFriendship/highschool_friendship_catattr.txt")
+    A = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeStatisticsALAAMdirected.changeSender, changeStatisticsALAAMdirected.changeReciprocity, changeStatisticsALAAMdirected.changeContagion, changeStatisticsALAAMdirected.changeTransitiveTriangleT1, partial(changeStatisticsALAAMdirected.changeReceiverMismatch, "class"), partial(changeStatisticsALAAMdirected.changeGWSender, log(2))]
+    cstable = ChangeStatisticsTable(g, statfuncs)
+    for i in g.nodeIterator():
+        assert all(cstable.changeStats(g, A, i) ==
+                   numpy.array([f(g, A, i) for f in statfuncs]))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_active_neighbour_counts():
+    """
+    test the change statistics using the active neighbour counts index
+    give the same values as the change statistic functions, including
+    when the outcome of the node itself is temporarily set to 0 as in
+    the samplers, and that the index is correctly maintained by the sampler
+    """
+    print("testing active neighbour counts...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net")
+    ug = BipartiteGraph("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net")
+    dg = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net")
+    statfuncs = [changeContagion, changeIndirectPartnerAttribute, changePartnerAttributeActivity, partial(changeGWContagion, log(2)), changeLogContagion, partial(changePowerContagion, 2)]
+    bpstatfuncs = [partial(changeBipartiteAlterTwoStar2, MODE_A), partial(changeBipartiteAlterTwoStar2, MODE_B)]
+    dstatfuncs = [changeStatisticsALAAMdirected.changeContagion, changeStatisticsALAAMdirected.changeAlterInTwoStar2, changeStatisticsALAAMdirected.changeAlterOutTwoStar2, partial(changeStatisticsALAAMdirected.changeGWContagion, log(2)), changeStatisticsALAAMdirected.changeLogContagion, partial(changeStatisticsALAAMdirected.changePowerContagion, 2)]
+    assert get_indexed_changestat(changeTriangleT3) is None
+    for (G, funcs) in [(g, statfuncs), (ug, statfuncs + bpstatfuncs),
+                       (dg, dstatfuncs)]:
+        A = numpy.array([random.randint(0, 1) for _ in range(G.numNodes())])
+        A[random.randrange(G.numNodes())] = NA_VALUE
+        nbrcounts = ActiveNeighbourCounts(G, A)
+        for i in G.nodeIterator():
+            if A[i] == NA_VALUE:
+                continue
+            Ai = A[i]
+            A[i] = 0 # as done by samplers for both changeTo0 and changeTo1
+            for f in funcs:
+                assert isclose(get_indexed_changestat(f)(G, A, i, nbrcounts),
+                               f(G, A, i))
+            A[i] = Ai
+        # run sampler and check index is maintained, and same as new one
+        theta = numpy.array([-0.5, 0.5] + [0.1] * (len(funcs) - 2))
+        cstable = getChangeStatisticsTable(G, funcs)
+        basicALAAMsampler(G, A, funcs, theta, True, 1000)
+        nbrcounts = ActiveNeighbourCounts(G, A)
+        assert cstable.nbrcounts.active == nbrcounts.active
+        assert all(cstable.nbrcounts.active_mask ==
+                   numpy.array(cstable.nbrcounts.active, dtype=bool))
+        # and resynchronized when A is changed outside the sampler
+        A[numpy.nonzero(A != NA_VALUE)[0][:10]] ^= 1
+        nbrcounts = ActiveNeighbourCounts(G, A)
+        synced = cstable.activeNeighbourCounts(G, A)
+        assert all(synced.active_mask == nbrcounts.active_mask)
+        assert (dict((k, v) for (k, v) in vars(synced).items()
+                     if k != 'active_mask') ==
+                dict((k, v) for (k, v) in vars(nbrcounts).items()
+                     if k != 'active_mask'))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_fused_change_stats():
+    """
+    test the fused computation of contagion-type change statistics in
+    a single pass gives the same values as the change statistic functions
+    """
+    print("testing fused change statistics...")
+    start = time.time()
+    assert get_fused_changestat(changeContagion) == ('Contagion', None)
+    assert get_fused_changestat(partial(changeGWContagion, log(2))) == ('GWContagion', log(2))
+    assert get_fused_changestat(changeGWContagion) is None
+    assert get_fused_changestat(partial(changeContagion, 1)) is None
+    assert get_fused_changestat(changeStatisticsALAAMdirected.changeContagion) is None
+    assert get_fused_changestat(changeTriangleT1) is None
+    g = Graph("../examples/data/simulated_n500_bin_cont2/n500_kstar_simulate12750000.txt",
+              "../examples/data/simulated_n500_bin_cont2/binaryAttribute_50_50_n500.txt")
+    statfuncs = [changeDensity, changeContagion, changePartnerAttributeActivity, changeIndirectPartnerAttribute, changePartnerPartnerAttribute, changeTriangleT2, changeTriangleT3, partial(changeGWContagion, log(2)), partial(changeGWContagion, 2.0), changeLogContagion, partial(changePowerContagion, 2), partial(changeAlterBinaryTwoStar2, 'binaryAttribute')]
+    cstable = ChangeStatisticsTable(g, statfuncs)
+    assert cstable.fused.fused_indices == list(range(1, 11))
+    for k in range(5):
+        A = numpy.array([random.randint(0, 1) for _ in range(g.numNodes())])
+        nbrcounts = cstable.activeNeighbourCounts(g, A)
+        for i in g.nodeIterator():
+            Ai = A[i]
+            A[i] = 0 # as done by samplers for both changeTo0 and changeTo1
+            assert numpy.allclose(cstable.changeStats(g, A, i, nbrcounts),
+                                  [f(g, A, i) for f in statfuncs])
+            A[i] = Ai
+    outcome_binvar = list(map(int_or_na, open("../examples/data/simulated_n500_bin_cont2/sample-n500_bin_cont6700000.txt").read().split()[1:]))
+    obs_stats = computeObservedStatistics(g, outcome_binvar, statfuncs)
+    assert numpy.allclose(obs_stats, computeObservedStatistics(g, outcome_binvar, [partial(f) for f in statfuncs]))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_batch_sampler():
+    """
+    test the batch version of the basic sampler: reproducible with
+    the same seed, does not change NA outcomes or (if not performing
+    moves) the outcome vector, and gives the correct outcome probability
+    for a density only model (independent Bernoulli outcomes).
+    """
+    print("testing batch sampler...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net")
+    statfuncs = [changeDensity, changeActivity, changeContagion]
+    theta = numpy.array([-1.0, 0.1, 0.2])
+    A = numpy.array([random.randint(0, 1) for _ in range(g.numNodes())])
+    A[0] = NA_VALUE
+    Acopy = numpy.copy(A)
+    batchALAAMsampler(g, A, statfuncs, theta, False, 1000)
+    assert all(A == Acopy)
+    results = []
+    for k in range(2):
+        A = numpy.copy(Acopy)
+        rng = numpy.random.default_rng(42)
+        results.append(batchALAAMsampler(g, A, statfuncs, theta, True, 1000,
+                                         rng = rng))
+        assert A[0] == NA_VALUE
+    assert results[0][0] == results[1][0]
+    assert all(results[0][1] == results[1][1])
+    assert all(results[0][2] == results[1][2])
+    # non-NA nodes are cached on the graph while the NA pattern is the same
+    nodes = getNodesNotNA(g, A)
+    assert list(nodes) == list(range(1, g.numNodes()))
+    assert getNodesNotNA(g, list(A)) is nodes
+    A[[0, 1]] = [0, NA_VALUE]
+    assert list(getNodesNotNA(g, A)) == [0] + list(range(2, g.numNodes()))
+    # density only model: outcome of each node is independent Bernoulli(p)
+    p = 0.3
+    g = Graph(num_nodes = 500)
+    A = numpy.zeros(g.numNodes(), dtype=int)
+    batchALAAMsampler(g, A, [changeDensity], numpy.array([log(p/(1-p))]),
+                      True, 10000)
+    mean_outcome = 0
+    for k in range(100):
+        batchALAAMsampler(g, A, [changeDensity], numpy.array([log(p/(1-p))]),
+                          True, 1000)
+        mean_outcome += numpy.mean(A) / 100
+    print(mean_outcome)
+    assert abs(mean_outcome - p) < 0.05
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_zoo_sampler_node_sets():
+    """
+    test the node sets for the ZOO sampler are correctly maintained
+    by the sampler and when synchronised with a changed outcome vector
+    """
+    print("testing ZOO sampler node sets...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net")
+    statfuncs = [changeDensity, changeActivity, changeContagion]
+    theta = numpy.array([-1.0, 0.05, 0.2])
+    A = numpy.zeros(g.numNodes(), dtype=int) # all zero is a special case
+    A[3] = NA_VALUE
+    def check_node_sets(nodesets, A):
+        assert sorted(nodesets.nodes[0]) == list(numpy.nonzero(A == 0)[0])
+        assert sorted(nodesets.nodes[1]) == list(numpy.nonzero(A == 1)[0])
+        for value in [0, 1]:
+            for (k, i) in enumerate(nodesets.nodes[value]):
+                assert nodesets.pos[i] == k
+        assert all(nodesets.A == A)
+    for k in range(20):
+        zooALAAMsampler(g, A, statfuncs, theta, True, 100)
+        check_node_sets(g.zoo_node_sets, A)
+        assert A[3] == NA_VALUE
+    Acopy = numpy.copy(A)
+    zooALAAMsampler(g, A, statfuncs, theta, False, 100)
+    assert all(A == Acopy)
+    nodesets = ZooNodeSets(A)
+    A = numpy.array([random.randint(0, 1) for _ in range(g.numNodes())])
+    nodesets.sync(A)
+    check_node_sets(nodesets, A)
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_conditional_sampler():
+    """
+    test the conditional (snowball sample) sampler only changes the
+    outcome of inner wave nodes with outcome not NA, and gives the correct
+    outcome probability for a density only model.
+    """
+    print("testing conditional sampler...")
+    start = time.time()
+    g = Graph(num_nodes = 500)
+    # zones 0, 1, 2 assigned by node number, so inner waves are zones 0 and 1
+    g.zone = [i % 3 for i in range(g.numNodes())]
+    g.max_zone = 2
+    g.inner_nodes = [i for (i, z) in enumerate(g.zone) if z < g.max_zone]
+    A = numpy.array([random.randint(0, 1) for _ in range(g.numNodes())])
+    A[0:10] = NA_VALUE
+    Acopy = numpy.copy(A)
+    p = 0.3
+    mean_outcome = 0
+    for k in range(100):
+        conditionalALAAMsampler(g, A, [changeDensity],
+                                numpy.array([log(p/(1-p))]), True, 1000)
+        assert all(A[0:10] == NA_VALUE)
+        assert all(A[2::3] == Acopy[2::3]) # outermost zone not changed
+        if k >= 10:
+            mean_outcome += numpy.mean(A[10:][numpy.array(g.zone[10:]) < 2]) / 90
+    print(mean_outcome)
+    assert abs(mean_outcome - p) < 0.05
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_run_ee_parallel():
+    """
+    test running EE estimation in parallel processes: runs have
+    different seeds, and results are returned for each run
+    """
+    print("testing parallel EE estimation...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            results = run_ee_parallel(g, outcome_binvar, "karate",
+                                      [changeDensity, changeActivity],
+                                      ["Density", "Activity"],
+                                      num_runs = 2, processes = 2,
+                                      EEiterations = 200,
+                                      sampler_func = batchALAAMsampler,
+                                      seed = 123)
+            assert len(results) == 2
+            for (run, (theta_values, dzA_values)) in enumerate(results):
+                # Algorithm S (100 rows) then EE every 100 iterations
+                assert theta_values.shape == (102, 4)
+                assert dzA_values.shape == (2, 3)
+                assert os.path.exists("theta_values_karate_" + str(run) + ".txt")
+            assert not numpy.array_equal(results[0][0], results[1][0])
+        finally:
+            os.chdir(cwd)
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+
+def test_compute_ee_covariance():
+    """
+    test computing EE estimates and standard errors (batch means MCMC
+    covariance, Fisher information, and inverse-variance pooling)
+    """
+    print("testing EE estimate and covariance computation...")
+    start = time.time()
+    rng = numpy.random.default_rng(42)
+    # batch means covariance against straightforward computation
+    X = rng.normal(size = (1000, 3))
+    b = 31
+    a = 1000 // b
+    batchmeans = numpy.array([numpy.mean(X[k*b:(k+1)*b], axis = 0)
+                              for k in range(a)])
+    expected = numpy.zeros((3, 3))
+    for k in range(a):
+        d = batchmeans[k] - numpy.mean(X, axis = 0)
+        expected += b * numpy.outer(d, d) / (a - 1)
+    assert numpy.allclose(batch_means_covariance(X), expected)
+    Y = rng.normal(size = (4, 1000, 3))
+    stacked = batch_means_covariance(Y)
+    for k in range(4):
+        assert numpy.allclose(stacked[k], batch_means_covariance(Y[k]))
+
+    (est, se) = inverse_variance_wm(numpy.array([1.0, 2.0]),
+                                    numpy.array([1.0, 2.0]))
+    assert isclose(est, (1.0 + 2.0/4) / (1 + 1/4))
+    assert isclose(se, math.sqrt(1 / (1 + 1/4)))
+
+    # simulated EE output: theta and dzA every 100 iterations, with
+    # the Algorithm S values before iteration 0
+    labels = ["Density", "Contagion"]
+    def simulate_run(num_rows):
+        t = numpy.arange(-100, num_rows * 100, 100)
+        theta = numpy.column_stack([t, numpy.array([-1.0, 0.5]) +
+                                    0.01 * rng.normal(size = (len(t), 2)),
+                                    numpy.full(len(t), 0.5)])
+        dzA = numpy.column_stack([t[1:], rng.normal(size = (len(t)-1, 2))])
+        return (theta, dzA)
+    runs = [simulate_run(500), simulate_run(500), simulate_run(400)]
+    bad_theta = runs[1][0].copy()
+    bad_theta[-1, 1] = float("nan")
+    runs.append((bad_theta, runs[1][1]))
+    estimates = computeEEestimates([theta for (theta, dzA) in runs],
+                                   [dzA for (theta, dzA) in runs])
+    assert estimates.runs == [0, 1, 2]
+    assert estimates.removed_runs == [3]
+    # results for each run the same as computing it on its own
+    for k in range(3):
+        single = computeEEestimates([runs[k][0]], [runs[k][1]])
+        assert numpy.allclose(single.theta_estimates[0],
+                              estimates.theta_estimates[k])
+        assert numpy.allclose(single.se_estimates[0],
+                              estimates.se_estimates[k])
+    assert numpy.allclose(estimates.pooled_estimate, [-1.0, 0.5], atol = 0.01)
+    assert numpy.all(estimates.pooled_se <
+                     numpy.min(estimates.se_estimates, axis = 0))
+
+    # read and write files in the same format as the R script
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            for (run, (theta, dzA)) in enumerate(runs):
+                numpy.savetxt("theta_values_test_" + str(run) + ".txt", theta,
+                              header = "t Density Contagion AcceptanceRate",
+                              comments = "")
+                numpy.savetxt("dzA_values_test_" + str(run) + ".txt", dzA,
+                              header = "t Density Contagion", comments = "")
+            (file_labels, file_runs, theta_values_list,
+             dzA_values_list) = readEEoutputFiles("theta_values_test",
+                                                  "dzA_values_test")
+            assert file_labels == labels
+            assert file_runs == [0, 1, 2, 3]
+            file_estimates = computeEEestimates(theta_values_list,
+                                                dzA_values_list, file_runs,
+                                                max_runs = 2)
+            assert file_estimates.runs == [0, 1]
+            with open("estimation.out", "w") as f:
+                writeEEestimates(labels, estimates, 4, f)
+            (paramnames, pooled) = parseEstimationEEOutput("estimation.out")
+            assert paramnames == labels
+            assert numpy.allclose(pooled, estimates.pooled_estimate,
+                                  rtol = 1e-6)
+        finally:
+            os.chdir(cwd)
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def attributes_equal(attrs1, attrs2):
+    """
+    Return True if the two dicts of node attributes (binattr, contattr
+    or catattr of Graph objects) have the same names and values
+    """
+    return (attrs1.keys() == attrs2.keys() and
+            all([numpy.array_equal(attrs1[a], attrs2[a], equal_nan = True)
+                 for a in attrs1.keys()]))
+
+
+def test_binary_graph():
+    """
+    test saving and loading CSR graphs in binary format, and the
+    automatic binary cache of graphs read from text files
+    """
+    print("testing binary graph format and cache...")
+    start = time.time()
+    karate_dir = "../examples/data/karate_club/"
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for f in ["karate.net", "karate_binattr.txt", "karate_contattr.txt",
+                  "karate_catattr.txt", "karate_outcome.txt"]:
+            shutil.copy(karate_dir + f, tmpdir)
+        os.chdir(tmpdir)
+        try:
+            with open("karate_zone.txt", "w") as f:
+                f.write("zone\n" + "\n".join([str(min(i // 10, 2))
+                                               for i in range(34)]) + "\n")
+            g = Graph("karate.net", "karate_binattr.txt", "karate_contattr.txt",
+                      "karate_catattr.txt", "karate_zone.txt")
+            assert not os.path.exists("karate.net.cache")
+            csrg = load_graph_cached("karate.net", "karate_binattr.txt",
+                                     "karate_contattr.txt", "karate_catattr.txt",
+                                     "karate_zone.txt")
+            assert os.path.isdir("karate.net.cache")
+            # second time loaded (memory mapped) from the cache
+            csrg2 = load_graph_cached("karate.net", "karate_binattr.txt",
+                                      "karate_contattr.txt", "karate_catattr.txt",
+                                      "karate_zone.txt")
+            assert isinstance(csrg2, CSRGraph)
+            assert isinstance(csrg2.indices.base, numpy.memmap)
+            for h in [csrg, csrg2]:
+                assert sorted(h.edgeIterator()) == sorted(g.edgeIterator())
+                assert all([h.isEdge(i, j) == g.isEdge(i, j)
+                            for i in g.nodeIterator() for j in g.nodeIterator()])
+                assert attributes_equal(h.binattr, g.binattr)
+                assert attributes_equal(h.catattr, g.catattr)
+                assert attributes_equal(h.contattr, g.contattr)
+                assert h.zone == g.zone and h.max_zone == g.max_zone
+                assert h.inner_nodes == g.inner_nodes
+            # cache is rebuilt when a file is changed
+            with open("karate_zone.txt", "w") as f:
+                # trailing spaces so size changes even if mtime does not
+                f.write("zone\n" + "\n".join([str(i % 2) + " "
+                                               for i in range(34)]) + "\n")
+            csrg3 = load_graph_cached("karate.net", "karate_binattr.txt",
+                                      "karate_contattr.txt", "karate_catattr.txt",
+                                      "karate_zone.txt")
+            assert csrg3.zone == [i % 2 for i in range(34)]
+            assert load_binary("karate.net.cache").zone == csrg3.zone
+            # or a different set of files is used
+            csrg4 = load_graph_cached("karate.net")
+            assert csrg4.binattr is None and csrg4.zone is None
+        finally:
+            os.chdir(cwd)
+
+        g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net",
+                    catattr_filename = "../examples/data/directed/HighSchoolFriendship/highschool_friendship_catattr.txt")
+        csrg = toCSR(g)
+        csrg.save_binary(os.path.join(tmpdir, "digraph"))
+        csrg2 = load_binary(os.path.join(tmpdir, "digraph"), mmap_mode = None)
+        assert isinstance(csrg2, CSRDigraph)
+        assert all([numpy.array_equal(getattr(csrg, a), getattr(csrg2, a))
+                    for a in ["indptr", "indices", "rev_indptr", "rev_indices"]])
+        assert attributes_equal(csrg2.catattr, g.catattr) and csrg2.binattr is None
+        outcome_binvar = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+        statfuncs = [changeDensity, changeStatisticsALAAMdirected.changeSender, changeStatisticsALAAMdirected.changeReceiver, changeStatisticsALAAMdirected.changeContagion, partial(changeStatisticsALAAMdirected.changeSenderMatch, "class")]
+        assert numpy.allclose(computeObservedStatistics(csrg2, outcome_binvar, statfuncs),
+                              computeObservedStatistics(g, outcome_binvar, statfuncs))
+
+        g = BipartiteGraph("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net")
+        toCSR(g).save_binary(os.path.join(tmpdir, "bipartite"))
+        csrg = load_binary(os.path.join(tmpdir, "bipartite"))
+        assert isinstance(csrg, CSRBipartiteGraph)
+        assert csrg.num_A_nodes == g.num_A_nodes
+        outcome_binvar = list(map(int_or_na, open("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_outcome.txt").read().split()[1:]))
+        statfuncs = [partial(changeBipartiteDensity, MODE_A), partial(changeBipartiteActivity, MODE_A), partial(changeBipartiteEgoTwoStar, MODE_A), partial(changeBipartiteAlterTwoStar1,MODE_A), partial(changeBipartiteAlterTwoStar2,MODE_A), partial(changeBipartiteFourCycle1, MODE_A), partial(changeBipartiteFourCycle2, MODE_A)]
+        obs_stats = computeObservedStatistics(csrg, outcome_binvar, statfuncs)
+        assert all(obs_stats == numpy.array([39, 129, 347, 1258, 266, 718, 122]))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_read_graph_files():
+    """
+    test the vectorized reading of Pajek network and attribute files
+    gives the same result as inserting the edges one at a time, and
+    reading directly into CSR format with readCSRGraph()
+    """
+    print("testing reading graph files...")
+    start = time.time()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        netfile = os.path.join(tmpdir, "test.net")
+        with open(netfile, "w") as f:
+            # weights, duplicate edge, mixed case section, trailing lines
+            f.write("*vertices 6\n1\n2\n3\n4\n5\n6\n*Edges  \n"
+                    "1 2 0.5\n3 1\n2 1 2\n5 6\n1 5\n\n*arcs\n4 6\n")
+        attrfile = os.path.join(tmpdir, "test_attr.txt")
+        with open(attrfile, "w") as f:
+            f.write("a b\n1 NA\n0 2\nNA 3\n1 1\n0 0\n1 NA\n")
+        g = Graph(netfile, attrfile, attrfile, attrfile)
+        g2 = Graph(num_nodes = 6)
+        for (i, j) in [(0, 1), (2, 0), (1, 0), (4, 5), (0, 4)]:
+            g2.insertEdge(i, j)
+        assert g.G == g2.G
+        assert attributes_equal(g.binattr, {'a': [1, 0, NA_VALUE, 1, 0, 1],
+                                            'b': [NA_VALUE, 2, 3, 1, 0, NA_VALUE]})
+        assert g.binattr['a'].dtype == BINATTR_DTYPE
+        assert attributes_equal(g.catattr, g.binattr)
+        assert g.catattr['a'].dtype == numpy.int32
+        assert math.isnan(g.contattr['a'][2]) and g.contattr['b'][1] == 2.0
+        d = Digraph(netfile)  # no *arcs directly after the vertices
+        assert sorted(d.edgeIterator()) == [(3, 5)]
+        csrg = readCSRGraph(netfile, attrfile)
+        assert (numpy.array_equal(csrg.indptr, toCSR(g).indptr) and
+                numpy.array_equal(csrg.indices, toCSR(g).indices))
+        assert attributes_equal(csrg.binattr, g.binattr)
+
+        with open(netfile, "w") as f:
+            f.write("*vertices 4 2\n*edges\n1 3\n2 3\n1 4\n")
+        b = BipartiteGraph(netfile)
+        b2 = BipartiteGraph(num_nodes = (2, 2))
+        for (i, j) in [(0, 2), (1, 2), (0, 3)]:
+            b2.insertEdge(i, j)
+        assert b.G == b2.G
+        assert all([b.twoPathsMatrix.getValue(i, j) ==
+                    b2.twoPathsMatrix.getValue(i, j)
+                    for i in range(4) for j in range(4)])
+        with open(netfile, "w") as f:
+            f.write("*vertices 4 2\n*edges\n1 2\n")
+        try:
+            BipartiteGraph(netfile)
+            assert False
+        except ValueError:
+            pass
+
+    for directed in [False, True]:
+        graph_class = Digraph if directed else Graph
+        netfile = ("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net" if directed else "../examples/data/simulated_n1000_bin_cont/n1000_kstar_simulate12750000.txt")
+        csrg = readCSRGraph(netfile, directed = directed)
+        csrg2 = toCSR(graph_class(netfile))
+        attrs = ["indptr", "indices"] + (["rev_indptr", "rev_indices"]
+                                         if directed else [])
+        assert all([numpy.array_equal(getattr(csrg, a), getattr(csrg2, a))
+                    for a in attrs])
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_category_match():
+    """
+    test the categorical attribute change statistics using the per-edge
+    category match arrays on CSR graphs give the same values as on the
+    dictionary of dictionaries versions, including NA values
+    """
+    print("testing category match arrays...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net",
+              catattr_filename = "../examples/data/karate_club/karate_catattr.txt")
+    assert g.catattr['class'].dtype == numpy.int32
+    g.catattr['class'][[0, 5, 33]] = NA_VALUE
+    csrg = toCSR(g)
+    catmatch = csrg.catattrMatch('class')
+    assert len(catmatch.same) == len(csrg.indices)
+    assert catmatch.same_count[0] == catmatch.diff_count[0] == 0
+    assert all([set(catmatch.sameNeighbours(i)) ==
+                set([u for u in g.neighbourIterator(i)
+                     if g.catattr['class'][i] != NA_VALUE and
+                     g.catattr['class'][i] == g.catattr['class'][u]])
+                for i in g.nodeIterator()])
+    assert csrg.catattrMatch('class') is catmatch # cached
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeoO_Osame, changeoO_OsameContagion, changeoO_Odiff,
+                 changeSamePartnerActivityTwoPath,
+                 changeDiffPartnerActivityTwoPath,
+                 changeSameIndirectPartnerAttribute,
+                 changeDiffIndirectPartnerAttribute]
+    for attrname in ['gender', 'class']:
+        for func in statfuncs:
+            assert all([func(attrname, csrg, outcome_binvar, i) ==
+                        func(attrname, g, outcome_binvar, i)
+                        for i in g.nodeIterator()])
+
+    g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net",
+                catattr_filename = "../examples/data/directed/HighSchoolFriendship/highschool_friendship_catattr.txt")
+    assert g.catattr['sex'].count(NA_VALUE) == 1
+    csrg = toCSR(g)
+    outcome_binvar = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+    statfuncs = [changeStatisticsALAAMdirected.changeSenderMatch,
+                 changeStatisticsALAAMdirected.changeReceiverMatch,
+                 changeStatisticsALAAMdirected.changeReciprocityMatch,
+                 changeStatisticsALAAMdirected.changeSenderMismatch,
+                 changeStatisticsALAAMdirected.changeReceiverMismatch,
+                 changeStatisticsALAAMdirected.changeReciprocityMismatch]
+    for attrname in ['class', 'sex']:
+        for func in statfuncs:
+            assert all([func(attrname, csrg, outcome_binvar, i) ==
+                        func(attrname, g, outcome_binvar, i)
+                        for i in g.nodeIterator()])
+
+    g = BipartiteGraph("../examples/data/bipartite/tiny/tiny_bipartite.net",
+                       catattr_filename = "../examples/data/bipartite/tiny/tiny_catattr.txt")
+    csrg = toCSR(g)
+    outcome_binvar = list(map(int, open("../examples/data/bipartite/tiny/tiny_outcome.txt").read().split()[1:]))
+    statfuncs = [partial(changeBpAlterSameTwoStar1, MODE_B, 'catattr'), partial(changeBpAlterSameTwoStar2, MODE_B, 'catattr'), partial(changeBpAlterDiffTwoStar1, MODE_B, 'catattr'), partial(changeBpAlterDiffTwoStar2, MODE_B, 'catattr')]
+    assert all(computeObservedStatistics(csrg, outcome_binvar, statfuncs) ==
+               numpy.array([0, 0, 2, 0]))
+    assert changeBpAlterDiffTwoStar2(MODE_B, 'catattr', csrg, outcome_binvar, 3) == 2
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_jit_kernels():
+    """
+    test the change statistic kernels (jitChangeStatistics.py) give
+    exactly the same values as the Python change statistic functions
+    on CSR graphs, and the kernel sampler gives the same results as
+    the batch sampler with the same random number generator. If Numba
+    is not installed the kernels are run as ordinary Python functions.
+    """
+    print("testing change statistic kernels (Numba installed:", HAVE_NUMBA, ")...")
+    start = time.time()
+
+    def check_kernels(csrg, statfuncs, outcome_binvar):
+        model = get_kernel_model(csrg, statfuncs)
+        assert model is not None
+        assert get_kernel_model(csrg, statfuncs) is model # cached
+        for A in [outcome_binvar,
+                  [random.choice([0, 1, 1, NA_VALUE]) for _ in outcome_binvar]]:
+            Aarray = numpy.array(A)
+            for i in csrg.nodeIterator():
+                changestats = model.changeStats(Aarray, i)
+                assert all([changestats[l] == statfuncs[l](csrg, A, i)
+                            for l in range(len(statfuncs))])
+
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    g.catattr['class'][[0, 5]] = NA_VALUE
+    g.contattr['age'][3] = numpy.nan
+    csrg = toCSR(g)
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeActivity, changeTwoStar,
+                 changeThreeStar, changePartnerActivityTwoPath,
+                 changeTriangleT1, changeContagion,
+                 changeIndirectPartnerAttribute,
+                 changePartnerAttributeActivity,
+                 changePartnerPartnerAttribute, changeTriangleT2,
+                 changeTriangleT3, partial(changeoOb, "senior"),
+                 partial(changeo_Ob, "senior"), partial(changeoOc, "age"),
+                 partial(changeo_Oc, "age"), partial(changeGWActivity, log(2)),
+                 partial(changeAlterBinaryTwoStar1, "senior"),
+                 partial(changeAlterBinaryTwoStar2, "senior"),
+                 partial(changeGWContagion, 0.6), changeLogContagion,
+                 partial(changePowerContagion, 3)]
+    for attrname in ['gender', 'class']:
+        statfuncs += [partial(func, attrname) for func in
+                      [changeoO_Osame, changeoO_OsameContagion,
+                       changeoO_Odiff, changeSamePartnerActivityTwoPath,
+                       changeDiffPartnerActivityTwoPath,
+                       changeSameIndirectPartnerAttribute,
+                       changeDiffIndirectPartnerAttribute]]
+    check_kernels(csrg, statfuncs, outcome_binvar)
+    # no kernels for dictionary graphs or for some change statistics
+    assert get_kernel_model(g, statfuncs) is None
+    assert get_kernel_model(csrg, [changeDensity, partial(changeSettingHomophily, g)]) is None
+    assert get_kernel_model(csrg, [changeStatisticsALAAMdirected.changeSender]) is None
+
+    g = Graph("../examples/data/simulated_n500_bin_cont2/n500_kstar_simulate12750000.txt",
+              "../examples/data/simulated_n500_bin_cont2/binaryAttribute_50_50_n500.txt",
+              "../examples/data/simulated_n500_bin_cont2/continuousAttributes_n500.txt")
+    csrg = toCSR(g)
+    outcome_binvar = list(map(int_or_na, open("../examples/data/simulated_n500_bin_cont2/sample-n500_bin_cont6700000.txt").read().split()[1:]))
+    check_kernels(csrg, [changeContagion, changeTriangleT3,
+                         partial(changeo_Oc, "continuousAttribute"),
+                         partial(changeGWContagion, log(2)),
+                         changeLogContagion, partial(changePowerContagion, 2)],
+                  outcome_binvar)
+
+    g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net",
+                catattr_filename = "../examples/data/directed/HighSchoolFriendship/highschool_friendship_catattr.txt")
+    csrg = toCSR(g)
+    outcome_binvar = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+    d = changeStatisticsALAAMdirected
+    statfuncs = [changeDensity, d.changeSender, d.changeReceiver,
+                 d.changeReciprocity, d.changeEgoInTwoStar,
+                 d.changeEgoInThreeStar, d.changeEgoOutTwoStar,
+                 d.changeEgoOutThreeStar, d.changeMixedTwoStar,
+                 d.changeMixedTwoStarSource, d.changeMixedTwoStarSink,
+                 d.changeContagion, d.changeContagionReciprocity,
+                 d.changeTransitiveTriangleT1, d.changeTransitiveTriangleT3,
+                 d.changeTransitiveTriangleD1, d.changeTransitiveTriangleU1,
+                 d.changeCyclicTriangleC1, d.changeCyclicTriangleC3,
+                 d.changeAlterInTwoStar2, d.changeAlterOutTwoStar2,
+                 partial(d.changeGWSender, log(2)),
+                 partial(d.changeGWReceiver, 1.2),
+                 partial(d.changeGWContagion, log(2)), d.changeLogContagion,
+                 partial(d.changePowerContagion, 4)]
+    for attrname in ['class', 'sex']:
+        statfuncs += [partial(func, attrname) for func in
+                      [d.changeSenderMatch, d.changeReceiverMatch,
+                       d.changeReciprocityMatch, d.changeSenderMismatch,
+                       d.changeReceiverMismatch, d.changeReciprocityMismatch]]
+    check_kernels(csrg, statfuncs, outcome_binvar)
+
+    for (netfile, attrprefix, outcomefile) in [
+            ("../examples/data/bipartite/tiny/tiny_bipartite.net",
+             "../examples/data/bipartite/tiny/tiny_",
+             "../examples/data/bipartite/tiny/tiny_outcome.txt"),
+            ("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net",
+             "../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_",
+             "../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_outcome.txt")]:
+        g = BipartiteGraph(netfile, attrprefix + "binattr.txt",
+                           catattr_filename = attrprefix + "catattr.txt")
+        csrg = toCSR(g)
+        outcome_binvar = list(map(int_or_na, open(outcomefile).read().split()[1:]))
+        statfuncs = [changeContagion, partial(changeoOb, "binattr")]
+        for mode in [MODE_A, MODE_B]:
+            statfuncs += [partial(func, mode) for func in
+                          [changeBipartiteDensity, changeBipartiteActivity,
+                           changeBipartiteEgoTwoStar,
+                           changeBipartiteEgoThreeStar,
+                           changeBipartiteAlterTwoStar1,
+                           changeBipartiteAlterTwoStar2,
+                           changeBipartiteFourCycle1,
+                           changeBipartiteFourCycle2]]
+            statfuncs += [partial(changeBipartiteGWActivity, mode, log(2))]
+            statfuncs += [partial(func, mode, 'catattr') for func in
+                          [changeBpAlterSameTwoStar1, changeBpAlterDiffTwoStar1,
+                           changeBpAlterSameTwoStar2, changeBpAlterDiffTwoStar2]]
+            statfuncs += [partial(func, mode, 'binattr') for func in
+                          [changeBpAlterBinaryTwoStar1,
+                           changeBpAlterBinaryTwoStar2]]
+        check_kernels(csrg, statfuncs, outcome_binvar)
+
+    # kernel sampler gives same results as batch sampler
+    g = toCSR(Graph("../examples/data/karate_club/karate.net",
+                    "../examples/data/karate_club/karate_binattr.txt"))
+    for (statfuncs, theta) in [
+            ([changeDensity, changeActivity, changeContagion,
+              partial(changeoOb, "senior")],
+             numpy.array([-1.0, 0.1, 0.3, 0.5])),
+            ([changeDensity, changeContagion, changeTriangleT3,
+              changeIndirectPartnerAttribute],
+             numpy.array([-0.5, 0.25, 0.5, -0.125]))]:
+        A0 = [random.randint(0, 1) for _ in range(g.numNodes())]
+        A0[0] = NA_VALUE
+        nodes = numpy.nonzero(numpy.array(A0) != NA_VALUE)[0]
+        for performMove in [False, True]:
+            A1 = list(A0)
+            A2 = numpy.array(A0)
+            result1 = batchALAAMsampler(g, A1, statfuncs, theta, performMove,
+                                        2000, rng = numpy.random.default_rng(42))
+            result2 = kernelALAAMsamplerNodes(nodes, g, A2, statfuncs, theta,
+                                              performMove, 2000,
+                                              rng = numpy.random.default_rng(42))
+            assert A1 == A2.tolist()
+            assert (A1 == A0) == (not performMove)
+            assert result1[0] == result2[0]
+            assert all(result1[1] == result2[1])
+            assert all(result1[2] == result2[2])
+    g = toCSR(BipartiteGraph("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net"))
+    statfuncs = [partial(changeBipartiteDensity, MODE_A),
+                 partial(changeBipartiteAlterTwoStar2, MODE_A),
+                 partial(changeBipartiteFourCycle2, MODE_A)]
+    theta = numpy.array([-0.5, 0.125, 0.0625])
+    A1 = [0] * g.numNodes()
+    A2 = [0] * g.numNodes()
+    result1 = batchALAAMsamplerNodes(numpy.arange(g.num_A_nodes), g, A1,
+                                     statfuncs, theta, True, 1000,
+                                     rng = numpy.random.default_rng(1))
+    result2 = jitBipartiteALAAMsampler(MODE_A, g, A2, statfuncs, theta, True,
+                                       1000, rng = numpy.random.default_rng(1))
+    assert all(numpy.array(A2[g.num_A_nodes:]) == 0)
+    assert A1 == A2
+    assert result1[0] == result2[0]
+    assert all(result1[1] == result2[1])
+    assert all(result1[2] == result2[2])
+    # theta as 1 x n matrix, as used in stochastic approximation
+    A3 = [0] * g.numNodes()
+    result3 = jitBipartiteALAAMsampler(MODE_A, g, A3, statfuncs,
+                                       theta.reshape((1, len(theta))), True,
+                                       1000, rng = numpy.random.default_rng(1))
+    assert A3 == A2
+    assert result3[0] == result2[0]
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_mple():
+    """
+    test the maximum pseudo-likelihood estimate (MPLE): for a model
+    with only outcome-independent change statistics it is the ordinary
+    logistic regression, the score is zero at the MPLE, it does not
+    exist for separated outcomes, and can be used as the initial
+    estimate for EE
+    """
+    print("testing MPLE...")
+    start = time.time()
+    datadir = "../examples/data/simulated_n500_bin_cont2/"
+    g = Graph(datadir + "n500_kstar_simulate12750000.txt",
+              datadir + "binaryAttribute_50_50_n500.txt",
+              datadir + "continuousAttributes_n500.txt")
+    outcome_binvar = list(map(int_or_na, open(datadir + "sample-n500_bin_cont6700000.txt").read().split()[1:]))
+    # Density and oOb only: MPLE is the log odds of the outcome for
+    # nodes without and with the binary attribute
+    (theta, std_error) = algorithm_MPLE(g, outcome_binvar,
+                                        [changeDensity,
+                                         partial(changeoOb, "binaryAttribute")])
+    A = numpy.array(outcome_binvar)
+    b = g.binattr["binaryAttribute"] == 1
+    p0 = numpy.mean(A[~b])
+    p1 = numpy.mean(A[b])
+    assert isclose(theta[0], log(p0/(1-p0)))
+    assert isclose(theta[0] + theta[1], log(p1/(1-p1)))
+    assert isclose(std_error[0], math.sqrt(1/(numpy.sum(~b)*p0*(1-p0))))
+    # with contagion (depends on outcome): score is zero at MPLE
+    statfuncs = [changeDensity, changeActivity, changeContagion,
+                 partial(changeoOb, "binaryAttribute"),
+                 partial(changeoOc, "continuousAttribute")]
+    (theta, std_error) = algorithm_MPLE(g, outcome_binvar, statfuncs)
+    nodes = numpy.arange(g.numNodes())
+    X = mple_design_matrix(g, outcome_binvar, statfuncs, nodes)
+    assert all([X[i, 2] == changeContagion(g, outcome_binvar, i)
+                for i in nodes])
+    p = 1 / (1 + numpy.exp(-X @ theta))
+    assert numpy.allclose(X.T @ (A - p), 0, atol = 1e-6)
+    assert all(std_error > 0)
+    # outcomes separated by change statistics: MPLE does not exist
+    g = Graph("../examples/data/karate_club/karate.net")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    assert algorithm_MPLE(g, outcome_binvar, [changeDensity, changeActivity,
+                                              changeContagion]) == (None, None)
+    # used as initial estimate for EE
+    g = Graph(datadir + "n500_kstar_simulate12750000.txt")
+    outcome_binvar = list(map(int_or_na, open(datadir + "sample-n500_bin_cont6700000.txt").read().split()[1:]))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            run_ee(g, outcome_binvar, "n500", [changeDensity, changeContagion],
+                   ["Density", "Contagion"], EEiterations = 200,
+                   sampler_func = batchALAAMsampler, use_mple = True)
+            theta_values = numpy.loadtxt("theta_values_n500.txt", skiprows = 1)
+            # MPLE iterations have negative t and no acceptance rate
+            assert 0 < numpy.sum(theta_values[:, 0] < 0) < 100
+            assert all(numpy.isnan(theta_values[theta_values[:, 0] < 0, -1]))
+            assert theta_values[-1, 0] == 100
+        finally:
+            os.chdir(cwd)
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def toggled_statistics(G, A, statfuncs):
+    """
+    Compute the observed statistics by summing the change statistics
+    for each node with outcome 1, changing the outcome of each node in
+    node order (the method used by computeObservedStatistics() for
+    statistics with no direct form).
+    """
+    Z = numpy.zeros(len(statfuncs))
+    Acopy = numpy.zeros(len(A))
+    for i in range(len(A)):
+        if A[i] == NA_VALUE:
+            Acopy[i] = NA_VALUE
+        if A[i] == 1:
+            Z += [func(G, Acopy, i) for func in statfuncs]
+            Acopy[i] = 1
+    return Z
+
+
+def test_direct_statistics():
+    """
+    test the directly computed statistics (directStatistics.py) used by
+    computeObservedStatistics() are the same as summing the change
+    statistics over the nodes with outcome 1
+    """
+    print("testing direct computation of observed statistics...")
+    start = time.time()
+
+    def check_direct(g, statfuncs, outcome_binvar):
+        csrg = toCSR(g)
+        for func in statfuncs:
+            assert get_direct_statistic(func) is not None
+        for A in [outcome_binvar,
+                  [random.choice([0, 1, NA_VALUE]) for i in range(len(outcome_binvar))]]:
+            toggled = toggled_statistics(g, A, statfuncs)
+            direct = numpy.array([get_direct_statistic(func)(csrg, A)
+                                  for func in statfuncs])
+            assert numpy.allclose(direct, toggled, rtol = 1e-12)
+            # integer valued statistics are exactly the same
+            assert all(direct[toggled == numpy.round(toggled)] ==
+                       toggled[toggled == numpy.round(toggled)])
+            assert numpy.allclose(computeObservedStatistics(g, A, statfuncs),
+                                  toggled, rtol = 1e-12)
+            # change statistics for all nodes at once
+            Awork = list(A)
+            for func in statfuncs:
+                delta_func = get_direct_change_statistic(func)
+                if delta_func is None:
+                    continue
+                delta = delta_func(csrg, A)
+                for i in g.nodeIterator():
+                    a = Awork[i]
+                    Awork[i] = 0
+                    assert isclose(delta[i], func(g, Awork, i), abs_tol = 1e-9)
+                    Awork[i] = a
+        # the CSR version of g used is cached on g
+        assert getattr(g, 'csr_graph', None) is getCSRGraph(g)
+        assert getCSRGraph(csrg) is csrg
+
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    gsetting = Graph(num_nodes = g.numNodes())
+    for (i, j) in set((random.randrange(g.numNodes()), random.randrange(g.numNodes())) for k in range(100)):
+        if i != j and not gsetting.isEdge(i, j):
+            gsetting.insertEdge(i, j)
+    distmatrix = numpy.random.rand(g.numNodes(), g.numNodes())
+    check_direct(g, [changeContagion, changeIndirectPartnerAttribute, changePartnerAttributeActivity, changePartnerPartnerAttribute, changeTriangleT2, changeTriangleT3, partial(changeoO_OsameContagion, "gender"), partial(changeSameIndirectPartnerAttribute, "class"), partial(changeDiffIndirectPartnerAttribute, "class"), partial(changeAlterBinaryTwoStar2, "senior"), partial(changeGWContagion, log(2)), changeLogContagion, partial(changePowerContagion, 2), partial(changeSettingHomophily, gsetting), partial(changeGeographicHomophily, distmatrix), partial(changeContagionDist, distmatrix)], outcome_binvar)
+
+    datadir = "../examples/data/simulated_n500_bin_cont2/"
+    g = Graph(datadir + "n500_kstar_simulate12750000.txt",
+              datadir + "binaryAttribute_50_50_n500.txt")
+    outcome_binvar = list(map(int_or_na, open(datadir + "sample-n500_bin_cont6700000.txt").read().split()[1:]))
+    check_direct(g, [changeContagion, changeIndirectPartnerAttribute, changePartnerPartnerAttribute, changeTriangleT2, changeTriangleT3, partial(changeAlterBinaryTwoStar2, "binaryAttribute"), partial(changeGWContagion, 2.0), changeLogContagion], outcome_binvar)
+
+    g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net")
+    outcome_binvar = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+    check_direct(g, [changeStatisticsALAAMdirected.changeContagion, changeStatisticsALAAMdirected.changeContagionReciprocity, changeStatisticsALAAMdirected.changeTransitiveTriangleT3, changeStatisticsALAAMdirected.changeCyclicTriangleC3, changeStatisticsALAAMdirected.changeAlterInTwoStar2, changeStatisticsALAAMdirected.changeAlterOutTwoStar2, partial(changeStatisticsALAAMdirected.changeGWContagion, log(2)), changeStatisticsALAAMdirected.changeLogContagion, partial(changeStatisticsALAAMdirected.changePowerContagion, 3)], outcome_binvar)
+
+    for (netfile, binattrfile, catattrfile, outcomefile) in [
+            ("../examples/data/bipartite/tiny/tiny_bipartite.net",
+             "../examples/data/bipartite/tiny/tiny_binattr.txt",
+             "../examples/data/bipartite/tiny/tiny_catattr.txt",
+             "../examples/data/bipartite/tiny/tiny_outcome.txt"),
+            ("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net",
+             "../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_binattr.txt",
+             "../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_catattr.txt",
+             "../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_outcome.txt")]:
+        g = BipartiteGraph(netfile, binattrfile, catattr_filename = catattrfile)
+        outcome_binvar = list(map(int_or_na, open(outcomefile).read().split()[1:]))
+        binattr = list(g.binattr.keys())[0]
+        catattr = list(g.catattr.keys())[0]
+        check_direct(g, [f for mode in [MODE_A, MODE_B] for f in [partial(changeBipartiteAlterTwoStar2, mode), partial(changeBipartiteFourCycle2, mode), partial(changeBpAlterSameTwoStar2, mode, catattr), partial(changeBpAlterDiffTwoStar2, mode, catattr), partial(changeBpAlterBinaryTwoStar2, mode, binattr)]], outcome_binvar)
+
+    # no direct statistic for a change statistic not in the table
+    assert get_direct_statistic(partial(changeContagion_LISTCOMP)) is None
+    assert get_direct_change_statistic(changeTriangleT2) is None
+    assert get_direct_change_statistic(partial(changeGWContagion, log(2))) is not None
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def small_network_expected_statistics(thetas):
+    """
+    Return tuple (g, statfuncs, expectedZ) for a network small enough
+    to enumerate all outcome vectors, where expectedZ[k] is the exact
+    expected value of the statistics for parameters thetas[k].
+    """
+    N = 10
+    g = Graph(num_nodes = N)
+    for (i, j) in [(0,1), (1,2), (2,3), (3,4), (4,0), (4,5), (5,6), (6,7), (7,8), (8,9), (9,5), (2,7)]:
+        g.insertEdge(i, j)
+    statfuncs = [changeDensity, changeContagion, changeIndirectPartnerAttribute]
+    allZ = numpy.array([computeObservedStatistics(g, [(k >> i) & 1 for i in range(N)], statfuncs) for k in range(2**N)])
+    expectedZ = []
+    for theta in thetas:
+        weights = numpy.exp(allZ @ theta)
+        expectedZ.append(weights @ allZ / numpy.sum(weights))
+    return (g, statfuncs, expectedZ)
+
+
+def check_small_network_distribution(sampler_func):
+    """
+    Check the mean statistics sampled with sampler_func on a network
+    small enough to enumerate all outcome vectors are the same as the
+    exact expected values.
+    """
+    theta = numpy.array([-0.5, 0.4, -0.1])
+    (g, statfuncs, [expectedZ]) = small_network_expected_statistics([theta])
+    N = g.numNodes()
+    A = [0] * N
+    sampler_func(g, A, statfuncs, theta, True, 1000)
+    meanZ = numpy.zeros(len(statfuncs))
+    num_samples = 10000
+    for k in range(num_samples):
+        sampler_func(g, A, statfuncs, theta, True, N)
+        meanZ += computeObservedStatistics(g, A, statfuncs)
+    meanZ /= num_samples
+    assert numpy.allclose(meanZ, expectedZ, rtol = 0.05)
+
+
+def test_checkerboard_sampler():
+    """
+    test the checkerboard (graph colouring) sampler: the colour classes,
+    the vectorized change statistics, and the distribution it samples
+    from on a network small enough to enumerate all outcome vectors
+    """
+    print("testing checkerboard sampler...")
+    start = time.time()
+
+    def check_model(g, statfuncs, outcome_binvar):
+        model = get_checkerboard_model(g, statfuncs)
+        assert model is not None
+        assert model is get_checkerboard_model(g, statfuncs) # cached
+        csrg = model.G
+        assert sorted(numpy.concatenate(model.classes)) == list(range(g.numNodes()))
+        # no two nodes of the same colour within distance radius
+        # (with arcs as edges in either direction for directed graphs)
+        nbrs = [set(csrg.indices[csrg.indptr[i]:csrg.indptr[i+1]]) for i in range(g.numNodes())]
+        if isinstance(csrg, CSRDigraph):
+            for i in range(g.numNodes()):
+                for j in list(nbrs[i]):
+                    nbrs[j].add(i)
+        for cls in model.classes:
+            for i in cls:
+                near = {i}
+                for d in range(model.radius):
+                    near |= {v for u in near for v in nbrs[u]}
+                assert len(near & set(cls)) == 1
+        # vectorized change statistics are the same as the functions
+        for A in [outcome_binvar,
+                  [random.choice([0, 1, NA_VALUE]) for i in range(len(outcome_binvar))]]:
+            for cls in model.classes:
+                Acopy = numpy.array(A)
+                Acopy[cls] = 0
+                state = model.getState(Acopy)
+                changestats = model.changeStats(state, cls)
+                for (k, i) in enumerate(cls):
+                    assert numpy.allclose(changestats[k],
+                                          [func(g, Acopy, i) for func in statfuncs],
+                                          rtol = 1e-12)
+
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    check_model(g, [changeDensity, changeActivity, changeContagion, changeIndirectPartnerAttribute, changePartnerAttributeActivity, changePartnerPartnerAttribute, changeTriangleT2, changeTriangleT3, partial(changeoO_OsameContagion, "gender"), partial(changeAlterBinaryTwoStar2, "senior"), partial(changeGWContagion, log(2)), changeLogContagion, partial(changePowerContagion, 2)], outcome_binvar)
+    check_model(g, [changeDensity, changeContagion], outcome_binvar)
+    assert get_checkerboard_model(g, [changeDensity, changeContagion]).radius == 1
+    check_model(g, [changeDensity, changeActivity], outcome_binvar)
+    assert len(get_checkerboard_model(g, [changeDensity, changeActivity]).classes) == 1
+
+    g = Digraph("../examples/data/directed/HighSchoolFriendship/highschool_friendship_arclist.net")
+    outcome_binvar = list(map(int, open("../examples/data/directed/HighSchoolFriendship/highschool_friendship_binattr.txt").read().split()[1:]))
+    check_model(g, [changeDensity, changeStatisticsALAAMdirected.changeContagion, changeStatisticsALAAMdirected.changeContagionReciprocity, changeStatisticsALAAMdirected.changeAlterInTwoStar2, changeStatisticsALAAMdirected.changeAlterOutTwoStar2, partial(changeStatisticsALAAMdirected.changeGWContagion, log(2)), changeStatisticsALAAMdirected.changeLogContagion, partial(changeStatisticsALAAMdirected.changePowerContagion, 3)], outcome_binvar)
+
+    g = BipartiteGraph("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net",
+                       "../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_binattr.txt")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_outcome.txt").read().split()[1:]))
+    binattr = list(g.binattr.keys())[0]
+    check_model(g, [changeDensity] + [f for mode in [MODE_A, MODE_B] for f in [partial(changeBipartiteAlterTwoStar2, mode), partial(changeBipartiteFourCycle2, mode), partial(changeBpAlterBinaryTwoStar2, mode, binattr)]], outcome_binvar)
+
+    # no vectorized version so the batch sampler is used instead
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    statfuncs = [changeDensity, partial(changeSameIndirectPartnerAttribute, "class")]
+    assert get_checkerboard_model(g, statfuncs) is None
+    A1 = list(outcome_binvar[:g.numNodes()])
+    A2 = list(A1)
+    result1 = checkerboardALAAMsampler(g, A1, statfuncs, numpy.array([-0.5, 0.2]), True, 100, numpy.random.default_rng(7))
+    result2 = batchALAAMsampler(g, A2, statfuncs, numpy.array([-0.5, 0.2]), True, 100, numpy.random.default_rng(7))
+    assert A1 == A2 and result1[0] == result2[0]
+    assert all(numpy.array_equal(x, y) for (x, y) in zip(result1[1:], result2[1:]))
+
+    # outcome vector not changed if performMove is False, is changed otherwise
+    statfuncs = [changeDensity, changeContagion]
+    A = [0] * g.numNodes()
+    (acc, ch1, ch0) = checkerboardALAAMsampler(g, A, statfuncs, numpy.array([0.0, 0.0]), False, 1000)
+    assert A == [0] * g.numNodes()
+    assert 0 < acc < 1 and ch1[0] > 0 and ch0[0] == 0
+    (acc, ch1, ch0) = checkerboardALAAMsampler(g, A, statfuncs, numpy.array([0.0, 0.0]), True, 1000)
+    assert 0 < sum(A) < g.numNodes()
+    assert numpy.allclose(ch1 - ch0, computeObservedStatistics(g, A, statfuncs))
+    # theta as 1 x n matrix, as used in stochastic approximation
+    A1 = list(A)
+    A2 = list(A)
+    result1 = checkerboardALAAMsampler(g, A1, statfuncs, numpy.array([[-0.5, 0.2]]), True, 100, numpy.random.default_rng(3))
+    result2 = checkerboardALAAMsampler(g, A2, statfuncs, numpy.array([-0.5, 0.2]), True, 100, numpy.random.default_rng(3))
+    assert A1 == A2 and result1[0] == result2[0]
+
+    # mean statistics are the same as the exact expected values computed
+    # by enumerating all outcome vectors of a small network
+    check_small_network_distribution(partial(checkerboardALAAMsampler, rng = numpy.random.default_rng(42)))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_heat_bath_sampler():
+    """
+    test the heat-bath (Gibbs) sampler with random and systematic scan,
+    and the effective sample size estimate
+    """
+    print("testing heat-bath sampler...")
+    start = time.time()
+
+    # effective sample size of independent values is the number of
+    # values, and of an AR(1) process is n(1-phi)/(1+phi)
+    rng = numpy.random.default_rng(123)
+    assert isclose(effective_sample_size(rng.normal(size = 10000)), 10000, rel_tol = 0.1)
+    x = numpy.zeros(10000)
+    for k in range(1, len(x)):
+        x[k] = 0.9 * x[k-1] + rng.normal()
+    assert isclose(effective_sample_size(x), 10000 * 0.1 / 1.9, rel_tol = 0.2)
+    assert math.isnan(effective_sample_size(numpy.ones(100)))
+
+    # systematic scan updates every node once in each sweep
+    scan = SystematicScan(numpy.arange(5, 15), rng)
+    for sweep in range(3):
+        assert sorted(numpy.concatenate([scan.nextNodes(3), scan.nextNodes(7)])) == list(range(5, 15))
+
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    statfuncs = [changeDensity, changeContagion, partial(changeGWContagion, log(2))]
+    theta = numpy.array([-0.5, 0.2, 0.1])
+    for systematic in [False, True]:
+        # outcome vector not changed if performMove is False, is changed otherwise
+        A = [0] * g.numNodes()
+        (acc, ch1, ch0) = heatBathALAAMsampler(g, A, statfuncs, theta, False, 1000, systematic = systematic)
+        assert A == [0] * g.numNodes()
+        assert 0 < acc < 1 and ch1[0] > 0 and ch0[0] == 0
+        (acc, ch1, ch0) = heatBathALAAMsampler(g, A, statfuncs, theta, True, 1000, systematic = systematic)
+        assert 0 < sum(A) < g.numNodes()
+        assert numpy.allclose(ch1 - ch0, computeObservedStatistics(g, A, statfuncs))
+        # NA outcomes are never changed
+        A = [NA_VALUE if i % 3 == 0 else 0 for i in range(g.numNodes())]
+        heatBathALAAMsampler(g, A, statfuncs, theta, True, 1000, systematic = systematic)
+        assert all(A[i] == NA_VALUE for i in range(0, g.numNodes(), 3))
+
+        check_small_network_distribution(partial(heatBathALAAMsampler, rng = numpy.random.default_rng(7), systematic = systematic))
+
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_ensemble_sampler():
+    """
+    test the ensemble sampler running several chains together, and
+    simulation and stochastic approximation with it
+    """
+    print("testing ensemble sampler...")
+    start = time.time()
+
+    # statistics of each chain are the sum of its change statistics
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    statfuncs = [changeDensity, changeActivity, changeContagion, changeTriangleT3, partial(changeGWContagion, log(2))]
+    theta = numpy.array([-0.5, 0.1, 0.2, 0.1, 0.1])
+    C = 5
+    Amatrix = numpy.zeros((C, g.numNodes()))
+    Amatrix[:, ::4] = NA_VALUE
+    (acc, ch1, ch0) = ensembleALAAMsampler(g, Amatrix, statfuncs, theta, False, 100)
+    assert numpy.all(Amatrix[:, 1::4] == 0)
+    assert acc.shape == (C,) and ch1.shape == (C, len(statfuncs))
+    assert numpy.all(ch0 == 0)
+    for k in range(3):
+        Z = numpy.array([computeObservedStatistics(g, A, statfuncs) for A in Amatrix])
+        (acc, ch1, ch0) = ensembleALAAMsampler(g, Amatrix, statfuncs, theta, True, 200)
+        assert numpy.all(acc > 0)
+        assert numpy.all(Amatrix[:, ::4] == NA_VALUE)
+        assert numpy.allclose(Z + ch1 - ch0, [computeObservedStatistics(g, A, statfuncs) for A in Amatrix])
+    # chains are different
+    assert len(set(tuple(A) for A in Amatrix)) == C
+
+    # no vectorized version so each chain is run with the batch sampler
+    statfuncs = [changeDensity, partial(changeSameIndirectPartnerAttribute, "class")]
+    Amatrix = numpy.zeros((C, g.numNodes()))
+    (acc, ch1, ch0) = ensembleALAAMsampler(g, Amatrix, statfuncs, numpy.array([-0.5, 0.2]), True, 100)
+    assert acc.shape == (C,) and ch1.shape == (C, len(statfuncs))
+    assert numpy.allclose(ch1 - ch0, [computeObservedStatistics(g, A, statfuncs) for A in Amatrix])
+
+    # mean statistics are the exact expected values, with a different
+    # theta for the first and second half of the chains
+    thetas = [numpy.array([-0.5, 0.4, -0.1]), numpy.array([0.2, -0.3, 0.1])]
+    (g, statfuncs, expectedZ) = small_network_expected_statistics(thetas)
+    C = 20
+    theta = numpy.array([thetas[0]] * (C // 2) + [thetas[1]] * (C // 2))
+    Amatrix = numpy.zeros((C, g.numNodes()))
+    rng = numpy.random.default_rng(99)
+    ensembleALAAMsampler(g, Amatrix, statfuncs, theta, True, 1000, rng)
+    meanZ = numpy.zeros((C, len(statfuncs)))
+    num_samples = 1000
+    for k in range(num_samples):
+        ensembleALAAMsampler(g, Amatrix, statfuncs, theta, True, 10, rng)
+        meanZ += [computeObservedStatistics(g, A, statfuncs) for A in Amatrix]
+    meanZ /= num_samples
+    assert numpy.allclose(numpy.mean(meanZ[:C//2], axis=0), expectedZ[0], rtol = 0.05)
+    assert numpy.allclose(numpy.mean(meanZ[C//2:], axis=0), expectedZ[1], rtol = 0.05)
+
+    # simulation with an ensemble of chains
+    sim = list(simulateALAAMensemble(g, statfuncs, thetas[0], 25, 4, 10, 100))
+    assert len(sim) == 25
+    for (A, Z, acceptance_rate, t) in sim:
+        assert numpy.allclose(Z, computeObservedStatistics(g, A, statfuncs))
+    assert [t for (A, Z, acceptance_rate, t) in sim[:9]] == [110] * 4 + [120] * 4 + [130]
+
+    # sampling stochastic approximation statistics with an ensemble of chains
+    A = numpy.zeros(g.numNodes())
+    Z = numpy.zeros(len(statfuncs))
+    (Zmatrix, A1, Z1) = sample_statistics(g, A, Z, statfuncs, thetas[0], basicALAAMsampler, 10, 10, 100, num_chains = 4)
+    assert Zmatrix.shape == (12, len(statfuncs))
+    assert numpy.allclose(Z1, computeObservedStatistics(g, A1, statfuncs))
+    assert numpy.all(A == 0) and numpy.all(Z == 0)
+    (Zmatrix, A1, Z1) = sample_statistics(g, A, Z, statfuncs, thetas[0], basicALAAMsampler, 10, 10, 100)
+    assert Zmatrix.shape == (10, len(statfuncs))
+    assert numpy.allclose(Z1, computeObservedStatistics(g, A1, statfuncs))
+
+    # with snowball sampling zones the conditional ensemble sampler is used
+    # by default, so nodes in the outermost zone are not changed, and the
+    # (unconditional) ensembleALAAMsampler is rejected
+    g.zone = [i % 3 for i in range(g.numNodes())]
+    g.max_zone = 2
+    g.inner_nodes = [i for (i, z) in enumerate(g.zone) if z < g.max_zone]
+    (Zmatrix, A1, Z1) = sample_statistics(g, A, Z, statfuncs, thetas[0], conditionalALAAMsampler, 10, 10, 100, num_chains = 4)
+    assert numpy.any(A1 != 0) and numpy.all(A1[2::3] == 0)
+    assert numpy.allclose(Z1, computeObservedStatistics(g, A1, statfuncs))
+    try:
+        sample_statistics(g, A, Z, statfuncs, thetas[0], conditionalALAAMsampler, 10, 10, 100, num_chains = 4, ensemble_sampler_func = ensembleALAAMsampler)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_parallel_tempering_sampler():
+    """
+    test the parallel tempering (replica exchange) sampler
+    """
+    print("testing parallel tempering sampler...")
+    start = time.time()
+    betas = geometric_temperature_ladder(5, 8.0)
+    assert betas[0] == 1 and isclose(betas[-1], 1/8.0)
+    assert numpy.all(numpy.diff(betas) < 0)
+
+    g = Graph("../examples/data/karate_club/karate.net",
+              "../examples/data/karate_club/karate_binattr.txt",
+              "../examples/data/karate_club/karate_contattr.txt",
+              "../examples/data/karate_club/karate_catattr.txt")
+    statfuncs = [changeDensity, changeActivity, changeContagion]
+    theta = numpy.array([-3.0, 0.1, 0.6])
+    rng = numpy.random.default_rng(5)
+    A = [0] * g.numNodes()
+    A[0] = NA_VALUE
+    Z = computeObservedStatistics(g, A, statfuncs)
+    for k in range(20):
+        (acc, ch1, ch0) = parallelTemperingALAAMsampler(g, A, statfuncs, theta, True, 50, betas = betas, swap_interval = 20, rng = rng)
+        assert 0 <= acc <= 1
+        Z += ch1 - ch0
+        assert numpy.allclose(Z, computeObservedStatistics(g, A, statfuncs))
+        assert A[0] == NA_VALUE
+    pt = g.parallel_tempering
+    assert sorted(pt.temperature) == list(range(len(betas)))
+    assert numpy.all(pt.swap_attempts > 0)
+    assert numpy.all((pt.swapAcceptanceRates() >= 0) & (pt.swapAcceptanceRates() <= 1))
+    assert numpy.array_equal(pt.Amatrix[pt.coldReplica()], A)
+    for r in range(len(betas)):
+        assert numpy.allclose(pt.Zmatrix[r], computeObservedStatistics(g, pt.Amatrix[r], statfuncs))
+    # a different outcome vector replaces the cold chain
+    A = [1] * g.numNodes()
+    (acc, ch1, ch0) = parallelTemperingALAAMsampler(g, A, statfuncs, theta, True, 50, betas = betas, rng = rng)
+    assert numpy.allclose(computeObservedStatistics(g, [1] * g.numNodes(), statfuncs) + ch1 - ch0, computeObservedStatistics(g, A, statfuncs))
+    # not tempered and A not changed if performMove is False
+    Acopy = list(A)
+    parallelTemperingALAAMsampler(g, A, statfuncs, theta, False, 50, betas = betas, rng = rng)
+    assert A == Acopy
+
+    check_small_network_distribution(partial(parallelTemperingALAAMsampler, betas = geometric_temperature_ladder(3, 4.0), rng = numpy.random.default_rng(11)))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_simulate_theta_path():
+    """
+    test simulating along a grid of theta values, warm-starting each
+    point from the previous one: forward and backward (hysteresis)
+    paths, segments in parallel processes, and the mean statistics
+    at each point on a network small enough to enumerate all outcome
+    vectors
+    """
+    print("testing simulation along theta path...")
+    start = time.time()
+    theta_grid = numpy.array([[-0.5, c, -0.1] for c in [0.0, 0.2, 0.4, 0.6]])
+    (g, statfuncs, expectedZ) = small_network_expected_statistics(theta_grid)
+    N = g.numNodes()
+
+    results = simulate_theta_path(g, statfuncs, theta_grid, 4000,
+                                  iterationInStep = N, burnIn = 100*N,
+                                  sampler_func = batchALAAMsampler,
+                                  hysteresis = True)
+    assert len(results) == 2 * len(theta_grid)
+    assert [d for (theta, d, Zmatrix, acc, A) in results] == [1]*4 + [-1]*4
+    for (k, (theta, direction, Zmatrix, acc, A)) in enumerate(results):
+        j = k if direction == 1 else 2*len(theta_grid) - 1 - k
+        assert numpy.array_equal(theta, theta_grid[j])
+        assert Zmatrix.shape == (4000, len(statfuncs))
+        assert len(acc) == 4000
+        assert numpy.allclose(Zmatrix[-1], computeObservedStatistics(g, A, statfuncs))
+        assert numpy.allclose(numpy.mean(Zmatrix, axis = 0), expectedZ[j], rtol = 0.1)
+
+    results = simulate_theta_path(g, statfuncs, theta_grid, 10,
+                                  iterationInStep = N, burnIn = 10*N,
+                                  sampler_func = batchALAAMsampler,
+                                  num_segments = 2, processes = 2,
+                                  seed = 123)
+    assert len(results) == len(theta_grid)
+    for (k, (theta, direction, Zmatrix, acc, A)) in enumerate(results):
+        assert direction == 1
+        assert numpy.array_equal(theta, theta_grid[k])
+        assert numpy.allclose(Zmatrix[-1], computeObservedStatistics(g, A, statfuncs))
+    # different seeds for the segments
+    assert not numpy.array_equal(results[0][2], results[2][2])
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_importance_reweighting():
+    """
+    test importance reweighting of simulated statistics to other theta
+    values, on a network small enough to enumerate all outcome vectors
+    """
+    print("testing importance reweighting...")
+    start = time.time()
+    theta_grid = numpy.array([[-0.5, c, -0.1] for c in [0.0, 0.1, 0.2, 0.3, 0.4]])
+    (g, statfuncs, expectedZ) = small_network_expected_statistics(theta_grid)
+    N = g.numNodes()
+    samples_list = [ReweightedSamples.fromSimulation(theta_grid[k],
+                                                     simulateALAAM(g, statfuncs, theta_grid[k], 5000, N, 100*N, sampler_func = batchALAAMsampler))
+                    for k in [0, 4]]
+    assert samples_list[0].numSamples() == 5000
+    # no reweighting at the theta simulated with
+    (mean, variance, ess, reliable) = samples_list[0].estimate(theta_grid[0])
+    assert numpy.isclose(ess, 5000)
+    assert reliable
+    assert numpy.allclose(mean, numpy.mean(samples_list[0].getZmatrix(), axis = 0))
+    assert numpy.allclose(variance, numpy.var(samples_list[0].getZmatrix(), axis = 0))
+    assert numpy.isclose(numpy.sum(samples_list[0].weights(theta_grid[2])), 1)
+
+    results = reweight_theta_grid(samples_list, theta_grid)
+    assert len(results) == len(theta_grid)
+    assert results[0][4] is samples_list[0] and results[4][4] is samples_list[1]
+    for (k, (mean, variance, ess, reliable, samples)) in enumerate(results):
+        assert reliable
+        assert numpy.allclose(mean, expectedZ[k], rtol = 0.1)
+
+    # far from the theta simulated with, the estimate is not reliable
+    (mean, variance, ess, reliable) = samples_list[0].estimate(numpy.array([2.0, 2.0, 2.0]))
+    assert not reliable
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_streaming_gof():
+    """
+    test the running mean and covariance (including merging) used for
+    goodness-of-fit, and that gof() gives the same results as computed
+    from all the simulated statistics written to file
+    """
+    print("testing streaming goodness-of-fit...")
+    start = time.time()
+    X = numpy.random.default_rng(42).normal(size = (500, 4)) @ numpy.array([[1, 0.5, 0, 0], [0, 1, 0, 0.2], [0, 0, 2, 0], [0, 0, 0, 1]])
+    stats = RunningMeanCovariance(4)
+    for x in X[:300]:
+        stats.update(x)
+    stats2 = RunningMeanCovariance(4)
+    for x in X[300:]:
+        stats2.update(x)
+    stats.merge(stats2)
+    stats.merge(RunningMeanCovariance(4))
+    assert stats.count == 500
+    assert numpy.allclose(stats.mean, numpy.mean(X, axis = 0))
+    assert numpy.allclose(stats.variance(), numpy.var(X, axis = 0))
+    assert numpy.allclose(stats.covariance(), numpy.cov(X, rowvar = False))
+
+    g = Graph("../examples/data/karate_club/karate.net")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeActivity, changeContagion, changeTwoStar]
+    labels = ["Density", "Activity", "Contagion", "TwoStar"]
+    theta = numpy.array([-1.0, 0.1, 0.2, 0.0])
+    with tempfile.TemporaryDirectory() as tmpdir:
+        statsfile = os.path.join(tmpdir, "sim_stats.txt")
+        (tratio, mdist) = gof(g, outcome_binvar, statfuncs, theta,
+                              numSamples = 200, iterationInStep = 100,
+                              burnIn = 1000, outputStatsFilename = statsfile,
+                              labels = labels)
+        simstats = numpy.loadtxt(statsfile, skiprows = 1)
+    assert simstats.shape == (200, len(statfuncs) + 2)
+    Zmatrix = simstats[:, 1:-1]
+    Zobs = computeObservedStatistics(g, outcome_binvar, statfuncs)
+    assert numpy.allclose(tratio, (numpy.mean(Zmatrix, axis = 0) - Zobs) / numpy.std(Zmatrix, axis = 0))
+    assert math.isclose(mdist, mahalanobis(Zobs, Zmatrix))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_gof_chains():
+    """
+    test goodness-of-fit with multiple chains in parallel processes: the
+    samples are divided between the chains, the chains have different
+    seeds, and the between-chain diagnostic
+    """
+    print("testing goodness-of-fit with multiple chains...")
+    start = time.time()
+    stats = []
+    for offset in [0.0, 0.0, 5.0]:
+        s = RunningMeanCovariance(2)
+        for x in numpy.random.default_rng(len(stats)).normal(size = (1000, 2)):
+            s.update(x + [offset, 0])
+        stats.append(s)
+    rhat = potential_scale_reduction(stats[:2])
+    assert numpy.all(numpy.abs(rhat - 1) < 0.01)
+    rhat = potential_scale_reduction(stats)
+    assert rhat[0] > 1.5 and abs(rhat[1] - 1) < 0.01
+
+    g = Graph("../examples/data/karate_club/karate.net")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeActivity, changeContagion]
+    labels = ["Density", "Activity", "Contagion"]
+    theta = numpy.array([-1.0, 0.1, 0.2])
+    with tempfile.TemporaryDirectory() as tmpdir:
+        statsfile = os.path.join(tmpdir, "sim_stats.txt")
+        (tratio, mdist) = gof(g, outcome_binvar, statfuncs, theta,
+                              numSamples = 101, iterationInStep = 100,
+                              burnIn = 1000, outputStatsFilename = statsfile,
+                              labels = labels, num_chains = 2, processes = 2,
+                              seed = 123)
+        assert os.listdir(tmpdir) == ["sim_stats.txt"]
+        simstats = numpy.loadtxt(statsfile, skiprows = 1)
+    assert simstats.shape == (101, len(statfuncs) + 2)
+    # chain 0 has 51 samples, chain 1 has 50, with different seeds
+    assert numpy.array_equal(simstats[:51, 0], 1000 + 100 * numpy.arange(1, 52))
+    assert numpy.array_equal(simstats[51:, 0], 1000 + 100 * numpy.arange(1, 51))
+    assert not numpy.array_equal(simstats[:50, 1:], simstats[51:, 1:])
+    Zmatrix = simstats[:, 1:-1]
+    Zobs = computeObservedStatistics(g, outcome_binvar, statfuncs)
+    assert numpy.allclose(tratio, (numpy.mean(Zmatrix, axis = 0) - Zobs) / numpy.std(Zmatrix, axis = 0))
+    assert math.isclose(mdist, mahalanobis(Zobs, Zmatrix))
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_checkpoint_resume():
+    """
+    test checkpointing and resuming EE and stochastic approximation
+    estimation: resuming from a checkpoint gives the same results as
+    an uninterrupted run
+    """
+    print("testing checkpoint and resume...")
+    start = time.time()
+    g = Graph("../examples/data/karate_club/karate.net")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    statfuncs = [changeDensity, changeActivity, changeContagion]
+    labels = ["Density", "Activity", "Contagion"]
+
+    def seed_rngs(seed):
+        import batchALAAMsampler as batch_sampler_module
+        random.seed(seed)
+        numpy.random.seed(seed)
+        batch_sampler_module.default_rng = numpy.random.default_rng(seed)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            seed_rngs(42)
+            run_ee(g, outcome_binvar, "full", statfuncs, labels,
+                   EEiterations = 500,
+                   sampler_func = batchALAAMsampler)
+            # stopped after 300 iterations (checkpoint at end), with more
+            # output written after the checkpoint, then resumed to 500
+            seed_rngs(42)
+            run_ee(g, outcome_binvar, "resumed", statfuncs, labels,
+                   EEiterations = 300, sampler_func = batchALAAMsampler,
+                   checkpoint_filename = "ee.ckpt",
+                   checkpoint_interval = 200)
+            assert pickle.load(open("ee.ckpt", "rb"))["t"] == 300
+            for prefix in ["theta_values_", "dzA_values_"]:
+                with open(prefix + "resumed.txt", "a") as f:
+                    f.write("300 0 0 0 0\n")
+            run_ee(g, outcome_binvar, "resumed", statfuncs, labels,
+                   EEiterations = 500, sampler_func = batchALAAMsampler,
+                   checkpoint_filename = "ee2.ckpt",
+                   checkpoint_interval = 200, resume_from = "ee.ckpt")
+            assert pickle.load(open("ee2.ckpt", "rb"))["t"] == 500
+            for prefix in ["theta_values_", "dzA_values_"]:
+                assert (open(prefix + "full.txt").read() ==
+                        open(prefix + "resumed.txt").read())
+
+            # parameters must be the same as in checkpoint
+            try:
+                run_ee(g, outcome_binvar, "resumed", statfuncs[:2], labels[:2],
+                       EEiterations = 500, resume_from = "ee.ckpt")
+                assert False, "expected ValueError"
+            except ValueError:
+                pass
+
+            Zobs = computeObservedStatistics(g, outcome_binvar, statfuncs)
+            checkpoints = []
+            def checkpoint_func(state):
+                filename = "sa" + str(len(checkpoints)) + ".ckpt"
+                save_checkpoint(filename, dict(state, algorithm = 'SA',
+                                               labels = labels))
+                checkpoints.append(filename)
+            seed_rngs(42)
+            full = stochasticApproximation(g, outcome_binvar, statfuncs,
+                                           numpy.zeros(3), Zobs,
+                                           batchALAAMsampler,
+                                           checkpoint_func = checkpoint_func,
+                                           checkpoint_interval = 10)
+            states = [pickle.load(open(f, "rb")) for f in checkpoints]
+            assert states[-1]["phase"] == 3
+            # resume from in the middle of a subphase, the start of
+            # a subphase, and the start of phase 3
+            for k in [next(k for (k, s) in enumerate(states) if s["phase"] == 2 and s["subphase"] == 1 and s["i"] > 0),
+                      next(k for (k, s) in enumerate(states) if s["phase"] == 2 and s["subphase"] == 3 and s["i"] == 0),
+                      len(states) - 1]:
+                state = load_checkpoint(checkpoints[k], 'SA', labels)
+                resumed = stochasticApproximation(g, outcome_binvar,
+                                                  statfuncs, numpy.zeros(3),
+                                                  Zobs, batchALAAMsampler,
+                                                  resume_state = state)
+                for (x, y) in zip(full, resumed):
+                    assert numpy.array_equal(x, y)
+        finally:
+            os.chdir(cwd)
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_ee_stopping_rule():
+    """
+    test stopping EE estimation early when theta has settled
+    """
+    print("testing EE stopping rule...")
+    start = time.time()
+    oscillating = lambda t: numpy.array([1.0, -2.0]) * (-1)**t
+    # dzA fluctuating around zero and constant theta: stops at end of
+    # second window (first has no previous window to compare theta with)
+    rule = EEStoppingRule(window = 100)
+    assert next(t for t in range(1000) if rule.update(t, numpy.array([0.5, -1.0]), oscillating(t))) == 199
+    assert rule.reason.startswith("after 200 iterations")
+    # theta drifting: does not stop
+    rule = EEStoppingRule(window = 100)
+    assert not any(rule.update(t, numpy.array([0.5, -1.0 + 0.001 * t]), oscillating(t)) for t in range(1000))
+    assert rule.reason is None
+    # dzA not around zero: does not stop
+    rule = EEStoppingRule(window = 100)
+    assert not any(rule.update(t, numpy.array([0.5, -1.0]), oscillating(t) + 1) for t in range(1000))
+    # not before min_iterations
+    rule = EEStoppingRule(window = 100, min_iterations = 500)
+    assert next(t for t in range(1000) if rule.update(t, numpy.array([0.5, -1.0]), oscillating(t))) == 499
+
+    g = Graph("../examples/data/karate_club/karate.net")
+    outcome_binvar = list(map(int_or_na, open("../examples/data/karate_club/karate_outcome.txt").read().split()[1:]))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            rule = EEStoppingRule(window = 200)
+            run_ee(g, outcome_binvar, "karate",
+                   [changeDensity, changeActivity, changeContagion],
+                   ["Density", "Activity", "Contagion"],
+                   EEiterations = 20000, sampler_func = batchALAAMsampler,
+                   checkpoint_filename = "ee.ckpt", stopping_rule = rule)
+            assert rule.reason is not None
+            state = pickle.load(open("ee.ckpt", "rb"))
+            assert state["t"] < 20000
+            assert state["stopping_rule"].reason == rule.reason
+            theta_values = numpy.loadtxt("theta_values_karate.txt", skiprows = 1)
+            # last row is the iteration stopped at
+            assert theta_values[-1, 0] == state["t"] - 1
+        finally:
+            os.chdir(cwd)
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_binattr_high_degree():
+    """
+    test change statistics summing a binary attribute over the neighbours
+    of a node do not overflow for a node with degree over 127
+    """
+    print("testing binary attribute sums for high degree node...")
+    start = time.time()
+    g = Graph(num_nodes = 201)
+    for j in range(1, 201):
+        g.insertEdge(0, j)
+    g.binattr = attribute_columns({'b': [0] + [1]*200}, BINATTR_DTYPE)
+    A = [0] * 201
+    f = partial(changeo_Ob, 'b')
+    assert f(g, A, 0) == 200
+    assert getChangeStatisticsTable(g, [changeDensity, f]).changeStats(g, A, 0)[1] == 200
+    assert f(toCSR(g), A, 0) == 200
+    print("OK,", time.time() - start, "s")
+    print()
+
+
+def test_csr_bipartite_estimation():
+    """
+    test EE and stochastic approximation estimation run to completion
+    (including goodness-of-fit) on a CSR bipartite graph
+    """
+    print("testing estimation on CSR bipartite graph...")
+    start = time.time()
+    g = toCSR(BipartiteGraph("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_bipartite.net"))
+    outcome_binvar = list(map(int_or_na, open("../examples/data/bipartite/Inouye_Pyke_pollinator_web/inouye_outcome_BNA.txt").read().split()[1:]))
+    statfuncs = [partial(changeBipartiteDensity, MODE_A),
+                 partial(changeBipartiteActivity, MODE_A)]
+    labels = ["bipartiteDensityA", "bipartiteActivityA"]
+    sampler = partial(jitBipartiteALAAMsampler, MODE_A)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            run_ee(g, outcome_binvar, "inouye", statfuncs, labels,
+                   EEiterations = 200, sampler_func = sampler)
+            assert os.path.exists("theta_values_inouye.txt")
+            run_sa(g, outcome_binvar, statfuncs, labels,
+                   sampler_func = sampler, GoFiterationInStep = 10,
+                   GoFburnIn = 100, bipartiteGoFfixedMode = MODE_B,
+                   add_gof_param_func_list = [])
+        finally:
+            os.chdir(cwd)
+    print("OK,", time.time() - start, "s")
+    print()
+
     
 ############################### main #########################################
 
@@ -931,6 +2688,33 @@ def main():
     test_changestats_comparison()
     test_mahalanobis()
     test_new_bipartite_change_stats_tiny()
+    test_csr_graphs()
+    test_changestats_table()
+    test_active_neighbour_counts()
+    test_fused_change_stats()
+    test_batch_sampler()
+    test_zoo_sampler_node_sets()
+    test_conditional_sampler()
+    test_run_ee_parallel()
+    test_compute_ee_covariance()
+    test_binary_graph()
+    test_read_graph_files()
+    test_category_match()
+    test_jit_kernels()
+    test_mple()
+    test_direct_statistics()
+    test_checkerboard_sampler()
+    test_heat_bath_sampler()
+    test_ensemble_sampler()
+    test_parallel_tempering_sampler()
+    test_simulate_theta_path()
+    test_importance_reweighting()
+    test_streaming_gof()
+    test_gof_chains()
+    test_checkpoint_resume()
+    test_ee_stopping_rule()
+    test_binattr_high_degree()
+    test_csr_bipartite_estimation()
 
 if __name__ == "__main__":
     main()